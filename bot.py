@@ -45,12 +45,15 @@ from cogs.ranking.services.rank_notifications_service import RankNotificationSer
 from cogs.ranking.services.ranking_service import RankingService
 from cogs.ranking.services.mmr_tracker_service import MmrTrackerService
 from core.bootstrap import ServiceContainer, build_service_container
+from core.chart_renderer import ChartRenderer
+from core.deadline_scheduler import DeadlineScheduler
 from integrations.twitch.service import TwitchService as TwitchApiService
 
 # ------------------------------------------------------------
 # Logging
 # ------------------------------------------------------------
-setup_logging(LOG_LEVELS)
+# setup_logging est appele dans main(): les workers spawn du ChartRenderer
+# re-importent ce module et ne doivent pas ouvrir leur propre logs/bot.log.
 logger = logging.getLogger("bot")
 
 
@@ -135,6 +138,8 @@ class KayoBot(commands.Bot):
         self.rank_notification_service: RankNotificationService | None = None
         self.henrik_service: HenrikDevService | None = None
         self.mmr_tracker_service: MmrTrackerService | None = None
+        self.chart_renderer: ChartRenderer | None = None
+        self.deadline_scheduler: DeadlineScheduler | None = None
 
     async def setup_hook(self) -> None:
         """
@@ -159,6 +164,8 @@ class KayoBot(commands.Bot):
             SETTINGS.henrik_valo_key,
             twitch_client_id=SETTINGS.twitch_client_id,
             twitch_client_secret=SETTINGS.twitch_client_secret,
+            http_cache_dir=SETTINGS.http_cache_dir,
+            chart_cache_dir=SETTINGS.chart_cache_dir,
         )
         self._http_client = self.services.http_client
         self.channel_configuration_service = self.services.channel_configuration_service
@@ -184,6 +191,8 @@ class KayoBot(commands.Bot):
         self.rank_notification_service = self.services.rank_notification_service
         self.henrik_service = self.services.henrik_service
         self.mmr_tracker_service = self.services.mmr_tracker_service
+        self.chart_renderer = self.services.chart_renderer
+        self.deadline_scheduler = self.services.deadline_scheduler
         logger.info("AccueilService initialized.")
         logger.info("CleanService initialized.")
         logger.info("AutomodService initialized.")
@@ -213,10 +222,19 @@ class KayoBot(commands.Bot):
         try:
             await super().close()
         finally:
+            if self.services is not None:
+                await self.services.response_cache.close()
+                await self.services.chart_renderer.close()
+                logger.info("Chart render pool stopped.")
+                await self.services.deadline_scheduler.close()
+                logger.info("Deadline scheduler stopped.")
             if self._http_client is not None:
                 await self._http_client.close()
                 self._http_client = None
                 logger.info("HTTP client closed.")
+            if self.services is not None:
+                await self.services.users_db_service.close()
+                logger.info("Users last_seen flusher stopped.")
             if self.db is not None:
                 await self.db.close()
                 self.db = None
@@ -295,10 +313,9 @@ class KayoBot(commands.Bot):
             logger.exception("Command sync failed")
 
 
-bot = KayoBot()
-
-
 async def main() -> None:
+    setup_logging(LOG_LEVELS)
+
     try:
         validate_runtime_config(SETTINGS)
     except ConfigValidationError as exc:
@@ -313,6 +330,7 @@ async def main() -> None:
         logger.error("Discord token missing after config validation.")
         return
 
+    bot = KayoBot()
     async with bot:
         await bot.start(token)
 
@@ -1,6 +1,6 @@
 # cogs/accueil/renderers/__init__.py
 """Presentation renderers for accueil cogs."""
 
-from .member_stats_chart import build_member_evolution_chart
+from .member_stats_chart import build_member_evolution_chart, render_member_evolution_png
 
-__all__ = ["build_member_evolution_chart"]
+__all__ = ["build_member_evolution_chart", "render_member_evolution_png"]
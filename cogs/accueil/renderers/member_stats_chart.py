@@ -24,11 +24,28 @@ def build_member_evolution_chart(
     evolution_data: Sequence[EvolutionPoint],
     current_member_count: int,
 ) -> io.BytesIO:
-    if not evolution_data:
+    return io.BytesIO(
+        render_member_evolution_png(
+            [point.date for point in evolution_data],
+            [point.net_change for point in evolution_data],
+            current_member_count,
+        )
+    )
+
+
+def render_member_evolution_png(
+    days: Sequence[date],
+    net_changes: Sequence[int],
+    current_member_count: int,
+) -> bytes:
+    """Rendu PNG a partir de listes simples (picklable: utilise par le pool de rendu)."""
+    if not days:
         raise ValueError("evolution_data must not be empty")
+    if len(days) != len(net_changes):
+        raise ValueError("days and net_changes must have the same length")
 
-    dates = [point.date.strftime("%d-%m") for point in evolution_data]
-    net_changes = [point.net_change for point in evolution_data]
+    dates = [day.strftime("%d-%m") for day in days]
+    net_changes = list(net_changes)
 
     cumulative = [0] * len(net_changes)
     cumulative[-1] = current_member_count
@@ -62,6 +79,5 @@ def build_member_evolution_chart(
 
     buffer = io.BytesIO()
     fig.savefig(buffer, format="png", dpi=100)
-    buffer.seek(0)
     plt.close(fig)
-    return buffer
+    return buffer.getvalue()
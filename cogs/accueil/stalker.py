@@ -7,22 +7,30 @@ import discord
 from discord.ext import commands, tasks
 import logging
 import asyncio
+import io
 from datetime import datetime, time
 from zoneinfo import ZoneInfo
 from typing import Optional, Dict
 
 from cogs.accueil.presenters import build_member_stats_embed, detect_period_from_embed
-from cogs.accueil.renderers import build_member_evolution_chart
+from cogs.accueil.renderers import render_member_evolution_png
 from cogs.accueil.services import AccueilService
 from cogs.accueil.views import StatsView
+from core.chart_renderer import ChartRenderer, ChartRenderError
 
 logger = logging.getLogger(__name__)
 
 
 class StalkerCog(commands.Cog):
-    def __init__(self, bot: commands.Bot, accueil_service: AccueilService):
+    def __init__(
+        self,
+        bot: commands.Bot,
+        accueil_service: AccueilService,
+        chart_renderer: ChartRenderer,
+    ):
         self.bot = bot
         self._service = accueil_service
+        self._chart_renderer = chart_renderer
         # Multi-serveur : dictionnaire {guild_id: message}
         self.persistent_messages: Dict[int, discord.Message] = {}
         self._load_persistent_task: asyncio.Task | None = None
@@ -82,11 +90,17 @@ class StalkerCog(commands.Cog):
             logger.info("Aucune donnée d'évolution trouvée pour la période demandée.")
             return None
 
-        chart_buffer = build_member_evolution_chart(
-            evolution_data,
-            current_member_count=guild.member_count or 0,
-        )
-        return discord.File(fp=chart_buffer, filename="evolution_membres.png")
+        try:
+            png = await self._chart_renderer.render(
+                render_member_evolution_png,
+                [point.date for point in evolution_data],
+                [point.net_change for point in evolution_data],
+                guild.member_count or 0,
+            )
+        except ChartRenderError as e:
+            logger.warning(f"Graphique d'évolution non rendu pour la guilde {guild.id}: {e}")
+            return None
+        return discord.File(fp=io.BytesIO(png), filename="evolution_membres.png")
 
     async def update_stats_embed(
         self,
@@ -266,5 +280,10 @@ async def setup(bot: commands.Bot):
         logger.error("accueil_service non initialisé. StalkerCog ne sera pas chargé.")
         return
 
-    await bot.add_cog(StalkerCog(bot, accueil_service))
+    chart_renderer = getattr(bot, "chart_renderer", None)
+    if chart_renderer is None:
+        logger.error("chart_renderer non initialisé. StalkerCog ne sera pas chargé.")
+        return
+
+    await bot.add_cog(StalkerCog(bot, accueil_service, chart_renderer))
     logger.info("StalkerCog chargé.")
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from typing import Callable
+
 from database.services.guild_channels_service import ChannelConfigurationService as ChannelConfigurationDbService
 
 
@@ -18,6 +20,13 @@ class ChannelConfigurationService:
     def __init__(self, db_service: ChannelConfigurationDbService):
         self._db_service = db_service
 
+    def add_write_listener(self, listener: Callable[[int], None]) -> None:
+        """listener(guild_id) est appele apres chaque ecriture de la config."""
+        self._db_service.add_write_listener(listener)
+
+    def remove_write_listener(self, listener: Callable[[int], None]) -> None:
+        self._db_service.remove_write_listener(listener)
+
     async def get_all(self, guild_id: int) -> dict[str, int]:
         return await self._db_service.get_all(guild_id)
 
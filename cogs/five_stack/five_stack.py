@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import logging
+from datetime import datetime, timedelta, timezone
 from typing import Literal
 
 import discord
@@ -21,39 +22,52 @@ from cogs.five_stack.presenters import (
     team_status_message,
 )
 from cogs.five_stack.services import FiveStackService
+from cogs.five_stack.services.five_stack_service import QUEUE_ANY_AFTER_SECONDS, QUEUE_REMOVE_AFTER_SECONDS
 from cogs.five_stack.views import QueueView, TeamPublicView
+from core.deadline_scheduler import DeadlineScheduler
 from database.services.five_stack_service import FiveStackTeamInfo
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_MATCHMAKING_CATEGORY = "Matchmaking"
 TEAM_RETENTION_HOURS = 24
+QUEUE_EXPIRY_DEADLINE = "five_stack.queue_expiry"
+# Nouvelle recherche de groupes pour une guild (cle: guild_id): echec de creation
+# d'un match ou prochain elargissement des fenetres d'ELO
+QUEUE_SEARCH_DEADLINE = "five_stack.queue_search"
+MATCH_RETRY_SECONDS = 30
+# Rechargement de l'index de file quand la lecture en base a echoue
+QUEUE_RELOAD_DEADLINE = "five_stack.queue_reload"
+QUEUE_RELOAD_RETRY_SECONDS = 30
 
 
 class FiveStackCog(commands.Cog):
     team_group = app_commands.Group(name="team", description="Gestion des equipes five-stack")
     matchmaking_group = app_commands.Group(name="matchmaking", description="Stats et historique matchmaking")
 
-    def __init__(self, bot: commands.Bot, service: FiveStackService) -> None:
+    def __init__(self, bot: commands.Bot, service: FiveStackService, deadline_scheduler: DeadlineScheduler) -> None:
         self.bot = bot
         self._service = service
+        self._deadlines = deadline_scheduler
         self._views_reloaded = False
         self._server_locks: dict[int, asyncio.Lock] = {}
-        self.process_queue_task_loop.start()
-        self.stale_task.start()
+        self._deadlines.register(QUEUE_EXPIRY_DEADLINE, self._expire_queue_entries)
+        self._deadlines.register(QUEUE_SEARCH_DEADLINE, self._search_queue)
+        self._deadlines.register(QUEUE_RELOAD_DEADLINE, self._reload_queue)
         self.cleanup_teams_task.start()
         self.voice_cleaner_task.start()
         logger.info("FiveStackCog initialized.")
 
     def cog_unload(self) -> None:
         for task_loop in (
-            self.process_queue_task_loop,
-            self.stale_task,
             self.cleanup_teams_task,
             self.voice_cleaner_task,
         ):
             if task_loop.is_running():
                 task_loop.cancel()
+        self._deadlines.unregister(QUEUE_EXPIRY_DEADLINE)
+        self._deadlines.unregister(QUEUE_SEARCH_DEADLINE)
+        self._deadlines.unregister(QUEUE_RELOAD_DEADLINE)
         self._server_locks.clear()
 
     @commands.Cog.listener()
@@ -62,6 +76,36 @@ class FiveStackCog(commands.Cog):
             return
         self._views_reloaded = True
         await self._reload_persistent_views()
+        # Reprise apres redemarrage: la file persistee peut deja contenir des groupes complets
+        await self._reload_queue()
+
+    @commands.Cog.listener()
+    async def on_presence_reconciled(self, result) -> None:
+        # La synchro de presence du demarrage a pu retirer de la base des entrees
+        # deja chargees dans l'index (membres partis pendant le downtime)
+        if result.queue_entries_removed:
+            await self._reload_queue()
+            for guild in self.bot.guilds:
+                await self._refresh_queue_message(guild)
+
+    async def _reload_queue(self, _key: None = None) -> None:
+        # load_queue() est serialise avec les ecritures de la file dans le service
+        try:
+            await self._service.load_queue()
+            expiry = await self._service.next_queue_expiry()
+        except Exception:
+            # Sans index ni echeance d'expiration la file resterait figee: on insiste
+            logger.exception("Five-stack queue reload failed, retrying in %ss.", QUEUE_RELOAD_RETRY_SECONDS)
+            self._deadlines.schedule(
+                QUEUE_RELOAD_DEADLINE,
+                None,
+                datetime.now(timezone.utc) + timedelta(seconds=QUEUE_RELOAD_RETRY_SECONDS),
+            )
+            return
+        self._deadlines.cancel(QUEUE_RELOAD_DEADLINE, None)
+        for guild in self.bot.guilds:
+            await self._process_queue(guild)
+        self._schedule_queue_expiry(expiry, replace=True)
 
     @commands.Cog.listener()
     async def on_member_remove(self, member: discord.Member) -> None:
@@ -337,40 +381,63 @@ class FiveStackCog(commands.Cog):
             ephemeral=True,
         )
 
-    @tasks.loop(seconds=15)
-    async def process_queue_task_loop(self) -> None:
-        try:
-            proposals = await self._service.find_match_proposals()
-            for proposal in proposals:
-                guild = self.bot.get_guild(proposal.guild_id)
-                if guild is None:
-                    continue
-                lock = self._server_locks.setdefault(guild.id, asyncio.Lock())
-                async with lock:
+    async def _process_queue(self, guild: discord.Guild) -> None:
+        """
+        Matchmaking declenche par les evenements de file (ajout, passage en "any",
+        redemarrage). Le verrou de guild couvre recherche et creation des matchs pour
+        qu'une entree ne soit pas proposee deux fois.
+        """
+        lock = self._server_locks.setdefault(guild.id, asyncio.Lock())
+        async with lock:
+            try:
+                for proposal in await self._service.find_match_proposals(guild.id):
                     await self._create_match(guild, proposal)
-        except Exception:
-            logger.exception("Five-stack queue processing task failed.")
+                self._schedule_queue_search(guild.id)
+            except Exception:
+                # Le bucket reste a examiner mais aucun evenement ne le relancerait
+                logger.exception("Five-stack queue processing failed for guild %s, retrying later.", guild.id)
+                self._deadlines.schedule(
+                    QUEUE_SEARCH_DEADLINE,
+                    guild.id,
+                    datetime.now(timezone.utc) + timedelta(seconds=MATCH_RETRY_SECONDS),
+                )
 
-    @process_queue_task_loop.before_loop
-    async def before_process_queue(self) -> None:
-        await self.bot.wait_until_ready()
+    def _schedule_queue_search(self, guild_id: int) -> None:
+        # Sans nouvel evenement, seul l'elargissement des fenetres d'ELO peut creer un groupe
+        when = self._service.next_queue_search(guild_id)
+        if when is None:
+            self._deadlines.cancel(QUEUE_SEARCH_DEADLINE, guild_id)
+        else:
+            self._deadlines.schedule(QUEUE_SEARCH_DEADLINE, guild_id, when)
 
-    @tasks.loop(minutes=1)
-    async def stale_task(self) -> None:
-        try:
-            converted, removed_ids = await self._service.cleanup_queue()
-            if not converted and not removed_ids:
-                return
+    async def _search_queue(self, guild_id: int) -> None:
+        guild = self.bot.get_guild(guild_id)
+        if guild is not None:
+            await self._process_queue(guild)
+
+    async def _expire_queue_entries(self, _key: None) -> None:
+        converted, removed_ids = await self._service.cleanup_queue()
+        if converted or removed_ids:
             for guild in self.bot.guilds:
+                await self._process_queue(guild)
                 await self._refresh_queue_message(guild)
             for member_id in removed_ids:
                 await self._safe_dm(member_id, "Votre inscription a la queue a expire apres 10 minutes.")
-        except Exception:
-            logger.exception("Five-stack stale queue cleanup task failed.")
-
-    @stale_task.before_loop
-    async def before_stale(self) -> None:
-        await self.bot.wait_until_ready()
+        self._schedule_queue_expiry(await self._service.next_queue_expiry(), replace=True)
+
+    def _schedule_queue_expiry(self, when: datetime | None, *, replace: bool = False) -> None:
+        """
+        Une seule echeance pour toute la file: la plus proche. replace=False ne fait
+        qu'avancer l'echeance courante (ajout en file), replace=True la recalcule.
+        """
+        if when is None:
+            self._deadlines.cancel(QUEUE_EXPIRY_DEADLINE, None)
+            return
+        # Marge d'une seconde: le nettoyage compare queued_at au now() de PostgreSQL
+        when = max(when, datetime.now(timezone.utc)) + timedelta(seconds=1)
+        current = self._deadlines.deadline(QUEUE_EXPIRY_DEADLINE, None)
+        if replace or current is None or when < current:
+            self._deadlines.schedule(QUEUE_EXPIRY_DEADLINE, None, when)
 
     @tasks.loop(hours=1)
     async def cleanup_teams_task(self) -> None:
@@ -451,8 +518,11 @@ class FiveStackCog(commands.Cog):
             return
 
         await self._service.add_queue_entry(data)
+        delay = QUEUE_ANY_AFTER_SECONDS if desired_team_size != 0 else QUEUE_REMOVE_AFTER_SECONDS
+        self._schedule_queue_expiry(datetime.now(timezone.utc) + timedelta(seconds=delay))
         await self._refresh_queue_message(interaction.guild)
         await interaction.followup.send(queue_status_message("joined"), ephemeral=True)
+        await self._process_queue(interaction.guild)
 
     async def _create_match(self, guild: discord.Guild, proposal) -> None:
         channel = await self._create_match_voice_channel(guild, proposal.member_ids)
@@ -582,5 +652,9 @@ async def setup(bot: commands.Bot) -> None:
     if service is None:
         logger.error("five_stack_service is not initialized. FiveStackCog will not be loaded.")
         return
-    await bot.add_cog(FiveStackCog(bot, service))
+    deadline_scheduler = getattr(bot, "deadline_scheduler", None)
+    if deadline_scheduler is None:
+        logger.error("deadline_scheduler is not initialized. FiveStackCog will not be loaded.")
+        return
+    await bot.add_cog(FiveStackCog(bot, service, deadline_scheduler))
     logger.info("FiveStackCog loaded.")
@@ -1,17 +1,18 @@
 from cogs.five_stack.services.five_stack_service import (
     FiveStackService,
-    MatchProposal,
     PlayerProfile,
     QueueEntryData,
     TeamCreateResult,
     TeamMemberResult,
 )
+from cogs.five_stack.services.queue_matchmaker import MatchProposal, QueueMatchmaker
 
 __all__ = [
     "FiveStackService",
     "MatchProposal",
     "PlayerProfile",
     "QueueEntryData",
+    "QueueMatchmaker",
     "TeamCreateResult",
     "TeamMemberResult",
 ]
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import asyncio
 import secrets
 import string
 from dataclasses import dataclass
-from datetime import datetime, timezone
-from typing import Iterable, Sequence
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
 
+from cogs.five_stack.services.queue_matchmaker import DEFAULT_ELO, MatchProposal, QueueMatchmaker
 from database.services.five_stack_service import FiveStackDbService, FiveStackTeamInfo
 from database.services.guild_channels_service import ChannelConfigurationService
 from database.services.guild_roles_service import RoleConfigurationService
@@ -24,8 +26,10 @@ PLATFORM_ROLE_KEYS = ("pc", "console")
 DEFAULT_LANGUAGE = "francais"
 DEFAULT_REGION = "eu"
 DEFAULT_PLATFORM = "pc"
-DEFAULT_ELO = 1000
 MAX_TEAM_MEMBERS = 5
+# Une entree de file passe en "any" apres 5 minutes et expire apres 10 minutes
+QUEUE_ANY_AFTER_SECONDS = 300
+QUEUE_REMOVE_AFTER_SECONDS = 600
 
 
 @dataclass(frozen=True, slots=True)
@@ -72,18 +76,6 @@ class TeamMemberResult:
     team: FiveStackTeamInfo | None = None
 
 
-@dataclass(frozen=True, slots=True)
-class MatchProposal:
-    guild_id: int
-    entries: tuple[object, ...]
-    member_ids: tuple[int, ...]
-    team_size: int
-    quality_score: float
-    elo_spread: int
-    avg_elo: int
-    role_diversity_score: float
-
-
 class FiveStackService:
     def __init__(
         self,
@@ -98,6 +90,10 @@ class FiveStackService:
         self._roles = role_config_service
         self._messages = persistent_messages_service
         self._valorant = valorant_db_service
+        self._matchmaker = QueueMatchmaker()
+        # Ecritures de la file et rechargements de l'index serialises: une entree
+        # ajoutee pendant list_queue() ne doit pas disparaitre au load() qui suit
+        self._queue_lock = asyncio.Lock()
 
     async def create_team(
         self,
@@ -312,7 +308,11 @@ class FiveStackService:
         )
 
     async def add_queue_entry(self, data: QueueEntryData):
-        return await self._db.add_queue_entry(
+        async with self._queue_lock:
+            return await self._add_queue_entry(data)
+
+    async def _add_queue_entry(self, data: QueueEntryData):
+        row = await self._db.add_queue_entry(
             guild_id=data.guild_id,
             guild_name=data.guild_name,
             discord_member_id=data.discord_member_id,
@@ -329,38 +329,70 @@ class FiveStackService:
             elo_low=data.elo_low,
             roles=data.roles,
         )
+        # Avant le premier load_queue(), l'entree sera lue depuis la base
+        if self._matchmaker.loaded:
+            self._matchmaker.add(row)
+        return row
 
     async def remove_from_queue(self, *, guild_id: int, discord_member_id: int) -> bool:
-        return await self._db.remove_from_queue(guild_id=guild_id, discord_member_id=discord_member_id)
+        async with self._queue_lock:
+            removed = await self._db.remove_from_queue(guild_id=guild_id, discord_member_id=discord_member_id)
+            self._matchmaker.remove_member(guild_id, discord_member_id)
+        return removed
 
     async def list_queue(self, guild_id: int | None = None):
         return await self._db.list_queue(guild_id)
 
-    async def cleanup_queue(self, *, any_after_seconds: int = 300, remove_after_seconds: int = 600):
-        return await self._db.cleanup_queue(
+    async def cleanup_queue(
+        self,
+        *,
+        any_after_seconds: int = QUEUE_ANY_AFTER_SECONDS,
+        remove_after_seconds: int = QUEUE_REMOVE_AFTER_SECONDS,
+    ):
+        converted, removed_ids = await self._db.cleanup_queue(
             any_after_seconds=any_after_seconds,
             remove_after_seconds=remove_after_seconds,
         )
+        if converted or removed_ids:
+            # Conversion et expiration sont decidees par now() cote PostgreSQL: on relit la file
+            await self.load_queue()
+        return converted, removed_ids
+
+    async def load_queue(self) -> None:
+        """(Re)construit l'index de matchmaking depuis five_stack_queue."""
+        async with self._queue_lock:
+            self._matchmaker.load(await self._db.list_queue(None))
+
+    async def next_queue_expiry(self) -> datetime | None:
+        """Prochaine conversion en "any" ou expiration d'une entree de file (None si file vide)."""
+        return self.queue_expiry(await self._db.list_queue(None))
+
+    @staticmethod
+    def queue_expiry(entries: Iterable[object]) -> datetime | None:
+        deadlines = []
+        for entry in entries:
+            queued_at = entry.queued_at if entry.queued_at.tzinfo else entry.queued_at.replace(tzinfo=timezone.utc)
+            delay = QUEUE_ANY_AFTER_SECONDS if entry.desired_team_size != 0 else QUEUE_REMOVE_AFTER_SECONDS
+            deadlines.append(queued_at + timedelta(seconds=delay))
+        return min(deadlines) if deadlines else None
 
     async def find_match_proposals(self, guild_id: int | None = None) -> tuple[MatchProposal, ...]:
-        entries = await self._db.list_queue(guild_id)
-        proposals = []
-        used_entry_ids: set[int] = set()
-
-        for candidate_group in self._compatible_groups(entries):
-            available = [entry for entry in candidate_group if entry.id not in used_entry_ids]
-            for target_size in (5, 3, 2):
-                proposal = self._build_greedy_proposal(available, target_size)
-                if proposal is None:
-                    continue
-                proposals.append(proposal)
-                used_entry_ids.update(entry.id for entry in proposal.entries)
-                break
+        """Propositions des buckets modifies depuis la derniere recherche, sans relire la file."""
+        async with self._queue_lock:
+            if not self._matchmaker.loaded:
+                self._matchmaker.load(await self._db.list_queue(None))
+            return self._matchmaker.find_proposals(guild_id)
 
-        return tuple(proposals)
+    def next_queue_search(self, guild_id: int) -> datetime | None:
+        """Quand relancer la recherche de la guild: les fenetres d'ELO s'elargissent avec l'attente."""
+        return self._matchmaker.next_search_at(guild_id)
 
     async def record_match(self, proposal: MatchProposal, *, match_code: str, voice_channel_id: int | None):
-        return await self._db.create_match(
+        async with self._queue_lock:
+            return await self._record_match(proposal, match_code=match_code, voice_channel_id=voice_channel_id)
+
+    async def _record_match(self, proposal: MatchProposal, *, match_code: str, voice_channel_id: int | None):
+        match = await self._db.create_match(
             guild_id=proposal.guild_id,
             match_code=match_code,
             voice_channel_id=voice_channel_id,
@@ -371,6 +403,8 @@ class FiveStackService:
             avg_elo=proposal.avg_elo,
             role_diversity_score=proposal.role_diversity_score,
         )
+        self._matchmaker.remove_ids(entry.id for entry in proposal.entries)
+        return match
 
     async def get_player_stats(self, *, guild_id: int, discord_member_id: int):
         return await self._db.get_player_stats(guild_id=guild_id, discord_member_id=discord_member_id)
@@ -483,64 +517,3 @@ class FiveStackService:
                 if role in counts:
                     counts[role] += len(getattr(entry, "all_member_ids", ()))
         return counts
-
-    def _compatible_groups(self, entries: Sequence[object]) -> list[list[object]]:
-        groups: dict[tuple[int, str, str, str], list[object]] = {}
-        for entry in entries:
-            key = (entry.guild_id, entry.language, entry.region, entry.platform)
-            groups.setdefault(key, []).append(entry)
-        return [sorted(group, key=lambda item: item.queued_at) for group in groups.values()]
-
-    def _build_greedy_proposal(self, entries: Sequence[object], target_size: int) -> MatchProposal | None:
-        candidates = [
-            entry
-            for entry in entries
-            if entry.entry_type <= target_size
-            and entry.desired_team_size in {0, target_size}
-        ]
-        selected = []
-        member_ids: list[int] = []
-        total = 0
-
-        for entry in candidates:
-            entry_members = list(entry.all_member_ids)
-            if total + len(entry_members) > target_size:
-                continue
-            if set(entry_members) & set(member_ids):
-                continue
-            selected.append(entry)
-            member_ids.extend(entry_members)
-            total += len(entry_members)
-            if total == target_size:
-                break
-
-        if total != target_size or not selected:
-            return None
-
-        elos = [entry.elo if entry.elo is not None else DEFAULT_ELO for entry in selected]
-        elo_spread = max(elos) - min(elos) if len(elos) > 1 else 0
-        avg_elo = sum(elos) // len(elos)
-        roles = {role for entry in selected for role in entry.roles}
-        role_diversity = min(1.0, len(roles) / 5)
-        wait_bonus = min(0.2, self._oldest_wait_seconds(selected) / 1800)
-        quality_score = max(0.0, min(1.0, 1 - (elo_spread / 1000) + role_diversity * 0.2 + wait_bonus))
-
-        return MatchProposal(
-            guild_id=selected[0].guild_id,
-            entries=tuple(selected),
-            member_ids=tuple(member_ids),
-            team_size=target_size,
-            quality_score=round(quality_score, 3),
-            elo_spread=elo_spread,
-            avg_elo=avg_elo,
-            role_diversity_score=round(role_diversity, 3),
-        )
-
-    @staticmethod
-    def _oldest_wait_seconds(entries: Sequence[object]) -> int:
-        now = datetime.now(timezone.utc)
-        waits = []
-        for entry in entries:
-            queued_at = entry.queued_at if entry.queued_at.tzinfo else entry.queued_at.replace(tzinfo=timezone.utc)
-            waits.append(max(0, int((now - queued_at).total_seconds())))
-        return max(waits) if waits else 0
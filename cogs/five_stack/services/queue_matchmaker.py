@@ -0,0 +1,364 @@
+from __future__ import annotations
+
+import bisect
+import math
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Sequence
+
+DEFAULT_ELO = 1000
+TARGET_TEAM_SIZES = (5, 3, 2)
+# Ecart d'ELO toujours accepte autour d'une entree, elargi avec l'attente
+MMR_TOLERANCE = 150
+MMR_WIDEN_PER_MINUTE = 50
+# Voisins en ELO examines autour de l'entree la plus ancienne (C(10, 4) = 210 groupes au pire)
+SEARCH_POOL_SIZE = 10
+
+BucketKey = tuple[int, str, str, str]
+
+
+@dataclass(frozen=True, slots=True)
+class MatchProposal:
+    guild_id: int
+    entries: tuple[object, ...]
+    member_ids: tuple[int, ...]
+    team_size: int
+    quality_score: float
+    elo_spread: int
+    avg_elo: int
+    role_diversity_score: float
+
+
+def bucket_key(entry: object) -> BucketKey:
+    return (entry.guild_id, entry.language, entry.region, entry.platform)
+
+
+def entry_elo(entry: object) -> int:
+    return entry.elo if entry.elo is not None else DEFAULT_ELO
+
+
+@dataclass(slots=True)
+class QueueBucket:
+    """Entrees compatibles (meme guild, langue, region, plateforme), par anciennete et par ELO."""
+
+    by_time: dict[int, object] = field(default_factory=dict)
+    by_elo: list[tuple[int, int]] = field(default_factory=list)
+    dirty: bool = True
+    # Prochain palier d'elargissement des fenetres d'ELO: nouvelle recherche a faire
+    widen_at: datetime | None = None
+
+    def add(self, entry: object) -> None:
+        # Les ajouts arrivent dans l'ordre de queued_at (upsert -> now()), load() trie au prealable
+        self.by_time[entry.id] = entry
+        bisect.insort(self.by_elo, (entry_elo(entry), entry.id))
+        self.dirty = True
+
+    def remove(self, entry_id: int) -> object | None:
+        entry = self.by_time.pop(entry_id, None)
+        if entry is None:
+            return None
+        index = bisect.bisect_left(self.by_elo, (entry_elo(entry), entry_id))
+        del self.by_elo[index]
+        self.dirty = True
+        return entry
+
+    def __len__(self) -> int:
+        return len(self.by_time)
+
+
+class QueueMatchmaker:
+    """
+    Index en memoire de five_stack_queue, mis a jour a chaque ajout/retrait au lieu
+    de relire et regrouper toute la file. La base reste la source de verite: load()
+    reconstruit l'index (demarrage, nettoyage des entrees expirees).
+
+    Seuls les buckets modifies depuis la derniere recherche infructueuse, ou dont
+    une fenetre d'ELO s'est elargie depuis (next_search_at()), sont re-examines
+    par find_proposals().
+    """
+
+    def __init__(self) -> None:
+        self._buckets: dict[BucketKey, QueueBucket] = {}
+        self._entries: dict[int, BucketKey] = {}
+        # (guild_id, discord_member_id) -> entree du membre (cle de l'upsert)
+        self._owners: dict[tuple[int, int], int] = {}
+        self._members: dict[tuple[int, int], set[int]] = {}
+        self.loaded = False
+
+    def load(self, entries: Iterable[object]) -> None:
+        self._buckets.clear()
+        self._entries.clear()
+        self._owners.clear()
+        self._members.clear()
+        for entry in sorted(entries, key=lambda item: (item.queued_at, item.id)):
+            self.add(entry)
+        self.loaded = True
+
+    def add(self, entry: object) -> None:
+        owner = (entry.guild_id, entry.discord_member_id)
+        previous = self._owners.get(owner)
+        if previous is not None:
+            self._remove(previous)
+        if entry.id in self._entries:
+            self._remove(entry.id)
+
+        key = bucket_key(entry)
+        self._buckets.setdefault(key, QueueBucket()).add(entry)
+        self._entries[entry.id] = key
+        self._owners[owner] = entry.id
+        for member_id in entry.all_member_ids:
+            self._members.setdefault((entry.guild_id, member_id), set()).add(entry.id)
+
+    def remove_member(self, guild_id: int, discord_member_id: int) -> int:
+        """Comme FiveStackQueueRepo.delete_member: l'entree du membre et celles d'equipe qui le contiennent."""
+        entry_ids = set(self._members.get((guild_id, discord_member_id), ()))
+        owned = self._owners.get((guild_id, discord_member_id))
+        if owned is not None:
+            entry_ids.add(owned)
+        for entry_id in entry_ids:
+            self._remove(entry_id)
+        return len(entry_ids)
+
+    def remove_ids(self, entry_ids: Iterable[int]) -> None:
+        for entry_id in entry_ids:
+            self._remove(entry_id)
+
+    def entries(self, guild_id: int | None = None) -> tuple[object, ...]:
+        return tuple(
+            entry
+            for key, bucket in self._buckets.items()
+            if guild_id is None or key[0] == guild_id
+            for entry in bucket.by_time.values()
+        )
+
+    def find_proposals(
+        self,
+        guild_id: int | None = None,
+        *,
+        now: datetime | None = None,
+    ) -> tuple[MatchProposal, ...]:
+        now = now or datetime.now(timezone.utc)
+        proposals = []
+        for key, bucket in self._buckets.items():
+            if guild_id is not None and key[0] != guild_id:
+                continue
+            if not bucket.dirty and (bucket.widen_at is None or bucket.widen_at > now):
+                continue
+            found = search_bucket(bucket.by_time.values(), bucket.by_elo, now=now)
+            # Un bucket reste "dirty" tant qu'il produit des propositions: si la
+            # creation du match echoue, il sera re-examine au prochain evenement.
+            bucket.dirty = bool(found)
+            bucket.widen_at = next_widening(bucket.by_time.values(), now) if len(bucket) > 1 else None
+            proposals.extend(found)
+        return tuple(proposals)
+
+    def next_search_at(self, guild_id: int) -> datetime | None:
+        """Prochain elargissement de fenetre d'ELO dans la guild (None: rien a attendre)."""
+        return min(
+            (
+                bucket.widen_at
+                for key, bucket in self._buckets.items()
+                if key[0] == guild_id and bucket.widen_at is not None
+            ),
+            default=None,
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, entry_id: int) -> None:
+        key = self._entries.pop(entry_id, None)
+        if key is None:
+            return
+        bucket = self._buckets[key]
+        entry = bucket.remove(entry_id)
+        if not bucket:
+            del self._buckets[key]
+        owner = (entry.guild_id, entry.discord_member_id)
+        if self._owners.get(owner) == entry_id:
+            del self._owners[owner]
+        for member_id in entry.all_member_ids:
+            member_entries = self._members.get((entry.guild_id, member_id))
+            if member_entries is None:
+                continue
+            member_entries.discard(entry_id)
+            if not member_entries:
+                del self._members[(entry.guild_id, member_id)]
+
+
+@dataclass(frozen=True, slots=True)
+class _Candidate:
+    entry: object
+    elo: int
+    size: int
+    members: frozenset[int]
+    roles: frozenset[str]
+    low: float
+    high: float
+    wait: int
+
+
+def _candidate(entry: object, now: datetime) -> _Candidate:
+    elo = entry_elo(entry)
+    wait = wait_seconds(entry, now)
+    if entry.mmr_extended:
+        low, high = -math.inf, math.inf
+    else:
+        widen = MMR_WIDEN_PER_MINUTE * (wait // 60)
+        low = min(entry.elo_low if entry.elo_low is not None else elo, elo - MMR_TOLERANCE) - widen
+        high = max(entry.elo_high if entry.elo_high is not None else elo, elo + MMR_TOLERANCE) + widen
+    return _Candidate(
+        entry=entry,
+        elo=elo,
+        size=len(entry.all_member_ids),
+        members=frozenset(entry.all_member_ids),
+        roles=frozenset(entry.roles),
+        low=low,
+        high=high,
+        wait=wait,
+    )
+
+
+def search_bucket(
+    entries_by_time: Iterable[object],
+    elo_index: Sequence[tuple[int, int]],
+    *,
+    now: datetime,
+) -> list[MatchProposal]:
+    """
+    Les entrees sont servies par anciennete: pour chacune, on cherche parmi ses
+    SEARCH_POOL_SIZE voisins en ELO (fenetre glissante sur l'index trie) le groupe
+    de la taille visee qui maximise quality_score, chaque entree devant accepter
+    l'ELO de toutes les autres (elo_low/elo_high, sauf mmr_extended).
+    """
+    candidates = {entry.id: _candidate(entry, now) for entry in entries_by_time}
+    ordered = [entry_id for _, entry_id in elo_index if entry_id in candidates]
+    position = {entry_id: index for index, entry_id in enumerate(ordered)}
+    used: set[int] = set()
+    proposals = []
+
+    for anchor_id, anchor in candidates.items():
+        if anchor_id in used:
+            continue
+        desired = anchor.entry.desired_team_size
+        for target_size in (desired,) if desired else TARGET_TEAM_SIZES:
+            if anchor.size > target_size:
+                continue
+            pool = _neighbours(anchor, target_size, ordered, position[anchor_id], candidates, used)
+            best = _best_group(anchor, pool, target_size)
+            if best is None:
+                continue
+            proposals.append(_proposal(best, target_size))
+            used.update(candidate.entry.id for candidate in best)
+            break
+    return proposals
+
+
+def _neighbours(
+    anchor: _Candidate,
+    target_size: int,
+    ordered: list[int],
+    index: int,
+    candidates: dict[int, _Candidate],
+    used: set[int],
+) -> list[_Candidate]:
+    """Plus proches voisins en ELO compatibles avec l'ancre, du plus proche au plus lointain."""
+    pool = []
+    left, right = index - 1, index + 1
+    room = target_size - anchor.size
+    while len(pool) < SEARCH_POOL_SIZE and (left >= 0 or right < len(ordered)):
+        left_gap = anchor.elo - candidates[ordered[left]].elo if left >= 0 else math.inf
+        right_gap = candidates[ordered[right]].elo - anchor.elo if right < len(ordered) else math.inf
+        if left_gap <= right_gap:
+            candidate = candidates[ordered[left]]
+            left -= 1
+        else:
+            candidate = candidates[ordered[right]]
+            right += 1
+        # L'index est trie: au-dela des bornes de l'ancre, le cote est epuise
+        if not anchor.low <= candidate.elo <= anchor.high:
+            if candidate.elo < anchor.elo:
+                left = -1
+            else:
+                right = len(ordered)
+            continue
+        if (
+            candidate.entry.id in used
+            or candidate.size > room
+            or candidate.entry.desired_team_size not in {0, target_size}
+            or not candidate.low <= anchor.elo <= candidate.high
+            or not candidate.members.isdisjoint(anchor.members)
+        ):
+            continue
+        pool.append(candidate)
+    return pool
+
+
+def _best_group(anchor: _Candidate, pool: list[_Candidate], target_size: int) -> list[_Candidate] | None:
+    best: list[_Candidate] | None = None
+    best_score = -math.inf
+
+    def visit(start: int, group: list[_Candidate], members: frozenset[int], remaining: int,
+              lowest: int, highest: int, low: float, high: float) -> None:
+        nonlocal best, best_score
+        if remaining == 0:
+            score = _raw_quality(group, highest - lowest)
+            if score > best_score:
+                best, best_score = list(group), score
+            return
+        for index in range(start, len(pool)):
+            candidate = pool[index]
+            if candidate.size > remaining or not members.isdisjoint(candidate.members):
+                continue
+            new_lowest, new_highest = min(lowest, candidate.elo), max(highest, candidate.elo)
+            new_low, new_high = max(low, candidate.low), min(high, candidate.high)
+            if new_lowest < new_low or new_highest > new_high:
+                continue
+            group.append(candidate)
+            visit(index + 1, group, members | candidate.members, remaining - candidate.size,
+                  new_lowest, new_highest, new_low, new_high)
+            group.pop()
+
+    visit(0, [anchor], anchor.members, target_size - anchor.size,
+          anchor.elo, anchor.elo, anchor.low, anchor.high)
+    return best
+
+
+def _raw_quality(group: Sequence[_Candidate], elo_spread: int) -> float:
+    role_diversity = min(1.0, len(frozenset().union(*(candidate.roles for candidate in group))) / 5)
+    wait_bonus = min(0.2, max(candidate.wait for candidate in group) / 1800)
+    return 1 - (elo_spread / 1000) + role_diversity * 0.2 + wait_bonus
+
+
+def _proposal(group: Sequence[_Candidate], target_size: int) -> MatchProposal:
+    group = sorted(group, key=lambda candidate: (candidate.entry.queued_at, candidate.entry.id))
+    elos = [candidate.elo for candidate in group]
+    elo_spread = max(elos) - min(elos)
+    role_diversity = min(1.0, len(frozenset().union(*(candidate.roles for candidate in group))) / 5)
+    quality_score = max(0.0, min(1.0, _raw_quality(group, elo_spread)))
+    return MatchProposal(
+        guild_id=group[0].entry.guild_id,
+        entries=tuple(candidate.entry for candidate in group),
+        member_ids=tuple(member_id for candidate in group for member_id in candidate.entry.all_member_ids),
+        team_size=target_size,
+        quality_score=round(quality_score, 3),
+        elo_spread=elo_spread,
+        avg_elo=sum(elos) // len(elos),
+        role_diversity_score=round(role_diversity, 3),
+    )
+
+
+def next_widening(entries: Iterable[object], now: datetime) -> datetime | None:
+    """Prochaine minute d'attente entamee (MMR_WIDEN_PER_MINUTE) parmi les entrees non etendues."""
+    steps = []
+    for entry in entries:
+        if entry.mmr_extended:
+            continue
+        queued_at = entry.queued_at if entry.queued_at.tzinfo else entry.queued_at.replace(tzinfo=timezone.utc)
+        steps.append(queued_at + timedelta(minutes=wait_seconds(entry, now) // 60 + 1))
+    return min(steps, default=None)
+
+
+def wait_seconds(entry: object, now: datetime) -> int:
+    queued_at = entry.queued_at if entry.queued_at.tzinfo else entry.queued_at.replace(tzinfo=timezone.utc)
+    return max(0, int((now - queued_at).total_seconds()))
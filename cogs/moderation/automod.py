@@ -436,6 +436,10 @@ class AutoMod(commands.Cog):
             window_seconds=window_seconds,
         )
 
+    def get_recent_message_refs(self, *, user_id: int, guild_id: int) -> list[tuple[int, int]]:
+        """Messages recents connus du tracker (suppression ciblee lors d'un ban)."""
+        return self._spam_tracker.get_user_message_refs(user_id=user_id, guild_id=guild_id)
+
     def clear_pending_spam(self, *, user_id: int, guild_id: int) -> None:
         self._spam_tracker.clear_pending_spam(user_id=user_id, guild_id=guild_id)
 
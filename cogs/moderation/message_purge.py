@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+MAX_SCAN_PER_CHANNEL = 1000
+# Salons purges en meme temps, tous bans confondus. discord.py attend deja les
+# buckets de rate limit de chaque route; la borne evite d'en ouvrir trop a la fois.
+MAX_CONCURRENT_CHANNELS = 4
+BULK_DELETE_MAX = 100
+PURGE_REASON = "Suppression des messages suite à un ban"
+
+
+@dataclass(slots=True)
+class PurgeProgress:
+    channels_total: int
+    channels_done: int = 0
+    deleted: int = 0
+
+
+ProgressCallback = Callable[[PurgeProgress], Awaitable[None]]
+
+
+def can_purge(channel: discord.TextChannel) -> bool:
+    permissions = channel.permissions_for(channel.guild.me)
+    return permissions.manage_messages and permissions.read_message_history
+
+
+def idle_since(channel: discord.TextChannel, after_id: int) -> bool:
+    """Aucun message dans le salon depuis after_id (snowflake du debut de la fenetre)."""
+    last_message_id = channel.last_message_id
+    return last_message_id is not None and last_message_id <= after_id
+
+
+class MessagePurger:
+    """
+    Suppression des messages d'un membre sur un ensemble de salons, en parallele
+    sous un semaphore partage par toutes les purges en cours.
+
+    Les refs (channel_id, message_id) deja connues (tracker anti-spam) sont
+    supprimees en bulk d'abord; les salons sans message dans la fenetre ne sont
+    pas scannes.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = MAX_CONCURRENT_CHANNELS,
+        scan_limit: int = MAX_SCAN_PER_CHANNEL,
+    ) -> None:
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._scan_limit = scan_limit
+
+    async def purge(
+        self,
+        channels: Iterable[discord.TextChannel],
+        *,
+        user_id: int,
+        after: datetime,
+        known_refs: Iterable[tuple[int, int]] = (),
+        on_progress: ProgressCallback | None = None,
+    ) -> PurgeProgress:
+        after_id = discord.utils.time_snowflake(after)
+        known: dict[int, set[int]] = {}
+        for channel_id, message_id in known_refs:
+            if message_id > after_id:
+                known.setdefault(channel_id, set()).add(message_id)
+
+        targets = [
+            channel
+            for channel in channels
+            if can_purge(channel) and (channel.id in known or not idle_since(channel, after_id))
+        ]
+        progress = PurgeProgress(channels_total=len(targets))
+
+        async def run(channel: discord.TextChannel) -> None:
+            async with self._slots:
+                deleted = await self._purge_channel(
+                    channel,
+                    user_id=user_id,
+                    after=after,
+                    known_ids=known.get(channel.id, ()),
+                )
+            progress.channels_done += 1
+            progress.deleted += deleted
+            if on_progress is not None:
+                await on_progress(progress)
+
+        await asyncio.gather(*(run(channel) for channel in targets))
+        return progress
+
+    async def _purge_channel(
+        self,
+        channel: discord.TextChannel,
+        *,
+        user_id: int,
+        after: datetime,
+        known_ids: Iterable[int],
+    ) -> int:
+        """Retourne le nombre de suppressions confirmees par Discord."""
+        deleted = await self._delete_known(channel, sorted(known_ids))
+
+        # Toujours scanner: les refs connues ne couvrent pas forcement tous les messages
+        try:
+            purged = await channel.purge(
+                limit=self._scan_limit,
+                check=lambda message: message.author.id == user_id,
+                after=after,
+                reason=PURGE_REASON,
+            )
+            deleted += len(purged)
+        except discord.Forbidden:
+            logger.debug(f"Pas de permission pour purger dans {channel.name} ({channel.guild.name})")
+        except discord.HTTPException as e:
+            logger.error(f"Erreur lors de la purge dans {channel.name} ({channel.guild.name}): {e}")
+        except Exception as e:
+            logger.error(f"Erreur inattendue lors de la purge dans {channel.name} ({channel.guild.name}): {e}")
+        return deleted
+
+    async def _delete_known(self, channel: discord.TextChannel, known_ids: list[int]) -> int:
+        deleted = 0
+        for start in range(0, len(known_ids), BULK_DELETE_MAX):
+            chunk_ids = known_ids[start:start + BULK_DELETE_MAX]
+            try:
+                await channel.delete_messages(
+                    [discord.Object(id=message_id) for message_id in chunk_ids],
+                    reason=PURGE_REASON,
+                )
+                deleted += len(chunk_ids)
+            except discord.NotFound:
+                # Un message du lot deja supprime fait echouer tout le bulk: un par un
+                deleted += await self._delete_one_by_one(channel, chunk_ids)
+            except discord.HTTPException as e:
+                logger.error(f"Erreur lors de la suppression des messages connus dans {channel.name} ({channel.guild.name}): {e}")
+                break
+        return deleted
+
+    async def _delete_one_by_one(self, channel: discord.TextChannel, message_ids: list[int]) -> int:
+        deleted = 0
+        for message_id in message_ids:
+            try:
+                await channel.get_partial_message(message_id).delete()
+                deleted += 1
+            except discord.NotFound:
+                continue
+            except discord.HTTPException as e:
+                logger.error(f"Erreur lors de la suppression d'un message connu dans {channel.name} ({channel.guild.name}): {e}")
+                break
+        return deleted
@@ -1,16 +1,19 @@
 # cogs/moderation/moderation.py
 import asyncio
+import time
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
+from cogs.moderation.message_purge import MessagePurger, ProgressCallback, PurgeProgress
 from cogs.moderation.presenters import (
     build_ban_dm_embed,
     build_unban_dm_embed,
     format_ban_status_message,
+    format_purge_progress,
 )
 from cogs.moderation.services.internal_ban_workflow import (
     apply_internal_ban,
@@ -18,23 +21,51 @@ from cogs.moderation.services.internal_ban_workflow import (
     remove_internal_ban,
 )
 from cogs.moderation.services.moderation_service import ModerationService
+from core.deadline_scheduler import DeadlineScheduler
 
 logger = logging.getLogger(__name__)
 
-MAX_BAN_PURGE_SCAN_PER_CHANNEL = 1000
+PURGE_PROGRESS_INTERVAL_SECONDS = 2.0
+BAN_EXPIRY_DEADLINE = "moderation.ban_expiry"
+TEMPORARY_BANS_RETRY_SECONDS = 30.0
+BAN_EXPIRY_GUILD_RETRY = timedelta(minutes=15)
 
 class Moderation(commands.Cog):
     """Cog pour gérer les bannissements, débannissements, avertissements et vérifications."""
-    def __init__(self, bot: commands.Bot, moderation_service: ModerationService):
+    def __init__(
+        self,
+        bot: commands.Bot,
+        moderation_service: ModerationService,
+        deadline_scheduler: DeadlineScheduler,
+    ):
         self.bot = bot
         self._mod_svc = moderation_service
+        self._deadlines = deadline_scheduler
         self.lock = asyncio.Lock()
         self._internal_ban_enforcements: set[tuple[int, int]] = set()
-        self.check_bans_expired.start()
+        self._purger = MessagePurger()
+        self._deadlines.register(BAN_EXPIRY_DEADLINE, self._expire_ban)
+        self._init_task = asyncio.create_task(self._async_init())
         logger.info("Initialisation du Cog de Modération.")
 
+    async def _async_init(self):
+        """Charge l'index des bans et planifie la fin de chaque ban temporaire."""
+        await self.bot.wait_until_ready()
+        await self._mod_svc.load_ban_index()
+
+        # Sans cette liste aucune fin de ban ne serait planifiee: on insiste
+        while (bans := await self._mod_svc.get_temporary_bans()) is None:
+            await asyncio.sleep(TEMPORARY_BANS_RETRY_SECONDS)
+        for ban in bans:
+            if ban.target_discord_id and ban.ban_end is not None:
+                self._deadlines.schedule(
+                    BAN_EXPIRY_DEADLINE, (ban.guild_id, ban.target_discord_id), ban.ban_end
+                )
+        logger.info(f"{len(bans)} fin(s) de bannissement temporaire planifiée(s).")
+
     def cog_unload(self):
-        self.check_bans_expired.cancel()
+        self._init_task.cancel()
+        self._deadlines.unregister(BAN_EXPIRY_DEADLINE)
         logger.info("Cog de Modération déchargé.")
 
     async def ensure_moderator_permissions(self, interaction: discord.Interaction):
@@ -179,21 +210,31 @@ class Moderation(commands.Cog):
                     duration_minutes=duration_minutes
                 )
 
-                # Supprimer les messages si demandé
+                # Supprimer les messages si demandé, avec suivi dans un followup édité
                 deleted_count = 0
+                status_message = None
                 if success and delete_period != "none":
+                    status_message = await interaction.followup.send(
+                        "Suppression des messages en cours...",
+                        ephemeral=True,
+                        wait=True,
+                    )
                     deleted_count = await self.delete_user_messages(
                         user_id=user.id,
                         period=delete_period,
                         scope=scope,
-                        current_guild=interaction.guild
+                        current_guild=interaction.guild,
+                        on_progress=self._purge_progress_reporter(status_message),
                     )
 
                 if success:
                     msg = f"{user.display_name} a été banni(e) {'temporairement' if ban_type == 'temp' else 'définitivement'}."
                     if deleted_count > 0:
                         msg += f"\n{deleted_count} message(s) supprimé(s)."
-                    await interaction.followup.send(msg, ephemeral=True)
+                    if status_message is not None:
+                        await status_message.edit(content=msg)
+                    else:
+                        await interaction.followup.send(msg, ephemeral=True)
                 else:
                     await interaction.followup.send(
                         "Une erreur est survenue lors du bannissement. Veuillez vérifier les rôles et permissions du bot.",
@@ -305,6 +346,12 @@ class Moderation(commands.Cog):
             if not result.ban_recorded:
                 return False
 
+            # Un nouveau ban remplace le precedent: sa fin (ou son absence) fait foi
+            if ban_end is not None:
+                self._deadlines.schedule(BAN_EXPIRY_DEADLINE, (guild.id, member.id), ban_end)
+            else:
+                self._deadlines.cancel(BAN_EXPIRY_DEADLINE, (guild.id, member.id))
+
             logger.debug(
                 f"Ajout du bannissement : user_id={member.id}, ban_type={ban_type}, "
                 f"reason={reason}, banned_by={banned_by.id}, ban_end={ban_end}, roles_backup={list(result.roles_backed_up)}"
@@ -335,6 +382,7 @@ class Moderation(commands.Cog):
     async def unban_member(self, guild: discord.Guild, user_id: int, reason: Optional[str] = None) -> None:
         """Débanni un membre et restaure ses rôles sur tous les serveurs."""
         logger.debug(f"Tentative de débannissement de l'utilisateur ID: {user_id}. Raison: {reason}")
+        self._deadlines.cancel(BAN_EXPIRY_DEADLINE, (guild.id, user_id))
 
         result = await remove_internal_ban(
             bot=self.bot,
@@ -383,7 +431,8 @@ class Moderation(commands.Cog):
         user_id: int,
         period: str,
         scope: str,
-        current_guild: discord.Guild
+        current_guild: discord.Guild,
+        on_progress: Optional[ProgressCallback] = None,
     ) -> int:
         """
         Supprime les messages d'un utilisateur dans une période donnée.
@@ -393,6 +442,7 @@ class Moderation(commands.Cog):
             period: Période de suppression ("1h", "6h", "12h", "24h", "7d")
             scope: Portée ("current" pour le serveur actuel, "all" pour tous les serveurs)
             current_guild: Le serveur où la commande a été exécutée
+            on_progress: Appelé après chaque salon traité
 
         Returns:
             Le nombre total de messages supprimés
@@ -410,79 +460,88 @@ class Moderation(commands.Cog):
         if not delta:
             return 0
 
-        after_date = datetime.utcnow() - delta
-        total_deleted = 0
+        after_date = discord.utils.utcnow() - delta
 
         # Déterminer les serveurs à parcourir
         guilds_to_process = [current_guild] if scope == "current" else self.bot.guilds
+        channels = [channel for guild in guilds_to_process for channel in guild.text_channels]
 
-        for guild in guilds_to_process:
-            # Parcourir tous les salons textuels
-            for channel in guild.text_channels:
-                try:
-                    # Vérifier que le bot a les permissions
-                    if not channel.permissions_for(guild.me).manage_messages:
-                        continue
-                    if not channel.permissions_for(guild.me).read_message_history:
-                        continue
-
-                    # Utiliser purge avec un check sur l'auteur
-                    def check(msg):
-                        return msg.author.id == user_id
-
-                    deleted = await channel.purge(
-                        limit=MAX_BAN_PURGE_SCAN_PER_CHANNEL,
-                        check=check,
-                        after=after_date,
-                        reason=f"Suppression des messages suite à un ban"
-                    )
-                    total_deleted += len(deleted)
+        # Messages déjà connus de l'automod: suppression ciblée avant le scan
+        known_refs: list[tuple[int, int]] = []
+        automod_cog = self.bot.get_cog("AutoMod")
+        if automod_cog and hasattr(automod_cog, "get_recent_message_refs"):
+            for guild in guilds_to_process:
+                known_refs.extend(automod_cog.get_recent_message_refs(user_id=user_id, guild_id=guild.id))
+
+        progress = await self._purger.purge(
+            channels,
+            user_id=user_id,
+            after=after_date,
+            known_refs=known_refs,
+            on_progress=on_progress,
+        )
+
+        logger.info(
+            f"Suppression terminée: {progress.deleted} messages de l'utilisateur {user_id} supprimés "
+            f"({progress.channels_done}/{len(channels)} salons parcourus)."
+        )
+        return progress.deleted
+
+    def _purge_progress_reporter(self, status_message: discord.WebhookMessage) -> ProgressCallback:
+        """Édite le followup au plus toutes les PURGE_PROGRESS_INTERVAL_SECONDS."""
+        last_edit = 0.0
+
+        async def report(progress: PurgeProgress) -> None:
+            nonlocal last_edit
+            now = time.monotonic()
+            if now - last_edit < PURGE_PROGRESS_INTERVAL_SECONDS:
+                return
+            last_edit = now
+            try:
+                await status_message.edit(content=format_purge_progress(progress))
+            except discord.HTTPException as e:
+                logger.debug(f"Impossible de mettre à jour la progression de la purge: {e}")
 
-                except discord.Forbidden:
-                    logger.debug(f"Pas de permission pour purger dans {channel.name} ({guild.name})")
-                except discord.HTTPException as e:
-                    logger.error(f"Erreur lors de la purge dans {channel.name} ({guild.name}): {e}")
-                except Exception as e:
-                    logger.error(f"Erreur inattendue lors de la purge dans {channel.name} ({guild.name}): {e}")
+        return report
 
-        logger.info(f"Suppression terminée: {total_deleted} messages de l'utilisateur {user_id} supprimés.")
-        return total_deleted
+    async def _expire_ban(self, key: tuple[int, int]) -> None:
+        """
+        Echeance d'un ban temporaire: relit le ban (leve ou prolonge entre-temps) avant de debannir.
+        Leve si le ban n'a pas pu etre leve: le DeadlineScheduler relance l'echeance.
+        """
+        guild_id, discord_id = key
+        ban = await self._mod_svc.fetch_ban_info(guild_id, discord_id)
+        if ban is None or ban.ban_end is None:
+            return
 
-    @tasks.loop(minutes=1)
-    async def check_bans_expired(self):
-        """Vérifie régulièrement les bannissements temporaires expirés et débannit automatiquement les membres."""
-        try:
-            now = datetime.utcnow()
-            expired_bans = await self._mod_svc.get_expired_bans(now)
-
-            count = 0
-            for ban in expired_bans:
-                discord_id = ban.target_discord_id
-                if not discord_id:
-                    logger.error("Impossible de récupérer l'ID Discord pour un ban expiré.")
-                    continue
-
-                guild = self.bot.get_guild(ban.guild_id)
-                if not guild:
-                    logger.warning(f"Guild introuvable pour le ban expiré: {ban.guild_id}.")
-                    continue
-
-                await self.unban_member(guild, discord_id, reason="Expiration du bannissement temporaire")
-                count += 1
-
-            if count > 0:
-                logger.info(f"{count} bannissement(s) expiré(s) traité(s) avec succès.")
-        except Exception:
-            logger.exception("Expired ban check task failed.")
+        # ban_end est TIMESTAMPTZ en base, les datetimes naifs du cog sont en UTC
+        ban_end = ban.ban_end if ban.ban_end.tzinfo else ban.ban_end.replace(tzinfo=timezone.utc)
+        if ban_end > datetime.now(timezone.utc):
+            self._deadlines.schedule(BAN_EXPIRY_DEADLINE, key, ban_end)
+            return
 
-    @check_bans_expired.before_loop
-    async def before_check_bans_expired(self):
-        await self.bot.wait_until_ready()
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            # Guild indisponible (panne, cache pas encore rempli): on repasse plus tard
+            logger.warning(f"Guild introuvable pour le ban expiré: {guild_id}, nouvel essai planifié.")
+            self._deadlines.schedule(
+                BAN_EXPIRY_DEADLINE, key, datetime.now(timezone.utc) + BAN_EXPIRY_GUILD_RETRY
+            )
+            return
+
+        await self.unban_member(guild, discord_id, reason="Expiration du bannissement temporaire")
+        if await self._mod_svc.fetch_ban_info(guild_id, discord_id) is not None:
+            raise RuntimeError(f"Ban expiré toujours actif pour {discord_id} dans {guild_id}.")
+        logger.info(f"Bannissement temporaire expiré traité pour {discord_id} dans {guild_id}.")
 
 async def setup(bot: commands.Bot):
     moderation_service = getattr(bot, "moderation_service", None)
     if moderation_service is None:
         logger.error("moderation_service non initialisé dans le bot. Le cog Moderation ne sera pas chargé.")
         return
-    await bot.add_cog(Moderation(bot, moderation_service))
+    deadline_scheduler = getattr(bot, "deadline_scheduler", None)
+    if deadline_scheduler is None:
+        logger.error("deadline_scheduler non initialisé dans le bot. Le cog Moderation ne sera pas chargé.")
+        return
+    await bot.add_cog(Moderation(bot, moderation_service, deadline_scheduler))
     logger.info("Moderation Cog chargé avec succès.")
@@ -5,6 +5,7 @@ from .moderation_messages import (
     build_ban_dm_embed,
     build_unban_dm_embed,
     format_ban_status_message,
+    format_purge_progress,
 )
 from .unban_request_messages import (
     build_deban_panel_embed,
@@ -44,6 +45,7 @@ __all__ = [
     "format_deletion_history_table",
     "format_ban_status_message",
     "format_custom_items_message",
+    "format_purge_progress",
     "get_deletion_type_icon",
     "mark_spam_alert_banned",
     "mark_spam_alert_ignored",
@@ -38,6 +38,20 @@ def format_ban_status_message(ban_info: BanDisplayInfo, banned_user_id: int) ->
     )
 
 
+class PurgeProgressInfo(Protocol):
+    channels_total: int
+    channels_done: int
+    deleted: int
+
+
+def format_purge_progress(progress: PurgeProgressInfo) -> str:
+    return (
+        "Suppression des messages en cours... "
+        f"{progress.channels_done}/{progress.channels_total} salon(s), "
+        f"{progress.deleted} message(s) supprimé(s)."
+    )
+
+
 def build_ban_dm_embed(
     *,
     guild_name: str,
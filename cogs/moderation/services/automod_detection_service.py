@@ -4,6 +4,7 @@
 from __future__ import annotations
 
 import re
+from collections import OrderedDict
 from typing import Any, Iterable
 from urllib.parse import urlparse
 
@@ -45,6 +46,65 @@ SCAM_DOMAINS = [
 URL_PATTERN = re.compile(r'https?://[^\s<>"{}|\\^`\[\]]+')
 
 
+# Matchers compiles gardes en memoire (une entree par jeu de patterns/domaines custom).
+MATCHER_CACHE_SIZE = 256
+
+# Une reference arriere (\1, (?P=nom)) change de sens une fois le pattern
+# fusionne dans une alternation: ces patterns restent compiles a part.
+_BACKREFERENCE = re.compile(r"\\\d|\(\?P=")
+
+
+def _compile_alternation(patterns: Iterable[str]) -> re.Pattern[str] | None:
+    patterns = list(patterns)
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE)
+
+
+class ScamMatcher:
+    """Patterns et domaines compiles pour un jeu de configuration donne.
+
+    - Une seule regex en alternation pour les patterns integres + custom.
+    - Un set de domaines interroge suffixe par suffixe (O(nombre de labels)).
+    """
+
+    def __init__(self, patterns: Iterable[str], domains: Iterable[str]) -> None:
+        combinable: list[str] = []
+        separate: list[re.Pattern[str]] = []
+        for pattern in patterns:
+            try:
+                compiled = re.compile(pattern, re.IGNORECASE)
+            except re.error:
+                continue
+            if _BACKREFERENCE.search(pattern):
+                separate.append(compiled)
+            else:
+                combinable.append(pattern)
+
+        try:
+            combined = _compile_alternation(combinable)
+            self._patterns = ([combined] if combined is not None else []) + separate
+        except re.error:
+            # Flags globaux en milieu de pattern, groupes nommes en double...
+            self._patterns = [re.compile(p, re.IGNORECASE) for p in combinable] + separate
+
+        self._domains = frozenset(str(domain).lower() for domain in domains)
+
+    def matches_content(self, content: str) -> bool:
+        content_lower = content.lower()
+        return any(pattern.search(content_lower) for pattern in self._patterns)
+
+    def matches_domain(self, domain: str) -> bool:
+        domains = self._domains
+        if domain in domains:
+            return True
+        index = domain.find(".")
+        while index != -1:
+            if domain[index + 1:] in domains:
+                return True
+            index = domain.find(".", index + 1)
+        return False
+
 class AutomodDetectionService:
     """Side-effect-free detection logic used by AutoMod."""
 
@@ -53,11 +113,30 @@ class AutomodDetectionService:
         scam_patterns: Iterable[str] = SCAM_PATTERNS,
         scam_domains: Iterable[str] = SCAM_DOMAINS,
     ) -> None:
-        self.scam_patterns = [
-            re.compile(pattern, re.IGNORECASE)
-            for pattern in scam_patterns
-        ]
+        self.scam_patterns = tuple(scam_patterns)
         self.scam_domains = tuple(domain.lower() for domain in scam_domains)
+        self._matchers: OrderedDict[tuple[tuple[str, ...], tuple[str, ...]], ScamMatcher] = OrderedDict()
+
+    def get_matcher(self, config: dict[str, Any]) -> ScamMatcher:
+        """
+        Matcher compile pour la config d'un serveur.
+        La cle est le contenu des listes custom: un add/remove de pattern ou de
+        domaine produit une nouvelle cle, l'ancien matcher n'est plus servi.
+        """
+        key = (
+            tuple(config.get("custom_scam_patterns", []) or []),
+            tuple(config.get("custom_scam_domains", []) or []),
+        )
+        matcher = self._matchers.get(key)
+        if matcher is not None:
+            self._matchers.move_to_end(key)
+            return matcher
+
+        matcher = ScamMatcher(self.scam_patterns + key[0], self.scam_domains + key[1])
+        self._matchers[key] = matcher
+        if len(self._matchers) > MATCHER_CACHE_SIZE:
+            self._matchers.popitem(last=False)
+        return matcher
 
     def is_member_whitelisted(
         self,
@@ -87,46 +166,24 @@ class AutomodDetectionService:
     def is_scam_domain(self, url: str, config: dict[str, Any]) -> bool:
         try:
             parsed = urlparse(url)
-            domain = parsed.netloc.lower()
-
-            for scam_domain in self.scam_domains:
-                if domain == scam_domain or domain.endswith("." + scam_domain):
-                    return True
-
-            custom_domains = config.get("custom_scam_domains", []) or []
-            for scam_domain in custom_domains:
-                normalized_domain = str(scam_domain).lower()
-                if domain == normalized_domain or domain.endswith("." + normalized_domain):
-                    return True
-
+            return self.get_matcher(config).matches_domain(parsed.netloc.lower())
         except Exception:
-            pass
-        return False
+            return False
 
     def is_scam_content(self, content: str, config: dict[str, Any]) -> bool:
-        content_lower = content.lower()
-
-        for pattern in self.scam_patterns:
-            if pattern.search(content_lower):
-                return True
-
-        custom_patterns = config.get("custom_scam_patterns", []) or []
-        for pattern_str in custom_patterns:
-            try:
-                pattern = re.compile(pattern_str, re.IGNORECASE)
-                if pattern.search(content_lower):
-                    return True
-            except re.error:
-                continue
-
-        return False
+        return self.get_matcher(config).matches_content(content)
 
     def is_scam_message_content(self, content: str, config: dict[str, Any]) -> bool:
-        if self.is_scam_content(content, config):
+        matcher = self.get_matcher(config)
+        if matcher.matches_content(content):
             return True
 
         for url in self.extract_urls(content):
-            if self.is_scam_domain(url, config):
+            try:
+                domain = urlparse(url).netloc.lower()
+            except ValueError:
+                continue
+            if matcher.matches_domain(domain):
                 return True
 
         return False
@@ -1,11 +1,32 @@
 # cogs/moderation/services/automod_spam_tracker.py
-"""In-memory tracking for cross-channel spam detection."""
+"""In-memory tracking for cross-channel spam detection.
+
+Hot path of ``on_message``: every operation is O(1) amortized.
+
+- Messages are kept per (user, guild) in a bounded deque, in arrival order.
+- Each (user, guild, content) keeps a channel counter updated incrementally,
+  so detection never rescans the history.
+- Expiry is driven by a min-heap of deadlines: only due entries are touched,
+  instead of sweeping every tracked user on each message.
+"""
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import heapq
+import itertools
+from collections import Counter, deque
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 
+# Les messages sont conserves au moins ce temps (refs pour la suppression).
+MIN_RETENTION = timedelta(minutes=2)
+# Borne memoire par (user, guild), meme pendant un raid.
+MAX_RECORDS_PER_STREAM = 100
+
+_EXPIRE_STREAM = 0
+_EXPIRE_PENDING = 1
+_EXPIRE_WHITELIST = 2
+
 
 @dataclass(frozen=True)
 class SpamMessageRecord:
@@ -23,9 +44,66 @@ class PendingSpamContent:
     expires_at: datetime
 
 
+@dataclass
+class _ContentBucket:
+    """Messages d'un meme contenu pour un (user, guild), tries par date.
+
+    ``channels`` compte les salons des records ``records[head:]``, c'est-a-dire
+    ceux de la fenetre de detection courante.
+    """
+
+    records: deque[SpamMessageRecord] = field(default_factory=deque)
+    channels: Counter[int] = field(default_factory=Counter)
+    head: int = 0
+    window: timedelta = timedelta(0)
+
+    def append(self, record: SpamMessageRecord) -> None:
+        self.records.append(record)
+        self.channels[record.channel_id] += 1
+
+    def popleft(self) -> None:
+        record = self.records.popleft()
+        if self.head > 0:
+            self.head -= 1
+        else:
+            self._discount(record.channel_id)
+
+    def distinct_channels(self, now: datetime, window: timedelta) -> int:
+        cutoff = now - window
+        if window > self.window:
+            # Fenetre elargie (changement de config): recompte borne par la deque.
+            self.window = window
+            self.head = 0
+            self.channels = Counter(record.channel_id for record in self.records)
+        else:
+            self.window = window
+        while self.head < len(self.records) and self.records[self.head].created_at <= cutoff:
+            self._discount(self.records[self.head].channel_id)
+            self.head += 1
+        return len(self.channels)
+
+    def _discount(self, channel_id: int) -> None:
+        remaining = self.channels[channel_id] - 1
+        if remaining > 0:
+            self.channels[channel_id] = remaining
+        else:
+            del self.channels[channel_id]
+
+
+@dataclass
+class _MessageStream:
+    """Historique borne d'un (user, guild)."""
+
+    records: deque[tuple[SpamMessageRecord, datetime]] = field(default_factory=deque)
+    buckets: dict[int, _ContentBucket] = field(default_factory=dict)
+
+
 class AutomodSpamTracker:
-    def __init__(self) -> None:
-        self.message_cache: dict[int, list[SpamMessageRecord]] = {}
+    def __init__(self, *, max_records_per_stream: int = MAX_RECORDS_PER_STREAM) -> None:
+        self._max_records = max_records_per_stream
+        self._streams: dict[tuple[int, int], _MessageStream] = {}
+        self._deadlines: list[tuple[datetime, int, int, tuple[int, int]]] = []
+        self._seq = itertools.count()
         self.spam_whitelist: dict[tuple[int, int], datetime] = {}
         self.pending_spam_content: dict[tuple[int, int], PendingSpamContent] = {}
 
@@ -39,6 +117,7 @@ class AutomodSpamTracker:
     ) -> datetime:
         expires_at = (now or datetime.utcnow()) + duration
         self.spam_whitelist[(user_id, guild_id)] = expires_at
+        self._schedule(expires_at, _EXPIRE_WHITELIST, (user_id, guild_id))
         return expires_at
 
     def is_whitelisted(
@@ -72,32 +151,20 @@ class AutomodSpamTracker:
         now: datetime | None = None,
     ) -> bool:
         timestamp = now or datetime.utcnow()
-        self.cleanup(now=timestamp, max_age=timedelta(seconds=max(time_window_seconds, 120)))
+        window = timedelta(seconds=time_window_seconds)
+        self.expire(now=timestamp)
 
-        content_hash = self._content_hash(content)
-        self.record_message(
+        record = self._append(
             user_id=user_id,
             guild_id=guild_id,
             channel_id=channel_id,
             message_id=message_id,
             content=content,
             now=timestamp,
+            retention=max(window, MIN_RETENTION),
         )
-        records = self.message_cache[user_id]
-
-        cutoff = timestamp - timedelta(seconds=time_window_seconds)
-        recent_records = [
-            record
-            for record in records
-            if record.created_at > cutoff and record.guild_id == guild_id
-        ]
-        channels_with_same_content = {
-            record.channel_id
-            for record in recent_records
-            if record.content_hash == content_hash
-        }
-
-        return len(channels_with_same_content) >= threshold
+        bucket = self._streams[(user_id, guild_id)].buckets[record.content_hash]
+        return bucket.distinct_channels(timestamp, window) >= threshold
 
     def record_message(
         self,
@@ -109,16 +176,14 @@ class AutomodSpamTracker:
         content: str,
         now: datetime | None = None,
     ) -> None:
-        timestamp = now or datetime.utcnow()
-        records = self.message_cache.setdefault(user_id, [])
-        records.append(
-            SpamMessageRecord(
-                guild_id=guild_id,
-                channel_id=channel_id,
-                message_id=message_id,
-                content_hash=self._content_hash(content),
-                created_at=timestamp,
-            )
+        self._append(
+            user_id=user_id,
+            guild_id=guild_id,
+            channel_id=channel_id,
+            message_id=message_id,
+            content=content,
+            now=now or datetime.utcnow(),
+            retention=MIN_RETENTION,
         )
 
     def flag_pending_spam(
@@ -137,6 +202,7 @@ class AutomodSpamTracker:
             content_hash=self._content_hash(content),
             expires_at=expires_at,
         )
+        self._schedule(expires_at, _EXPIRE_PENDING, (user_id, guild_id))
         return expires_at
 
     def is_pending_spam_message(
@@ -171,39 +237,114 @@ class AutomodSpamTracker:
         now: datetime | None = None,
         window_seconds: int = 60,
     ) -> list[tuple[int, int]]:
+        stream = self._streams.get((user_id, guild_id))
+        if stream is None:
+            return []
+        bucket = stream.buckets.get(self._content_hash(content))
+        if bucket is None:
+            return []
+
         timestamp = now or datetime.utcnow()
         cutoff = timestamp - timedelta(seconds=window_seconds)
-        content_hash = self._content_hash(content)
-
-        return [
-            (record.channel_id, record.message_id)
-            for record in self.message_cache.get(user_id, [])
-            if (
-                record.content_hash == content_hash
-                and record.created_at > cutoff
-                and record.guild_id == guild_id
-            )
-        ]
+        refs: list[tuple[int, int]] = []
+        for record in reversed(bucket.records):
+            if record.created_at <= cutoff:
+                break
+            refs.append((record.channel_id, record.message_id))
+        refs.reverse()
+        return refs
+
+    def get_user_message_refs(self, *, user_id: int, guild_id: int) -> list[tuple[int, int]]:
+        """Refs (channel_id, message_id) de tous les messages encore suivis d'un (user, guild)."""
+        stream = self._streams.get((user_id, guild_id))
+        if stream is None:
+            return []
+        return [(record.channel_id, record.message_id) for record, _ in stream.records]
+
+    def expire(self, *, now: datetime | None = None) -> None:
+        """Retire les entrees arrivees a echeance (cout proportionnel a celles-ci)."""
+        timestamp = now or datetime.utcnow()
+        deadlines = self._deadlines
+        while deadlines and deadlines[0][0] <= timestamp:
+            _, _, kind, key = heapq.heappop(deadlines)
+            if kind == _EXPIRE_STREAM:
+                self._expire_stream(key, timestamp)
+            elif kind == _EXPIRE_PENDING:
+                pending = self.pending_spam_content.get(key)
+                if pending is not None and timestamp >= pending.expires_at:
+                    del self.pending_spam_content[key]
+            else:
+                expires_at = self.spam_whitelist.get(key)
+                if expires_at is not None and timestamp >= expires_at:
+                    del self.spam_whitelist[key]
 
     def cleanup(
         self,
         *,
         now: datetime | None = None,
-        max_age: timedelta = timedelta(minutes=2),
+        max_age: timedelta = MIN_RETENTION,
     ) -> None:
+        """Balayage complet (maintenance uniquement, pas sur le chemin chaud)."""
         timestamp = now or datetime.utcnow()
+        self.expire(now=timestamp)
         cutoff = timestamp - max_age
-        for user_id in list(self.message_cache.keys()):
-            self.message_cache[user_id] = [
-                record
-                for record in self.message_cache[user_id]
-                if record.created_at > cutoff
-            ]
-            if not self.message_cache[user_id]:
-                del self.message_cache[user_id]
-        for key, pending in list(self.pending_spam_content.items()):
-            if timestamp >= pending.expires_at:
-                del self.pending_spam_content[key]
+        for key in list(self._streams):
+            stream = self._streams[key]
+            while stream.records and stream.records[0][0].created_at <= cutoff:
+                self._pop_oldest(key, stream)
+
+    def _append(
+        self,
+        *,
+        user_id: int,
+        guild_id: int,
+        channel_id: int,
+        message_id: int,
+        content: str,
+        now: datetime,
+        retention: timedelta,
+    ) -> SpamMessageRecord:
+        key = (user_id, guild_id)
+        record = SpamMessageRecord(
+            guild_id=guild_id,
+            channel_id=channel_id,
+            message_id=message_id,
+            content_hash=self._content_hash(content),
+            created_at=now,
+        )
+        stream = self._streams.get(key)
+        if stream is None:
+            stream = self._streams[key] = _MessageStream()
+
+        expires_at = now + retention
+        stream.records.append((record, expires_at))
+        bucket = stream.buckets.get(record.content_hash)
+        if bucket is None:
+            bucket = stream.buckets[record.content_hash] = _ContentBucket()
+        bucket.append(record)
+        self._schedule(expires_at, _EXPIRE_STREAM, key)
+
+        while len(stream.records) > self._max_records:
+            self._pop_oldest(key, stream)
+        return record
+
+    def _expire_stream(self, key: tuple[int, int], now: datetime) -> None:
+        stream = self._streams.get(key)
+        while stream is not None and stream.records and stream.records[0][1] <= now:
+            self._pop_oldest(key, stream)
+            stream = self._streams.get(key)
+
+    def _pop_oldest(self, key: tuple[int, int], stream: _MessageStream) -> None:
+        record, _ = stream.records.popleft()
+        bucket = stream.buckets[record.content_hash]
+        bucket.popleft()
+        if not bucket.records:
+            del stream.buckets[record.content_hash]
+        if not stream.records:
+            del self._streams[key]
+
+    def _schedule(self, expires_at: datetime, kind: int, key: tuple[int, int]) -> None:
+        heapq.heappush(self._deadlines, (expires_at, next(self._seq), kind, key))
 
     @staticmethod
     def _content_hash(content: str) -> int:
@@ -33,20 +33,67 @@ class ModerationService:
         self._persistent_msg = persistent_msg_svc
         self._role_config = role_config_svc
         self._channel_config = channel_config_svc
+        # Index des bans actifs {guild_id: {discord_id}}; None tant qu'il n'est pas charge
+        self._banned: dict[int, set[int]] | None = None
+        # Bans ajoutes/retires pendant un chargement de l'index: rejoues sur le snapshot
+        self._pending_ban_changes: list[tuple[int, int, bool]] | None = None
 
     # ==================== BANS ====================
 
+    async def load_ban_index(self) -> None:
+        """Charge l'index memoire des bans; en cas d'echec, les lectures restent en base."""
+        self._pending_ban_changes = []
+        try:
+            banned = await self._mod_db.list_banned_discord_ids()
+            for guild_id, user_id, is_banned in self._pending_ban_changes:
+                if is_banned:
+                    banned.setdefault(guild_id, set()).add(user_id)
+                else:
+                    banned.get(guild_id, set()).discard(user_id)
+            self._banned = banned
+            logger.info(
+                "Index des bans charge: %s ban(s).",
+                sum(len(user_ids) for user_ids in self._banned.values()),
+            )
+        except Exception as e:
+            logger.error(f"Erreur chargement de l'index des bans: {e}")
+        finally:
+            self._pending_ban_changes = None
+
+    def _track_ban(self, guild_id: int, user_id: int, is_banned: bool) -> None:
+        if self._pending_ban_changes is not None:
+            self._pending_ban_changes.append((guild_id, user_id, is_banned))
+        if self._banned is None:
+            return
+        if is_banned:
+            self._banned.setdefault(guild_id, set()).add(user_id)
+        else:
+            self._banned.get(guild_id, set()).discard(user_id)
+
+    def may_be_banned(self, guild_id: int, discord_user_id: int) -> bool:
+        """False seulement si l'index est charge et ne contient pas ce membre."""
+        if self._banned is None:
+            return True
+        return discord_user_id in self._banned.get(guild_id, ())
+
     async def get_ban_info(self, guild_id: int, discord_user_id: int) -> Optional[BanInfo]:
         """
         Récupère les informations de ban pour un utilisateur.
         Retourne None si l'utilisateur n'est pas banni.
+        L'index memoire evite la requete pour les membres non bannis.
         """
         try:
-            return await self._mod_db.get_ban(guild_id, discord_user_id)
+            return await self.fetch_ban_info(guild_id, discord_user_id)
         except Exception as e:
             logger.error(f"Erreur get_ban_info pour user {discord_user_id}: {e}")
             return None
 
+    async def fetch_ban_info(self, guild_id: int, discord_user_id: int) -> Optional[BanInfo]:
+        """Comme get_ban_info, mais une erreur DB est propagee (appelant qui relance)."""
+        if not self.may_be_banned(guild_id, discord_user_id):
+            return None
+        return await self._mod_db.get_ban(guild_id, discord_user_id)
+
     async def add_ban(
         self,
         guild_id: int,
@@ -71,6 +118,7 @@ class ModerationService:
                 reason=reason,
                 ban_end=ban_end,
             )
+            self._track_ban(guild_id, user_id, True)
             logger.info(f"Ban ajouté pour user {user_id} dans guild {guild_id}")
             return True
         except ValueError as e:
@@ -87,6 +135,7 @@ class ModerationService:
         """
         try:
             result = await self._mod_db.remove_ban(guild_id, user_id)
+            self._track_ban(guild_id, user_id, False)
             if result:
                 logger.info(f"Ban supprimé pour user {user_id} dans guild {guild_id}")
             return result
@@ -94,15 +143,16 @@ class ModerationService:
             logger.error(f"Erreur remove_ban pour user {user_id}: {e}")
             return False
 
-    async def get_expired_bans(self, current_time: datetime) -> List[BanInfo]:
+    async def get_temporary_bans(self) -> Optional[List[BanInfo]]:
         """
-        Récupère les bannissements temporaires expirés.
+        Récupère les bannissements temporaires, expirés ou non (planification des fins de ban).
+        Retourne None si la lecture échoue (à distinguer d'une liste vide).
         """
         try:
-            return await self._mod_db.get_expired_bans(current_time)
+            return await self._mod_db.get_temporary_bans()
         except Exception as e:
-            logger.error(f"Erreur get_expired_bans: {e}")
-            return []
+            logger.error(f"Erreur get_temporary_bans: {e}")
+            return None
 
     # ==================== WARNINGS ====================
 
@@ -18,12 +18,12 @@ from cogs.ranking.presenters import (
     build_valorant_account_panel_embed,
     format_valorant_update_error_message,
 )
-from cogs.ranking.services.ranking_service import RankingService
+from cogs.ranking.services.ranking_service import RankingService, ValorantPipelineUpdate
+from cogs.ranking.services.pipeline_scheduler import PipelineScheduler
 from cogs.ranking.services.valorant_pipeline import (
     ValorantPipeline,
     UserPipelineState,
     PipelineResult,
-    LocalRateLimitReached,
 )
 from cogs.ranking.views import EmbedButtonsView
 from integrations.henrikdev.service import HenrikDevService
@@ -33,6 +33,12 @@ logger = logging.getLogger(__name__)
 
 EMBED_MESSAGE_TYPE = "embed_rank"
 
+# Le debit reel est borne par le token bucket du pipeline, pas par la taille du batch.
+PIPELINE_BATCH_SIZE = 200
+PIPELINE_WORKERS = 4
+# Resultats ecrits au fil du batch: un echec ou un arret n'en perd qu'un paquet
+PIPELINE_FLUSH_SIZE = 25
+
 
 class EmbedCog(commands.Cog):
     """Cog principal pour la gestion des rangs Valorant."""
@@ -73,22 +79,33 @@ class EmbedCog(commands.Cog):
     async def _startup_presence_sync(self):
         """
         Synchronise l'etat de presence au demarrage.
-        Rattrape les evenements join/leave manques pendant le downtime.
-        Une seule transaction bulk au lieu de N appels individuels.
+        Rattrape les evenements join/leave manques pendant le downtime:
+        le cache membres est streame vers la base et compare en SQL.
         """
         logger.info("[startup_presence_sync] Debut de la synchronisation de presence...")
 
-        valo_discord_ids = set(await self._ranking_svc.get_all_discord_ids())
-        present_ids = {m.id for g in self.bot.guilds for m in g.members}
-
-        reactivated, deactivated = await self._ranking_svc.sync_presence(
-            present_ids & valo_discord_ids, valo_discord_ids,
+        # Une guild indisponible ou pas entierement chunkee a un cache membres
+        # incomplet: la scanner ferait "partir" des membres toujours presents.
+        guilds = [g for g in self.bot.guilds if not g.unavailable and g.chunked]
+        skipped = len(self.bot.guilds) - len(guilds)
+        if skipped:
+            logger.warning(
+                f"[startup_presence_sync] {skipped} guild(s) ignoree(s): indisponibles ou membres non charges"
+            )
+        result = await self._ranking_svc.reconcile_presence(
+            [g.id for g in guilds],
+            ((g.id, m.id) for g in guilds for m in g.members),
+            complete=not skipped,
         )
 
         logger.info(
-            f"[startup_presence_sync] Termine: {reactivated} reactives, "
-            f"{deactivated} desactives"
+            f"[startup_presence_sync] Termine: {result.reactivated} reactives, "
+            f"{result.deactivated} desactives, {result.members_left} departs, "
+            f"{result.members_rejoined} retours, {result.queue_entries_removed} sorties de file, "
+            f"{result.team_members_removed} sorties d'equipe, {result.teams_closed} equipes fermees"
         )
+        # Les cogs qui indexent ces tables en memoire (file five-stack) se rechargent
+        self.bot.dispatch("presence_reconciled", result)
 
     async def reload_persistent_embed(self):
         """Recharge les vues des embeds persistants."""
@@ -132,14 +149,15 @@ class EmbedCog(commands.Cog):
     @commands.Cog.listener()
     async def on_member_remove(self, member: discord.Member):
         """Desactive le tracking si l'utilisateur quitte tous les serveurs."""
-        for guild in self.bot.guilds:
-            if guild.id != member.guild.id and guild.get_member(member.id):
-                return  # Encore present ailleurs
+        if any(
+            guild.id != member.guild.id and guild.get_member(member.id)
+            for guild in self.bot.guilds
+        ):
+            return  # Encore present ailleurs
 
-        if await self._ranking_svc.account_linked(member.id):
-            deactivated = await self._ranking_svc.mark_inactive(member.id)
-            if deactivated:
-                logger.info(f"[on_member_remove] {member.id} marque inactif (quitte tous les guilds)")
+        # Un seul UPDATE: sans compte lie (ou deja inactif), rien ne change
+        if await self._ranking_svc.mark_inactive(member.id):
+            logger.info(f"[on_member_remove] {member.id} marque inactif (quitte tous les guilds)")
 
     @commands.command(name="send_embed_rang")
     @commands.has_permissions(administrator=True)
@@ -229,13 +247,6 @@ class EmbedCog(commands.Cog):
         """Boucle principale de mise a jour des rangs via le pipeline."""
         try:
             await self._process_pipeline_batch()
-        except RateLimitError as e:
-            logger.warning(f"[update_roles_loop] RateLimitError: {e}. Pause 60s.")
-            self.update_roles_loop.change_interval(seconds=60)
-        except LocalRateLimitReached as e:
-            delay = max(1, e.reset_seconds)
-            logger.info(f"[update_roles_loop] Limite locale atteinte. Pause {delay}s.")
-            self.update_roles_loop.change_interval(seconds=delay)
         except Exception as e:
             logger.exception(f"[update_roles_loop] Erreur inattendue: {e}")
             self.update_roles_loop.change_interval(seconds=60)
@@ -247,8 +258,11 @@ class EmbedCog(commands.Cog):
         await self.bot.wait_until_ready()
 
     async def _process_pipeline_batch(self):
-        """Traite un batch d'utilisateurs via le pipeline."""
-        users = await self._ranking_svc.get_users_for_pipeline(limit=20)
+        """
+        Traite un batch d'utilisateurs via le pipeline.
+        PIPELINE_WORKERS workers concurrents se partagent le token bucket du pipeline.
+        """
+        users = await self._ranking_svc.get_users_for_pipeline(limit=PIPELINE_BATCH_SIZE)
 
         if not users:
             logger.debug("[_process_pipeline_batch] Aucun utilisateur a traiter.")
@@ -260,6 +274,8 @@ class EmbedCog(commands.Cog):
         ban_role_cache = await self._load_ban_role_cache(guild_list)
 
         stats = {"processed": 0, "updated": 0, "errors": 0, "skipped": 0}
+        updates: List[ValorantPipelineUpdate] = []
+        scheduler = PipelineScheduler(workers=PIPELINE_WORKERS)
 
         for record in users:
             state = UserPipelineState(
@@ -279,37 +295,85 @@ class EmbedCog(commands.Cog):
                 stats["skipped"] += 1
                 continue
 
-            if not self._pipeline._check_local_rate_limit():
-                reset = self._pipeline.get_local_rate_limit_reset()
-                raise LocalRateLimitReached(reset)
+            scheduler.push(state)
 
-            member = self._find_member_in_cache(state.discord_id, guild_list)
-            if not member:
-                # Membre absent : mark_inactive suffit (filtre par is_active dans le pipeline)
-                await self._ranking_svc.mark_inactive(state.discord_id)
-                stats["skipped"] += 1
-                continue
+        async def process(state: UserPipelineState) -> None:
+            await self._process_pipeline_user(state, guild_list, ban_role_cache, stats, updates)
+            if len(updates) >= PIPELINE_FLUSH_SIZE:
+                await self._flush_pipeline_updates(updates)
 
-            if self._is_member_banned(member, ban_role_cache):
-                await self._ranking_svc.update_pipeline_success(state.discord_id)
-                stats["skipped"] += 1
-                continue
+        await scheduler.run(process)
+        await self._flush_pipeline_updates(updates)
 
-            stats["processed"] += 1
+        logger.info(
+            f"[_process_pipeline_batch] Batch termine: {stats['processed']} traites, "
+            f"{stats['updated']} mis a jour, {stats['errors']} erreurs, {stats['skipped']} ignores"
+        )
 
-            try:
-                result, rate_limit = await self._pipeline.execute_step(state)
-            except RateLimitError:
-                raise
-            except Exception as e:
-                logger.error(f"[_process_pipeline_batch] Erreur execute_step pour {state.discord_id}: {e}")
-                await self._ranking_svc.update_pipeline_error(state.discord_id)
-                stats["errors"] += 1
-                continue
+    async def _flush_pipeline_updates(self, updates: List[ValorantPipelineUpdate]) -> None:
+        """Un UPDATE pour les resultats en attente; remis en attente si l'ecriture echoue."""
+        if not updates:
+            return
+        # Detache avant l'await: les autres workers continuent d'ajouter leurs resultats
+        pending = updates[:]
+        updates.clear()
+        try:
+            await self._ranking_svc.apply_pipeline_results(pending)
+        except Exception:
+            logger.exception(f"[_flush_pipeline_updates] Ecriture de {len(pending)} resultats echouee.")
+            # En tete: un resultat plus recent du meme joueur reste prioritaire
+            updates[:0] = pending
+
+    async def _process_pipeline_user(
+        self,
+        state: UserPipelineState,
+        guild_list: List[discord.Guild],
+        ban_role_cache: Dict[int, Optional[int]],
+        stats: Dict[str, int],
+        updates: List[ValorantPipelineUpdate],
+    ):
+        """
+        Traite un utilisateur (execute par un worker du PipelineScheduler).
+        Le resultat DB est ajoute a `updates`, ecrit par paquets de PIPELINE_FLUSH_SIZE.
+        """
+        member = self._find_member_in_cache(state.discord_id, guild_list)
+        if not member:
+            # Membre absent : mark_inactive suffit (filtre par is_active dans le pipeline)
+            await self._ranking_svc.mark_inactive(state.discord_id)
+            stats["skipped"] += 1
+            return
+
+        if self._is_member_banned(member, ban_role_cache):
+            updates.append(ValorantPipelineUpdate(
+                discord_id=state.discord_id, success=True, read_pseudo=state.pseudo, read_tag=state.tag
+            ))
+            stats["skipped"] += 1
+            return
+
+        stats["processed"] += 1
+
+        try:
+            result, _rate_limit = await self._pipeline.execute_step(state)
+        except RateLimitError as e:
+            # Le bucket est deja en pause : l'utilisateur sera repris au prochain batch
+            logger.warning(f"[_process_pipeline_user] RateLimitError pour {state.discord_id}: {e}")
+            stats["skipped"] += 1
+            return
+        except Exception as e:
+            logger.error(f"[_process_pipeline_user] Erreur execute_step pour {state.discord_id}: {e}")
+            updates.append(ValorantPipelineUpdate(
+                discord_id=state.discord_id, success=False, read_pseudo=state.pseudo, read_tag=state.tag
+            ))
+            stats["errors"] += 1
+            return
 
-            if result.success:
-                await self._ranking_svc.update_pipeline_success(
-                    state.discord_id,
+        if result.success:
+            updates.append(
+                ValorantPipelineUpdate(
+                    discord_id=state.discord_id,
+                    success=True,
+                    read_pseudo=state.pseudo,
+                    read_tag=state.tag,
                     puuid=result.puuid,
                     region=result.region,
                     platform=result.platform,
@@ -320,27 +384,19 @@ class EmbedCog(commands.Cog):
                     current_season=result.current_season,
                     current_act=result.current_act,
                 )
+            )
 
-                if result.rank:
-                    await self._update_member_role(member, result.rank, state.rank)
-                    stats["updated"] += 1
-            else:
-                await self._ranking_svc.update_pipeline_error(state.discord_id)
-                stats["errors"] += 1
-
-                if result.should_notify_user:
-                    await self._notify_user_error(member, state, result)
-
-            if rate_limit:
-                pause = self._pipeline.should_pause_for_rate_limit(rate_limit)
-                if pause > 0:
-                    logger.info(f"Rate limit bas (remaining={rate_limit.remaining}), pause {pause}s")
-                    await asyncio.sleep(pause)
+            if result.rank:
+                await self._update_member_role(member, result.rank, state.rank)
+                stats["updated"] += 1
+        else:
+            updates.append(ValorantPipelineUpdate(
+                discord_id=state.discord_id, success=False, read_pseudo=state.pseudo, read_tag=state.tag
+            ))
+            stats["errors"] += 1
 
-        logger.info(
-            f"[_process_pipeline_batch] Batch termine: {stats['processed']} traites, "
-            f"{stats['updated']} mis a jour, {stats['errors']} erreurs, {stats['skipped']} ignores"
-        )
+            if result.should_notify_user:
+                await self._notify_user_error(member, state, result)
 
     async def _load_ban_role_cache(self, guild_list: List[discord.Guild]) -> Dict[int, Optional[int]]:
         """Charge le cache des roles de ban pour chaque guild."""
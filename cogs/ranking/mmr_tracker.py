@@ -1,3 +1,4 @@
+import io
 import logging
 from datetime import datetime, timezone
 import discord
@@ -7,9 +8,10 @@ from discord import app_commands
 from typing import List, Optional
 
 from cogs.ranking.presenters import build_mmr_stats_embed
-from cogs.ranking.renderers import build_mmr_history_chart, get_mmr_period_title
+from cogs.ranking.renderers import get_mmr_period_title, render_mmr_history_png
 from cogs.ranking.services.mmr_tracker_service import MmrTrackerService
-from cogs.ranking.services.mmr_stats_service import calculate_mmr_stats, parse_mmr_period
+from cogs.ranking.services.mmr_stats_service import parse_mmr_period
+from core.chart_renderer import ChartRenderer, ChartRenderError
 
 logger = logging.getLogger(__name__)
 
@@ -58,9 +60,15 @@ class MMRTracker(commands.Cog):
         app_commands.Choice(name="Afficher les stats", value="afficher"),
     ]
 
-    def __init__(self, bot: commands.Bot, tracker_svc: MmrTrackerService):
+    def __init__(
+        self,
+        bot: commands.Bot,
+        tracker_svc: MmrTrackerService,
+        chart_renderer: ChartRenderer,
+    ):
         self.bot = bot
         self._tracker_svc = tracker_svc
+        self._chart_renderer = chart_renderer
         self.check_loop.start()
 
     def cog_unload(self):
@@ -74,6 +82,11 @@ class MMRTracker(commands.Cog):
             logger.exception(f"[check_loop] Impossible de recuperer les joueurs suivis: {e}")
             return
 
+        try:
+            await self._tracker_svc.prepare_partitions(rows)
+        except Exception as e:
+            logger.exception(f"[check_loop] Preparation des partitions impossible: {e}")
+
         for row in rows:
             try:
                 await self._tracker_svc.record_current_mmr_snapshot(row)
@@ -85,6 +98,10 @@ class MMRTracker(commands.Cog):
     @check_loop.before_loop
     async def before_check_loop(self):
         await self.bot.wait_until_ready()
+        try:
+            await self._tracker_svc.load_known_partitions()
+        except Exception as e:
+            logger.exception(f"[check_loop] Lecture des partitions impossible: {e}")
 
     @app_commands.command(name="mmr_track", description="Gérer le suivi MMR : activer, désactiver ou afficher les stats.")
     @app_commands.check(_valorant_link_required)
@@ -117,39 +134,33 @@ class MMRTracker(commands.Cog):
 
         selection = parse_mmr_period(periode)
 
-        # 2) Recuperation de l'historique filtre (retourne des EloHistoryRow)
-        history = await self._tracker_svc.get_history(
-            discord_id,
-            selection.season_num,
-            selection.act_num,
-        )
-        if len(history) < 2:
-            return await interaction.followup.send("Aucun historique disponible.")
-
-        stats = calculate_mmr_stats(
-            history,
-            start_date=selection.start_date,
-            start_at=selection.start_at,
-        )
+        # 2) Stats de la periode (rollup journalier pour all/eXaY, historique borne sinon)
+        stats = await self._tracker_svc.get_mmr_stats(discord_id, selection)
         if not stats:
             return await interaction.followup.send(
                 f"Aucune partie enregistrée pour la période '{selection.period}'."
             )
 
         title = get_mmr_period_title(selection.period, selection.season_num, selection.act_num)
-        buf = build_mmr_history_chart(
-            stats.dates_plot,
-            stats.elos_plot,
-            period=selection.period,
-            title=title,
-        )
-
         embed = build_mmr_stats_embed(
             title=title,
             stats=stats,
             timestamp=datetime.now(timezone.utc),
         )
-        file = File(buf, filename="mmr_history.png")
+        try:
+            png = await self._chart_renderer.render(
+                render_mmr_history_png,
+                list(stats.dates_plot),
+                list(stats.elos_plot),
+                period=selection.period,
+                title=title,
+            )
+        except ChartRenderError as e:
+            logger.warning(f"[mmr_track] Graphique non rendu pour discord_id={discord_id}: {e}")
+            embed.set_image(url=None)
+            return await interaction.followup.send(embed=embed)
+
+        file = File(io.BytesIO(png), filename="mmr_history.png")
         await interaction.followup.send(embed=embed, file=file)
 
     @mmr_track.autocomplete("periode")
@@ -181,5 +192,10 @@ async def setup(bot: commands.Bot):
         logger.error("ranking_service non initialisé. MMRTracker ne sera pas chargé.")
         return
 
-    await bot.add_cog(MMRTracker(bot, tracker_service))
+    chart_renderer = getattr(bot, "chart_renderer", None)
+    if chart_renderer is None:
+        logger.error("chart_renderer non initialisé. MMRTracker ne sera pas chargé.")
+        return
+
+    await bot.add_cog(MMRTracker(bot, tracker_service, chart_renderer))
     logger.info("MMRTracker Cog chargé.")
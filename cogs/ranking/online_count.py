@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 
 import discord
@@ -7,6 +8,7 @@ from discord.ext import commands, tasks
 
 from cogs.ranking.services.online_count_service import (
     ChannelEditRateLimiter,
+    ChannelRenameScheduler,
     RankOnlineCountConfig,
     RankOnlineCountService,
 )
@@ -24,14 +26,51 @@ class RankOnlineCountCog(commands.Cog):
     ) -> None:
         self.bot = bot
         self._service = service
-        self._rate_limiter = rate_limiter or ChannelEditRateLimiter()
+        self._renames = ChannelRenameScheduler(self._rename_channel, rate_limiter=rate_limiter)
+        self._config_refreshes: dict[int, asyncio.Task] = {}
+        self._service.watch_config(self._on_config_written)
         self.refresh_rank_counts.start()
         logger.info("RankOnlineCountCog initialized.")
 
     def cog_unload(self) -> None:
         if self.refresh_rank_counts.is_running():
             self.refresh_rank_counts.cancel()
-        self._rate_limiter.clear()
+        self._service.unwatch_config(self._on_config_written)
+        for task in self._config_refreshes.values():
+            task.cancel()
+        self._config_refreshes.clear()
+        self._renames.clear()
+
+    def _on_config_written(self, guild_id: int) -> None:
+        # Appele de facon synchrone par le cache de config: reseed en tache.
+        # Un reseed deja en cours a pu lire l'ancienne config: on le remplace.
+        if not self.bot.is_ready():
+            return
+        guild = self.bot.get_guild(guild_id)
+        if guild is None:
+            return
+        previous = self._config_refreshes.pop(guild_id, None)
+        if previous is not None:
+            previous.cancel()
+        task = asyncio.create_task(self._refresh_after_config_write(guild))
+        self._config_refreshes[guild_id] = task
+        task.add_done_callback(lambda done: self._forget_config_refresh(guild_id, done))
+
+    def _forget_config_refresh(self, guild_id: int, task: asyncio.Task) -> None:
+        if self._config_refreshes.get(guild_id) is task:
+            del self._config_refreshes[guild_id]
+
+    async def _refresh_after_config_write(self, guild: discord.Guild) -> None:
+        try:
+            await self.refresh_guild(guild)
+        except Exception:
+            logger.exception("Rank online count refresh failed for guild %s after a config change.", guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild) -> None:
+        config = self._service.forget_guild(guild.id)
+        if config is not None:
+            self._renames.cancel(config.rank_channels.values())
 
     @commands.Cog.listener()
     async def on_presence_update(self, before: discord.Member, after: discord.Member) -> None:
@@ -42,16 +81,41 @@ class RankOnlineCountCog(commands.Cog):
         ):
             return
 
-        config = await self._service.get_config(after.guild.id)
-        changed_ranks = self._service.rank_names_for_role_ids(
-            (role.id for role in after.roles),
-            config,
+        role_ids = [role.id for role in after.roles]
+        self._apply_member_change(
+            after.guild,
+            role_ids_before=role_ids,
+            role_ids_after=role_ids,
+            online_before=before.status != discord.Status.offline,
+            online_after=after.status != discord.Status.offline,
         )
-        if not changed_ranks:
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member) -> None:
+        if before.roles == after.roles:
             return
 
-        await self.refresh_guild(after.guild, config=config, only_ranks=changed_ranks)
+        online = after.status != discord.Status.offline
+        self._apply_member_change(
+            after.guild,
+            role_ids_before=[role.id for role in before.roles],
+            role_ids_after=[role.id for role in after.roles],
+            online_before=online,
+            online_after=online,
+        )
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member) -> None:
+        self._apply_member_change(
+            member.guild,
+            role_ids_before=[role.id for role in member.roles],
+            role_ids_after=(),
+            online_before=member.status != discord.Status.offline,
+            online_after=False,
+        )
 
+    # Seed au demarrage (premier tour apres wait_until_ready) puis resynchronisation
+    # periodique: recharge la config et corrige une derive eventuelle
     @tasks.loop(minutes=10)
     async def refresh_rank_counts(self) -> None:
         for guild in self.bot.guilds:
@@ -64,33 +128,41 @@ class RankOnlineCountCog(commands.Cog):
     async def before_refresh_rank_counts(self) -> None:
         await self.bot.wait_until_ready()
 
-    async def refresh_guild(
+    async def refresh_guild(self, guild: discord.Guild) -> None:
+        """Recompte depuis le cache membres (seed) et planifie les renommages."""
+        config = await self._service.get_config(guild.id)
+        counts = {}
+        for rank, role_id in config.rank_roles.items():
+            role = guild.get_role(role_id)
+            if role is not None:
+                counts[rank] = sum(1 for member in role.members if member.status != discord.Status.offline)
+        self._service.seed_guild(guild.id, config, counts)
+        self._schedule_renames(guild, config, config.configured_ranks)
+
+    def _apply_member_change(self, guild: discord.Guild, **change) -> None:
+        changed_ranks = self._service.apply_member_change(guild.id, **change)
+        if changed_ranks:
+            self._schedule_renames(guild, self._service.cached_config(guild.id), changed_ranks)
+
+    def _schedule_renames(
         self,
         guild: discord.Guild,
-        *,
-        config: RankOnlineCountConfig | None = None,
-        only_ranks: frozenset[str] | None = None,
+        config: RankOnlineCountConfig,
+        ranks: frozenset[str],
     ) -> None:
-        config = config or await self._service.get_config(guild.id)
-        ranks_to_refresh = config.configured_ranks if only_ranks is None else config.configured_ranks & only_ranks
-        if not ranks_to_refresh:
-            return
-
-        for rank in sorted(ranks_to_refresh):
-            role = guild.get_role(config.rank_roles[rank])
+        for rank in sorted(ranks):
             channel = guild.get_channel(config.rank_channels[rank])
-            if role is None or channel is None:
+            if channel is None:
                 continue
-
-            online_count = sum(1 for member in role.members if member.status != discord.Status.offline)
-            await self._rename_channel_if_needed(channel, self._service.channel_name(rank, online_count))
-
-    async def _rename_channel_if_needed(self, channel, new_name: str) -> None:
-        if getattr(channel, "name", None) == new_name:
-            return
-
-        if not self._rate_limiter.allow(channel.id):
-            logger.warning("Rank online count rename skipped for channel %s: rate limit reached.", channel.id)
+            self._renames.schedule(
+                channel.id,
+                self._service.channel_name(rank, self._service.online_count(guild.id, rank)),
+                current_name=getattr(channel, "name", None),
+            )
+
+    async def _rename_channel(self, channel_id: int, new_name: str) -> None:
+        channel = self.bot.get_channel(channel_id)
+        if channel is None or getattr(channel, "name", None) == new_name:
             return
 
         try:
@@ -1,6 +1,6 @@
 # cogs/ranking/renderers/__init__.py
 """Presentation renderers for ranking cogs."""
 
-from .mmr_history_chart import build_mmr_history_chart, get_mmr_period_title
+from .mmr_history_chart import build_mmr_history_chart, get_mmr_period_title, render_mmr_history_png
 
-__all__ = ["build_mmr_history_chart", "get_mmr_period_title"]
+__all__ = ["build_mmr_history_chart", "get_mmr_period_title", "render_mmr_history_png"]
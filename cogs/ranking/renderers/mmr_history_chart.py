@@ -38,6 +38,17 @@ def build_mmr_history_chart(
     period: str,
     title: str,
 ) -> io.BytesIO:
+    return io.BytesIO(render_mmr_history_png(dates_plot, elos_plot, period=period, title=title))
+
+
+def render_mmr_history_png(
+    dates_plot: Sequence[datetime],
+    elos_plot: Sequence[int],
+    *,
+    period: str,
+    title: str,
+) -> bytes:
+    """Rendu PNG a partir de listes simples (picklable: utilise par le pool de rendu)."""
     if len(dates_plot) < 2 or len(elos_plot) < 2:
         raise ValueError("MMR history chart requires at least two points")
     if len(dates_plot) != len(elos_plot):
@@ -54,59 +65,59 @@ def build_mmr_history_chart(
     ]
 
     buffer = io.BytesIO()
-    plt.style.use("dark_background")
-    fig, ax = plt.subplots(figsize=(10, 4), dpi=150)
-
-    ymin = min(elos_plot) - 10
-    gradient = np.linspace(1, 0, 256).reshape(256, 1)
-    image = ax.imshow(
-        gradient,
-        extent=[mpl_dates.min(), mpl_dates.max(), ymin, max(elos_plot)],
-        origin="lower",
-        cmap=plt.get_cmap(cmap_fill),
-        alpha=0.5,
-        aspect="auto",
-        zorder=1,
-    )
-    polygon = np.vstack(
-        [
-            [mpl_dates[0], ymin],
-            np.column_stack([mpl_dates, elos_plot]),
-            [mpl_dates[-1], ymin],
-            [mpl_dates[0], ymin],
-        ]
-    )
-    image.set_clip_path(PathPatch(Path(polygon), transform=ax.transData))
-
-    line_collection = LineCollection(segments, colors=segment_colors, linewidths=2.5, zorder=3)
-    ax.add_collection(line_collection)
-
-    for segment, color in zip(segments, segment_colors):
-        ax.plot(
-            segment[:, 0],
-            segment[:, 1],
-            linewidth=8,
-            solid_capstyle="round",
-            color=color,
+    # Style local au rendu: un worker partage ne doit pas garder le fond sombre
+    with plt.style.context("dark_background"):
+        fig, ax = plt.subplots(figsize=(10, 4), dpi=150)
+
+        ymin = min(elos_plot) - 10
+        gradient = np.linspace(1, 0, 256).reshape(256, 1)
+        image = ax.imshow(
+            gradient,
+            extent=[mpl_dates.min(), mpl_dates.max(), ymin, max(elos_plot)],
+            origin="lower",
+            cmap=plt.get_cmap(cmap_fill),
+            alpha=0.5,
+            aspect="auto",
+            zorder=1,
+        )
+        polygon = np.vstack(
+            [
+                [mpl_dates[0], ymin],
+                np.column_stack([mpl_dates, elos_plot]),
+                [mpl_dates[-1], ymin],
+                [mpl_dates[0], ymin],
+            ]
+        )
+        image.set_clip_path(PathPatch(Path(polygon), transform=ax.transData))
+
+        # Halo: une seule collection au lieu d'un ax.plot par segment
+        glow_collection = LineCollection(
+            segments,
+            colors=segment_colors,
+            linewidths=8,
+            capstyle="round",
             alpha=0.2,
             zorder=2,
         )
-
-    date_format = "%H:%M" if period == "today" else "%Y-%m-%d"
-    ax.xaxis.set_major_formatter(mdates.DateFormatter(date_format))
-    ax.xaxis.set_major_locator(mdates.AutoDateLocator())
-    ax.set_title(f"Évolution MMR ({title})", fontsize=14, fontweight="bold")
-    ax.set_xlabel("Heure" if period != "all" else "Date", fontsize=12)
-    ax.set_ylabel("ELO", fontsize=12)
-
-    ax.grid(False)
-    ax.xaxis.grid(False)
-    ax.spines["top"].set_visible(False)
-    ax.spines["right"].set_visible(False)
-    ax.set_ylim(ymin, max(elos_plot) + 10)
-
-    fig.tight_layout()
-    fig.savefig(buffer, format="png")
-    buffer.seek(0)
-    plt.close(fig)
-    return buffer
+        ax.add_collection(glow_collection)
+        line_collection = LineCollection(segments, colors=segment_colors, linewidths=2.5, zorder=3)
+        ax.add_collection(line_collection)
+
+        date_format = "%H:%M" if period == "today" else "%Y-%m-%d"
+        ax.xaxis.set_major_formatter(mdates.DateFormatter(date_format))
+        ax.xaxis.set_major_locator(mdates.AutoDateLocator())
+        ax.set_title(f"Évolution MMR ({title})", fontsize=14, fontweight="bold")
+        ax.set_xlabel("Heure" if period != "all" else "Date", fontsize=12)
+        ax.set_ylabel("ELO", fontsize=12)
+
+        ax.grid(False)
+        ax.xaxis.grid(False)
+        ax.spines["top"].set_visible(False)
+        ax.spines["right"].set_visible(False)
+        ax.set_xlim(mpl_dates.min(), mpl_dates.max())
+        ax.set_ylim(ymin, max(elos_plot) + 10)
+
+        fig.tight_layout()
+        fig.savefig(buffer, format="png")
+        plt.close(fig)
+    return buffer.getvalue()
@@ -4,13 +4,21 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import date, datetime, time, timedelta
+from datetime import date, datetime, time, timedelta, timezone
 import re
 from typing import Protocol, Sequence
 from zoneinfo import ZoneInfo
 
+import numpy as np
+
 
 PARIS_TZ = ZoneInfo("Europe/Paris")
+# Au-dela, la courbe est reduite par LTTB (le graphique n'a pas plus de pixels utiles)
+MAX_PLOT_POINTS = 500
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_US_PER_DAY = 86_400 * 1_000_000
+# (season, act) des agregats calcules sur tout l'historique du compte (periode "all")
+ALL_ACTS = (0, 0)
 
 
 class MmrHistoryRow(Protocol):
@@ -18,16 +26,14 @@ class MmrHistoryRow(Protocol):
     elo: int
 
 
-@dataclass(frozen=True)
-class _DiffRow:
-    row: MmrHistoryRow
-    diff: int
-
-
-@dataclass(frozen=True)
-class _SyntheticPlotRow:
-    recorded_at: datetime
-    elo: int
+class MmrHistorySeries(Protocol):
+    """Historique en colonnes tries par recorded_at (cf. EloHistorySeries)."""
+    recorded_us: np.ndarray
+    elo: np.ndarray
+    rr_delta: np.ndarray
+    has_rr: np.ndarray
+    has_match: np.ndarray
+    is_legacy: np.ndarray
 
 
 @dataclass(frozen=True)
@@ -38,6 +44,15 @@ class MmrPeriodSelection:
     start_date: date | None
     start_at: datetime | None = None
 
+    @property
+    def since(self) -> datetime | None:
+        """Borne basse a pousser en SQL (meme convention UTC que calculate_mmr_stats_from_series)."""
+        if self.start_at is not None:
+            return _aware(self.start_at)
+        if self.start_date:
+            return datetime.combine(self.start_date, time.min, tzinfo=timezone.utc)
+        return None
+
 
 @dataclass(frozen=True)
 class MmrStats:
@@ -50,6 +65,32 @@ class MmrStats:
     elos_plot: list[int]
 
 
+@dataclass(frozen=True)
+class MmrDaySummary:
+    """
+    Agregat d'une journee UTC d'un acte, ou du compte pour ALL_ACTS (ligne de
+    valorant_mmr_daily_summary). uses_rr_delta et import_elo decrivent l'etat en fin
+    de journee, repris par le jour suivant: mode des deltas de l'historique, et elo
+    de la sequence d'import encore ouverte (dedupe des snapshots) ou None.
+    """
+    season: int
+    act: int
+    day: date
+    games: int
+    net_change: int
+    wins: int
+    win_total: int
+    losses: int
+    loss_total: int
+    last_diff: int
+    open_at: datetime
+    open_elo: int
+    close_at: datetime
+    close_elo: int
+    uses_rr_delta: bool = False
+    import_elo: int | None = None
+
+
 def parse_mmr_period(
     period: str | None,
     *,
@@ -73,7 +114,10 @@ def parse_mmr_period(
     if selected_period == "week":
         if today is not None:
             return MmrPeriodSelection(selected_period, None, None, reference_day - timedelta(days=7))
-        return MmrPeriodSelection(selected_period, None, None, None, reference_now - timedelta(days=7))
+        # Fenetre glissante arrondie a la minute: start_at devient le premier point du
+        # graphique, une borne stable permet au ChartCache de resservir le meme rendu.
+        start_at = (reference_now - timedelta(days=7)).replace(second=0, microsecond=0)
+        return MmrPeriodSelection(selected_period, None, None, None, start_at)
     if selected_period == "all":
         return MmrPeriodSelection(selected_period, None, None, None)
 
@@ -85,174 +129,381 @@ def parse_mmr_period(
     return MmrPeriodSelection(selected_period, None, None, reference_day)
 
 
-def calculate_mmr_stats(
-    history: Sequence[MmrHistoryRow],
+def calculate_mmr_stats_from_series(
+    series: MmrHistorySeries,
     *,
     start_date: date | None = None,
     start_at: datetime | None = None,
+    max_plot_points: int | None = None,
 ) -> MmrStats | None:
-    period_rows = [
-        row
-        for row in history
-        if _is_in_period(row, start_date, start_at)
-    ]
-    if not period_rows:
+    """
+    Stats MMR d'une periode, calculees sur des tableaux NumPy.
+
+    L'historique etant trie, la periode est un suffixe [first, n): un searchsorted
+    remplace les filtrages repetes. start_date s'entend en UTC, comme recorded_at.date()
+    sur les lignes lues en base.
+    max_plot_points: la courbe (pas les stats) est reduite par LTTB au-dela de ce nombre.
+    """
+    first = _period_start_index(series.recorded_us, start_date, start_at)
+    period = _series_period(series, first, start_at)
+    if period is None:
         return None
-
-    if any(_row_attr(row, "rr_delta") is not None for row in period_rows):
-        diffs, plot_rows = _metadata_diffs(history, start_date, start_at)
-    else:
-        diffs, plot_rows = _legacy_diffs(history, start_date, start_at), period_rows
-
-    if not diffs or len(plot_rows) < 2:
+    diffs, plot_us, plot_elo, first_date = period
+    if len(plot_elo) < 2:
         return None
 
-    wins = [diff for _, diff in diffs if diff > 0]
-    losses = [diff for _, diff in diffs if diff < 0]
+    if max_plot_points is not None and len(plot_elo) > max_plot_points:
+        kept = lttb_indices(plot_us, plot_elo, max_plot_points)
+        plot_us, plot_elo = plot_us[kept], plot_elo[kept]
+    dates_plot = [_from_epoch_us(value) for value in plot_us.tolist()]
+    if first_date is not None:
+        dates_plot[0] = first_date
+    elos_plot = plot_elo.tolist()
 
+    wins = diffs[diffs > 0]
+    losses = diffs[diffs < 0]
     return MmrStats(
-        total_games=len(diffs),
-        total_change=sum(diff for _, diff in diffs),
-        avg_win=round(sum(wins) / len(wins)) if wins else 0,
-        avg_loss=round(sum(losses) / len(losses)) if losses else 0,
-        last_diff=diffs[-1][1],
-        dates_plot=[row.recorded_at for row in plot_rows],
-        elos_plot=[row.elo for row in plot_rows],
+        total_games=int(len(diffs)),
+        total_change=int(diffs.sum()),
+        avg_win=round(int(wins.sum()) / len(wins)) if len(wins) else 0,
+        avg_loss=round(int(losses.sum()) / len(losses)) if len(losses) else 0,
+        last_diff=int(diffs[-1]),
+        dates_plot=dates_plot,
+        elos_plot=elos_plot,
     )
 
 
-def _legacy_diffs(
-    history: Sequence[MmrHistoryRow],
-    start_date: date | None,
+def _series_period(
+    series: MmrHistorySeries,
+    first: int,
     start_at: datetime | None,
-) -> list[tuple[datetime, int]]:
-    diffs: list[tuple[datetime, int]] = []
-    for index in range(1, len(history)):
-        recorded_at = history[index].recorded_at
-        if not _is_in_period(history[index], start_date, start_at):
-            continue
-
-        diff = history[index].elo - history[index - 1].elo
-        diffs.append((recorded_at, diff))
-    return diffs
-
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, datetime | None] | None:
+    """Deltas retenus et points de courbe de la periode [first, n), None sans partie."""
+    n = len(series.elo)
+    if first >= n:
+        return None
 
-def _metadata_diffs(
-    history: Sequence[MmrHistoryRow],
-    start_date: date | None,
-    start_at: datetime | None,
-) -> tuple[list[tuple[datetime, int]], list[MmrHistoryRow]]:
-    diff_rows: list[_DiffRow] = []
-    previous: MmrHistoryRow | None = None
-
-    for row in history:
-        in_period = _is_in_period(row, start_date, start_at)
-        if not in_period:
-            previous = row
-            continue
+    elo = series.elo
+    if series.has_rr[first:].any():
+        indices, diffs = _series_metadata_diffs(series, first)
+        if len(indices) == 0:
+            return None
+        plot_us, plot_elo, first_date = _series_plot_points(series, first, indices, diffs, start_at)
+    else:
+        indices = np.arange(max(first, 1), n)
+        diffs = elo[indices] - elo[indices - 1]
+        plot_us, plot_elo, first_date = series.recorded_us[first:], elo[first:], None
 
-        rr_delta = _row_attr(row, "rr_delta")
-        if previous is None and _row_attr(row, "source") == "legacy":
-            previous = row
-            continue
-        if rr_delta is None and previous is not None:
-            rr_delta = row.elo - previous.elo
-        if rr_delta is None:
-            previous = row
-            continue
+    if len(diffs) == 0:
+        return None
+    return diffs, plot_us, plot_elo, first_date
 
-        if rr_delta != 0 or _row_attr(row, "match_id"):
-            diff_rows.append(_DiffRow(row, rr_delta))
 
-        previous = row
+def summarize_mmr_days(
+    series: MmrHistorySeries,
+    *,
+    season: int,
+    act: int,
+    from_day: date | None = None,
+    previous: MmrDaySummary | None = None,
+) -> list[MmrDaySummary]:
+    """
+    Agregats par jour UTC d'un historique (un acte, ou tout le compte pour ALL_ACTS),
+    jours >= from_day.
+
+    Les deltas sont ceux de calculate_mmr_stats_from_series sur l'historique complet,
+    regroupes par jour: la ligne precedente (meme d'un autre jour) sert de point de depart, et le mode
+    des deltas comme la sequence d'import en cours sont repris de `previous`, l'agregat
+    du dernier jour anterieur a from_day. La serie peut donc commencer par la derniere
+    ligne anterieure a from_day (cf. since en SQL); voir mmr_days_need_rebuild.
+    """
+    n = len(series.elo)
+    first = _period_start_index(series.recorded_us, from_day, None)
+    if first >= n:
+        return []
 
-    deduped_rows = _dedupe_imported_matches_and_snapshots(diff_rows)
-    diffs = [(item.row.recorded_at, item.diff) for item in deduped_rows]
-    plot_rows = _metadata_plot_rows(history, start_date, start_at, deduped_rows)
-    return diffs, plot_rows
+    elo = series.elo
+    uses_rr_delta = bool(series.has_rr.any()) or (previous is not None and previous.uses_rr_delta)
+    import_elo = previous.import_elo if previous is not None and uses_rr_delta else None
+    if uses_rr_delta:
+        indices, diffs, selected, still_open = _series_metadata_selection(series, first, import_elo)
+    else:
+        indices = np.arange(max(first, 1), n)
+        diffs = elo[indices] - elo[indices - 1]
+        selected = still_open = None
+    if len(indices) == 0:
+        return []
 
+    day_numbers = series.recorded_us[indices] // _US_PER_DAY
+    starts = np.flatnonzero(np.diff(day_numbers, prepend=day_numbers[0] - 1))
+    stops = np.append(starts[1:], len(indices))
+    selected_days = series.recorded_us[selected] // _US_PER_DAY if selected is not None else None
+
+    summaries: list[MmrDaySummary] = []
+    for start, stop in zip(starts.tolist(), stops.tolist()):
+        day_number = int(day_numbers[start])
+        day_diffs = diffs[start:stop]
+        first_change = int(indices[start])
+        last_change = int(indices[stop - 1])
+        day_start = _EPOCH + timedelta(days=day_number)
+        if first_change > 0:
+            open_at = max(day_start, _from_epoch_us(int(series.recorded_us[first_change - 1])))
+        else:
+            open_at = _from_epoch_us(int(series.recorded_us[0])) - timedelta(seconds=1)
+
+        if selected_days is not None:
+            # Etat apres la derniere ligne retenue du jour (un snapshot ignore garde la sequence ouverte)
+            last = int(np.searchsorted(selected_days, day_number, side="right")) - 1
+            if last >= 0:
+                import_elo = int(elo[selected[last]]) if still_open[last] else None
+
+        wins = day_diffs[day_diffs > 0]
+        losses = day_diffs[day_diffs < 0]
+        summaries.append(
+            MmrDaySummary(
+                season=season,
+                act=act,
+                day=day_start.date(),
+                games=int(len(day_diffs)),
+                net_change=int(day_diffs.sum()),
+                wins=int(len(wins)),
+                win_total=int(wins.sum()),
+                losses=int(len(losses)),
+                loss_total=int(losses.sum()),
+                last_diff=int(day_diffs[-1]),
+                open_at=open_at,
+                open_elo=int(elo[first_change] - day_diffs[0]),
+                close_at=_from_epoch_us(int(series.recorded_us[last_change])),
+                close_elo=int(elo[last_change]),
+                uses_rr_delta=uses_rr_delta,
+                import_elo=import_elo,
+            )
+        )
+    return summaries
 
-def _dedupe_imported_matches_and_snapshots(diff_rows: list[_DiffRow]) -> list[_DiffRow]:
-    deduped: list[_DiffRow] = []
-    last_import: _DiffRow | None = None
 
-    for item in diff_rows:
-        if _row_attr(item.row, "match_id"):
-            deduped.append(item)
-            last_import = item
-            continue
+def mmr_days_need_rebuild(
+    series: MmrHistorySeries,
+    *,
+    from_day: date,
+    previous: MmrDaySummary | None,
+) -> bool:
+    """
+    Vrai si summarize_mmr_days(from_day=...) ne peut pas prolonger les agregats existants:
+    historique anterieur sans agregat connu (etat inconnu), ou premier rr_delta d'un
+    historique jusque-la agrege en mode legacy (tous les jours changent de mode).
+    """
+    first = _period_start_index(series.recorded_us, from_day, None)
+    if first == 0:
+        return False
+    if previous is None:
+        return True
+    return not previous.uses_rr_delta and bool(series.has_rr.any())
+
+
+def combine_mmr_day_summaries(
+    summaries: Sequence[MmrDaySummary],
+    *,
+    max_plot_points: int | None = None,
+) -> MmrStats | None:
+    """
+    Stats d'une periode a partir des agregats journaliers (O(jours)), identiques a
+    calculate_mmr_stats_from_series sur l'historique brut de la meme periode.
+    La courbe a un point par jour (cloture), precede de l'ouverture du premier jour,
+    reduite par LTTB au-dela de max_plot_points.
+    """
+    if not summaries:
+        return None
 
-        if last_import and item.row.elo == last_import.row.elo:
+    ordered = sorted(summaries, key=lambda summary: summary.close_at)
+    games = sum(summary.games for summary in ordered)
+    wins = sum(summary.wins for summary in ordered)
+    losses = sum(summary.losses for summary in ordered)
+    win_total = sum(summary.win_total for summary in ordered)
+    loss_total = sum(summary.loss_total for summary in ordered)
+
+    dates_plot = [ordered[0].open_at]
+    elos_plot = [ordered[0].open_elo]
+    for summary in ordered:
+        if summary.close_at == dates_plot[-1]:
+            elos_plot[-1] = summary.close_elo
             continue
+        dates_plot.append(summary.close_at)
+        elos_plot.append(summary.close_elo)
 
-        deduped.append(item)
-        last_import = None
-
-    return deduped
+    if games == 0:
+        return None
+    if max_plot_points is not None and len(elos_plot) > max_plot_points:
+        plot_us = np.array([_to_epoch_us(value) for value in dates_plot], dtype=np.int64)
+        kept = lttb_indices(plot_us, np.array(elos_plot), max_plot_points).tolist()
+        dates_plot = [dates_plot[i] for i in kept]
+        elos_plot = [elos_plot[i] for i in kept]
+    return MmrStats(
+        total_games=games,
+        total_change=sum(summary.net_change for summary in ordered),
+        avg_win=round(win_total / wins) if wins else 0,
+        avg_loss=round(loss_total / losses) if losses else 0,
+        last_diff=ordered[-1].last_diff,
+        dates_plot=dates_plot,
+        elos_plot=elos_plot,
+    )
 
 
-def _metadata_plot_rows(
-    history: Sequence[MmrHistoryRow],
+def _period_start_index(
+    recorded_us: np.ndarray,
     start_date: date | None,
     start_at: datetime | None,
-    diff_rows: list[_DiffRow],
-) -> list[MmrHistoryRow]:
-    if not diff_rows:
-        return []
-
-    selected_rows = [item.row for item in diff_rows]
-    first_change = selected_rows[0]
-    baseline = _find_plot_baseline(history, start_date, start_at, first_change)
-    if baseline is not None and baseline is not first_change:
-        return [baseline, *selected_rows]
-    boundary_baseline = _period_boundary_baseline(diff_rows[0], start_at)
-    if boundary_baseline is not None:
-        return [boundary_baseline, *selected_rows]
-    imported_baseline = _imported_plot_baseline(diff_rows[0])
-    if imported_baseline is not None:
-        return [imported_baseline, *selected_rows]
-    return selected_rows
-
-
-def _find_plot_baseline(
-    history: Sequence[MmrHistoryRow],
-    start_date: date | None,
+) -> int:
+    if start_at is not None:
+        if start_at.tzinfo is None:
+            start_at = start_at.replace(tzinfo=timezone.utc)
+        bound = _to_epoch_us(start_at)
+    elif start_date:
+        bound = _to_epoch_us(datetime.combine(start_date, time.min, tzinfo=timezone.utc))
+    else:
+        return 0
+    return int(np.searchsorted(recorded_us, bound, side="left"))
+
+
+def _series_metadata_diffs(series: MmrHistorySeries, first: int) -> tuple[np.ndarray, np.ndarray]:
+    """Equivalent vectorise de _metadata_diffs + _dedupe_imported_matches_and_snapshots."""
+    kept, diffs, _, _ = _series_metadata_selection(series, first)
+    return kept, diffs
+
+
+def _series_metadata_selection(
+    series: MmrHistorySeries,
+    first: int,
+    import_elo: int | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Lignes retenues de [first, n) et leurs deltas, plus les lignes selectionnees avant
+    dedupe et, pour chacune, si une sequence d'import reste ouverte apres elle.
+    import_elo: sequence d'import ouverte avant first (agregat du jour precedent).
+    """
+    elo = series.elo[first:]
+    has_rr = series.has_rr[first:]
+    has_match = series.has_match[first:]
+    previous_elo = series.elo[first - 1:-1] if first > 0 else np.concatenate(([0], elo[:-1]))
+
+    rr = np.where(has_rr, series.rr_delta[first:], elo - previous_elo)
+    valid = np.ones(len(elo), dtype=bool)
+    if first == 0:
+        # Premiere ligne de l'historique: pas de precedent pour deduire un delta
+        valid[0] = bool(has_rr[0]) and not bool(series.is_legacy[0])
+    selected = valid & ((rr != 0) | has_match)
+
+    positions = np.flatnonzero(selected)
+    sel_elo = elo[positions]
+    sel_match = has_match[positions]
+    if import_elo is not None:
+        # Sequence ouverte avant first: equivalente a un match virtuel du meme elo
+        sel_elo = np.concatenate(([import_elo], sel_elo))
+        sel_match = np.concatenate(([True], sel_match))
+
+    # Un snapshot qui suit un import de match est ignore tant qu'il porte le meme elo
+    # que ce match; le premier snapshot different (garde) clot la sequence.
+    order = np.arange(len(sel_elo))
+    last_match = np.maximum.accumulate(np.where(sel_match, order, -1))
+    after_match = ~sel_match & (last_match >= 0)
+    same_elo = np.zeros(len(sel_elo), dtype=bool)
+    same_elo[after_match] = sel_elo[after_match] == sel_elo[last_match[after_match]]
+    mismatches = np.cumsum(after_match & ~same_elo)
+    clean_run = np.zeros(len(sel_elo), dtype=bool)
+    clean_run[after_match] = mismatches[after_match] == mismatches[last_match[after_match]]
+    keep = ~(after_match & same_elo & clean_run)
+    still_open = sel_match | ~keep
+    if import_elo is not None:
+        keep, still_open = keep[1:], still_open[1:]
+
+    kept = positions[keep]
+    return kept + first, rr[kept], positions + first, still_open
+
+
+def _series_plot_points(
+    series: MmrHistorySeries,
+    first: int,
+    indices: np.ndarray,
+    diffs: np.ndarray,
     start_at: datetime | None,
-    first_change: MmrHistoryRow,
-) -> MmrHistoryRow | None:
-    previous: MmrHistoryRow | None = None
-
-    for row in history:
-        if row is first_change:
-            if previous is not None:
-                return previous
-            return first_change
-        if _is_in_period(row, start_date, start_at):
-            previous = row
-
-    return first_change
+) -> tuple[np.ndarray, np.ndarray, datetime | None]:
+    """
+    Equivalent de _metadata_plot_rows: lignes retenues precedees d'un point de depart.
+    Le troisieme element remplace la date du premier point (start_at tel quel).
+    """
+    plot_us = series.recorded_us[indices]
+    plot_elo = series.elo[indices]
+
+    first_change = int(indices[0])
+    first_baseline_elo = series.elo[first_change] - diffs[0]
+    if first_change > first:
+        baseline = first_change - 1
+        return (
+            np.concatenate(([series.recorded_us[baseline]], plot_us)),
+            np.concatenate(([series.elo[baseline]], plot_elo)),
+            None,
+        )
+    if start_at is not None and _from_epoch_us(int(plot_us[0])) > _aware(start_at):
+        return (
+            np.concatenate(([_to_epoch_us(_aware(start_at))], plot_us)),
+            np.concatenate(([first_baseline_elo], plot_elo)),
+            start_at,
+        )
+    if series.has_match[first_change]:
+        return (
+            np.concatenate(([plot_us[0] - 1_000_000], plot_us)),
+            np.concatenate(([first_baseline_elo], plot_elo)),
+            None,
+        )
+    return plot_us, plot_elo, None
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices des points a garder (premier et dernier inclus)
+    pour que la courbe reduite a `threshold` points garde la meme allure.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    xs = np.asarray(x, dtype=np.float64)
+    ys = np.asarray(y, dtype=np.float64)
+    # threshold - 2 seaux entre le premier et le dernier point
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0] = 0
+    kept[-1] = n - 1
+
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            next_start, next_end = edges[bucket + 1], edges[bucket + 2]
+            avg_x = xs[next_start:next_end].mean()
+            avg_y = ys[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = xs[n - 1], ys[n - 1]
+
+        area = np.abs(
+            (xs[previous] - avg_x) * (ys[start:end] - ys[previous])
+            - (xs[previous] - xs[start:end]) * (avg_y - ys[previous])
+        )
+        previous = start + int(area.argmax())
+        kept[bucket + 1] = previous
+    return kept
 
 
-def _period_boundary_baseline(diff_row: _DiffRow, start_at: datetime | None) -> _SyntheticPlotRow | None:
-    if start_at is None or diff_row.row.recorded_at <= start_at:
-        return None
-    return _SyntheticPlotRow(
-        recorded_at=start_at,
-        elo=diff_row.row.elo - diff_row.diff,
-    )
+def _aware(value: datetime) -> datetime:
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
 
 
-def _imported_plot_baseline(diff_row: _DiffRow) -> _SyntheticPlotRow | None:
-    if not _row_attr(diff_row.row, "match_id"):
-        return None
-    return _SyntheticPlotRow(
-        recorded_at=diff_row.row.recorded_at - timedelta(seconds=1),
-        elo=diff_row.row.elo - diff_row.diff,
-    )
+def _to_epoch_us(value: datetime) -> int:
+    return (value - _EPOCH) // timedelta(microseconds=1)
 
 
-def _row_attr(row: MmrHistoryRow, name: str):
-    return getattr(row, name, None)
+def _from_epoch_us(value: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=value)
 
 
 def _reference_now(now: datetime | None) -> datetime:
@@ -261,17 +512,3 @@ def _reference_now(now: datetime | None) -> datetime:
     if now.tzinfo is None:
         return now.replace(tzinfo=PARIS_TZ)
     return now.astimezone(PARIS_TZ)
-
-
-def _is_in_period(row: MmrHistoryRow, start_date: date | None, start_at: datetime | None) -> bool:
-    if start_at is not None:
-        return _recorded_at_for_compare(row.recorded_at, start_at) >= start_at
-    return not start_date or row.recorded_at.date() >= start_date
-
-
-def _recorded_at_for_compare(recorded_at: datetime, start_at: datetime) -> datetime:
-    if recorded_at.tzinfo is None and start_at.tzinfo is not None:
-        return recorded_at.replace(tzinfo=start_at.tzinfo)
-    if recorded_at.tzinfo is not None and start_at.tzinfo is None:
-        return recorded_at.replace(tzinfo=None)
-    return recorded_at
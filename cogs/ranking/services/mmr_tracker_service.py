@@ -6,18 +6,35 @@ Aucun appel HTTP direct - delegue au HenrikDevService.
 """
 
 import re
+import asyncio
 import logging
+import math
 from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, time, timedelta, timezone
 from typing import Any, Optional
 
-from database.services.valorant_db_service import EloHistoryRow, ValorantDbService
+from cogs.ranking.services.mmr_stats_service import (
+    ALL_ACTS,
+    MAX_PLOT_POINTS,
+    MmrPeriodSelection,
+    MmrStats,
+    calculate_mmr_stats_from_series,
+    combine_mmr_day_summaries,
+    mmr_days_need_rebuild,
+    summarize_mmr_days,
+)
+from database.services.valorant_db_service import EloHistoryRow, EloHistorySeries, ValorantDbService
 from integrations.henrikdev.service import HenrikDevService
 from integrations.exceptions import ApiError, RateLimitError
 
 logger = logging.getLogger(__name__)
 
 BACKFILL_RETRY_INTERVAL = timedelta(hours=6)
+# Pages d'historique stocke recuperees en parallele quand le total est connu.
+STORED_HISTORY_PAGE_CONCURRENCY = 3
+# Bornes des cles de partition (cf. ValorantEloHistoryRepo.ensure_partitions).
+MAX_SEASON = 99
+MAX_ACT_PER_SEASON = 9
 
 
 @dataclass(frozen=True)
@@ -37,6 +54,8 @@ class MmrTrackerService:
     ):
         self._valo_db = valorant_db_svc
         self._henrik = henrik_svc
+        # Reconstructions du rollup MMR en cours, par discord_id
+        self._summary_rebuilds: dict[int, asyncio.Task] = {}
 
     # ==================== tracking on/off ====================
 
@@ -63,12 +82,56 @@ class MmrTrackerService:
     ) -> list[EloHistoryRow]:
         return await self._valo_db.get_history(discord_id, season, act)
 
+    async def get_history_series(
+        self,
+        discord_id: int,
+        season: int | None = None,
+        act: int | None = None,
+        since: datetime | None = None,
+    ) -> EloHistorySeries:
+        return await self._valo_db.get_history_series(discord_id, season, act, since)
+
     async def get_partitions(self, discord_id: int) -> list[tuple[int, int]]:
         return await self._valo_db.get_partitions(discord_id)
 
     async def get_latest_partition(self) -> Optional[tuple[int, int]]:
         return await self._valo_db.get_latest_partition()
 
+    # ==================== partitions ====================
+
+    async def load_known_partitions(self) -> None:
+        await self._valo_db.load_known_partitions()
+
+    async def prepare_partitions(self, rows: list[dict[str, Any]]) -> None:
+        """
+        Assure la partition de l'acte courant (le plus recent vu par le pipeline)
+        et pre-cree celles de l'acte suivant, pour que le DDL ne tombe pas
+        sur le chemin des insertions. Sans effet si elles sont deja connues.
+        """
+        current = max(
+            (
+                (row["current_season"], row["current_act"])
+                for row in rows
+                if row.get("current_season") and row.get("current_act")
+            ),
+            default=None,
+        )
+        if current is None:
+            return
+
+        season, act = current
+        for partition in self._upcoming_partitions(season, act):
+            await self._valo_db.ensure_partitions(*partition)
+
+    @staticmethod
+    def _upcoming_partitions(season: int, act: int) -> list[tuple[int, int]]:
+        partitions = [(season, act)]
+        if act < MAX_ACT_PER_SEASON:
+            partitions.append((season, act + 1))
+        if season < MAX_SEASON:
+            partitions.append((season + 1, 1))
+        return partitions
+
     async def record_current_mmr_snapshot(self, row: dict[str, Any]) -> bool:
         """
         Enregistre un point MMR courant si l'ELO a change.
@@ -127,6 +190,37 @@ class MmrTrackerService:
         Parse une entree d'historique et l'insere en DB.
         L'entree doit contenir: date, elo, rr_delta/last_change, season.short.
         """
+        row = self._parse_history_entry(user_id, entry, puuid=puuid, source=source)
+        if row is None:
+            return False
+
+        await self._valo_db.ensure_partitions(row.season, row.act)
+        inserted = await self._valo_db.insert_history_entry(
+            user_id,
+            row.season,
+            row.act,
+            row.recorded_at,
+            row.elo,
+            row.is_win,
+            puuid=row.puuid,
+            rr_delta=row.rr_delta,
+            match_id=row.match_id,
+            source=row.source,
+        )
+        if inserted:
+            await self._refresh_daily_summary(
+                user_id, puuid, row.season, row.act, row.recorded_at.astimezone(timezone.utc).date()
+            )
+        return inserted
+
+    @staticmethod
+    def _parse_history_entry(
+        user_id: int,
+        entry: dict[str, Any],
+        *,
+        puuid: str | None,
+        source: str,
+    ) -> EloHistoryRow | None:
         raw_date = entry.get("date")
         elo = entry.get("elo")
         rr_delta = entry.get("rr_delta", entry.get("last_change", entry.get("rr", 0)))
@@ -137,7 +231,7 @@ class MmrTrackerService:
 
         if elo is None:
             logger.warning(f"[insert_history_entry] Pas d'elo pour user_id={user_id}")
-            return False
+            return None
 
         season_info = entry.get("season") or {}
         season_short = season_info.get("short", "")
@@ -145,39 +239,147 @@ class MmrTrackerService:
             logger.warning(
                 f"[insert_history_entry] Pas de season.short pour user_id={user_id}. Ignore."
             )
-            return False
+            return None
 
         m = re.match(r"e(\d+)a(\d+)", season_short)
         if not m:
             logger.warning(
                 f"[insert_history_entry] Format invalide: '{season_short}' pour user_id={user_id}. Ignore."
             )
-            return False
+            return None
         season_num, act_num = map(int, m.groups())
 
         if not raw_date:
             logger.warning(f"[insert_history_entry] Pas de date pour user_id={user_id}")
-            return False
+            return None
 
         if isinstance(raw_date, str):
             recorded_at = datetime.fromisoformat(raw_date.replace("Z", "+00:00"))
         else:
             recorded_at = raw_date
 
-        await self._valo_db.ensure_partitions(season_num, act_num)
-        return await self._valo_db.insert_history_entry(
-            user_id,
-            season_num,
-            act_num,
-            recorded_at,
-            elo,
-            is_win,
+        return EloHistoryRow(
+            season=season_num,
+            act=act_num,
+            user_id=user_id,
+            recorded_at=recorded_at,
+            elo=elo,
+            is_win=is_win,
             puuid=puuid,
             rr_delta=rr_delta,
             match_id=match_id,
             source=source,
         )
 
+    # ==================== daily summary (rollup) ====================
+
+    async def get_mmr_stats(
+        self, discord_id: int, selection: MmrPeriodSelection
+    ) -> MmrStats | None:
+        """
+        Stats d'une periode. Pour "all" et eXaY, stats et courbe viennent du rollup
+        journalier (O(jours), un point par jour), sans lire l'historique brut.
+        today/week restent sur l'historique borne en SQL: leur debut ne tombe pas sur
+        une frontiere de jour UTC, un agregat journalier y compterait des parties
+        anterieures a la periode. Tant que le rollup n'est pas construit, l'historique
+        brut sert et une reconstruction est lancee en arriere-plan.
+        """
+        if selection.since is None:
+            season, act = (
+                (selection.season_num, selection.act_num)
+                if selection.season_num is not None
+                else ALL_ACTS
+            )
+            summaries = await self._valo_db.get_daily_summaries(discord_id, season, act)
+            if summaries is not None:
+                return combine_mmr_day_summaries(summaries, max_plot_points=MAX_PLOT_POINTS)
+            self._schedule_summary_rebuild(discord_id)
+
+        history = await self.get_history_series(
+            discord_id,
+            selection.season_num,
+            selection.act_num,
+            since=selection.since,
+        )
+        return calculate_mmr_stats_from_series(
+            history,
+            start_date=selection.start_date,
+            start_at=selection.start_at,
+            max_plot_points=MAX_PLOT_POINTS,
+        )
+
+    async def rebuild_daily_summaries_for(self, discord_id: int) -> None:
+        info = await self._valo_db.get_valorant_info_by_discord_id(discord_id)
+        if info is None:
+            return
+        await self._rebuild_daily_summaries(info.user_id, info.puuid)
+
+    def _schedule_summary_rebuild(self, discord_id: int) -> None:
+        if discord_id in self._summary_rebuilds:
+            return
+
+        async def rebuild() -> None:
+            try:
+                await self.rebuild_daily_summaries_for(discord_id)
+            except Exception as e:
+                logger.warning(f"[daily_summary] Reconstruction impossible pour discord_id={discord_id}: {e}")
+            finally:
+                self._summary_rebuilds.pop(discord_id, None)
+
+        self._summary_rebuilds[discord_id] = asyncio.create_task(rebuild())
+
+    async def _rebuild_daily_summaries(self, user_id: int, puuid: str | None) -> None:
+        try:
+            summaries = []
+            for season, act in await self._valo_db.get_account_partitions(user_id, puuid):
+                series = await self._valo_db.get_account_history_series(user_id, puuid, season, act)
+                summaries += summarize_mmr_days(series, season=season, act=act)
+            # Periode "all": tout l'historique du compte, les deltas enjambent les actes
+            series = await self._valo_db.get_account_history_series(user_id, puuid)
+            summaries += summarize_mmr_days(series, season=ALL_ACTS[0], act=ALL_ACTS[1])
+            await self._valo_db.rebuild_daily_summaries(user_id, puuid, summaries)
+        except Exception as e:
+            logger.exception(f"[daily_summary] Reconstruction echouee pour user_id={user_id}: {e}")
+
+    async def _refresh_daily_summary(
+        self,
+        user_id: int,
+        puuid: str | None,
+        season: int,
+        act: int,
+        day: date,
+    ) -> None:
+        """
+        Recalcule les jours >= day de l'acte et du compte (en pratique: la journee en
+        cours), en reprenant l'etat du dernier jour agrege avant `day`.
+        """
+        since = datetime.combine(day, time.min, tzinfo=timezone.utc)
+        scopes = {(season, act): (season, act), ALL_ACTS: (None, None)}
+        try:
+            previous_by_scope = await self._valo_db.get_daily_summaries_before(
+                user_id, puuid, list(scopes), day
+            )
+            summaries = []
+            for scope, partition in scopes.items():
+                series = await self._valo_db.get_account_history_series(
+                    user_id, puuid, *partition, since=since
+                )
+                previous = previous_by_scope.get(scope)
+                if mmr_days_need_rebuild(series, from_day=day, previous=previous):
+                    await self._rebuild_daily_summaries(user_id, puuid)
+                    return
+                summaries += summarize_mmr_days(
+                    series, season=scope[0], act=scope[1], from_day=day, previous=previous
+                )
+            await self._valo_db.replace_daily_summaries(user_id, puuid, list(scopes), day, summaries)
+        except Exception as e:
+            logger.exception(f"[daily_summary] Mise a jour echouee pour user_id={user_id}: {e}")
+            # Rollup potentiellement faux: les lectures repasseront par l'historique brut
+            try:
+                await self._valo_db.invalidate_daily_summaries(user_id, puuid)
+            except Exception:
+                logger.exception(f"[daily_summary] Invalidation impossible pour user_id={user_id}")
+
     # ==================== full history backfill ====================
 
     async def fetch_full_history(self, discord_id: int) -> MmrHistoryBackfillResult:
@@ -297,14 +499,15 @@ class MmrTrackerService:
             return MmrHistoryBackfillResult(status="empty")
 
         logger.info(f"[fetch_full_history] Insertion de {len(history_entries)} entrees")
-        inserted_count = 0
         imported_source = history_entries[0][1]
-        for entry, source in history_entries:
-            inserted = await self.insert_history_entry(
-                user_id, entry, puuid=puuid, source=source
-            )
-            if inserted:
-                inserted_count += 1
+        rows = [
+            row
+            for entry, source in history_entries
+            if (row := self._parse_history_entry(user_id, entry, puuid=puuid, source=source))
+            is not None
+        ]
+        inserted_count = await self._valo_db.bulk_insert_history(rows)
+        await self._rebuild_daily_summaries(user_id, puuid)
 
         await self._valo_db.mark_mmr_history_backfilled(user_id)
 
@@ -320,33 +523,73 @@ class MmrTrackerService:
         region: str,
         platform: str,
         puuid: str,
+    ) -> list[Any]:
+        try:
+            first_resp, _ = await self._henrik.get_stored_mmr_history_by_puuid(
+                region, platform, puuid, page=None, size=None,
+            )
+        except ApiError as exc:
+            if self._is_missing_stored_history(exc):
+                logger.info("[fetch_full_history] Historique stocke absent")
+                return []
+            raise
+        if first_resp.status != 200:
+            return []
+
+        entries: list[Any] = list(first_resp.data or [])
+        next_page, size = self._next_stored_history_page(first_resp)
+        if next_page is None:
+            return entries
+
+        last_page = self._last_stored_history_page(first_resp)
+        if last_page is None:
+            return entries + await self._fetch_stored_pages_sequentially(
+                region, platform, puuid, next_page, size,
+            )
+
+        # Total connu: les pages restantes sont recuperees en parallele (bornees).
+        semaphore = asyncio.Semaphore(STORED_HISTORY_PAGE_CONCURRENCY)
+
+        async def fetch_page(page: int) -> Any:
+            async with semaphore:
+                resp, _ = await self._henrik.get_stored_mmr_history_by_puuid(
+                    region, platform, puuid, page=page, size=size,
+                )
+            if resp.status != 200:
+                raise RuntimeError(f"stored mmr history page failed with status {resp.status}")
+            return resp
+
+        pages = await asyncio.gather(
+            *(fetch_page(page) for page in range(next_page, last_page + 1))
+        )
+        for resp in pages:
+            entries.extend(resp.data or [])
+        return entries
+
+    async def _fetch_stored_pages_sequentially(
+        self,
+        region: str,
+        platform: str,
+        puuid: str,
+        page: int,
+        size: int | None,
     ) -> list[Any]:
         entries: list[Any] = []
-        page: int | None = None
-        size: int | None = None
-        seen_pages: set[int | None] = set()
+        seen_pages: set[int] = set()
 
         while page not in seen_pages:
             seen_pages.add(page)
-            try:
-                stored_resp, _ = await self._henrik.get_stored_mmr_history_by_puuid(
-                    region,
-                    platform,
-                    puuid,
-                    page=page,
-                    size=size,
-                )
-            except ApiError as exc:
-                if not entries and page is None and self._is_missing_stored_history(exc):
-                    logger.info("[fetch_full_history] Historique stocke absent")
-                    return []
-                raise
+            stored_resp, _ = await self._henrik.get_stored_mmr_history_by_puuid(
+                region,
+                platform,
+                puuid,
+                page=page,
+                size=size,
+            )
             if stored_resp.status != 200:
-                if entries:
-                    raise RuntimeError(
-                        f"stored mmr history page failed with status {stored_resp.status}"
-                    )
-                break
+                raise RuntimeError(
+                    f"stored mmr history page failed with status {stored_resp.status}"
+                )
             entries.extend(stored_resp.data or [])
 
             next_page, next_size = self._next_stored_history_page(stored_resp)
@@ -359,6 +602,15 @@ class MmrTrackerService:
 
         return entries
 
+    @staticmethod
+    def _last_stored_history_page(stored_resp: Any) -> int | None:
+        results = getattr(stored_resp, "results", None)
+        total = getattr(results, "total", 0) or 0
+        returned = getattr(results, "returned", 0) or 0
+        if total <= 0 or returned <= 0:
+            return None
+        return math.ceil(total / returned)
+
     @staticmethod
     def _next_stored_history_page(stored_resp: Any) -> tuple[int | None, int | None]:
         results = getattr(stored_resp, "results", None)
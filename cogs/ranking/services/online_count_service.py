@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 import time
 from dataclasses import dataclass
-from typing import Iterable
+from typing import Awaitable, Callable, Iterable
 
 from cogs.ranking.services.rank_notifications_service import RANK_NAMES
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass(frozen=True, slots=True)
 class RankOnlineCountConfig:
@@ -39,14 +43,109 @@ class ChannelEditRateLimiter:
         self._timestamps_by_channel[channel_id] = timestamps
         return True
 
+    def retry_after(self, channel_id: int, *, now: float | None = None) -> float:
+        """Secondes avant qu'allow() accepte une edition de ce salon (0 si tout de suite)."""
+        current_time = time.time() if now is None else now
+        timestamps = [
+            timestamp
+            for timestamp in self._timestamps_by_channel.get(channel_id, [])
+            if timestamp > current_time - self._window_seconds
+        ]
+        if len(timestamps) < self._max_edits:
+            return 0.0
+        return timestamps[-self._max_edits] + self._window_seconds - current_time
+
     def clear(self) -> None:
         self._timestamps_by_channel.clear()
 
 
+class ChannelRenameScheduler:
+    """
+    Renommages de salons differes et fusionnes: seul le dernier nom demande pour
+    un salon est applique, apres debounce_seconds puis quand le budget
+    ChannelEditRateLimiter le permet (attente plutot qu'abandon).
+    """
+
+    def __init__(
+        self,
+        rename: Callable[[int, str], Awaitable[None]],
+        *,
+        rate_limiter: ChannelEditRateLimiter | None = None,
+        debounce_seconds: float = 5.0,
+    ) -> None:
+        self._rename = rename
+        self._rate_limiter = rate_limiter if rate_limiter is not None else ChannelEditRateLimiter()
+        self._debounce_seconds = debounce_seconds
+        self._pending: dict[int, str] = {}
+        self._tasks: dict[int, asyncio.Task] = {}
+        self._closed = False
+
+    def schedule(self, channel_id: int, name: str, *, current_name: str | None = None) -> None:
+        if name == current_name:
+            # Retour au nom actuel avant l'echeance: plus rien a faire
+            self._pending.pop(channel_id, None)
+            return
+        self._pending[channel_id] = name
+        if channel_id not in self._tasks:
+            self._tasks[channel_id] = asyncio.create_task(self._run(channel_id))
+
+    async def _run(self, channel_id: int) -> None:
+        try:
+            await asyncio.sleep(self._debounce_seconds)
+            while (delay := self._rate_limiter.retry_after(channel_id)) > 0:
+                await asyncio.sleep(delay)
+            name = self._pending.pop(channel_id, None)
+            if name is None:
+                return
+            self._rate_limiter.allow(channel_id)
+            await self._rename(channel_id, name)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Scheduled rename failed for channel %s.", channel_id)
+        finally:
+            self._tasks.pop(channel_id, None)
+            # Nom demande pendant le renommage: nouveau cycle
+            if channel_id in self._pending and not self._closed:
+                self._tasks[channel_id] = asyncio.create_task(self._run(channel_id))
+
+    def cancel(self, channel_ids: Iterable[int]) -> None:
+        for channel_id in channel_ids:
+            self._pending.pop(channel_id, None)
+            task = self._tasks.pop(channel_id, None)
+            if task is not None:
+                task.cancel()
+
+    def clear(self) -> None:
+        self._closed = True
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        self._pending.clear()
+        self._rate_limiter.clear()
+
+
 class RankOnlineCountService:
+    """
+    Config des salons compteurs et compteurs en ligne par guild/rang en memoire:
+    seed_guild() une fois depuis le cache, puis apply_member_change() a chaque
+    evenement de presence ou de roles (aucune requete DB par evenement).
+    Une ecriture de la config roles/salons previent watch_config() pour reseeder.
+    """
+
     def __init__(self, role_config_service, channel_config_service) -> None:
         self._roles = role_config_service
         self._channels = channel_config_service
+        self._configs: dict[int, RankOnlineCountConfig] = {}
+        self._counts: dict[int, dict[str, int]] = {}
+
+    def watch_config(self, listener: Callable[[int], None]) -> None:
+        self._roles.add_write_listener(listener)
+        self._channels.add_write_listener(listener)
+
+    def unwatch_config(self, listener: Callable[[int], None]) -> None:
+        self._roles.remove_write_listener(listener)
+        self._channels.remove_write_listener(listener)
 
     async def get_config(self, guild_id: int) -> RankOnlineCountConfig:
         roles = await self._roles.get_all(guild_id)
@@ -64,6 +163,52 @@ class RankOnlineCountService:
         role_id_set = set(role_ids)
         return frozenset(rank for rank, role_id in config.rank_roles.items() if role_id in role_id_set)
 
+    def seed_guild(
+        self,
+        guild_id: int,
+        config: RankOnlineCountConfig,
+        counts: dict[str, int],
+    ) -> None:
+        self._configs[guild_id] = config
+        self._counts[guild_id] = {rank: counts.get(rank, 0) for rank in config.rank_roles}
+
+    def cached_config(self, guild_id: int) -> RankOnlineCountConfig | None:
+        return self._configs.get(guild_id)
+
+    def online_count(self, guild_id: int, rank: str) -> int:
+        return self._counts.get(guild_id, {}).get(rank, 0)
+
+    def apply_member_change(
+        self,
+        guild_id: int,
+        *,
+        role_ids_before: Iterable[int],
+        role_ids_after: Iterable[int],
+        online_before: bool,
+        online_after: bool,
+    ) -> frozenset[str]:
+        """
+        Met a jour les compteurs pour un membre (presence et/ou roles changes).
+        Retourne les rangs configures dont le compteur a bouge.
+        """
+        config = self._configs.get(guild_id)
+        if config is None:
+            return frozenset()
+
+        before = self.rank_names_for_role_ids(role_ids_before, config) if online_before else frozenset()
+        after = self.rank_names_for_role_ids(role_ids_after, config) if online_after else frozenset()
+        counts = self._counts[guild_id]
+        for rank in before - after:
+            counts[rank] = max(counts.get(rank, 0) - 1, 0)
+        for rank in after - before:
+            counts[rank] = counts.get(rank, 0) + 1
+        return (before ^ after) & config.configured_ranks
+
+    def forget_guild(self, guild_id: int) -> RankOnlineCountConfig | None:
+        """Oublie la guild et retourne sa config (pour annuler les renommages en attente)."""
+        self._counts.pop(guild_id, None)
+        return self._configs.pop(guild_id, None)
+
     @staticmethod
     def channel_name(rank: str, online_count: int) -> str:
         return f"{rank}-{online_count}-en-ligne"
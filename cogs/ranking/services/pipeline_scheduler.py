@@ -0,0 +1,76 @@
+# cogs/ranking/services/pipeline_scheduler.py
+"""
+Ordonnancement concurrent du pipeline Valorant: file de priorite + N workers.
+Le debit est borne par l'AsyncTokenBucket partage du ValorantPipeline.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+from typing import Awaitable, Callable, Optional
+
+from cogs.ranking.services.valorant_pipeline import PipelineStep, UserPipelineState
+
+logger = logging.getLogger(__name__)
+
+
+PipelineHandler = Callable[[UserPipelineState], Awaitable[None]]
+
+
+class PipelineScheduler:
+    """
+    File de priorite consommee par N workers concurrents.
+
+    Priorites (la plus basse passe en premier):
+    - refresh des comptes deja resolus
+    - nouveaux liens (resolution compte / plateforme)
+    - utilisateurs sortant d'un backoff (error_count > 0)
+    """
+
+    PRIORITY_REFRESH = 0
+    PRIORITY_NEW_LINK = 1
+    PRIORITY_BACKOFF = 2
+
+    def __init__(self, *, workers: int = 4) -> None:
+        self._workers = max(1, workers)
+        self._heap: list[tuple[int, int, UserPipelineState]] = []
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @classmethod
+    def priority(cls, state: UserPipelineState) -> int:
+        if state.error_count > 0:
+            return cls.PRIORITY_BACKOFF
+        if state.current_step is not PipelineStep.RANK_RETRIEVAL:
+            return cls.PRIORITY_NEW_LINK
+        return cls.PRIORITY_REFRESH
+
+    def push(self, state: UserPipelineState) -> None:
+        heapq.heappush(self._heap, (self.priority(state), next(self._sequence), state))
+
+    def pop(self) -> Optional[UserPipelineState]:
+        if not self._heap:
+            return None
+        return heapq.heappop(self._heap)[2]
+
+    async def run(self, handler: PipelineHandler) -> None:
+        """Vide la file avec N workers; une erreur n'arrete pas les autres workers."""
+        worker_count = min(self._workers, len(self._heap))
+        await asyncio.gather(*(self._worker(handler) for _ in range(worker_count)))
+
+    async def _worker(self, handler: PipelineHandler) -> None:
+        while True:
+            state = self.pop()
+            if state is None:
+                return
+            try:
+                await handler(state)
+            except Exception:
+                logger.exception(
+                    f"[PipelineScheduler] Erreur non geree pour {state.discord_id}"
+                )
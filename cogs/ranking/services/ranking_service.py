@@ -7,9 +7,10 @@ Aucun acces DB direct - delegue aux DB services.
 import asyncio
 import logging
 from datetime import datetime
-from typing import Optional
+from typing import Iterable, Optional
 
-from database.services.valorant_db_service import ValorantDbService
+from database.services.presence_service import PresenceDbService, PresenceReconciliation
+from database.services.valorant_db_service import ValorantDbService, ValorantPipelineUpdate
 from database.services.persistent_messages_service import PersistentMessagesService
 from database.services.guild_roles_service import RoleConfigurationService
 from database.services.guild_channels_service import ChannelConfigurationService
@@ -50,11 +51,13 @@ class RankingService:
         channel_config_svc: ChannelConfigurationService,
         role_config_svc: RoleConfigurationService,
         persistent_msg_svc: PersistentMessagesService,
+        presence_db_svc: PresenceDbService,
     ):
         self._valo_db = valorant_db_svc
         self._channel_config = channel_config_svc
         self._role_config = role_config_svc
         self._persistent_msg = persistent_msg_svc
+        self._presence_db = presence_db_svc
 
         # Cache local des role mappings par guild
         self._role_cache: dict[int, dict[str, int]] = {}
@@ -145,6 +148,9 @@ class RankingService:
     async def update_pipeline_error(self, discord_id: int) -> bool:
         return await self._valo_db.update_pipeline_error(discord_id)
 
+    async def apply_pipeline_results(self, updates: list[ValorantPipelineUpdate]) -> int:
+        return await self._valo_db.apply_pipeline_results(updates)
+
     # ==================== activite ====================
 
     async def mark_inactive(self, discord_id: int) -> bool:
@@ -153,16 +159,18 @@ class RankingService:
     async def reactivate(self, discord_id: int) -> bool:
         return await self._valo_db.reactivate(discord_id)
 
-    async def get_all_discord_ids(self) -> list[int]:
-        return await self._valo_db.get_all_discord_ids()
-
-    async def sync_presence(
+    async def reconcile_presence(
         self,
-        active_discord_ids: set[int],
-        all_discord_ids: set[int],
-    ) -> tuple[int, int]:
-        """Reactive les presents, desactive les absents. Retourne (reactivated, deactivated)."""
-        return await self._valo_db.sync_presence(active_discord_ids, all_discord_ids)
+        guild_ids: Iterable[int],
+        members: Iterable[tuple[int, int]],
+        *,
+        complete: bool = True,
+    ) -> PresenceReconciliation:
+        """
+        Aligne toutes les tables de presence sur le cache membres (guild_id, discord_id).
+        complete=False: des guilds du bot n'ont pas ete scannees (cache incomplet).
+        """
+        return await self._presence_db.reconcile(guild_ids, members, complete=complete)
 
     # ==================== notification ====================
 
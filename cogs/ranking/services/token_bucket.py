@@ -0,0 +1,103 @@
+# cogs/ranking/services/token_bucket.py
+"""
+Budget de requetes HenrikDev partage entre les workers du pipeline,
+recale sur les headers RateLimit renvoyes par l'API.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Callable, Optional
+
+from integrations.henrikdev.models import RateLimit
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTokenBucket:
+    """
+    Token bucket asynchrone.
+
+    Le remplissage local (capacity / period_seconds) borne notre debit;
+    les headers RateLimit ne peuvent que le reduire (remaining) ou le
+    suspendre jusqu'au reset de la fenetre serveur.
+    """
+
+    def __init__(
+        self,
+        *,
+        capacity: int,
+        period_seconds: float = 60.0,
+        reserve: int = 5,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._capacity = float(capacity)
+        self._period_seconds = period_seconds
+        self._rate = capacity / period_seconds
+        self._reserve = reserve
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated_at = clock()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def tokens(self) -> float:
+        self._refill(self._clock())
+        return self._tokens
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated_at
+        if elapsed > 0:
+            self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
+            self._updated_at = now
+
+    def try_acquire(self, *, now: float | None = None) -> float:
+        """
+        Consomme un jeton si disponible et retourne 0.
+        Sinon retourne le nombre de secondes a attendre.
+        """
+        current = self._clock() if now is None else now
+        if current < self._blocked_until:
+            return self._blocked_until - current
+
+        self._refill(current)
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return 0.0
+        return (1.0 - self._tokens) / self._rate
+
+    async def acquire(self) -> None:
+        # Le lock garantit un ordre FIFO entre workers en attente.
+        async with self._lock:
+            while True:
+                wait = self.try_acquire()
+                if wait <= 0:
+                    return
+                await asyncio.sleep(wait)
+
+    def pause(self, seconds: float, *, now: float | None = None) -> None:
+        """Vide le bucket et bloque toute acquisition pendant `seconds`."""
+        current = self._clock() if now is None else now
+        self._blocked_until = max(self._blocked_until, current + seconds)
+        self._tokens = 0.0
+        self._updated_at = max(self._updated_at, self._blocked_until)
+
+    def observe(self, rate_limit: Optional[RateLimit], *, now: float | None = None) -> None:
+        """Recale le bucket sur la fenetre serveur annoncee par l'API."""
+        if rate_limit is None or rate_limit.remaining is None:
+            return
+
+        current = self._clock() if now is None else now
+        self._refill(current)
+        available = rate_limit.remaining - self._reserve
+        if available <= 0:
+            reset = rate_limit.reset_seconds or self._period_seconds
+            logger.info(
+                f"[TokenBucket] Rate limit bas (remaining={rate_limit.remaining}), pause {reset}s"
+            )
+            self.pause(reset, now=current)
+            return
+        self._tokens = min(self._tokens, float(available))
@@ -14,6 +14,7 @@ from datetime import datetime, timedelta, timezone
 from enum import Enum, auto
 from typing import Optional, Tuple
 
+from cogs.ranking.services.token_bucket import AsyncTokenBucket
 from integrations.henrikdev.service import HenrikDevService
 from integrations.henrikdev.models import RateLimit
 from integrations.exceptions import RateLimitError, ApiError, NetworkError
@@ -21,14 +22,6 @@ from integrations.exceptions import RateLimitError, ApiError, NetworkError
 logger = logging.getLogger(__name__)
 
 
-class LocalRateLimitReached(Exception):
-    """Levée quand la limite locale de requêtes/minute est atteinte."""
-
-    def __init__(self, reset_seconds: int = 60):
-        self.reset_seconds = reset_seconds
-        super().__init__(f"Local rate limit reached, reset in {reset_seconds}s")
-
-
 class PipelineStep(Enum):
     """État actuel d'un utilisateur dans le pipeline."""
     ACCOUNT_RESOLUTION = auto()   # puuid IS NULL
@@ -93,48 +86,29 @@ class ValorantPipeline:
     ERROR_THRESHOLD = 3
     BACKOFF_MINUTES = [5, 15, 60, 240]
 
-    # Limite de requêtes par minute pour ce service (laisser ~20 req/min pour autres services)
+    # Débit local max du bucket (laisser ~20 req/min pour autres services)
     MAX_REQUESTS_PER_MINUTE = 70
-    RATE_LIMIT_SAFETY_THRESHOLD = 5  # Pause si remaining < 5
+    RATE_LIMIT_SAFETY_THRESHOLD = 5  # Pause jusqu'au reset si remaining <= 5
 
-    def __init__(self, service: HenrikDevService):
+    # Pause appliquée au bucket quand l'API répond 429
+    RATE_LIMIT_PAUSE_SECONDS = 60
+
+    def __init__(self, service: HenrikDevService, bucket: Optional[AsyncTokenBucket] = None):
         self._service = service
-        self._requests_this_minute = 0
-        self._minute_start = datetime.now(timezone.utc)
+        self._bucket = bucket or AsyncTokenBucket(
+            capacity=self.MAX_REQUESTS_PER_MINUTE,
+            period_seconds=60.0,
+            reserve=self.RATE_LIMIT_SAFETY_THRESHOLD,
+        )
         self._last_rate_limit: Optional[RateLimit] = None
 
-    def _check_local_rate_limit(self) -> bool:
-        """Vérifie si on a dépassé notre limite locale de 70 req/min."""
-        now = datetime.now(timezone.utc)
-        if (now - self._minute_start).total_seconds() >= 60:
-            self._requests_this_minute = 0
-            self._minute_start = now
-        return self._requests_this_minute < self.MAX_REQUESTS_PER_MINUTE
-
-    def _increment_request_count(self):
-        """Incrémente le compteur de requêtes."""
-        self._requests_this_minute += 1
-
-    def should_pause_for_rate_limit(self, rate_limit: RateLimit) -> int:
-        """
-        Retourne le nombre de secondes à attendre si rate limit bas, sinon 0.
-
-        Args:
-            rate_limit: Objet RateLimit retourné par l'API
+    @property
+    def bucket(self) -> AsyncTokenBucket:
+        return self._bucket
 
-        Returns:
-            Nombre de secondes à attendre (0 si pas besoin)
-        """
+    def _observe_rate_limit(self, rate_limit: Optional[RateLimit]) -> None:
         self._last_rate_limit = rate_limit
-        if rate_limit.remaining < self.RATE_LIMIT_SAFETY_THRESHOLD:
-            return rate_limit.reset_seconds
-        return 0
-
-    def get_local_rate_limit_reset(self) -> int:
-        """Retourne le reset_seconds du dernier rate_limit connu, ou 60 par défaut."""
-        if self._last_rate_limit:
-            return self._last_rate_limit.reset_seconds
-        return 60
+        self._bucket.observe(rate_limit)
 
     def should_skip_due_to_errors(self, state: UserPipelineState) -> bool:
         """
@@ -176,13 +150,8 @@ class ValorantPipeline:
             Tuple (PipelineResult, RateLimit ou None)
 
         Raises:
-            LocalRateLimitReached: Si la limite locale est atteinte
-            RateLimitError: Si l'API retourne 429
+            RateLimitError: Si l'API retourne 429 (le bucket est mis en pause)
         """
-        # Vérifier la limite locale avant tout appel
-        if not self._check_local_rate_limit():
-            raise LocalRateLimitReached(self.get_local_rate_limit_reset())
-
         step = state.current_step
 
         try:
@@ -194,7 +163,8 @@ class ValorantPipeline:
                 return await self._get_rank(state)
 
         except RateLimitError:
-            # Re-raise pour que le cog puisse gérer
+            # Suspendre tous les workers, puis re-raise pour que le cog puisse gérer
+            self._bucket.pause(self.RATE_LIMIT_PAUSE_SECONDS)
             raise
 
         except ApiError as e:
@@ -224,11 +194,10 @@ class ValorantPipeline:
         """
         logger.info(f"[Pipeline] Step 1 - Account Resolution for {state.pseudo}#{state.tag}")
 
-        self._increment_request_count()
         account_resp, rate_limit = await self._service.get_account_by_name(
-            state.pseudo, state.tag
+            state.pseudo, state.tag, limiter=self._bucket
         )
-        self._last_rate_limit = rate_limit
+        self._observe_rate_limit(rate_limit)
 
         if account_resp.status != 200:
             logger.warning(
@@ -272,11 +241,10 @@ class ValorantPipeline:
 
         # Essayer PC d'abord (majorité des joueurs)
         try:
-            self._increment_request_count()
             matchlist_resp, rate_limit = await self._service.get_matchlist_by_puuid(
-                state.region, "pc", state.puuid, size=1
+                state.region, "pc", state.puuid, size=1, limiter=self._bucket
             )
-            self._last_rate_limit = rate_limit
+            self._observe_rate_limit(rate_limit)
 
             if matchlist_resp.status == 200 and len(matchlist_resp.data) > 0:
                 logger.info(f"[Pipeline] Platform detected: PC for {state.pseudo}#{state.tag}")
@@ -291,11 +259,10 @@ class ValorantPipeline:
 
         # Essayer Console
         try:
-            self._increment_request_count()
             matchlist_resp, rate_limit = await self._service.get_matchlist_by_puuid(
-                state.region, "console", state.puuid, size=1
+                state.region, "console", state.puuid, size=1, limiter=self._bucket
             )
-            self._last_rate_limit = rate_limit
+            self._observe_rate_limit(rate_limit)
 
             if matchlist_resp.status == 200 and len(matchlist_resp.data) > 0:
                 logger.info(f"[Pipeline] Platform detected: Console for {state.pseudo}#{state.tag}")
@@ -331,11 +298,10 @@ class ValorantPipeline:
         """
         logger.info(f"[Pipeline] Step 3/4 - Rank Retrieval for {state.pseudo}#{state.tag}")
 
-        self._increment_request_count()
         mmr_resp, rate_limit = await self._service.get_mmr_by_puuid(
-            state.region, state.platform, state.puuid
+            state.region, state.platform, state.puuid, limiter=self._bucket
         )
-        self._last_rate_limit = rate_limit
+        self._observe_rate_limit(rate_limit)
 
         if mmr_resp.status != 200:
             logger.warning(
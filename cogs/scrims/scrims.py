@@ -1,11 +1,11 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
 
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 
 from cogs.scrims.presenters import (
     build_scrim_creation_message,
@@ -15,26 +15,33 @@ from cogs.scrims.presenters import (
 )
 from cogs.scrims.services import ScrimService
 from cogs.scrims.views import CreateScrimView, ScrimView
+from core.deadline_scheduler import DeadlineScheduler
 from database.services.scrims_service import ScrimInfo
 
 logger = logging.getLogger(__name__)
 
 PARIS_TZ = ZoneInfo("Europe/Paris")
 SCRIM_END_GRACE_SECONDS = 60
+SCRIM_END_DEADLINE = "scrims.end"
+# Relecture des scrims actifs quand elle a echoue au demarrage
+ACTIVE_SCRIMS_DEADLINE = "scrims.active_reload"
+ACTIVE_SCRIMS_RETRY_SECONDS = 30
 
 
 class ScrimCog(commands.Cog):
-    def __init__(self, bot: commands.Bot, service: ScrimService) -> None:
+    def __init__(self, bot: commands.Bot, service: ScrimService, deadline_scheduler: DeadlineScheduler) -> None:
         self.bot = bot
         self._service = service
+        self._deadlines = deadline_scheduler
         self._views_reloaded = False
         self._ending_scrims: set[int] = set()
-        self.scrim_end_checker.start()
+        self._deadlines.register(SCRIM_END_DEADLINE, self._end_scrim)
+        self._deadlines.register(ACTIVE_SCRIMS_DEADLINE, self._schedule_active_scrims)
         logger.info("ScrimCog initialized.")
 
     def cog_unload(self) -> None:
-        if self.scrim_end_checker.is_running():
-            self.scrim_end_checker.cancel()
+        self._deadlines.unregister(SCRIM_END_DEADLINE)
+        self._deadlines.unregister(ACTIVE_SCRIMS_DEADLINE)
         self._ending_scrims.clear()
 
     @commands.Cog.listener()
@@ -43,6 +50,7 @@ class ScrimCog(commands.Cog):
             return
         self._views_reloaded = True
         await self._reload_persistent_views()
+        await self._schedule_active_scrims()
 
     @commands.command(name="init_scrim")
     @commands.has_permissions(administrator=True)
@@ -71,28 +79,44 @@ class ScrimCog(commands.Cog):
             return
         raise error
 
-    @tasks.loop(minutes=1)
-    async def scrim_end_checker(self) -> None:
+    def _schedule_end(self, scrim: ScrimInfo) -> None:
+        self._deadlines.schedule(
+            SCRIM_END_DEADLINE,
+            scrim.id,
+            scrim.scheduled_at + timedelta(seconds=SCRIM_END_GRACE_SECONDS),
+        )
+
+    async def _schedule_active_scrims(self, _key: None = None) -> None:
+        # Toutes guilds confondues, comme l'ancien balayage des scrims dus
         try:
-            due_scrims = await self._service.list_due_scrims(
-                now=datetime.now(PARIS_TZ) - timedelta(seconds=SCRIM_END_GRACE_SECONDS)
-            )
-            for scrim in due_scrims:
-                if scrim.id in self._ending_scrims:
-                    continue
-                self._ending_scrims.add(scrim.id)
-                try:
-                    await self._complete_scrim(scrim)
-                except Exception:
-                    logger.exception("Could not complete scrim %s.", scrim.id)
-                finally:
-                    self._ending_scrims.discard(scrim.id)
+            scrims = await self._service.list_active_scrims()
         except Exception:
-            logger.exception("Scrim end checker task failed.")
+            # Sans cette liste aucune fin de scrim ne serait planifiee: on insiste
+            logger.exception("Active scrims could not be loaded, retrying in %ss.", ACTIVE_SCRIMS_RETRY_SECONDS)
+            self._deadlines.schedule(
+                ACTIVE_SCRIMS_DEADLINE,
+                None,
+                datetime.now(timezone.utc) + timedelta(seconds=ACTIVE_SCRIMS_RETRY_SECONDS),
+            )
+            return
+        for scrim in scrims:
+            self._schedule_end(scrim)
+        logger.info("%s scrim end(s) scheduled.", len(scrims))
 
-    @scrim_end_checker.before_loop
-    async def before_scrim_end_checker(self) -> None:
-        await self.bot.wait_until_ready()
+    async def _end_scrim(self, scrim_id: int) -> None:
+        scrim = await self._service.get_scrim(scrim_id)
+        if scrim is None or scrim.status != "active" or scrim_id in self._ending_scrims:
+            return
+
+        if scrim.scheduled_at + timedelta(seconds=SCRIM_END_GRACE_SECONDS) > datetime.now(PARIS_TZ):
+            self._schedule_end(scrim)
+            return
+
+        self._ending_scrims.add(scrim_id)
+        try:
+            await self._complete_scrim(scrim)
+        finally:
+            self._ending_scrims.discard(scrim_id)
 
     async def handle_create_scrim_submit(self, interaction: discord.Interaction, modal) -> None:
         await interaction.response.defer(ephemeral=True)
@@ -121,6 +145,7 @@ class ScrimCog(commands.Cog):
             creator_discord_id=interaction.user.id,
             data=data,
         )
+        self._schedule_end(scrim)
 
         message = await interaction.channel.send(
             embed=build_scrim_embed(scrim),
@@ -234,6 +259,10 @@ async def setup(bot: commands.Bot) -> None:
     if service is None:
         logger.error("scrim_service is not initialized. ScrimCog will not be loaded.")
         return
+    deadline_scheduler = getattr(bot, "deadline_scheduler", None)
+    if deadline_scheduler is None:
+        logger.error("deadline_scheduler is not initialized. ScrimCog will not be loaded.")
+        return
 
-    await bot.add_cog(ScrimCog(bot, service))
+    await bot.add_cog(ScrimCog(bot, service, deadline_scheduler))
     logger.info("ScrimCog loaded.")
@@ -61,9 +61,6 @@ class ScrimService:
     async def list_active_scrims(self, guild_id: int | None = None) -> tuple[ScrimInfo, ...]:
         return await self._scrims.list_active_scrims(guild_id)
 
-    async def list_due_scrims(self, *, now: datetime) -> tuple[ScrimInfo, ...]:
-        return await self._scrims.list_due_scrims(now=now)
-
     async def join_team(
         self,
         *,
@@ -2,6 +2,7 @@ from cogs.shop.services.valorant_shop_service import (
     ShopBundle,
     ShopBundleItem,
     ShopBundleMetadata,
+    ShopDelivery,
     ValorantShopService,
 )
 
@@ -9,5 +10,6 @@ __all__ = [
     "ShopBundle",
     "ShopBundleItem",
     "ShopBundleMetadata",
+    "ShopDelivery",
     "ValorantShopService",
 ]
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Iterable
 
-from database.services.guild_channels_service import ChannelConfigurationService
 from database.services.valorant_shop_service import ValorantShopDbService
 from integrations.exceptions import IntegrationError
 from integrations.henrikdev.service import HenrikDevService
@@ -43,16 +43,21 @@ class ShopBundleMetadata:
     vertical_promo_image_url: str | None
 
 
+@dataclass(frozen=True, slots=True)
+class ShopDelivery:
+    guild_id: int
+    channel_id: int
+    bundles: tuple[ShopBundle, ...]
+
+
 class ValorantShopService:
     def __init__(
         self,
         shop_db_service: ValorantShopDbService,
-        channel_config_service: ChannelConfigurationService,
         henrik_service: HenrikDevService,
         valorant_api_service: ValorantApiService,
     ) -> None:
         self._shop_db = shop_db_service
-        self._channels = channel_config_service
         self._henrik = henrik_service
         self._valorant_api = valorant_api_service
 
@@ -60,9 +65,6 @@ class ValorantShopService:
     def is_enabled(self) -> bool:
         return bool(getattr(self._henrik, "is_configured", True))
 
-    async def get_notify_channel_id(self, guild_id: int) -> int | None:
-        return await self._channels.get_one(guild_id, SHOP_CHANNEL_KEY)
-
     async def fetch_featured_bundles(self) -> tuple[ShopBundle, ...]:
         response, _ = await self._henrik.get_featured_store()
         return tuple(_bundle_from_model(bundle) for bundle in response.data)
@@ -81,33 +83,31 @@ class ValorantShopService:
             vertical_promo_image_url=response.data.verticalPromoImage,
         )
 
-    async def is_bundle_sent(self, *, guild_id: int, bundle_uuid: str) -> bool:
-        return await self._shop_db.is_bundle_sent(guild_id=guild_id, bundle_uuid=bundle_uuid)
-
-    async def mark_bundle_sent(
+    async def plan_deliveries(
         self,
         *,
-        guild_id: int,
-        guild_name: str | None,
-        bundle_uuid: str,
-    ) -> bool:
-        return await self._shop_db.mark_bundle_sent(
-            guild_id=guild_id,
-            guild_name=guild_name,
-            bundle_uuid=bundle_uuid,
-        )
-
-    async def filter_new_bundles(
-        self,
-        *,
-        guild_id: int,
+        guild_ids: Iterable[int],
         bundles: tuple[ShopBundle, ...],
-    ) -> tuple[ShopBundle, ...]:
-        new_bundles: list[ShopBundle] = []
-        for bundle in bundles:
-            if not await self.is_bundle_sent(guild_id=guild_id, bundle_uuid=bundle.bundle_uuid):
-                new_bundles.append(bundle)
-        return tuple(new_bundles)
+    ) -> tuple[ShopDelivery, ...]:
+        """Bundles pas encore envoyes, par guild ayant un salon de notification."""
+        targets = await self._shop_db.list_notify_targets(
+            guild_ids=guild_ids,
+            channel_key=SHOP_CHANNEL_KEY,
+            bundle_uuids=[bundle.bundle_uuid for bundle in bundles],
+        )
+        deliveries = []
+        for target in targets:
+            new_bundles = tuple(
+                bundle for bundle in bundles if bundle.bundle_uuid not in target.sent_bundle_uuids
+            )
+            if new_bundles:
+                deliveries.append(
+                    ShopDelivery(guild_id=target.guild_id, channel_id=target.channel_id, bundles=new_bundles)
+                )
+        return tuple(deliveries)
+
+    async def mark_bundles_sent(self, sent: Iterable[tuple[int, str]]) -> int:
+        return await self._shop_db.mark_bundles_sent(sent)
 
 
 def _bundle_from_model(bundle) -> ShopBundle:
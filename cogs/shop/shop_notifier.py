@@ -11,19 +11,27 @@ from cogs.shop.presenters import (
     build_item_embed,
     thread_name_for_bundle,
 )
-from cogs.shop.services import ShopBundle, ShopBundleMetadata, ValorantShopService
+from cogs.shop.services import ShopBundle, ShopBundleMetadata, ShopDelivery, ValorantShopService
 from integrations.exceptions import IntegrationError, RateLimitError
 
 logger = logging.getLogger(__name__)
 
 SHOP_CHECK_INTERVAL_MINUTES = 5
 SHOP_FETCH_RETRY_DELAYS_SECONDS = (15.0, 45.0)
+# Un enregistrement perdu renverrait le bundle au prochain cycle
+SHOP_MARK_RETRY_DELAYS_SECONDS = (5.0, 30.0)
+# Envois Discord en vol, toutes guilds confondues. discord.py attend deja les
+# buckets de rate limit par route; la borne evite d'en ouvrir trop a la fois.
+SHOP_SEND_CONCURRENCY = 4
+# Limite Discord d'embeds par message
+ITEM_EMBEDS_PER_MESSAGE = 10
 
 
 class ValorantShopNotifier(commands.Cog):
     def __init__(self, bot: commands.Bot, service: ValorantShopService) -> None:
         self.bot = bot
         self._service = service
+        self._send_slots = asyncio.Semaphore(SHOP_SEND_CONCURRENCY)
 
         if not service.is_enabled:
             logger.warning("HENRIK_VALO_KEY missing; Valorant shop loop disabled.")
@@ -52,12 +60,30 @@ class ValorantShopNotifier(commands.Cog):
         if not bundles:
             return
 
-        metadata_cache: dict[str, ShopBundleMetadata | None] = {}
-        for guild in self.bot.guilds:
-            try:
-                await self._notify_guild(guild, bundles, metadata_cache)
-            except Exception:
-                logger.exception("Valorant shop notification failed for guild %s.", guild.id)
+        try:
+            deliveries = await self._service.plan_deliveries(
+                guild_ids=[guild.id for guild in self.bot.guilds],
+                bundles=bundles,
+            )
+        except Exception:
+            logger.exception("Valorant shop check failed while loading notification targets.")
+            return
+        if not deliveries:
+            return
+
+        # Le diff et les metadonnees sont calcules une fois pour toutes les guilds
+        uuids = list({bundle.bundle_uuid: None for delivery in deliveries for bundle in delivery.bundles})
+        metadata = dict(zip(uuids, await asyncio.gather(*(self._get_metadata(uuid) for uuid in uuids))))
+
+        # Les guilds sont livrees en parallele, les bundles envoyes enregistres en un seul lot
+        delivered = await asyncio.gather(*(self._deliver(delivery, metadata) for delivery in deliveries))
+        sent = [
+            (delivery.guild_id, bundle_uuid)
+            for delivery, bundle_uuids in zip(deliveries, delivered)
+            for bundle_uuid in bundle_uuids
+        ]
+        if sent:
+            await self._mark_sent_with_retry(sent)
 
     async def _fetch_featured_bundles_with_retry(
         self,
@@ -82,43 +108,68 @@ class ValorantShopNotifier(commands.Cog):
 
         raise RuntimeError("unreachable Valorant shop retry state")
 
+    async def _mark_sent_with_retry(
+        self,
+        sent: list[tuple[int, str]],
+        *,
+        retry_delays: tuple[float, ...] = SHOP_MARK_RETRY_DELAYS_SECONDS,
+    ) -> bool:
+        for attempt, delay in enumerate((*retry_delays, None), start=1):
+            try:
+                await self._service.mark_bundles_sent(sent)
+                return True
+            except Exception:
+                if delay is None:
+                    logger.exception(
+                        "Could not record %s sent Valorant shop bundles; they will be sent again.",
+                        len(sent),
+                    )
+                    return False
+                logger.warning(
+                    "Recording sent Valorant shop bundles failed on attempt %s/%s; retrying in %.0fs.",
+                    attempt,
+                    len(retry_delays) + 1,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+
+        raise RuntimeError("unreachable Valorant shop retry state")
+
     @check_shop_task.before_loop
     async def before_check_shop_task(self) -> None:
         await self.bot.wait_until_ready()
 
-    async def _notify_guild(
+    async def _deliver(
         self,
-        guild: discord.Guild,
-        bundles: tuple[ShopBundle, ...],
-        metadata_cache: dict[str, ShopBundleMetadata | None],
-    ) -> None:
-        channel_id = await self._service.get_notify_channel_id(guild.id)
-        if channel_id is None:
-            return
-
-        channel = self.bot.get_channel(channel_id)
+        delivery: ShopDelivery,
+        metadata: dict[str, ShopBundleMetadata | None],
+    ) -> list[str]:
+        """Bundles envoyes dans la guild; on s'arrete au premier echec d'envoi du message principal."""
+        channel = self.bot.get_channel(delivery.channel_id)
         if channel is None or not hasattr(channel, "send"):
-            logger.warning("Configured Valorant shop channel %s not found for guild %s.", channel_id, guild.id)
-            return
-
-        new_bundles = await self._service.filter_new_bundles(guild_id=guild.id, bundles=bundles)
-        for bundle in new_bundles:
-            metadata = await self._get_metadata(bundle.bundle_uuid, metadata_cache)
-            await self._send_bundle_notification(channel, bundle, metadata)
-            await self._service.mark_bundle_sent(
-                guild_id=guild.id,
-                guild_name=guild.name,
-                bundle_uuid=bundle.bundle_uuid,
+            logger.warning(
+                "Configured Valorant shop channel %s not found for guild %s.",
+                delivery.channel_id,
+                delivery.guild_id,
             )
+            return []
 
-    async def _get_metadata(
-        self,
-        bundle_uuid: str,
-        metadata_cache: dict[str, ShopBundleMetadata | None],
-    ) -> ShopBundleMetadata | None:
-        if bundle_uuid not in metadata_cache:
-            metadata_cache[bundle_uuid] = await self._service.get_bundle_metadata(bundle_uuid)
-        return metadata_cache[bundle_uuid]
+        sent: list[str] = []
+        for bundle in delivery.bundles:
+            try:
+                await self._send_bundle_notification(channel, bundle, metadata.get(bundle.bundle_uuid))
+            except Exception:
+                logger.exception("Valorant shop notification failed for guild %s.", delivery.guild_id)
+                break
+            sent.append(bundle.bundle_uuid)
+        return sent
+
+    async def _get_metadata(self, bundle_uuid: str) -> ShopBundleMetadata | None:
+        try:
+            return await self._service.get_bundle_metadata(bundle_uuid)
+        except Exception:
+            logger.exception("Could not fetch Valorant bundle metadata for %s.", bundle_uuid)
+            return None
 
     async def _send_bundle_notification(
         self,
@@ -126,24 +177,28 @@ class ValorantShopNotifier(commands.Cog):
         bundle: ShopBundle,
         metadata: ShopBundleMetadata | None,
     ) -> None:
-        message = await channel.send(embed=build_bundle_embed(bundle, metadata))
+        async with self._send_slots:
+            message = await channel.send(embed=build_bundle_embed(bundle, metadata))
         if not bundle.items:
             return
 
         try:
-            thread = await message.create_thread(
-                name=thread_name_for_bundle(metadata, bundle),
-                auto_archive_duration=1440,
-            )
+            async with self._send_slots:
+                thread = await message.create_thread(
+                    name=thread_name_for_bundle(metadata, bundle),
+                    auto_archive_duration=1440,
+                )
         except (discord.Forbidden, discord.HTTPException):
             logger.exception("Could not create Valorant shop details thread for bundle %s.", bundle.bundle_uuid)
             return
 
-        for item in bundle.items:
+        embeds = [build_item_embed(item, whole_sale_only=bundle.whole_sale_only) for item in bundle.items]
+        for start in range(0, len(embeds), ITEM_EMBEDS_PER_MESSAGE):
             try:
-                await thread.send(embed=build_item_embed(item, whole_sale_only=bundle.whole_sale_only))
+                async with self._send_slots:
+                    await thread.send(embeds=embeds[start:start + ITEM_EMBEDS_PER_MESSAGE])
             except (discord.Forbidden, discord.HTTPException):
-                logger.exception("Could not send Valorant shop item %s.", item.uuid)
+                logger.exception("Could not send Valorant shop items for bundle %s.", bundle.bundle_uuid)
 
 
 async def setup(bot: commands.Bot) -> None:
@@ -1,13 +1,18 @@
+from cogs.twitch.services.stream_poller import LiveAnnouncement, TwitchStreamPoller
 from cogs.twitch.services.twitch_notification_service import (
     STREAMER_CHANNEL_KEY,
     StreamerMutationResult,
+    StreamSubscription,
     TwitchNotificationService,
     normalize_streamer_login,
 )
 
 __all__ = [
+    "LiveAnnouncement",
     "STREAMER_CHANNEL_KEY",
+    "StreamSubscription",
     "StreamerMutationResult",
     "TwitchNotificationService",
+    "TwitchStreamPoller",
     "normalize_streamer_login",
 ]
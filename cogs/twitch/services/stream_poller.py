@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Generic, Iterable, Iterator, TypeVar
+
+from cogs.twitch.services.twitch_notification_service import TwitchNotificationService
+from integrations.twitch.models import TwitchStream, TwitchUser
+from integrations.twitch.service import TwitchService as TwitchApiService
+
+logger = logging.getLogger(__name__)
+
+# Helix accepte au plus 100 login/id par requete
+HELIX_PAGE_SIZE = 100
+USER_TTL_SECONDS = 6 * 3600
+FOLLOWERS_TTL_SECONDS = 3600
+GAME_TTL_SECONDS = 24 * 3600
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True, slots=True)
+class LiveAnnouncement:
+    guild_id: int
+    channel_id: int
+    login: str
+    stream: TwitchStream
+    user: TwitchUser | None
+    follower_count: int
+    box_art_url: str | None
+
+
+class _TtlCache(Generic[T]):
+    def __init__(self, ttl_seconds: float, clock: Callable[[], float]) -> None:
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._entries: dict[str, tuple[float, T]] = {}
+
+    def get(self, key: str) -> T | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= self._clock():
+            return None
+        return entry[1]
+
+    def missing(self, keys: Iterable[str]) -> list[str]:
+        now = self._clock()
+        return [key for key in keys if self._entries.get(key, (0.0, None))[0] <= now]
+
+    def put(self, key: str, value: T) -> None:
+        self._entries[key] = (self._clock() + self._ttl, value)
+
+
+def _pages(values: list[str]) -> Iterator[list[str]]:
+    for start in range(0, len(values), HELIX_PAGE_SIZE):
+        yield values[start:start + HELIX_PAGE_SIZE]
+
+
+class TwitchStreamPoller:
+    """
+    Un seul poll pour toutes les guilds: les logins sont dedupliques puis pagines
+    par 100. Les profils, followers et jaquettes ne sont demandes que pour les
+    lives a annoncer, et mis en cache (TTL longs).
+
+    L'etat annonce est (guild_id, login) -> stream_id, persiste en base: un live
+    deja annonce n'est pas re-annonce apres un redemarrage, un nouveau live
+    (nouvel id) l'est. Un streamer hors ligne oublie ses annonces.
+    """
+
+    def __init__(
+        self,
+        api: TwitchApiService,
+        notifications: TwitchNotificationService,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._api = api
+        self._notifications = notifications
+        self._users: _TtlCache[TwitchUser | None] = _TtlCache(USER_TTL_SECONDS, clock)
+        self._followers: _TtlCache[int] = _TtlCache(FOLLOWERS_TTL_SECONDS, clock)
+        self._box_art: _TtlCache[str | None] = _TtlCache(GAME_TTL_SECONDS, clock)
+        self._announced: dict[tuple[int, str], str] | None = None
+
+    async def poll(self, guild_ids: Iterable[int]) -> list[LiveAnnouncement]:
+        if self._announced is None:
+            self._announced = await self._notifications.load_live_announcements()
+
+        subscriptions = await self._notifications.list_subscriptions(guild_ids)
+        logins = sorted({login for subscription in subscriptions for login in subscription.streamer_logins})
+        if not logins:
+            return []
+
+        live: dict[str, TwitchStream] = {}
+        for page in _pages(logins):
+            response = await self._api.get_streams_by_logins(page)
+            live.update({stream.user_login.lower(): stream for stream in response.data})
+
+        await self._forget_offline(set(logins) - set(live))
+
+        pending = [
+            (subscription, login, live[login])
+            for subscription in subscriptions
+            for login in subscription.streamer_logins
+            if login in live and self._announced.get((subscription.guild_id, login)) != live[login].id
+        ]
+        if not pending:
+            return []
+
+        went_live = sorted({login for _, login, _ in pending})
+        await self._load_users(went_live)
+        await self._load_followers(went_live)
+        await self._load_box_art({stream.game_id for _, _, stream in pending if stream.game_id})
+
+        return [
+            LiveAnnouncement(
+                guild_id=subscription.guild_id,
+                channel_id=subscription.channel_id,
+                login=login,
+                stream=stream,
+                user=self._users.get(login),
+                follower_count=self._followers.get(login) or 0,
+                box_art_url=self._box_art.get(stream.game_id or ""),
+            )
+            for subscription, login, stream in pending
+        ]
+
+    async def mark_announced(self, announcement: LiveAnnouncement) -> None:
+        self._announced[(announcement.guild_id, announcement.login)] = announcement.stream.id
+        await self._notifications.record_live_announcement(
+            guild_id=announcement.guild_id,
+            streamer_login=announcement.login,
+            stream_id=announcement.stream.id,
+        )
+
+    async def _forget_offline(self, offline: set[str]) -> None:
+        stale = [key for key in self._announced if key[1] in offline]
+        if not stale:
+            return
+        for key in stale:
+            del self._announced[key]
+        await self._notifications.clear_live_announcements(sorted({login for _, login in stale}))
+
+    async def _load_users(self, logins: list[str]) -> None:
+        missing = self._users.missing(logins)
+        for page in _pages(missing):
+            response = await self._api.get_users_by_logins(page)
+            found = {user.login.lower(): user for user in response.data}
+            for login in page:
+                self._users.put(login, found.get(login))
+
+    async def _load_followers(self, logins: list[str]) -> None:
+        for login in self._followers.missing(logins):
+            user = self._users.get(login)
+            if user is None:
+                continue
+            try:
+                self._followers.put(login, await self._api.get_followers_total(user.id))
+            except Exception:
+                logger.exception("Could not fetch follower count for %s.", login)
+
+    async def _load_box_art(self, game_ids: set[str]) -> None:
+        missing = self._box_art.missing(sorted(game_ids))
+        for page in _pages(missing):
+            response = await self._api.get_games_by_ids(page)
+            found = {
+                game.id: game.box_art_url.replace("{width}", "128").replace("{height}", "170")
+                for game in response.data
+                if game.box_art_url
+            }
+            for game_id in page:
+                self._box_art.put(game_id, found.get(game_id))
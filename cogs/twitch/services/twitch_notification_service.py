@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass
-from typing import Literal
+from typing import Iterable, Literal
 
 from database.services.guild_channels_service import ChannelConfigurationService
 from database.services.twitch_streamers_service import TwitchStreamersDbService
@@ -23,6 +23,13 @@ class StreamerMutationResult:
         return self.status in {"created", "removed"}
 
 
+@dataclass(frozen=True, slots=True)
+class StreamSubscription:
+    guild_id: int
+    channel_id: int
+    streamer_logins: tuple[str, ...]
+
+
 class TwitchNotificationService:
     def __init__(
         self,
@@ -70,6 +77,36 @@ class TwitchNotificationService:
     async def get_notify_channel_id(self, guild_id: int) -> int | None:
         return await self._channels.get_one(guild_id, STREAMER_CHANNEL_KEY)
 
+    async def list_subscriptions(self, guild_ids: Iterable[int]) -> list[StreamSubscription]:
+        """Guilds avec des streamers et un salon de notification configure."""
+        streamers = await self._streamers.list_all_streamers()
+        subscriptions = []
+        for guild_id in guild_ids:
+            logins = streamers.get(guild_id)
+            if not logins:
+                continue
+            channel_id = await self.get_notify_channel_id(guild_id)
+            if channel_id is None:
+                continue
+            subscriptions.append(
+                StreamSubscription(guild_id=guild_id, channel_id=channel_id, streamer_logins=tuple(logins))
+            )
+        return subscriptions
+
+    async def load_live_announcements(self) -> dict[tuple[int, str], str]:
+        """(guild_id, login) -> stream_id du live deja annonce."""
+        return await self._streamers.list_live_announcements()
+
+    async def record_live_announcement(self, *, guild_id: int, streamer_login: str, stream_id: str) -> None:
+        await self._streamers.record_live_announcement(
+            guild_id=guild_id,
+            streamer_login=streamer_login,
+            stream_id=stream_id,
+        )
+
+    async def clear_live_announcements(self, streamer_logins: list[str]) -> None:
+        await self._streamers.clear_live_announcements(streamer_logins)
+
 
 def normalize_streamer_login(value: str) -> str | None:
     login = value.strip().removeprefix("@").lower()
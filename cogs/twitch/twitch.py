@@ -13,7 +13,7 @@ from cogs.twitch.presenters import (
     build_twitch_live_embed,
     format_streamer_list,
 )
-from cogs.twitch.services import TwitchNotificationService
+from cogs.twitch.services import LiveAnnouncement, TwitchNotificationService, TwitchStreamPoller
 from integrations.twitch.service import TwitchService as TwitchApiService
 
 logger = logging.getLogger(__name__)
@@ -35,7 +35,11 @@ class TwitchNotifier(commands.Cog):
         self.bot = bot
         self._service = twitch_notification_service
         self._twitch = twitch_api_service
-        self._live_state: dict[tuple[int, str], bool] = {}
+        self._poller = (
+            TwitchStreamPoller(twitch_api_service, twitch_notification_service)
+            if twitch_api_service is not None
+            else None
+        )
 
         if self._twitch is None:
             logger.warning("Twitch API credentials missing; notification loop disabled.")
@@ -96,77 +100,46 @@ class TwitchNotifier(commands.Cog):
 
     @tasks.loop(minutes=1)
     async def check_streams_task(self) -> None:
-        if self._twitch is None:
+        if self._poller is None:
             return
 
-        for guild in self.bot.guilds:
+        try:
+            announcements = await self._poller.poll([guild.id for guild in self.bot.guilds])
+        except Exception:
+            logger.exception("Twitch stream poll failed.")
+            return
+
+        for announcement in announcements:
             try:
-                await self._check_guild_streams(guild)
+                await self._announce(announcement)
             except Exception:
-                logger.exception("Twitch stream check failed for guild %s.", guild.id)
+                logger.exception(
+                    "Twitch live notification failed for %s in guild %s.",
+                    announcement.login,
+                    announcement.guild_id,
+                )
 
     @check_streams_task.before_loop
     async def before_check_streams(self) -> None:
         await self.bot.wait_until_ready()
 
-    async def _check_guild_streams(self, guild: discord.Guild) -> None:
-        channel_id = await self._service.get_notify_channel_id(guild.id)
-        if channel_id is None:
-            return
-
-        streamers = await self._service.list_streamers(guild.id)
-        if not streamers:
-            return
-
-        streams_resp = await self._twitch.get_streams_by_logins(streamers)
-        live_now = {stream.user_login.lower(): stream for stream in streams_resp.data}
-
-        users_resp = await self._twitch.get_users_by_logins(streamers)
-        users = {user.login.lower(): user for user in users_resp.data}
-
-        follower_counts: dict[str, int] = {}
-        for login, user in users.items():
-            try:
-                follower_counts[login] = await self._twitch.get_followers_total(user.id)
-            except Exception:
-                logger.exception("Could not fetch follower count for %s.", login)
-                follower_counts[login] = 0
-
-        game_ids = list({stream.game_id for stream in live_now.values() if stream.game_id})
-        game_images: dict[str, str] = {}
-        if game_ids:
-            games_resp = await self._twitch.get_games_by_ids(game_ids)
-            game_images = {
-                game.id: game.box_art_url.replace("{width}", "128").replace("{height}", "170")
-                for game in games_resp.data
-                if game.box_art_url
-            }
-
-        channel = self.bot.get_channel(channel_id)
+    async def _announce(self, announcement: LiveAnnouncement) -> None:
+        channel = self.bot.get_channel(announcement.channel_id)
         if not channel or not hasattr(channel, "send"):
-            logger.warning("Configured Twitch channel %s not found for guild %s.", channel_id, guild.id)
+            logger.warning(
+                "Configured Twitch channel %s not found for guild %s.",
+                announcement.channel_id,
+                announcement.guild_id,
+            )
             return
 
-        for streamer_login in streamers:
-            login = streamer_login.lower()
-            key = (guild.id, login)
-            was_live = self._live_state.get(key, False)
-            is_live = login in live_now
+        await self._send_live_notification(channel, announcement)
+        await self._poller.mark_announced(announcement)
 
-            if is_live and not was_live:
-                await self._send_live_notification(channel, login, live_now[login], users.get(login), follower_counts, game_images)
-
-            self._live_state[key] = is_live
-
-    async def _send_live_notification(
-        self,
-        channel,
-        login: str,
-        stream,
-        user,
-        follower_counts: dict[str, int],
-        game_images: dict[str, str],
-    ) -> None:
+    async def _send_live_notification(self, channel, announcement: LiveAnnouncement) -> None:
+        stream = announcement.stream
+        user = announcement.user
+        login = announcement.login
         thumbnail_url = None
         if stream.thumbnail_url:
             thumbnail_url = stream.thumbnail_url.replace("{width}", "640").replace("{height}", "360")
@@ -177,11 +150,11 @@ class TwitchNotifier(commands.Cog):
             title=stream.title or "Live Twitch",
             game_name=stream.game_name or "Inconnu",
             viewer_count=stream.viewer_count or 0,
-            follower_count=follower_counts.get(login, 0),
+            follower_count=announcement.follower_count,
             stream_url=stream_url,
             thumbnail_url=thumbnail_url,
             profile_image_url=user.profile_image_url if user else None,
-            box_art_url=game_images.get(stream.game_id or ""),
+            box_art_url=announcement.box_art_url,
             timestamp=datetime.now(timezone.utc),
         )
         view = discord.ui.View()
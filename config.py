@@ -85,6 +85,8 @@ class RuntimeSettings:
     henrik_valo_key: str
     twitch_client_id: str
     twitch_client_secret: str
+    http_cache_dir: str = ""
+    chart_cache_dir: str = ""
 
     def missing_required_env_names(self) -> tuple[str, ...]:
         token_env = "DISCORD_TOKEN_TEST" if self.test_mode else "DISCORD_TOKEN"
@@ -141,6 +143,8 @@ def load_runtime_settings(env: Mapping[str, str] | None = None) -> RuntimeSettin
         henrik_valo_key=values.get("HENRIK_VALO_KEY", ""),
         twitch_client_id=values.get("TWITCH_CLIENT_ID", ""),
         twitch_client_secret=values.get("TWITCH_CLIENT_SECRET", ""),
+        http_cache_dir=values.get("HTTP_CACHE_DIR", ""),
+        chart_cache_dir=values.get("CHART_CACHE_DIR", ""),
     )
 
 
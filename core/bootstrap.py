@@ -26,7 +26,11 @@ from cogs.voice_chat.services import TempVoiceService
 from cogs.ranking.services.mmr_tracker_service import MmrTrackerService
 from cogs.ranking.services.rank_notifications_service import RankNotificationService
 from cogs.ranking.services.ranking_service import RankingService
+from core.chart_cache import ChartCache
+from core.chart_renderer import ChartRenderer
+from core.deadline_scheduler import DeadlineScheduler
 from database.engine import Db
+from database.identity_map import UserIdentityMap
 from database.services.automod_config_service import AutomodConfigService
 from database.services.economy_service import EconomyDbService
 from database.services.file_counters_service import FileCountersService
@@ -38,22 +42,40 @@ from database.services.member_stats_service import MemberStatsService
 from database.services.message_deletions_service import MessageDeletionsService
 from database.services.moderation_service import ModerationDbService
 from database.services.persistent_messages_service import PersistentMessagesService
+from database.services.presence_service import PresenceDbService
 from database.services.reputation_service import ReputationDbService
 from database.services.scrims_service import ScrimsDbService
 from database.services.twitch_streamers_service import TwitchStreamersDbService
 from database.services.tournaments_service import TournamentsDbService
 from database.services.unban_requests_service import UnbanRequestsService
+from database.services.users_service import UsersDbService
 from database.services.valorant_db_service import ValorantDbService
 from database.services.valorant_shop_service import ValorantShopDbService
 from integrations.henrikdev.service import HenrikDevService
 from integrations.http_client import HTTPClient
+from integrations.response_cache import DiskCacheStore, MemoryCacheStore, ResponseCache
 from integrations.twitch.service import TwitchService as TwitchApiService
 from integrations.valorant_api.service import ValorantApiService
 
 
+# Les ecritures du bot invalident deja le cache ; le TTL ne sert qu'a
+# rattraper les modifications faites directement en base.
+GUILD_CONFIG_CACHE_TTL_SECONDS = 900.0
+HTTP_CACHE_MAX_ENTRIES = 4096
+CHART_RENDER_WORKERS = 2
+CHART_RENDER_MAX_PENDING = 8
+CHART_RENDER_TIMEOUT_SECONDS = 20.0
+CHART_CACHE_MAX_BYTES = 32 * 1024 * 1024
+DEADLINE_WORKERS = 4
+
+
 @dataclass(slots=True)
 class ServiceContainer:
     http_client: HTTPClient
+    response_cache: ResponseCache
+    chart_renderer: ChartRenderer
+    deadline_scheduler: DeadlineScheduler
+    users_db_service: UsersDbService
     channel_configuration_service: ChannelConfigurationWorkflowService
     role_configuration_service: RoleConfigurationWorkflowService
     accueil_service: AccueilService
@@ -86,32 +108,60 @@ async def build_service_container(
     *,
     twitch_client_id: str = "",
     twitch_client_secret: str = "",
+    http_cache_dir: str = "",
+    chart_cache_dir: str = "",
 ) -> ServiceContainer:
+    # Identity map discord_id <-> user_id partagee par tous les services DB
+    identity = UserIdentityMap()
+    users_db_service = UsersDbService(db, identity)
+    users_db_service.start_seen_flusher()
+
     member_stats_db_service = MemberStatsService(db)
     persistent_messages_db_service = PersistentMessagesService(db)
-    channel_config_db_service = ChannelConfigurationDbService(db)
-    role_config_db_service = RoleConfigurationDbService(db)
+    channel_config_db_service = ChannelConfigurationDbService(
+        db, cache_ttl_seconds=GUILD_CONFIG_CACHE_TTL_SECONDS
+    )
+    role_config_db_service = RoleConfigurationDbService(
+        db, cache_ttl_seconds=GUILD_CONFIG_CACHE_TTL_SECONDS
+    )
     guild_members_db_service = GuildMembersService(db)
-    message_deletions_db_service = MessageDeletionsService(db)
-    economy_db_service = EconomyDbService(db)
-    five_stack_db_service = FiveStackDbService(db)
+    presence_db_service = PresenceDbService(db)
+    message_deletions_db_service = MessageDeletionsService(db, identity)
+    economy_db_service = EconomyDbService(db, identity)
+    five_stack_db_service = FiveStackDbService(db, identity)
     file_counters_db_service = FileCountersService(db)
     automod_config_db_service = AutomodConfigService(db)
-    moderation_db_service = ModerationDbService(db)
+    moderation_db_service = ModerationDbService(db, identity)
     unban_requests_db_service = UnbanRequestsService(db)
-    reputation_db_service = ReputationDbService(db)
+    reputation_db_service = ReputationDbService(db, identity)
     scrims_db_service = ScrimsDbService(db)
     tournaments_db_service = TournamentsDbService(db)
     twitch_streamers_db_service = TwitchStreamersDbService(db)
-    valorant_db_service = ValorantDbService(db)
+    valorant_db_service = ValorantDbService(db, identity)
     valorant_shop_db_service = ValorantShopDbService(db)
     channel_configuration_service = ChannelConfigurationWorkflowService(channel_config_db_service)
     role_configuration_service = RoleConfigurationWorkflowService(role_config_db_service)
 
     http_client = HTTPClient(timeout_seconds=15.0)
     await http_client.__aenter__()
-    henrik_service = HenrikDevService(http_client, henrik_api_key)
-    valorant_api_service = ValorantApiService(http_client)
+    # Cache de reponses devant HenrikDev et valorant-api.com (disque optionnel)
+    response_cache = ResponseCache(
+        MemoryCacheStore(max_entries=HTTP_CACHE_MAX_ENTRIES),
+        DiskCacheStore(http_cache_dir) if http_cache_dir else None,
+    )
+    henrik_service = HenrikDevService(http_client, henrik_api_key, cache=response_cache)
+    valorant_api_service = ValorantApiService(http_client, cache=response_cache)
+    # Rendu des graphiques matplotlib hors de la boucle asyncio, PNG mis en cache par contenu
+    chart_renderer = ChartRenderer(
+        max_workers=CHART_RENDER_WORKERS,
+        max_pending=CHART_RENDER_MAX_PENDING,
+        timeout_seconds=CHART_RENDER_TIMEOUT_SECONDS,
+        cache=ChartCache(CHART_CACHE_MAX_BYTES, spill_dir=chart_cache_dir or None),
+    )
+    await chart_renderer.start()
+    # Fins de ban / de scrim / de file: un seul timer sur la prochaine echeance
+    deadline_scheduler = DeadlineScheduler(max_workers=DEADLINE_WORKERS)
+    deadline_scheduler.start()
     twitch_api_service = (
         TwitchApiService(http_client, client_id=twitch_client_id, client_secret=twitch_client_secret)
         if twitch_client_id and twitch_client_secret
@@ -163,7 +213,6 @@ async def build_service_container(
     )
     valorant_shop_service = ValorantShopService(
         valorant_shop_db_service,
-        channel_config_db_service,
         henrik_service,
         valorant_api_service,
     )
@@ -181,6 +230,7 @@ async def build_service_container(
         channel_config_db_service,
         role_config_db_service,
         persistent_messages_db_service,
+        presence_db_service,
     )
     rank_notification_service = RankNotificationService(
         role_config_db_service,
@@ -190,6 +240,10 @@ async def build_service_container(
 
     return ServiceContainer(
         http_client=http_client,
+        response_cache=response_cache,
+        chart_renderer=chart_renderer,
+        deadline_scheduler=deadline_scheduler,
+        users_db_service=users_db_service,
         channel_configuration_service=channel_configuration_service,
         role_configuration_service=role_configuration_service,
         accueil_service=accueil_service,
@@ -0,0 +1,145 @@
+# core/chart_cache.py
+"""Cache des PNG rendus, adresse par le contenu (series + parametres de rendu)."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Mapping, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+def chart_cache_key(
+    fn: Callable[..., bytes],
+    args: Sequence[Any],
+    kwargs: Mapping[str, Any],
+) -> str:
+    """
+    Hash de la fonction de rendu et de tous ses arguments.
+    Une nouvelle ligne d'historique ou de stats change les series, donc la cle:
+    pas d'invalidation explicite a faire.
+    """
+    material = repr((fn.__module__, fn.__qualname__, tuple(args), sorted(kwargs.items())))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ChartCache:
+    """
+    LRU en memoire bornee en octets; les entrees evincees sont deversees sur disque
+    si spill_dir est fourni (lui-meme borne, les fichiers les plus anciens partent d'abord).
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 32 * 1024 * 1024,
+        *,
+        spill_dir: str | Path | None = None,
+        spill_max_bytes: int = 256 * 1024 * 1024,
+    ):
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._bytes = 0
+        self._spill_dir = Path(spill_dir) if spill_dir else None
+        self._spill_max_bytes = spill_max_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    async def get(self, key: str) -> bytes | None:
+        png = self._entries.get(key)
+        if png is not None:
+            self._entries.move_to_end(key)
+            return png
+        if self._spill_dir is None:
+            return None
+
+        png = await asyncio.to_thread(self._read_spilled, key)
+        if png is not None:
+            await self._store(key, png)
+        return png
+
+    async def set(self, key: str, png: bytes) -> None:
+        await self._store(key, png)
+
+    async def _store(self, key: str, png: bytes) -> None:
+        if len(png) > self._max_bytes:
+            await self._spill([(key, png)])
+            return
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous)
+        self._entries[key] = png
+        self._bytes += len(png)
+
+        evicted: list[tuple[str, bytes]] = []
+        while self._bytes > self._max_bytes:
+            old_key, old_png = self._entries.popitem(last=False)
+            self._bytes -= len(old_png)
+            evicted.append((old_key, old_png))
+        await self._spill(evicted)
+
+    async def _spill(self, entries: list[tuple[str, bytes]]) -> None:
+        if self._spill_dir is None or not entries:
+            return
+        try:
+            await asyncio.to_thread(self._write_spilled, entries)
+        except Exception:
+            logger.exception("Chart cache spill failed")
+
+    def _path(self, key: str) -> Path:
+        assert self._spill_dir is not None
+        return self._spill_dir / f"{key}.png"
+
+    def _read_spilled(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            png = path.read_bytes()
+            os.utime(path)
+            return png
+        except FileNotFoundError:
+            return None
+        except OSError:
+            logger.warning("Unreadable chart cache file %s, ignored", path)
+            return None
+
+    def _write_spilled(self, entries: list[tuple[str, bytes]]) -> None:
+        assert self._spill_dir is not None
+        self._spill_dir.mkdir(parents=True, exist_ok=True)
+        for key, png in entries:
+            path = self._path(key)
+            if path.exists():
+                os.utime(path)
+                continue
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(png)
+            tmp.replace(path)
+        self._prune_spilled()
+
+    def _prune_spilled(self) -> None:
+        assert self._spill_dir is not None
+        files = []
+        total = 0
+        for path in self._spill_dir.glob("*.png"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        files.sort()
+        for _, size, path in files:
+            if total <= self._spill_max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
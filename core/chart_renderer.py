@@ -0,0 +1,171 @@
+# core/chart_renderer.py
+"""Rendu matplotlib hors de la boucle asyncio (pool de processus pre-chauffe)."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import importlib
+import io
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Sequence
+
+from core.chart_cache import ChartCache, chart_cache_key
+
+logger = logging.getLogger(__name__)
+
+# Modules importes par chaque worker au demarrage (matplotlib + renderers)
+DEFAULT_PRELOAD_MODULES: tuple[str, ...] = (
+    "cogs.ranking.renderers.mmr_history_chart",
+    "cogs.accueil.renderers.member_stats_chart",
+)
+
+
+class ChartRenderError(RuntimeError):
+    """Le graphique n'a pas pu etre rendu (pool sature, timeout ou worker mort)."""
+
+
+class ChartRenderBusyError(ChartRenderError):
+    pass
+
+
+class ChartRenderTimeoutError(ChartRenderError):
+    pass
+
+
+def _warm_worker(modules: Sequence[str]) -> None:
+    """Initializer des workers: imports + un rendu a blanc (cache de polices, backend Agg)."""
+    for module in modules:
+        importlib.import_module(module)
+
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    with plt.style.context("dark_background"):
+        fig, ax = plt.subplots(figsize=(1, 1))
+        ax.plot([0, 1], [0, 1])
+        ax.set_title("warmup")
+        fig.savefig(io.BytesIO(), format="png")
+        plt.close(fig)
+
+
+def _ping() -> bool:
+    return True
+
+
+class ChartRenderer:
+    """
+    Execute les fonctions de rendu (arguments simples -> bytes PNG) dans un pool de processus.
+
+    - max_pending borne la file: au-dela, render() echoue tout de suite (ChartRenderBusyError)
+      plutot que d'empiler des commandes qui expireront de toute facon.
+    - timeout_seconds borne l'attente d'un rendu (file + execution).
+    - executor injectable (tests, ou ThreadPoolExecutor si les processus sont indisponibles).
+    - cache optionnel: un rendu deja fait pour les memes arguments est renvoye sans passer par le pool.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_workers: int = 2,
+        max_pending: int = 8,
+        timeout_seconds: float = 20.0,
+        preload_modules: Sequence[str] = DEFAULT_PRELOAD_MODULES,
+        executor: Executor | None = None,
+        cache: ChartCache | None = None,
+    ):
+        self._max_workers = max_workers
+        self._timeout = timeout_seconds
+        self._preload_modules = tuple(preload_modules)
+        self._owns_executor = executor is None
+        self._executor: Executor | None = executor
+        self._slots = asyncio.Semaphore(max_pending)
+        self._cache = cache
+
+    def _build_executor(self) -> Executor:
+        # spawn: jamais de fork d'un processus qui a deja des threads (aiohttp, asyncpg)
+        return ProcessPoolExecutor(
+            max_workers=self._max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_worker,
+            initargs=(self._preload_modules,),
+        )
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = self._build_executor()
+        return self._executor
+
+    async def start(self) -> None:
+        """Demarre les workers et attend qu'ils soient chauds."""
+        executor = self._get_executor()
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.gather(
+                *(loop.run_in_executor(executor, _ping) for _ in range(self._max_workers))
+            )
+        except Exception:
+            logger.exception("Chart render pool warm-up failed")
+
+    async def render(self, fn: Callable[..., bytes], *args: Any, **kwargs: Any) -> bytes:
+        """fn doit etre une fonction de module (picklable) qui renvoie des bytes PNG."""
+        key = chart_cache_key(fn, args, kwargs) if self._cache is not None else None
+        if key is not None:
+            cached = await self._cache.get(key)
+            if cached is not None:
+                return cached
+
+        png = await self._render_in_pool(fn, *args, **kwargs)
+        if key is not None:
+            await self._cache.set(key, png)
+        return png
+
+    async def _render_in_pool(self, fn: Callable[..., bytes], *args: Any, **kwargs: Any) -> bytes:
+        if self._slots.locked():
+            raise ChartRenderBusyError("Chart render queue is full")
+
+        await self._slots.acquire()
+        try:
+            executor = self._get_executor()
+            call = functools.partial(fn, *args, **kwargs)
+            future = asyncio.get_running_loop().run_in_executor(executor, call)
+        except BaseException:
+            self._slots.release()
+            raise
+        # Un rendu en cours ne peut pas etre interrompu: le slot reste pris
+        # jusqu'a ce que le worker ait vraiment fini, meme apres un timeout.
+        future.add_done_callback(self._release_slot)
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=self._timeout)
+        except asyncio.TimeoutError as e:
+            raise ChartRenderTimeoutError(
+                f"Chart render exceeded {self._timeout:.0f}s"
+            ) from e
+        except BrokenProcessPool as e:
+            self._reset_executor()
+            raise ChartRenderError("Chart render worker died") from e
+
+    def _release_slot(self, future: asyncio.Future) -> None:
+        self._slots.release()
+        if not future.cancelled():
+            # Resultat d'un rendu abandonne (timeout): ne pas le laisser "never retrieved"
+            future.exception()
+
+    def _reset_executor(self) -> None:
+        if not self._owns_executor or self._executor is None:
+            return
+        logger.warning("Chart render pool broken, recreating it")
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+    async def close(self) -> None:
+        if self._executor is None or not self._owns_executor:
+            return
+        executor, self._executor = self._executor, None
+        await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
@@ -0,0 +1,127 @@
+# core/deadline_scheduler.py
+"""Echeances (fin de ban, fin de scrim, expiration de file...) sur un tas min, sans polling."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+DeadlineHandler = Callable[[Any], Awaitable[None]]
+
+
+def _timestamp(when: datetime) -> float:
+    # Les datetimes naifs du code existant (datetime.utcnow()) sont en UTC
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return when.timestamp()
+
+
+class DeadlineScheduler:
+    """
+    Une seule tache dort jusqu'a la prochaine echeance du tas; schedule() la reveille
+    si la nouvelle echeance passe devant. Les echeances dues sont traitees en parallele
+    (max_workers), un handler en erreur est relance apres retry_delay_seconds.
+
+    Les echeances sont indexees par (kind, key): replanifier une cle remplace son
+    echeance, cancel() l'oublie. Les entrees perimees restent dans le tas et sont
+    ignorees a la sortie (suppression paresseuse).
+    """
+
+    def __init__(
+        self,
+        *,
+        max_workers: int = 4,
+        retry_delay_seconds: float = 60.0,
+    ):
+        self._handlers: dict[str, DeadlineHandler] = {}
+        self._deadlines: dict[tuple[str, Hashable], float] = {}
+        self._heap: list[tuple[float, int, str, Hashable]] = []
+        self._sequence = itertools.count()
+        self._workers = asyncio.Semaphore(max_workers)
+        self._retry_delay = retry_delay_seconds
+        self._wakeup = asyncio.Event()
+        self._running: set[asyncio.Task] = set()
+        self._timer: asyncio.Task | None = None
+
+    def register(self, kind: str, handler: DeadlineHandler) -> None:
+        self._handlers[kind] = handler
+
+    def unregister(self, kind: str) -> None:
+        """Retire le handler et toutes les echeances de ce type (dechargement d'un cog)."""
+        self._handlers.pop(kind, None)
+        for entry in [entry for entry in self._deadlines if entry[0] == kind]:
+            del self._deadlines[entry]
+
+    def schedule(self, kind: str, key: Hashable, when: datetime) -> None:
+        deadline = _timestamp(when)
+        self._deadlines[(kind, key)] = deadline
+        heapq.heappush(self._heap, (deadline, next(self._sequence), kind, key))
+        if self._heap[0][0] == deadline:
+            self._wakeup.set()
+
+    def cancel(self, kind: str, key: Hashable) -> None:
+        self._deadlines.pop((kind, key), None)
+
+    def deadline(self, kind: str, key: Hashable) -> datetime | None:
+        deadline = self._deadlines.get((kind, key))
+        return datetime.fromtimestamp(deadline, timezone.utc) if deadline is not None else None
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def start(self) -> None:
+        if self._timer is None:
+            self._timer = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        tasks = [task for task in (self._timer, *self._running) if task is not None]
+        self._timer = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._running.clear()
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            for kind, key in self._pop_due():
+                task = asyncio.create_task(self._dispatch(kind, key))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+
+            timeout = self._heap[0][0] - time.time() if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _pop_due(self) -> list[tuple[str, Hashable]]:
+        now = time.time()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, _, kind, key = heapq.heappop(self._heap)
+            if self._deadlines.get((kind, key)) != deadline:
+                continue  # annulee ou replanifiee
+            del self._deadlines[(kind, key)]
+            due.append((kind, key))
+        return due
+
+    async def _dispatch(self, kind: str, key: Hashable) -> None:
+        handler = self._handlers.get(kind)
+        if handler is None:
+            return
+        async with self._workers:
+            try:
+                await handler(key)
+            except Exception:
+                logger.exception("Deadline handler %s failed for %r, retrying later.", kind, key)
+                if (kind, key) not in self._deadlines and kind in self._handlers:
+                    retry_at = time.time() + self._retry_delay
+                    self.schedule(kind, key, datetime.fromtimestamp(retry_at, timezone.utc))
@@ -0,0 +1,90 @@
+# database/guild_config_cache.py
+"""
+Cache memoire des configurations de guild (salons, roles).
+
+- Un snapshot `key -> id` par guild, charge paresseusement.
+- Invalide explicitement par les services DB apres chaque ecriture.
+- TTL optionnel pour rattraper les modifications faites hors du bot.
+- Listeners notifies a chaque ecriture (caches derives cote cogs).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable
+
+
+SnapshotLoader = Callable[[int], Awaitable[dict[str, int]]]
+WriteListener = Callable[[int], None]
+
+logger = logging.getLogger(__name__)
+
+
+class GuildConfigCache:
+    def __init__(self, *, ttl_seconds: float | None = None) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._snapshots: dict[int, tuple[float, dict[str, int]]] = {}
+        self._locks: dict[int, asyncio.Lock] = {}
+        # Incremente a chaque invalidation : un chargement concurrent d'une
+        # ecriture ne doit pas reinstaller un snapshot perime.
+        self._generations: dict[int, int] = {}
+        self._listeners: list[WriteListener] = []
+
+    def add_listener(self, listener: WriteListener) -> None:
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: WriteListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _is_fresh(self, loaded_at: float, now: float) -> bool:
+        return self._ttl_seconds is None or now - loaded_at < self._ttl_seconds
+
+    def peek(self, guild_id: int, *, now: float | None = None) -> dict[str, int] | None:
+        entry = self._snapshots.get(guild_id)
+        if entry is None:
+            return None
+        loaded_at, snapshot = entry
+        if not self._is_fresh(loaded_at, time.monotonic() if now is None else now):
+            return None
+        return snapshot
+
+    async def get(self, guild_id: int, loader: SnapshotLoader) -> dict[str, int]:
+        """
+        Retourne le snapshot de la guild (lecture seule, ne pas muter).
+        Un seul chargement DB par guild meme sous rafale d'evenements.
+        """
+        snapshot = self.peek(guild_id)
+        if snapshot is not None:
+            return snapshot
+
+        lock = self._locks.setdefault(guild_id, asyncio.Lock())
+        async with lock:
+            snapshot = self.peek(guild_id)
+            if snapshot is not None:
+                return snapshot
+
+            generation = self._generations.get(guild_id, 0)
+            snapshot = await loader(guild_id)
+            if self._generations.get(guild_id, 0) == generation:
+                self._snapshots[guild_id] = (time.monotonic(), snapshot)
+            return snapshot
+
+    def _drop(self, guild_id: int) -> None:
+        self._generations[guild_id] = self._generations.get(guild_id, 0) + 1
+        self._snapshots.pop(guild_id, None)
+
+    def invalidate(self, guild_id: int) -> None:
+        """Appele apres une ecriture : oublie le snapshot et previent les listeners."""
+        self._drop(guild_id)
+        for listener in list(self._listeners):
+            try:
+                listener(guild_id)
+            except Exception:
+                logger.exception("Guild config write listener failed for guild %s.", guild_id)
+
+    def clear(self) -> None:
+        for guild_id in set(self._snapshots) | set(self._locks):
+            self._drop(guild_id)
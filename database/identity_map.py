@@ -0,0 +1,146 @@
+# database/identity_map.py
+"""
+Identity map discord_id <-> user_id partagee par les services DB.
+
+- LRU bornee: un user_id ne change jamais pour un discord_id donne.
+- Les lectures ne declenchent plus d'INSERT ... ON CONFLICT sur `users`.
+- Les mises a jour de `users.last_seen_at` sont coalescees puis ecrites
+  en lot par UsersDbService.flush_seen().
+
+Les methodes async recoivent une connexion: la transaction reste geree
+par le service DB appelant.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+import asyncpg
+
+from database.repos.user_repo import UserRepo
+
+
+class UserIdentityMap:
+    def __init__(self, *, max_size: int = 50_000) -> None:
+        self._max_size = max_size
+        self._user_ids: OrderedDict[int, int] = OrderedDict()
+        self._discord_ids: dict[int, int] = {}
+        self._pending_seen: set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._user_ids)
+
+    # ==================== cache ====================
+
+    def get_user_id(self, discord_id: int) -> Optional[int]:
+        user_id = self._user_ids.get(discord_id)
+        if user_id is not None:
+            self._user_ids.move_to_end(discord_id)
+        return user_id
+
+    def get_discord_id(self, user_id: int) -> Optional[int]:
+        discord_id = self._discord_ids.get(user_id)
+        if discord_id is not None:
+            self._user_ids.move_to_end(discord_id)
+        return discord_id
+
+    def remember(self, discord_id: int, user_id: int) -> None:
+        self._user_ids[discord_id] = user_id
+        self._user_ids.move_to_end(discord_id)
+        self._discord_ids[user_id] = discord_id
+        while len(self._user_ids) > self._max_size:
+            _, evicted_user_id = self._user_ids.popitem(last=False)
+            self._discord_ids.pop(evicted_user_id, None)
+
+    def mark_seen(self, user_id: int) -> None:
+        self._pending_seen.add(user_id)
+
+    def drain_seen(self) -> list[int]:
+        pending = sorted(self._pending_seen)
+        self._pending_seen.clear()
+        return pending
+
+    def clear(self) -> None:
+        self._user_ids.clear()
+        self._discord_ids.clear()
+        self._pending_seen.clear()
+
+    # ==================== resolution (conn fournie par l'appelant) ====================
+
+    async def resolve_user_id(
+        self, conn: asyncpg.Connection, discord_id: int
+    ) -> Optional[int]:
+        """Lecture seule: None si l'utilisateur n'existe pas encore."""
+        user_id = self.get_user_id(discord_id)
+        if user_id is not None:
+            return user_id
+        user_id = await UserRepo.get_user_id(conn, discord_id)
+        if user_id is not None:
+            self.remember(discord_id, user_id)
+        return user_id
+
+    async def resolve_discord_id(
+        self, conn: asyncpg.Connection, user_id: int
+    ) -> Optional[int]:
+        discord_id = self.get_discord_id(user_id)
+        if discord_id is not None:
+            return discord_id
+        return (await self.get_discord_ids_many(conn, [user_id])).get(user_id)
+
+    async def ensure_user_id(self, conn: asyncpg.Connection, discord_id: int) -> int:
+        """
+        Equivalent de UserRepo.ensure_exists sans ecriture quand l'identite est connue:
+        le last_seen_at est alors differe jusqu'au prochain flush.
+        """
+        user_id = self.get_user_id(discord_id)
+        if user_id is not None:
+            self.mark_seen(user_id)
+            return user_id
+
+        user_id, created = await UserRepo.ensure_exists_with_status(conn, discord_id=discord_id)
+        # Une ligne creee dans cette transaction peut encore etre annulee:
+        # elle n'est mise en cache qu'au prochain appel.
+        if not created:
+            self.remember(discord_id, user_id)
+        return user_id
+
+    async def get_user_ids_many(
+        self, conn: asyncpg.Connection, discord_ids: Iterable[int]
+    ) -> dict[int, int]:
+        """Prefetch discord_id -> user_id en une requete pour les absents du cache."""
+        result: dict[int, int] = {}
+        missing: list[int] = []
+        for discord_id in set(discord_ids):
+            user_id = self.get_user_id(discord_id)
+            if user_id is None:
+                missing.append(discord_id)
+            else:
+                result[discord_id] = user_id
+
+        if missing:
+            fetched = await UserRepo.get_user_ids_many(conn, missing)
+            for discord_id, user_id in fetched.items():
+                self.remember(discord_id, user_id)
+            result.update(fetched)
+        return result
+
+    async def get_discord_ids_many(
+        self, conn: asyncpg.Connection, user_ids: Iterable[int]
+    ) -> dict[int, int]:
+        """user_id -> discord_id en une requete pour les absents du cache."""
+        result: dict[int, int] = {}
+        missing: list[int] = []
+        for user_id in set(user_ids):
+            discord_id = self.get_discord_id(user_id)
+            if discord_id is None:
+                missing.append(user_id)
+            else:
+                result[user_id] = discord_id
+
+        if missing:
+            fetched = await UserRepo.get_discord_ids_by_user_ids(conn, missing)
+            for user_id, discord_id in fetched.items():
+                self.remember(discord_id, user_id)
+            result.update(fetched)
+        return result
@@ -0,0 +1,7 @@
+-- 030_mmr_history_recorded_at_index.sql
+-- Period reads on MMR history (today / week) filter on recorded_at >= $start and
+-- look up the last row before the window. Index (user_id, recorded_at) on the
+-- partitioned parent so every season/act partition gets it.
+
+CREATE INDEX IF NOT EXISTS idx_valorant_elo_history_user_recorded_at
+  ON valorant_elo_history_parent (user_id, recorded_at);
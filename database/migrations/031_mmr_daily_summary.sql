@@ -0,0 +1,35 @@
+-- 031_mmr_daily_summary.sql
+-- Per-player, per-day MMR rollup maintained by the runtime from
+-- valorant_elo_history_parent. Additive: raw history stays the source of truth
+-- and the rollup can be rebuilt from it at any time.
+--
+-- account = puuid of the scoped history, '' for unscoped legacy rows.
+
+CREATE TABLE IF NOT EXISTS valorant_mmr_daily_summary (
+  user_id     BIGINT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+  account     VARCHAR(255) NOT NULL,
+  season      INTEGER NOT NULL,
+  act         INTEGER NOT NULL,
+  day         DATE NOT NULL,
+  games       INTEGER NOT NULL,
+  net_change  INTEGER NOT NULL,
+  wins        INTEGER NOT NULL,
+  win_total   INTEGER NOT NULL,
+  losses      INTEGER NOT NULL,
+  loss_total  INTEGER NOT NULL,
+  last_diff   INTEGER NOT NULL,
+  open_at     TIMESTAMPTZ NOT NULL,
+  open_elo    INTEGER NOT NULL,
+  close_at    TIMESTAMPTZ NOT NULL,
+  close_elo   INTEGER NOT NULL,
+  updated_at  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (user_id, account, season, act, day)
+);
+
+-- Rollup complete for (user, account): only then do reads trust it.
+CREATE TABLE IF NOT EXISTS valorant_mmr_summary_state (
+  user_id   BIGINT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+  account   VARCHAR(255) NOT NULL,
+  built_at  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (user_id, account)
+);
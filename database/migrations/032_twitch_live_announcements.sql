@@ -0,0 +1,14 @@
+-- 032_twitch_live_announcements.sql
+-- Live Twitch deja annonces, par guild: un redemarrage du bot pendant un live
+-- ne le re-annonce pas. stream_id identifie le live (un nouveau live = nouvel id).
+-- Additive; les lignes suivent twitch_streamers (ON DELETE CASCADE).
+
+CREATE TABLE IF NOT EXISTS twitch_live_announcements (
+  guild_id       BIGINT NOT NULL,
+  streamer_login TEXT NOT NULL,
+  stream_id      TEXT NOT NULL,
+  announced_at   TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (guild_id, streamer_login),
+  FOREIGN KEY (guild_id, streamer_login)
+    REFERENCES twitch_streamers (guild_id, streamer_login) ON DELETE CASCADE
+);
@@ -0,0 +1,19 @@
+-- 033_mmr_daily_summary_carry.sql
+-- End-of-day state carried by valorant_mmr_daily_summary so that each day
+-- continues the previous one exactly like the raw-history stats:
+--   uses_rr_delta: the history is summarized with rr_delta metadata (not legacy diffs)
+--   import_elo:    elo of the import run still open at the end of the day, if any
+-- Whole-account ("all") days are stored under season = 0, act = 0.
+--
+-- Rollups built before this migration do not carry that state: the version
+-- column on valorant_mmr_summary_state keeps reads off them until rebuilt.
+-- Additive.
+
+ALTER TABLE valorant_mmr_daily_summary
+  ADD COLUMN IF NOT EXISTS uses_rr_delta BOOLEAN NOT NULL DEFAULT FALSE;
+
+ALTER TABLE valorant_mmr_daily_summary
+  ADD COLUMN IF NOT EXISTS import_elo INTEGER;
+
+ALTER TABLE valorant_mmr_summary_state
+  ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
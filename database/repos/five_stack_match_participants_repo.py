@@ -29,43 +29,51 @@ class FiveStackMatchParticipantsRepo:
         )
 
     @staticmethod
-    async def insert(
+    async def insert_many(
         conn: asyncpg.Connection,
         *,
         match_id: int,
-        discord_member_id: int,
-        elo_at_match: int | None,
-        roles_selected: tuple[str, ...],
-        entry_type: int,
-        wait_time_seconds: int,
+        participants: list[FiveStackMatchParticipantRow],
     ) -> None:
+        if not participants:
+            return
+        # unnest() aplatit les tableaux 2D: les roles passent en texte separe par des virgules
         await conn.execute(
             """
             INSERT INTO five_stack_match_participants (
               match_id, discord_member_id, elo_at_match, roles_selected,
               entry_type, wait_time_seconds
             )
-            VALUES ($1, $2, $3, $4, $5, $6)
+            SELECT $1, p.discord_member_id, p.elo_at_match, string_to_array(p.roles, ','),
+                   p.entry_type, p.wait_time_seconds
+              FROM unnest($2::bigint[], $3::int[], $4::text[], $5::int[], $6::int[])
+                   AS p(discord_member_id, elo_at_match, roles, entry_type, wait_time_seconds)
             ON CONFLICT (match_id, discord_member_id) DO NOTHING;
             """,
             match_id,
-            discord_member_id,
-            elo_at_match,
-            list(roles_selected),
-            entry_type,
-            wait_time_seconds,
+            [participant.discord_member_id for participant in participants],
+            [participant.elo_at_match for participant in participants],
+            [",".join(participant.roles_selected) for participant in participants],
+            [participant.entry_type for participant in participants],
+            [participant.wait_time_seconds for participant in participants],
         )
 
     @classmethod
-    async def list_by_match(cls, conn: asyncpg.Connection, match_id: int) -> list[FiveStackMatchParticipantRow]:
+    async def list_by_matches(
+        cls,
+        conn: asyncpg.Connection,
+        match_ids: list[int],
+    ) -> list[FiveStackMatchParticipantRow]:
+        if not match_ids:
+            return []
         rows = await conn.fetch(
             """
             SELECT match_id, discord_member_id, elo_at_match, roles_selected,
                    entry_type, wait_time_seconds
               FROM five_stack_match_participants
-             WHERE match_id = $1;
+             WHERE match_id = ANY($1::bigint[]);
             """,
-            match_id,
+            match_ids,
         )
         return [cls._row_to_model(row) for row in rows]
 
@@ -106,6 +106,31 @@ class FiveStackMatchesRepo:
         )
         return cls._row_to_model(row) if row else None
 
+    @classmethod
+    async def list_by_ids(
+        cls,
+        conn: asyncpg.Connection,
+        *,
+        guild_id: int,
+        match_ids: list[int],
+    ) -> list[FiveStackMatchRow]:
+        if not match_ids:
+            return []
+        rows = await conn.fetch(
+            """
+            SELECT id, guild_id, match_code, voice_channel_id, quality_score,
+                   elo_spread, avg_elo, role_diversity_score,
+                   total_wait_time_seconds, team_size, language, region,
+                   platform, created_at
+              FROM five_stack_matches
+             WHERE guild_id = $1
+               AND id = ANY($2::bigint[]);
+            """,
+            guild_id,
+            match_ids,
+        )
+        return [cls._row_to_model(row) for row in rows]
+
     @classmethod
     async def list_by_guild(cls, conn: asyncpg.Connection, *, guild_id: int, limit: int) -> list[FiveStackMatchRow]:
         rows = await conn.fetch(
@@ -34,15 +34,18 @@ class FiveStackPlayerStatsRepo:
         )
 
     @staticmethod
-    async def upsert_after_match(
+    async def upsert_many_after_match(
         conn: asyncpg.Connection,
         *,
         guild_id: int,
-        discord_member_id: int,
-        wait_time_seconds: int,
-        is_solo: bool,
-        preferred_role: str | None,
+        discord_member_ids: list[int],
+        wait_time_seconds: list[int],
+        is_solo: list[bool],
+        preferred_roles: list[str | None],
     ) -> None:
+        """Statistiques apres match de tous les participants d'un match (membres distincts) en une requete."""
+        if not discord_member_ids:
+            return
         await conn.execute(
             """
             INSERT INTO five_stack_player_stats (
@@ -50,7 +53,12 @@ class FiveStackPlayerStatsRepo:
               total_wait_time_seconds, matches_as_solo, matches_in_group,
               last_match_at, preferred_role
             )
-            VALUES ($1, $2, 1, $3, $4, $5, now(), $6)
+            SELECT $1, p.discord_member_id, 1, p.wait_time_seconds,
+                   CASE WHEN p.is_solo THEN 1 ELSE 0 END,
+                   CASE WHEN p.is_solo THEN 0 ELSE 1 END,
+                   now(), p.preferred_role
+              FROM unnest($2::bigint[], $3::int[], $4::bool[], $5::text[])
+                   AS p(discord_member_id, wait_time_seconds, is_solo, preferred_role)
             ON CONFLICT (guild_id, discord_member_id) DO UPDATE SET
               total_matches = five_stack_player_stats.total_matches + 1,
               total_wait_time_seconds = five_stack_player_stats.total_wait_time_seconds + EXCLUDED.total_wait_time_seconds,
@@ -60,11 +68,10 @@ class FiveStackPlayerStatsRepo:
               preferred_role = COALESCE(EXCLUDED.preferred_role, five_stack_player_stats.preferred_role);
             """,
             guild_id,
-            discord_member_id,
+            discord_member_ids,
             wait_time_seconds,
-            1 if is_solo else 0,
-            0 if is_solo else 1,
-            preferred_role,
+            is_solo,
+            preferred_roles,
         )
 
     @classmethod
@@ -20,6 +20,20 @@ class FiveStackTeamRow:
     created_at: datetime
 
 
+# Membres agreges dans la meme requete (ordre d'arrivee), au lieu d'une requete par equipe
+_TEAMS_WITH_MEMBERS_SELECT = """
+            SELECT t.code, t.guild_id, t.leader_discord_id, t.visibility, t.forum_channel_id,
+                   t.thread_id, t.voice_channel_id, t.status, t.created_at,
+                   COALESCE(m.member_ids, '{}'::bigint[]) AS member_ids
+              FROM five_stack_teams t
+              LEFT JOIN LATERAL (
+                SELECT array_agg(tm.member_discord_id ORDER BY tm.joined_at) AS member_ids
+                  FROM five_stack_team_members tm
+                 WHERE tm.guild_id = t.guild_id
+                   AND tm.team_code = t.code
+              ) m ON TRUE"""
+
+
 class FiveStackTeamsRepo:
     @staticmethod
     def _row_to_model(row: asyncpg.Record) -> FiveStackTeamRow:
@@ -82,34 +96,43 @@ class FiveStackTeamsRepo:
         return cls._row_to_model(row) if row else None
 
     @classmethod
-    async def list_active(cls, conn: asyncpg.Connection, guild_id: int) -> list[FiveStackTeamRow]:
+    async def list_active_with_members(
+        cls,
+        conn: asyncpg.Connection,
+        guild_id: int,
+    ) -> list[tuple[FiveStackTeamRow, tuple[int, ...]]]:
         rows = await conn.fetch(
-            """
-            SELECT code, guild_id, leader_discord_id, visibility, forum_channel_id,
-                   thread_id, voice_channel_id, status, created_at
-              FROM five_stack_teams
-             WHERE guild_id = $1
-               AND status = 'active'
-             ORDER BY created_at;
+            f"""
+            {_TEAMS_WITH_MEMBERS_SELECT}
+             WHERE t.guild_id = $1
+               AND t.status = 'active'
+             ORDER BY t.created_at;
             """,
             guild_id,
         )
-        return [cls._row_to_model(row) for row in rows]
+        return [cls._row_with_members(row) for row in rows]
 
     @classmethod
-    async def list_older_than(cls, conn: asyncpg.Connection, *, hours: int) -> list[FiveStackTeamRow]:
+    async def list_older_than_with_members(
+        cls,
+        conn: asyncpg.Connection,
+        *,
+        hours: int,
+    ) -> list[tuple[FiveStackTeamRow, tuple[int, ...]]]:
         rows = await conn.fetch(
-            """
-            SELECT code, guild_id, leader_discord_id, visibility, forum_channel_id,
-                   thread_id, voice_channel_id, status, created_at
-              FROM five_stack_teams
-             WHERE status = 'active'
-               AND created_at < now() - make_interval(hours => $1)
-             ORDER BY created_at;
+            f"""
+            {_TEAMS_WITH_MEMBERS_SELECT}
+             WHERE t.status = 'active'
+               AND t.created_at < now() - make_interval(hours => $1)
+             ORDER BY t.created_at;
             """,
             hours,
         )
-        return [cls._row_to_model(row) for row in rows]
+        return [cls._row_with_members(row) for row in rows]
+
+    @classmethod
+    def _row_with_members(cls, row: asyncpg.Record) -> tuple[FiveStackTeamRow, tuple[int, ...]]:
+        return cls._row_to_model(row), tuple(int(value) for value in row["member_ids"])
 
     @staticmethod
     async def update_leader(
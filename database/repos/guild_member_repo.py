@@ -28,6 +28,33 @@ class GuildMemberRepo:
             user_id,
         )
 
+    @staticmethod
+    async def mark_join_many(
+        conn: asyncpg.Connection,
+        *,
+        guild_id: int,
+        user_ids: list[int],
+    ) -> None:
+        """mark_join pour plusieurs membres en une requete."""
+        if not user_ids:
+            return
+        await conn.execute(
+            """
+            INSERT INTO guild_members(
+              guild_id, user_id, is_member, joined_at, left_at
+            )
+            SELECT $1, user_id, TRUE, now(), NULL
+              FROM unnest($2::bigint[]) AS u(user_id)
+            ON CONFLICT (guild_id, user_id) DO UPDATE
+            SET is_member = TRUE,
+                joined_at = COALESCE(guild_members.joined_at, now()),
+                left_at = NULL,
+                updated_at = now();
+            """,
+            guild_id,
+            user_ids,
+        )
+
     @staticmethod
     async def mark_leave(
         conn: asyncpg.Connection,
@@ -113,19 +113,27 @@ class ModerationBansRepo:
         return not result.endswith("0")
 
     @staticmethod
-    async def list_expired(
-        conn: asyncpg.Connection,
-        now: datetime,
-    ) -> List[BanRow]:
-        """Liste les bans temporaires expirés."""
+    async def list_banned_user_ids(conn: asyncpg.Connection) -> List[tuple[int, int]]:
+        """(guild_id, user_id) de tous les bans enregistres (index memoire)."""
+        rows = await conn.fetch(
+            """
+            SELECT guild_id, user_id
+            FROM moderation_bans;
+            """
+        )
+        return [(r["guild_id"], r["user_id"]) for r in rows]
+
+    @staticmethod
+    async def list_temporary(conn: asyncpg.Connection) -> List[BanRow]:
+        """Liste les bans temporaires (expires ou non), par date de fin."""
         rows = await conn.fetch(
             """
             SELECT id, guild_id, user_id, ban_type, reason,
                    banned_by_user_id, banned_at, ban_end
             FROM moderation_bans
-            WHERE ban_end IS NOT NULL AND ban_end <= $1;
-            """,
-            now,
+            WHERE ban_end IS NOT NULL
+            ORDER BY ban_end;
+            """
         )
         return [
             BanRow(
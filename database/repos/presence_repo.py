@@ -0,0 +1,212 @@
+# database/repos/presence_repo.py
+
+from typing import AsyncIterable, Iterable
+
+import asyncpg
+
+
+def _count(result: str) -> int:
+    parts = result.split()
+    return int(parts[-1]) if parts and parts[-1].isdigit() else 0
+
+
+class PresenceRepo:
+    """
+    Reconciliation de presence en SQL ensembliste.
+    load_snapshot charge (guild_id, discord_id) du cache gateway dans une table
+    temporaire (a appeler dans une transaction); les autres methodes comparent
+    chaque table a ce snapshot, limite aux guilds scannees.
+    """
+
+    @staticmethod
+    async def load_snapshot(
+        conn: asyncpg.Connection,
+        members: Iterable[tuple[int, int]] | AsyncIterable[tuple[int, int]],
+    ) -> None:
+        await conn.execute(
+            """
+            CREATE TEMP TABLE IF NOT EXISTS tmp_presence_snapshot (
+                guild_id   BIGINT NOT NULL,
+                discord_id BIGINT NOT NULL
+            ) ON COMMIT DROP;
+            """
+        )
+        await conn.execute("TRUNCATE tmp_presence_snapshot;")
+        await conn.copy_records_to_table(
+            "tmp_presence_snapshot",
+            records=members,
+            columns=("guild_id", "discord_id"),
+        )
+        await conn.execute(
+            "CREATE INDEX ON tmp_presence_snapshot (discord_id, guild_id);"
+            "ANALYZE tmp_presence_snapshot;"
+        )
+
+    @staticmethod
+    async def reconcile_valorant_info(
+        conn: asyncpg.Connection, guild_ids: list[int], *, deactivate: bool = True
+    ) -> tuple[int, int]:
+        """
+        is_active = present dans au moins une des guilds scannees.
+        deactivate=False: reactivations seulement (scan partiel des guilds).
+        Retourne (reactivated, deactivated).
+        """
+        rows = await conn.fetch(
+            """
+            UPDATE valorant_info vi
+               SET is_active = p.present,
+                   deactivated_at = CASE WHEN p.present THEN NULL ELSE NOW() END,
+                   last_checked_at = CASE WHEN p.present THEN NULL ELSE vi.last_checked_at END,
+                   error_count = CASE WHEN p.present THEN 0 ELSE vi.error_count END
+              FROM (
+                    SELECT u.user_id,
+                           EXISTS (
+                               SELECT 1
+                                 FROM tmp_presence_snapshot s
+                                WHERE s.discord_id = u.discord_id
+                                  AND s.guild_id = ANY($1)
+                           ) AS present
+                      FROM users u
+                   ) p
+             WHERE vi.user_id = p.user_id
+               AND vi.pseudo IS NOT NULL
+               AND vi.tag IS NOT NULL
+               AND vi.is_active IS DISTINCT FROM p.present
+               AND (p.present OR $2)
+            RETURNING p.present;
+            """,
+            guild_ids,
+            deactivate,
+        )
+        reactivated = sum(1 for row in rows if row["present"])
+        return reactivated, len(rows) - reactivated
+
+    @staticmethod
+    async def reconcile_guild_members(
+        conn: asyncpg.Connection, guild_ids: list[int]
+    ) -> tuple[int, int]:
+        """
+        is_member des lignes existantes (aucune ligne creee). Retourne (rejoined, left).
+        """
+        rows = await conn.fetch(
+            """
+            UPDATE guild_members gm
+               SET is_member = p.present,
+                   joined_at = CASE WHEN p.present THEN COALESCE(gm.joined_at, now()) ELSE gm.joined_at END,
+                   left_at = CASE WHEN p.present THEN NULL ELSE now() END,
+                   updated_at = now()
+              FROM (
+                    SELECT m.guild_id,
+                           m.user_id,
+                           EXISTS (
+                               SELECT 1
+                                 FROM tmp_presence_snapshot s
+                                WHERE s.discord_id = u.discord_id
+                                  AND s.guild_id = m.guild_id
+                           ) AS present
+                      FROM guild_members m
+                      JOIN users u ON u.user_id = m.user_id
+                     WHERE m.guild_id = ANY($1)
+                   ) p
+             WHERE gm.guild_id = p.guild_id
+               AND gm.user_id = p.user_id
+               AND gm.is_member IS DISTINCT FROM p.present
+            RETURNING p.present;
+            """,
+            guild_ids,
+        )
+        rejoined = sum(1 for row in rows if row["present"])
+        return rejoined, len(rows) - rejoined
+
+    @staticmethod
+    async def purge_five_stack_queue(conn: asyncpg.Connection, guild_ids: list[int]) -> int:
+        """Retire les entrees de file dont le joueur (ou un membre de l'equipe) est parti."""
+        result = await conn.execute(
+            """
+            DELETE FROM five_stack_queue q
+             WHERE q.guild_id = ANY($1)
+               AND EXISTS (
+                   SELECT 1
+                     FROM unnest(q.team_member_ids || q.discord_member_id) AS m(discord_id)
+                    WHERE NOT EXISTS (
+                        SELECT 1
+                          FROM tmp_presence_snapshot s
+                         WHERE s.guild_id = q.guild_id
+                           AND s.discord_id = m.discord_id
+                    )
+               );
+            """,
+            guild_ids,
+        )
+        return _count(result)
+
+    @staticmethod
+    async def purge_five_stack_team_members(conn: asyncpg.Connection, guild_ids: list[int]) -> int:
+        result = await conn.execute(
+            """
+            DELETE FROM five_stack_team_members tm
+             USING five_stack_teams t
+             WHERE t.guild_id = tm.guild_id
+               AND t.code = tm.team_code
+               AND t.status = 'active'
+               AND tm.guild_id = ANY($1)
+               AND NOT EXISTS (
+                   SELECT 1
+                     FROM tmp_presence_snapshot s
+                    WHERE s.guild_id = tm.guild_id
+                      AND s.discord_id = tm.member_discord_id
+               );
+            """,
+            guild_ids,
+        )
+        return _count(result)
+
+    @staticmethod
+    async def reassign_five_stack_leaders(conn: asyncpg.Connection, guild_ids: list[int]) -> int:
+        """Chef absent de son equipe: le plus ancien membre restant le remplace."""
+        result = await conn.execute(
+            """
+            UPDATE five_stack_teams t
+               SET leader_discord_id = nl.member_discord_id,
+                   updated_at = now()
+              FROM (
+                    SELECT DISTINCT ON (guild_id, team_code)
+                           guild_id, team_code, member_discord_id
+                      FROM five_stack_team_members
+                     WHERE guild_id = ANY($1)
+                     ORDER BY guild_id, team_code, joined_at
+                   ) nl
+             WHERE t.guild_id = nl.guild_id
+               AND t.code = nl.team_code
+               AND t.status = 'active'
+               AND NOT EXISTS (
+                   SELECT 1
+                     FROM five_stack_team_members tm
+                    WHERE tm.guild_id = t.guild_id
+                      AND tm.team_code = t.code
+                      AND tm.member_discord_id = t.leader_discord_id
+               );
+            """,
+            guild_ids,
+        )
+        return _count(result)
+
+    @staticmethod
+    async def close_empty_five_stack_teams(conn: asyncpg.Connection, guild_ids: list[int]) -> int:
+        result = await conn.execute(
+            """
+            UPDATE five_stack_teams t
+               SET status = 'deleted',
+                   updated_at = now()
+             WHERE t.guild_id = ANY($1)
+               AND t.status = 'active'
+               AND NOT EXISTS (
+                   SELECT 1
+                     FROM five_stack_team_members tm
+                    WHERE tm.guild_id = t.guild_id
+                      AND tm.team_code = t.code
+               );
+            """,
+            guild_ids,
+        )
+        return _count(result)
@@ -115,22 +115,6 @@ class ScrimsRepo:
             )
         return [cls._row_to_model(row) for row in rows]
 
-    @classmethod
-    async def list_due(cls, conn: asyncpg.Connection, *, now: datetime) -> list[ScrimRow]:
-        rows = await conn.fetch(
-            """
-            SELECT id, guild_id, creator_user_id, scheduled_at, map_name,
-                   rank_name, notes, team1_user_ids, team2_user_ids,
-                   channel_id, message_id, status
-              FROM scrims
-             WHERE status = 'active'
-               AND scheduled_at <= $1
-             ORDER BY scheduled_at, id;
-            """,
-            now,
-        )
-        return [cls._row_to_model(row) for row in rows]
-
     @classmethod
     async def set_message(
         cls,
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import asyncpg
+
+
+@dataclass(frozen=True, slots=True)
+class TwitchLiveAnnouncementRow:
+    guild_id: int
+    streamer_login: str
+    stream_id: str
+
+
+class TwitchLiveAnnouncementsRepo:
+    @staticmethod
+    async def list_all(conn: asyncpg.Connection) -> list[TwitchLiveAnnouncementRow]:
+        rows = await conn.fetch(
+            """
+            SELECT guild_id, streamer_login, stream_id
+              FROM twitch_live_announcements;
+            """
+        )
+        return [
+            TwitchLiveAnnouncementRow(
+                guild_id=int(row["guild_id"]),
+                streamer_login=str(row["streamer_login"]),
+                stream_id=str(row["stream_id"]),
+            )
+            for row in rows
+        ]
+
+    @staticmethod
+    async def upsert(conn: asyncpg.Connection, *, guild_id: int, streamer_login: str, stream_id: str) -> None:
+        await conn.execute(
+            """
+            INSERT INTO twitch_live_announcements (guild_id, streamer_login, stream_id)
+            VALUES ($1, $2, $3)
+            ON CONFLICT (guild_id, streamer_login)
+            DO UPDATE SET stream_id = EXCLUDED.stream_id,
+                          announced_at = now();
+            """,
+            guild_id,
+            streamer_login,
+            stream_id,
+        )
+
+    @staticmethod
+    async def delete_by_logins(conn: asyncpg.Connection, streamer_logins: list[str]) -> int:
+        result = await conn.execute(
+            """
+            DELETE FROM twitch_live_announcements
+             WHERE streamer_login = ANY($1::text[]);
+            """,
+            streamer_logins,
+        )
+        return int(result.split()[-1])
@@ -57,3 +57,20 @@ class TwitchStreamersRepo:
             )
             for row in rows
         ]
+
+    @staticmethod
+    async def list_all(conn: asyncpg.Connection) -> list[TwitchStreamerRow]:
+        rows = await conn.fetch(
+            """
+            SELECT guild_id, streamer_login
+              FROM twitch_streamers
+             ORDER BY guild_id, streamer_login;
+            """
+        )
+        return [
+            TwitchStreamerRow(
+                guild_id=int(row["guild_id"]),
+                streamer_login=str(row["streamer_login"]),
+            )
+            for row in rows
+        ]
@@ -37,6 +37,28 @@ class UserRepo:
 
         return int(row["user_id"])
 
+    @staticmethod
+    async def ensure_exists_with_status(
+        conn: asyncpg.Connection,
+        *,
+        discord_id: int,
+    ) -> tuple[int, bool]:
+        """
+        Comme ensure_exists, retourne aussi True si la ligne vient d'etre creee.
+        """
+        row = await conn.fetchrow(
+            """
+            INSERT INTO users(discord_id)
+            VALUES ($1)
+            ON CONFLICT (discord_id) DO UPDATE
+            SET last_seen_at = now()
+            RETURNING user_id, (xmax = 0) AS created;
+            """,
+            discord_id,
+        )
+
+        return int(row["user_id"]), bool(row["created"])
+
     @staticmethod
     async def get_user_id(
         conn: asyncpg.Connection,
@@ -55,6 +77,35 @@ class UserRepo:
             user_id,
         )
 
+    @staticmethod
+    async def touch_seen_many(conn: asyncpg.Connection, user_ids: list[int]) -> int:
+        if not user_ids:
+            return 0
+        result = await conn.execute(
+            "UPDATE users SET last_seen_at = now() WHERE user_id = ANY($1);",
+            user_ids,
+        )
+        parts = result.split()
+        return int(parts[-1]) if parts[-1].isdigit() else 0
+
+    @staticmethod
+    async def get_user_ids_many(
+        conn: asyncpg.Connection,
+        discord_ids: list[int],
+    ) -> dict[int, int]:
+        if not discord_ids:
+            return {}
+
+        rows = await conn.fetch(
+            """
+            SELECT discord_id, user_id
+              FROM users
+             WHERE discord_id = ANY($1);
+            """,
+            discord_ids,
+        )
+        return {row["discord_id"]: row["user_id"] for row in rows}
+
     @staticmethod
     async def get_by_discord_id(
         conn: asyncpg.Connection,
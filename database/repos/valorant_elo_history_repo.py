@@ -1,9 +1,12 @@
 # database/repos/valorant_elo_history_repo.py
 
+import re
+
 import asyncpg
+import numpy as np
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional, Sequence
 
 
 @dataclass(frozen=True)
@@ -35,6 +38,122 @@ def _row_to_model(row: asyncpg.Record) -> EloHistoryRow:
     )
 
 
+@dataclass(frozen=True, eq=False)
+class EloHistorySeries:
+    """
+    Historique en colonnes (tableaux NumPy alignes, tries par recorded_at).
+    Evite de materialiser un EloHistoryRow par ligne pour les longs historiques.
+
+    - recorded_us: instants en microsecondes depuis l'epoch (UTC)
+    - rr_delta vaut 0 quand has_rr est faux
+    """
+    recorded_us: np.ndarray
+    elo: np.ndarray
+    rr_delta: np.ndarray
+    has_rr: np.ndarray
+    has_match: np.ndarray
+    is_legacy: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.elo)
+
+    @classmethod
+    def from_columns(cls, rows: Sequence[Sequence[int]]) -> "EloHistorySeries":
+        """rows: (recorded_us, elo, rr_delta, has_rr, has_match, is_legacy), cf. get_history_series."""
+        matrix = np.array([tuple(row) for row in rows], dtype=np.int64).reshape(-1, 6)
+        return cls(
+            recorded_us=matrix[:, 0],
+            elo=matrix[:, 1],
+            rr_delta=matrix[:, 2],
+            has_rr=matrix[:, 3].astype(bool),
+            has_match=matrix[:, 4].astype(bool),
+            is_legacy=matrix[:, 5].astype(bool),
+        )
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Any]) -> "EloHistorySeries":
+        """Conversion depuis des lignes objet (EloHistoryRow ou equivalent)."""
+        return cls.from_columns([
+            (
+                _to_epoch_us(row.recorded_at),
+                row.elo,
+                getattr(row, "rr_delta", None) or 0,
+                getattr(row, "rr_delta", None) is not None,
+                bool(getattr(row, "match_id", None)),
+                getattr(row, "source", None) == "legacy",
+            )
+            for row in rows
+        ])
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+def _to_epoch_us(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // _ONE_MICROSECOND
+
+
+_HISTORY_COLUMNS = (
+    "season", "act", "user_id", "recorded_at", "elo", "is_win",
+    "puuid", "rr_delta", "match_id", "source",
+)
+
+# Meme regle de fusion pour l'insertion unitaire et l'import en lot.
+_ON_CONFLICT_MERGE = """
+            ON CONFLICT (season, act, user_id, recorded_at)
+            DO UPDATE SET
+                puuid = COALESCE(valorant_elo_history_parent.puuid, EXCLUDED.puuid),
+                rr_delta = COALESCE(valorant_elo_history_parent.rr_delta, EXCLUDED.rr_delta),
+                match_id = COALESCE(valorant_elo_history_parent.match_id, EXCLUDED.match_id),
+                source = CASE
+                    WHEN valorant_elo_history_parent.source = 'legacy'
+                         AND EXCLUDED.source <> 'legacy'
+                    THEN EXCLUDED.source
+                    ELSE valorant_elo_history_parent.source
+                END"""
+
+
+def _history_filter(
+    user_id: int,
+    season: int | None,
+    act: int | None,
+    puuid: str | None,
+    legacy_only: bool,
+    since: datetime | None = None,
+) -> tuple[str, list]:
+    sql = " WHERE user_id = $1"
+    params: list = [user_id]
+
+    if season is not None and act is not None:
+        sql += f" AND season = ${len(params) + 1} AND act = ${len(params) + 2}"
+        params += [season, act]
+
+    if puuid is not None:
+        sql += f" AND puuid = ${len(params) + 1}"
+        params.append(puuid)
+    elif legacy_only:
+        sql += " AND puuid IS NULL AND source = 'legacy'"
+
+    if since is not None:
+        # La derniere ligne anterieure a `since` est gardee: elle sert de point de
+        # depart aux deltas et a la courbe de la periode.
+        since_param = f"${len(params) + 1}"
+        sql += (
+            " AND recorded_at >= COALESCE(("
+            "SELECT max(recorded_at) FROM valorant_elo_history_parent"
+            + sql
+            + f" AND recorded_at < {since_param}), {since_param})"
+        )
+        params.append(since)
+    return sql, params
+
+
+_ACT_PARTITION_NAME = re.compile(r"^valorant_elo_history_season_(\d+)_act_(\d+)$")
+
+
 def _validate_partition_key(season: int, act: int) -> None:
     if not isinstance(season, int) or not isinstance(act, int):
         raise TypeError("season and act must be integers")
@@ -54,29 +173,42 @@ class ValorantEloHistoryRepo:
         act: int | None = None,
         puuid: str | None = None,
         legacy_only: bool = False,
+        since: datetime | None = None,
     ) -> list[EloHistoryRow]:
+        where, params = _history_filter(user_id, season, act, puuid, legacy_only, since)
         sql = (
             "SELECT season, act, user_id, recorded_at, elo, is_win, "
             "       puuid, rr_delta, match_id, source "
-            "  FROM valorant_elo_history_parent "
-            " WHERE user_id = $1"
+            "  FROM valorant_elo_history_parent"
+            + where
+            + " ORDER BY recorded_at;"
         )
-        params: list = [user_id]
-
-        if season is not None and act is not None:
-            sql += f" AND season = ${len(params) + 1} AND act = ${len(params) + 2}"
-            params += [season, act]
-
-        if puuid is not None:
-            sql += f" AND puuid = ${len(params) + 1}"
-            params.append(puuid)
-        elif legacy_only:
-            sql += " AND puuid IS NULL AND source = 'legacy'"
-
-        sql += " ORDER BY recorded_at;"
         rows = await conn.fetch(sql, *params)
         return [_row_to_model(r) for r in rows]
 
+    @staticmethod
+    async def get_history_series(
+        conn: asyncpg.Connection,
+        user_id: int,
+        season: int | None = None,
+        act: int | None = None,
+        puuid: str | None = None,
+        legacy_only: bool = False,
+        since: datetime | None = None,
+    ) -> EloHistorySeries:
+        """Meme filtre que get_history, mais seulement les colonnes utiles aux stats, en tableaux."""
+        where, params = _history_filter(user_id, season, act, puuid, legacy_only, since)
+        sql = (
+            "SELECT (EXTRACT(EPOCH FROM recorded_at) * 1000000)::bigint, elo, "
+            "       COALESCE(rr_delta, 0), (rr_delta IS NOT NULL)::int, "
+            "       (match_id IS NOT NULL AND match_id <> '')::int, (source = 'legacy')::int "
+            "  FROM valorant_elo_history_parent"
+            + where
+            + " ORDER BY recorded_at;"
+        )
+        rows = await conn.fetch(sql, *params)
+        return EloHistorySeries.from_columns(rows)
+
     @staticmethod
     async def get_last_row(
         conn: asyncpg.Connection,
@@ -139,6 +271,25 @@ class ValorantEloHistoryRepo:
             return None
         return row["season"], row["act"]
 
+    @staticmethod
+    async def list_partitions(conn: asyncpg.Connection) -> set[tuple[int, int]]:
+        """Partitions (season, act) existantes, lues dans le catalogue (pg_inherits)."""
+        rows = await conn.fetch(
+            """
+            SELECT c.relname
+              FROM pg_inherits s
+              JOIN pg_inherits a ON a.inhparent = s.inhrelid
+              JOIN pg_class c ON c.oid = a.inhrelid
+             WHERE s.inhparent = 'valorant_elo_history_parent'::regclass;
+            """
+        )
+        partitions: set[tuple[int, int]] = set()
+        for row in rows:
+            m = _ACT_PARTITION_NAME.match(row["relname"])
+            if m:
+                partitions.add((int(m.group(1)), int(m.group(2))))
+        return partitions
+
     # ---- writes ----
 
     @staticmethod
@@ -181,18 +332,7 @@ class ValorantEloHistoryRepo:
                    (season, act, user_id, recorded_at, elo, is_win,
                     puuid, rr_delta, match_id, source)
             VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
-            ON CONFLICT (season, act, user_id, recorded_at)
-            DO UPDATE SET
-                puuid = COALESCE(valorant_elo_history_parent.puuid, EXCLUDED.puuid),
-                rr_delta = COALESCE(valorant_elo_history_parent.rr_delta, EXCLUDED.rr_delta),
-                match_id = COALESCE(valorant_elo_history_parent.match_id, EXCLUDED.match_id),
-                source = CASE
-                    WHEN valorant_elo_history_parent.source = 'legacy'
-                         AND EXCLUDED.source <> 'legacy'
-                    THEN EXCLUDED.source
-                    ELSE valorant_elo_history_parent.source
-                END;
-            """,
+            """ + _ON_CONFLICT_MERGE + ";",
             season,
             act,
             user_id,
@@ -205,3 +345,61 @@ class ValorantEloHistoryRepo:
             source,
         )
         return result != "INSERT 0 0"
+
+    @staticmethod
+    async def bulk_insert_entries(
+        conn: asyncpg.Connection,
+        rows: Sequence[EloHistoryRow],
+    ) -> int:
+        """
+        Import en lot: COPY dans une table temporaire puis une seule fusion
+        dans valorant_elo_history_parent. Les partitions doivent exister.
+        Retourne le nombre de lignes inserees ou completees.
+        """
+        if not rows:
+            return 0
+
+        await conn.execute(
+            """
+            CREATE TEMP TABLE IF NOT EXISTS tmp_valorant_elo_history_import (
+                season      INTEGER NOT NULL,
+                act         INTEGER NOT NULL,
+                user_id     BIGINT NOT NULL,
+                recorded_at TIMESTAMPTZ NOT NULL,
+                elo         INTEGER NOT NULL,
+                is_win      BOOLEAN NOT NULL,
+                puuid       VARCHAR(255),
+                rr_delta    INTEGER,
+                match_id    VARCHAR(128),
+                source      VARCHAR(32) NOT NULL
+            ) ON COMMIT DROP;
+            """
+        )
+        await conn.execute("TRUNCATE tmp_valorant_elo_history_import;")
+        await conn.copy_records_to_table(
+            "tmp_valorant_elo_history_import",
+            records=[
+                (
+                    r.season, r.act, r.user_id, r.recorded_at, r.elo, r.is_win,
+                    r.puuid, r.rr_delta, r.match_id, r.source,
+                )
+                for r in rows
+            ],
+            columns=_HISTORY_COLUMNS,
+        )
+
+        # DISTINCT ON: un meme INSERT ... ON CONFLICT ne peut pas toucher deux fois la meme ligne.
+        result = await conn.execute(
+            """
+            INSERT INTO valorant_elo_history_parent
+                   (season, act, user_id, recorded_at, elo, is_win,
+                    puuid, rr_delta, match_id, source)
+            SELECT DISTINCT ON (season, act, user_id, recorded_at)
+                   season, act, user_id, recorded_at, elo, is_win,
+                   puuid, rr_delta, match_id, source
+              FROM tmp_valorant_elo_history_import
+             ORDER BY season, act, user_id, recorded_at
+            """ + _ON_CONFLICT_MERGE + ";"
+        )
+        parts = result.split()
+        return int(parts[-1]) if parts[-1].isdigit() else 0
@@ -31,9 +31,22 @@ class ValorantInfoRow:
 
 
 @dataclass(frozen=True)
-class ValorantUserPresenceRow:
-    user_id: int
+class ValorantPipelineUpdate:
+    """Resultat pipeline d'un utilisateur, applique en lot par apply_pipeline_results."""
     discord_id: int
+    success: bool
+    # Compte lu par le pipeline: un relink (/link) entre-temps n'est pas ecrase
+    read_pseudo: str
+    read_tag: str
+    puuid: str | None = None
+    region: str | None = None
+    platform: str | None = None
+    rank: str | None = None
+    elo: int | None = None
+    pseudo: str | None = None
+    tag: str | None = None
+    current_season: int | None = None
+    current_act: int | None = None
 
 
 def _row_to_model(row: asyncpg.Record) -> ValorantInfoRow:
@@ -314,6 +327,62 @@ class ValorantInfoRepo:
             user_id,
         )
 
+    @staticmethod
+    async def apply_pipeline_results(
+        conn: asyncpg.Connection, updates: list[ValorantPipelineUpdate]
+    ) -> int:
+        """
+        Applique succes et erreurs du pipeline en une seule requete.
+        Meme semantique que update_pipeline_success / update_pipeline_error, sauf
+        pour les comptes dont pseudo/tag ont change depuis la lecture (relink).
+        """
+        if not updates:
+            return 0
+        result = await conn.execute(
+            """
+            UPDATE valorant_info vi
+               SET last_checked_at = NOW(),
+                   error_count = CASE WHEN r.success THEN 0 ELSE vi.error_count + 1 END,
+                   last_error_at = CASE WHEN r.success THEN NULL ELSE NOW() END,
+                   puuid = COALESCE(r.puuid, vi.puuid),
+                   region = COALESCE(r.region, vi.region),
+                   platform = COALESCE(r.platform, vi.platform),
+                   rank = COALESCE(r.rank, vi.rank),
+                   elo = COALESCE(r.elo, vi.elo),
+                   pseudo = COALESCE(r.pseudo, vi.pseudo),
+                   tag = COALESCE(r.tag, vi.tag),
+                   current_season = COALESCE(r.current_season, vi.current_season),
+                   current_act = COALESCE(r.current_act, vi.current_act)
+              FROM unnest(
+                       $1::bigint[], $2::boolean[], $3::text[], $4::text[],
+                       $5::text[], $6::text[], $7::integer[], $8::text[],
+                       $9::text[], $10::integer[], $11::integer[],
+                       $12::text[], $13::text[]
+                   ) AS r(discord_id, success, puuid, region, platform, rank,
+                          elo, pseudo, tag, current_season, current_act,
+                          read_pseudo, read_tag)
+              JOIN users u ON u.discord_id = r.discord_id
+             WHERE vi.user_id = u.user_id
+               AND vi.pseudo = r.read_pseudo
+               AND vi.tag = r.read_tag;
+            """,
+            [u.discord_id for u in updates],
+            [u.success for u in updates],
+            [u.puuid for u in updates],
+            [u.region for u in updates],
+            [u.platform for u in updates],
+            [u.rank for u in updates],
+            [u.elo for u in updates],
+            [u.pseudo for u in updates],
+            [u.tag for u in updates],
+            [u.current_season for u in updates],
+            [u.current_act for u in updates],
+            [u.read_pseudo for u in updates],
+            [u.read_tag for u in updates],
+        )
+        parts = result.split()
+        return int(parts[-1]) if parts[-1].isdigit() else 0
+
     @staticmethod
     async def reset_for_account_change(
         conn: asyncpg.Connection, user_id: int, pseudo: str, tag: str
@@ -350,8 +419,8 @@ class ValorantInfoRepo:
         return result != "DELETE 0"
 
     @staticmethod
-    async def mark_inactive(conn: asyncpg.Connection, user_id: int) -> None:
-        await conn.execute(
+    async def mark_inactive(conn: asyncpg.Connection, user_id: int) -> bool:
+        result = await conn.execute(
             """
             UPDATE valorant_info
                SET is_active = FALSE,
@@ -361,6 +430,7 @@ class ValorantInfoRepo:
             """,
             user_id,
         )
+        return result != "UPDATE 0"
 
     @staticmethod
     async def mark_active(conn: asyncpg.Connection, user_id: int) -> bool:
@@ -378,47 +448,6 @@ class ValorantInfoRepo:
         )
         return result != "UPDATE 0"
 
-    @staticmethod
-    async def bulk_mark_inactive(
-        conn: asyncpg.Connection, user_ids: list[int]
-    ) -> int:
-        if not user_ids:
-            return 0
-        result = await conn.execute(
-            """
-            UPDATE valorant_info
-               SET is_active = FALSE,
-                   deactivated_at = NOW()
-             WHERE user_id = ANY($1)
-               AND is_active = TRUE;
-            """,
-            user_ids,
-        )
-        # result format: "UPDATE N"
-        parts = result.split()
-        return int(parts[-1]) if parts[-1].isdigit() else 0
-
-    @staticmethod
-    async def bulk_mark_active(
-        conn: asyncpg.Connection, user_ids: list[int]
-    ) -> int:
-        if not user_ids:
-            return 0
-        result = await conn.execute(
-            """
-            UPDATE valorant_info
-               SET is_active = TRUE,
-                   deactivated_at = NULL,
-                   last_checked_at = NULL,
-                   error_count = 0
-             WHERE user_id = ANY($1)
-               AND is_active = FALSE;
-            """,
-            user_ids,
-        )
-        parts = result.split()
-        return int(parts[-1]) if parts[-1].isdigit() else 0
-
     @staticmethod
     async def get_for_pipeline_with_discord_id(
         conn: asyncpg.Connection, limit: int
@@ -443,45 +472,6 @@ class ValorantInfoRepo:
             limit,
         )
 
-    @staticmethod
-    async def get_all_discord_ids(
-        conn: asyncpg.Connection,
-    ) -> list[int]:
-        rows = await conn.fetch(
-            """
-            SELECT u.discord_id
-              FROM valorant_info vi
-              JOIN users u ON u.user_id = vi.user_id
-             WHERE vi.pseudo IS NOT NULL
-               AND vi.tag IS NOT NULL;
-            """
-        )
-        return [r["discord_id"] for r in rows]
-
-    @staticmethod
-    async def get_user_ids_by_discord_ids(
-        conn: asyncpg.Connection,
-        discord_ids: list[int],
-    ) -> list[ValorantUserPresenceRow]:
-        if not discord_ids:
-            return []
-        rows = await conn.fetch(
-            """
-            SELECT u.user_id, u.discord_id
-              FROM users u
-              JOIN valorant_info vi ON vi.user_id = u.user_id
-             WHERE u.discord_id = ANY($1);
-            """,
-            discord_ids,
-        )
-        return [
-            ValorantUserPresenceRow(
-                user_id=row["user_id"],
-                discord_id=row["discord_id"],
-            )
-            for row in rows
-        ]
-
     @staticmethod
     async def enable_tracking(conn: asyncpg.Connection, user_id: int) -> None:
         await conn.execute(
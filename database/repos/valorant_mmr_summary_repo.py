@@ -0,0 +1,208 @@
+# database/repos/valorant_mmr_summary_repo.py
+
+import asyncpg
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Optional, Sequence
+
+# Version des agregats: un rollup construit par une version anterieure n'est pas lu
+SUMMARY_VERSION = 2
+
+
+@dataclass(frozen=True)
+class MmrDailySummaryRow:
+    season: int
+    act: int
+    day: date
+    games: int
+    net_change: int
+    wins: int
+    win_total: int
+    losses: int
+    loss_total: int
+    last_diff: int
+    open_at: datetime
+    open_elo: int
+    close_at: datetime
+    close_elo: int
+    uses_rr_delta: bool
+    import_elo: Optional[int]
+
+
+_SUMMARY_COLUMNS = (
+    "season, act, day, games, net_change, wins, win_total, losses, loss_total, "
+    "last_diff, open_at, open_elo, close_at, close_elo, uses_rr_delta, import_elo"
+)
+
+
+def _row_to_model(row: asyncpg.Record) -> MmrDailySummaryRow:
+    return MmrDailySummaryRow(
+        season=row["season"],
+        act=row["act"],
+        day=row["day"],
+        games=row["games"],
+        net_change=row["net_change"],
+        wins=row["wins"],
+        win_total=row["win_total"],
+        losses=row["losses"],
+        loss_total=row["loss_total"],
+        last_diff=row["last_diff"],
+        open_at=row["open_at"],
+        open_elo=row["open_elo"],
+        close_at=row["close_at"],
+        close_elo=row["close_elo"],
+        uses_rr_delta=row["uses_rr_delta"],
+        import_elo=row["import_elo"],
+    )
+
+
+class ValorantMmrSummaryRepo:
+    """
+    Agregats MMR journaliers (valorant_mmr_daily_summary).
+    account = puuid de l'historique, '' pour l'historique legacy sans puuid.
+    season = act = 0: agregats de tout l'historique du compte.
+    """
+
+    # ---- reads ----
+
+    @staticmethod
+    async def is_built(conn: asyncpg.Connection, user_id: int, account: str) -> bool:
+        row = await conn.fetchrow(
+            """
+            SELECT 1
+              FROM valorant_mmr_summary_state
+             WHERE user_id = $1 AND account = $2 AND version >= $3;
+            """,
+            user_id,
+            account,
+            SUMMARY_VERSION,
+        )
+        return row is not None
+
+    @staticmethod
+    async def get_summaries(
+        conn: asyncpg.Connection,
+        user_id: int,
+        account: str,
+        season: int | None = None,
+        act: int | None = None,
+    ) -> list[MmrDailySummaryRow]:
+        sql = (
+            f"SELECT {_SUMMARY_COLUMNS} "
+            "  FROM valorant_mmr_daily_summary "
+            " WHERE user_id = $1 AND account = $2"
+        )
+        params: list = [user_id, account]
+        if season is not None and act is not None:
+            sql += " AND season = $3 AND act = $4"
+            params += [season, act]
+        sql += " ORDER BY close_at;"
+        rows = await conn.fetch(sql, *params)
+        return [_row_to_model(r) for r in rows]
+
+    @staticmethod
+    async def get_last_before_many(
+        conn: asyncpg.Connection,
+        user_id: int,
+        account: str,
+        scopes: Sequence[tuple[int, int]],
+        day: date,
+    ) -> dict[tuple[int, int], MmrDailySummaryRow]:
+        """Dernier agregat anterieur a `day` de chaque (season, act) de scopes."""
+        rows = await conn.fetch(
+            f"""
+            SELECT DISTINCT ON (season, act) {_SUMMARY_COLUMNS}
+              FROM valorant_mmr_daily_summary
+             WHERE user_id = $1 AND account = $2 AND day < $5
+               AND (season, act) IN (SELECT * FROM unnest($3::int[], $4::int[]))
+             ORDER BY season, act, day DESC;
+            """,
+            user_id,
+            account,
+            [season for season, _ in scopes],
+            [act for _, act in scopes],
+            day,
+        )
+        return {(r["season"], r["act"]): _row_to_model(r) for r in rows}
+
+    # ---- writes ----
+
+    @staticmethod
+    async def replace_days(
+        conn: asyncpg.Connection,
+        user_id: int,
+        account: str,
+        scopes: Sequence[tuple[int, int]],
+        from_day: date | None,
+        summaries: Sequence[Any],
+    ) -> None:
+        """
+        Remplace les agregats des (season, act) de scopes a partir de from_day (tous
+        si None): un jour qui n'a plus de partie disparait, les autres sont reecrits.
+        """
+        sql = (
+            "DELETE FROM valorant_mmr_daily_summary "
+            " WHERE user_id = $1 AND account = $2"
+            "   AND (season, act) IN (SELECT * FROM unnest($3::int[], $4::int[]))"
+        )
+        params: list = [
+            user_id,
+            account,
+            [season for season, _ in scopes],
+            [act for _, act in scopes],
+        ]
+        if from_day is not None:
+            sql += " AND day >= $5"
+            params.append(from_day)
+        await conn.execute(sql + ";", *params)
+
+        if not summaries:
+            return
+        await conn.executemany(
+            f"""
+            INSERT INTO valorant_mmr_daily_summary
+                   (user_id, account, {_SUMMARY_COLUMNS}, updated_at)
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18, NOW());
+            """,
+            [
+                (
+                    user_id, account, s.season, s.act, s.day, s.games, s.net_change,
+                    s.wins, s.win_total, s.losses, s.loss_total, s.last_diff,
+                    s.open_at, s.open_elo, s.close_at, s.close_elo, s.uses_rr_delta, s.import_elo,
+                )
+                for s in summaries
+            ],
+        )
+
+    @staticmethod
+    async def delete_account(conn: asyncpg.Connection, user_id: int, account: str) -> None:
+        await conn.execute(
+            """
+            DELETE FROM valorant_mmr_daily_summary WHERE user_id = $1 AND account = $2;
+            """,
+            user_id,
+            account,
+        )
+
+    @staticmethod
+    async def mark_built(conn: asyncpg.Connection, user_id: int, account: str) -> None:
+        await conn.execute(
+            """
+            INSERT INTO valorant_mmr_summary_state (user_id, account, built_at, version)
+            VALUES ($1, $2, NOW(), $3)
+            ON CONFLICT (user_id, account) DO UPDATE SET built_at = NOW(), version = EXCLUDED.version;
+            """,
+            user_id,
+            account,
+            SUMMARY_VERSION,
+        )
+
+    @staticmethod
+    async def clear_built(conn: asyncpg.Connection, user_id: int, account: str) -> None:
+        await conn.execute(
+            """
+            DELETE FROM valorant_mmr_summary_state WHERE user_id = $1 AND account = $2;
+            """,
+            user_id,
+            account,
+        )
@@ -1,83 +1,67 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Optional
 
 import asyncpg
 
 
 @dataclass(frozen=True, slots=True)
-class ValorantSentBundleRow:
+class ShopNotifyTargetRow:
     guild_id: int
-    bundle_uuid: str
-    notified_at: datetime
+    channel_id: int
+    sent_bundle_uuids: frozenset[str]
 
 
 class ValorantSentBundlesRepo:
     @staticmethod
-    async def get(
+    async def list_notify_targets(
         conn: asyncpg.Connection,
         *,
-        guild_id: int,
-        bundle_uuid: str,
-    ) -> Optional[ValorantSentBundleRow]:
-        row = await conn.fetchrow(
+        guild_ids: list[int],
+        channel_key: str,
+        bundle_uuids: list[str],
+    ) -> list[ShopNotifyTargetRow]:
+        """Guilds avec un salon channel_key configure, et lesquels de bundle_uuids y sont deja envoyes."""
+        rows = await conn.fetch(
             """
-            SELECT guild_id, bundle_uuid, notified_at
-              FROM valorant_sent_bundles
-             WHERE guild_id = $1
-               AND bundle_uuid = $2;
+            SELECT gc.guild_id,
+                   gc.channel_id,
+                   COALESCE(
+                       array_agg(sb.bundle_uuid) FILTER (WHERE sb.bundle_uuid IS NOT NULL),
+                       '{}'::text[]
+                   ) AS sent_bundle_uuids
+              FROM guild_channels gc
+              LEFT JOIN valorant_sent_bundles sb
+                ON sb.guild_id = gc.guild_id
+               AND sb.bundle_uuid = ANY($3::text[])
+             WHERE gc.guild_id = ANY($1::bigint[])
+               AND gc.key = $2
+             GROUP BY gc.guild_id, gc.channel_id
+             ORDER BY gc.guild_id;
             """,
-            guild_id,
-            bundle_uuid,
+            guild_ids,
+            channel_key,
+            bundle_uuids,
         )
-        if row is None:
-            return None
-
-        return ValorantSentBundleRow(
-            guild_id=int(row["guild_id"]),
-            bundle_uuid=str(row["bundle_uuid"]),
-            notified_at=row["notified_at"],
-        )
-
-    @staticmethod
-    async def exists(
-        conn: asyncpg.Connection,
-        *,
-        guild_id: int,
-        bundle_uuid: str,
-    ) -> bool:
-        return bool(
-            await conn.fetchval(
-                """
-                SELECT EXISTS(
-                    SELECT 1
-                      FROM valorant_sent_bundles
-                     WHERE guild_id = $1
-                       AND bundle_uuid = $2
-                );
-                """,
-                guild_id,
-                bundle_uuid,
+        return [
+            ShopNotifyTargetRow(
+                guild_id=int(row["guild_id"]),
+                channel_id=int(row["channel_id"]),
+                sent_bundle_uuids=frozenset(row["sent_bundle_uuids"]),
             )
-        )
+            for row in rows
+        ]
 
     @staticmethod
-    async def insert(
-        conn: asyncpg.Connection,
-        *,
-        guild_id: int,
-        bundle_uuid: str,
-    ) -> bool:
-        row = await conn.fetchrow(
+    async def insert_many(conn: asyncpg.Connection, sent: list[tuple[int, str]]) -> int:
+        result = await conn.execute(
             """
             INSERT INTO valorant_sent_bundles (guild_id, bundle_uuid)
-            VALUES ($1, $2)
-            ON CONFLICT (guild_id, bundle_uuid) DO NOTHING
-            RETURNING guild_id;
+            SELECT guild_id, bundle_uuid
+              FROM unnest($1::bigint[], $2::text[]) AS s(guild_id, bundle_uuid)
+            ON CONFLICT (guild_id, bundle_uuid) DO NOTHING;
             """,
-            guild_id,
-            bundle_uuid,
+            [guild_id for guild_id, _ in sent],
+            [bundle_uuid for _, bundle_uuid in sent],
         )
-        return row is not None
+        return int(result.split()[-1])
@@ -57,12 +57,15 @@ EXPECTED_TABLES = frozenset(
         "scrims",
         "tournament_teams",
         "tournaments",
+        "twitch_live_announcements",
         "twitch_streamers",
         "unban_requests",
         "users",
         "user_profiles",
         "valorant_elo_history_parent",
         "valorant_info",
+        "valorant_mmr_daily_summary",
+        "valorant_mmr_summary_state",
         "valorant_sent_bundles",
     }
 )
@@ -381,6 +384,7 @@ EXPECTED_COLUMNS: Mapping[str, frozenset[str]] = {
             "updated_at",
         }
     ),
+    "twitch_live_announcements": frozenset({"guild_id", "streamer_login", "stream_id", "announced_at"}),
     "twitch_streamers": frozenset(
         {
             "guild_id",
@@ -458,6 +462,30 @@ EXPECTED_COLUMNS: Mapping[str, frozenset[str]] = {
             "source",
         }
     ),
+    "valorant_mmr_daily_summary": frozenset(
+        {
+            "user_id",
+            "account",
+            "season",
+            "act",
+            "day",
+            "games",
+            "net_change",
+            "wins",
+            "win_total",
+            "losses",
+            "loss_total",
+            "last_diff",
+            "open_at",
+            "open_elo",
+            "close_at",
+            "close_elo",
+            "uses_rr_delta",
+            "import_elo",
+            "updated_at",
+        }
+    ),
+    "valorant_mmr_summary_state": frozenset({"user_id", "account", "built_at", "version"}),
     "valorant_sent_bundles": frozenset({"guild_id", "bundle_uuid", "notified_at"}),
 }
 
@@ -751,6 +779,7 @@ EXPECTED_INDEXES = frozenset(
         "idx_valorant_info_pseudo_tag",
         "idx_valorant_info_puuid",
         "idx_valorant_elo_history_user_puuid_recorded_at",
+        "idx_valorant_elo_history_user_recorded_at",
         "idx_valorant_sent_bundles_guild_id",
     }
 )
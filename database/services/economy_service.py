@@ -4,10 +4,10 @@ from dataclasses import dataclass
 from datetime import date
 from typing import Optional
 
+from database.identity_map import UserIdentityMap
 from database.repos.economy_inventory_repo import EconomyInventoryRepo
 from database.repos.economy_profiles_repo import EconomyProfilesRepo
 from database.repos.guilds_repo import GuildsRepo
-from database.repos.user_repo import UserRepo
 
 
 @dataclass(frozen=True, slots=True)
@@ -46,8 +46,9 @@ class TransferInfo:
 
 
 class EconomyDbService:
-    def __init__(self, db) -> None:
+    def __init__(self, db, identity: UserIdentityMap | None = None) -> None:
         self._db = db
+        self._identity = identity if identity is not None else UserIdentityMap()
 
     async def get_profile(
         self,
@@ -58,7 +59,7 @@ class EconomyDbService:
     ) -> EconomyProfileInfo:
         async with self._db.transaction() as conn:
             await GuildsRepo.ensure_exists(conn, guild_id, guild_name)
-            user_id = await UserRepo.ensure_exists(conn, discord_id=discord_user_id)
+            user_id = await self._identity.ensure_user_id(conn, discord_user_id)
             row = await EconomyProfilesRepo.ensure_exists(conn, guild_id=guild_id, user_id=user_id)
             return EconomyProfileInfo(
                 guild_id=row.guild_id,
@@ -78,7 +79,7 @@ class EconomyDbService:
     ) -> DailyClaimInfo:
         async with self._db.transaction() as conn:
             await GuildsRepo.ensure_exists(conn, guild_id, guild_name)
-            user_id = await UserRepo.ensure_exists(conn, discord_id=discord_user_id)
+            user_id = await self._identity.ensure_user_id(conn, discord_user_id)
             profile = await EconomyProfilesRepo.ensure_exists(conn, guild_id=guild_id, user_id=user_id)
             if profile.last_daily_claim == claim_date:
                 return DailyClaimInfo(
@@ -113,7 +114,7 @@ class EconomyDbService:
     ) -> PurchaseInfo:
         async with self._db.transaction() as conn:
             await GuildsRepo.ensure_exists(conn, guild_id, guild_name)
-            user_id = await UserRepo.ensure_exists(conn, discord_id=discord_user_id)
+            user_id = await self._identity.ensure_user_id(conn, discord_user_id)
             await EconomyProfilesRepo.ensure_exists(conn, guild_id=guild_id, user_id=user_id)
             profile = await EconomyProfilesRepo.spend_if_enough(
                 conn,
@@ -146,7 +147,7 @@ class EconomyDbService:
     ) -> tuple[EconomyProfileInfo, tuple[EconomyInventoryItemInfo, ...]]:
         async with self._db.transaction() as conn:
             await GuildsRepo.ensure_exists(conn, guild_id, guild_name)
-            user_id = await UserRepo.ensure_exists(conn, discord_id=discord_user_id)
+            user_id = await self._identity.ensure_user_id(conn, discord_user_id)
             profile = await EconomyProfilesRepo.ensure_exists(conn, guild_id=guild_id, user_id=user_id)
             items = await EconomyInventoryRepo.list_for_user(conn, guild_id=guild_id, user_id=user_id)
             return (
@@ -170,8 +171,8 @@ class EconomyDbService:
     ) -> TransferInfo:
         async with self._db.transaction() as conn:
             await GuildsRepo.ensure_exists(conn, guild_id, guild_name)
-            from_user_id = await UserRepo.ensure_exists(conn, discord_id=from_discord_user_id)
-            to_user_id = await UserRepo.ensure_exists(conn, discord_id=to_discord_user_id)
+            from_user_id = await self._identity.ensure_user_id(conn, from_discord_user_id)
+            to_user_id = await self._identity.ensure_user_id(conn, to_discord_user_id)
             await EconomyProfilesRepo.ensure_exists(conn, guild_id=guild_id, user_id=from_user_id)
             await EconomyProfilesRepo.ensure_exists(conn, guild_id=guild_id, user_id=to_user_id)
 
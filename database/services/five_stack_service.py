@@ -4,6 +4,7 @@ from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Optional
 
+from database.identity_map import UserIdentityMap
 from database.repos.five_stack_feedback_repo import FiveStackFeedbackRepo
 from database.repos.five_stack_match_participants_repo import FiveStackMatchParticipantRow, FiveStackMatchParticipantsRepo
 from database.repos.five_stack_matches_repo import FiveStackMatchRow, FiveStackMatchesRepo
@@ -13,7 +14,6 @@ from database.repos.five_stack_team_members_repo import FiveStackTeamMembersRepo
 from database.repos.five_stack_teams_repo import FiveStackTeamRow, FiveStackTeamsRepo
 from database.repos.guild_member_repo import GuildMemberRepo
 from database.repos.guilds_repo import GuildsRepo
-from database.repos.user_repo import UserRepo
 
 
 @dataclass(frozen=True, slots=True)
@@ -29,8 +29,9 @@ class FiveStackMatchBundle:
 
 
 class FiveStackDbService:
-    def __init__(self, db) -> None:
+    def __init__(self, db, identity: UserIdentityMap | None = None) -> None:
         self._db = db
+        self._identity = identity if identity is not None else UserIdentityMap()
 
     async def create_team(
         self,
@@ -87,12 +88,8 @@ class FiveStackDbService:
 
     async def list_teams(self, guild_id: int) -> tuple[FiveStackTeamInfo, ...]:
         async with self._db.acquire() as conn:
-            teams = await FiveStackTeamsRepo.list_active(conn, guild_id)
-            result = []
-            for team in teams:
-                members = await FiveStackTeamMembersRepo.list_by_team(conn, guild_id=guild_id, team_code=team.code)
-                result.append(FiveStackTeamInfo(team=team, member_ids=tuple(row.member_discord_id for row in members)))
-            return tuple(result)
+            rows = await FiveStackTeamsRepo.list_active_with_members(conn, guild_id)
+            return tuple(FiveStackTeamInfo(team=team, member_ids=member_ids) for team, member_ids in rows)
 
     async def add_team_member(
         self,
@@ -180,18 +177,17 @@ class FiveStackDbService:
 
     async def list_old_teams(self, *, hours: int) -> tuple[FiveStackTeamInfo, ...]:
         async with self._db.acquire() as conn:
-            teams = await FiveStackTeamsRepo.list_older_than(conn, hours=hours)
-            result = []
-            for team in teams:
-                members = await FiveStackTeamMembersRepo.list_by_team(conn, guild_id=team.guild_id, team_code=team.code)
-                result.append(FiveStackTeamInfo(team=team, member_ids=tuple(row.member_discord_id for row in members)))
-            return tuple(result)
+            rows = await FiveStackTeamsRepo.list_older_than_with_members(conn, hours=hours)
+            return tuple(FiveStackTeamInfo(team=team, member_ids=member_ids) for team, member_ids in rows)
 
     async def add_queue_entry(self, **kwargs) -> FiveStackQueueRow:
         async with self._db.transaction() as conn:
             await GuildsRepo.ensure_exists(conn, kwargs["guild_id"], kwargs.get("guild_name"))
-            for discord_id in kwargs["team_member_ids"] or (kwargs["discord_member_id"],):
-                await self._ensure_member(conn, guild_id=kwargs["guild_id"], guild_name=kwargs.get("guild_name"), discord_id=discord_id)
+            member_ids = kwargs["team_member_ids"] or (kwargs["discord_member_id"],)
+            # Identites de toute l'equipe en une requete, puis un seul mark_join
+            await self._identity.get_user_ids_many(conn, member_ids)
+            user_ids = [await self._identity.ensure_user_id(conn, discord_id) for discord_id in member_ids]
+            await GuildMemberRepo.mark_join_many(conn, guild_id=kwargs["guild_id"], user_ids=user_ids)
             return await FiveStackQueueRepo.upsert(conn, **{k: v for k, v in kwargs.items() if k != "guild_name"})
 
     async def remove_from_queue(self, *, guild_id: int, discord_member_id: int) -> bool:
@@ -245,11 +241,11 @@ class FiveStackDbService:
                 region=first.region,
                 platform=first.platform,
             )
+            participants = []
             for entry in entries:
                 wait = max(0, int((now - (entry.queued_at if entry.queued_at.tzinfo else entry.queued_at.replace(tzinfo=timezone.utc))).total_seconds()))
-                for member_id in entry.all_member_ids:
-                    await FiveStackMatchParticipantsRepo.insert(
-                        conn,
+                participants.extend(
+                    FiveStackMatchParticipantRow(
                         match_id=match.id,
                         discord_member_id=member_id,
                         elo_at_match=entry.elo,
@@ -257,14 +253,20 @@ class FiveStackDbService:
                         entry_type=entry.entry_type,
                         wait_time_seconds=wait,
                     )
-                    await FiveStackPlayerStatsRepo.upsert_after_match(
-                        conn,
-                        guild_id=guild_id,
-                        discord_member_id=member_id,
-                        wait_time_seconds=wait,
-                        is_solo=entry.entry_type == 1,
-                        preferred_role=entry.roles[0] if entry.roles else None,
-                    )
+                    for member_id in entry.all_member_ids
+                )
+            await FiveStackMatchParticipantsRepo.insert_many(conn, match_id=match.id, participants=participants)
+            await FiveStackPlayerStatsRepo.upsert_many_after_match(
+                conn,
+                guild_id=guild_id,
+                discord_member_ids=[participant.discord_member_id for participant in participants],
+                wait_time_seconds=[participant.wait_time_seconds for participant in participants],
+                is_solo=[participant.entry_type == 1 for participant in participants],
+                preferred_roles=[
+                    participant.roles_selected[0] if participant.roles_selected else None
+                    for participant in participants
+                ],
+            )
             await FiveStackQueueRepo.delete_ids(conn, guild_id=guild_id, entry_ids=tuple(entry.id for entry in entries))
             return match
 
@@ -294,14 +296,20 @@ class FiveStackDbService:
         limit: int,
     ) -> tuple[FiveStackMatchBundle, ...]:
         async with self._db.acquire() as conn:
-            participants = await FiveStackMatchParticipantsRepo.list_by_member(conn, discord_member_id=discord_member_id, limit=limit)
-            result = []
-            for participant in participants:
-                match = await FiveStackMatchesRepo.get_by_id(conn, participant.match_id)
-                if match and match.guild_id == guild_id:
-                    all_participants = await FiveStackMatchParticipantsRepo.list_by_match(conn, match.id)
-                    result.append(FiveStackMatchBundle(match=match, participants=tuple(all_participants)))
-            return tuple(result)
+            own = await FiveStackMatchParticipantsRepo.list_by_member(conn, discord_member_id=discord_member_id, limit=limit)
+            match_ids = [participant.match_id for participant in own]
+            matches = {
+                match.id: match
+                for match in await FiveStackMatchesRepo.list_by_ids(conn, guild_id=guild_id, match_ids=match_ids)
+            }
+            participants: dict[int, list[FiveStackMatchParticipantRow]] = {match_id: [] for match_id in matches}
+            for participant in await FiveStackMatchParticipantsRepo.list_by_matches(conn, list(matches)):
+                participants[participant.match_id].append(participant)
+            return tuple(
+                FiveStackMatchBundle(match=matches[match_id], participants=tuple(participants[match_id]))
+                for match_id in match_ids
+                if match_id in matches
+            )
 
     async def save_feedback(
         self,
@@ -326,6 +334,6 @@ class FiveStackDbService:
 
     async def _ensure_member(self, conn, *, guild_id: int, guild_name: str | None, discord_id: int) -> int:
         await GuildsRepo.ensure_exists(conn, guild_id, guild_name)
-        user_id = await UserRepo.ensure_exists(conn, discord_id=discord_id)
+        user_id = await self._identity.ensure_user_id(conn, discord_id)
         await GuildMemberRepo.mark_join(conn, guild_id=guild_id, user_id=user_id)
         return user_id
@@ -1,5 +1,6 @@
 # database\services\guild_channels_service.py
 
+from database.guild_config_cache import GuildConfigCache, WriteListener
 from database.repos.guilds_repo import GuildsRepo
 from database.repos.guild_channels_repo import GuildChannelsRepo
 
@@ -7,25 +8,38 @@ def normalize_key(k: str) -> str:
     return " ".join(k.strip().split())
 
 class ChannelConfigurationService:
-    def __init__(self, db):
+    def __init__(self, db, *, cache_ttl_seconds: float | None = None):
         self._db = db
+        self._cache = GuildConfigCache(ttl_seconds=cache_ttl_seconds)
 
-    async def get_all(self, guild_id: int) -> dict[str, int]:
+    def add_write_listener(self, listener: WriteListener) -> None:
+        self._cache.add_listener(listener)
+
+    def remove_write_listener(self, listener: WriteListener) -> None:
+        self._cache.remove_listener(listener)
+
+    async def _load_all(self, guild_id: int) -> dict[str, int]:
         async with self._db.acquire() as conn:
             return await GuildChannelsRepo.get_all(conn, guild_id)
 
+    async def get_all(self, guild_id: int) -> dict[str, int]:
+        return dict(await self._cache.get(guild_id, self._load_all))
+
     async def get_one(self, guild_id: int, key: str) -> int | None:
         key = normalize_key(key)
-        async with self._db.acquire() as conn:
-            return await GuildChannelsRepo.get(conn, guild_id, key)
+        snapshot = await self._cache.get(guild_id, self._load_all)
+        return snapshot.get(key)
 
     async def set_one(self, guild_id: int, guild_name: str | None, key: str, channel_id: int) -> None:
         key = normalize_key(key)
         async with self._db.transaction() as conn:
             await GuildsRepo.ensure_exists(conn, guild_id, guild_name)
             await GuildChannelsRepo.upsert(conn, guild_id, key, channel_id)
+        self._cache.invalidate(guild_id)
 
     async def remove_one(self, guild_id: int, key: str) -> bool:
         key = normalize_key(key)
         async with self._db.transaction() as conn:
-            return await GuildChannelsRepo.delete(conn, guild_id, key)
+            deleted = await GuildChannelsRepo.delete(conn, guild_id, key)
+        self._cache.invalidate(guild_id)
+        return deleted
@@ -7,8 +7,8 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import List, Optional
 
+from database.identity_map import UserIdentityMap
 from database.repos.guilds_repo import GuildsRepo
-from database.repos.user_repo import UserRepo
 from database.repos.message_deletions_repo import MessageDeletionsRepo, MessageDeletionRow
 
 
@@ -33,10 +33,10 @@ class MessageDeletionsService:
     Les API publiques prennent des discord_id et font le mapping en interne.
     """
 
-    def __init__(self, db):
+    def __init__(self, db, identity: UserIdentityMap | None = None):
         self._db = db
-        # Cache user_id -> discord_id pour éviter des requêtes supplémentaires
-        self._discord_id_cache: dict[int, int] = {}
+        # Identity map partagée discord_id <-> user_id
+        self._identity = identity if identity is not None else UserIdentityMap()
 
     async def log_deletion(
         self,
@@ -76,11 +76,11 @@ class MessageDeletionsService:
             # Convert discord_id -> user_id (if provided)
             deleted_by_user_id = None
             if deleted_by_discord_id is not None:
-                deleted_by_user_id = await UserRepo.ensure_exists(conn, discord_id=deleted_by_discord_id)
+                deleted_by_user_id = await self._identity.ensure_user_id(conn, deleted_by_discord_id)
 
             target_user_id = None
             if target_user_discord_id is not None:
-                target_user_id = await UserRepo.ensure_exists(conn, discord_id=target_user_discord_id)
+                target_user_id = await self._identity.ensure_user_id(conn, target_user_discord_id)
 
             return await MessageDeletionsRepo.insert(
                 conn,
@@ -154,4 +154,4 @@ class MessageDeletionsService:
         if not user_ids:
             return {}
 
-        return await UserRepo.get_discord_ids_by_user_ids(conn, list(user_ids))
+        return await self._identity.get_discord_ids_many(conn, user_ids)
@@ -8,8 +8,8 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import List, Optional
 
+from database.identity_map import UserIdentityMap
 from database.repos.guilds_repo import GuildsRepo
-from database.repos.user_repo import UserRepo
 from database.repos.moderation_bans_repo import ModerationBansRepo, BanRow
 from database.repos.moderation_warnings_repo import ModerationWarningsRepo, WarningRow
 from database.repos.moderation_role_backups_repo import ModerationRoleBackupsRepo
@@ -45,8 +45,9 @@ class ModerationDbService:
     Reçoit l'instance DB en injection.
     """
 
-    def __init__(self, db):
+    def __init__(self, db, identity: UserIdentityMap | None = None):
         self._db = db
+        self._identity = identity if identity is not None else UserIdentityMap()
 
     # ==================== BANS ====================
 
@@ -58,17 +59,16 @@ class ModerationDbService:
         """Récupère un ban actif pour un utilisateur."""
         async with self._db.acquire() as conn:
             # Get internal user_id
-            user_row = await UserRepo.get_by_discord_id(conn, target_discord_id)
-            if not user_row:
+            user_id = await self._identity.resolve_user_id(conn, target_discord_id)
+            if user_id is None:
                 return None
 
-            ban = await ModerationBansRepo.get(conn, guild_id, user_row.user_id)
+            ban = await ModerationBansRepo.get(conn, guild_id, user_id)
             if not ban:
                 return None
 
             # Get moderator discord_id
-            mod_row = await UserRepo.get_by_user_id(conn, ban.banned_by_user_id)
-            mod_discord_id = mod_row.discord_id if mod_row else 0
+            mod_discord_id = await self._identity.resolve_discord_id(conn, ban.banned_by_user_id) or 0
 
             return BanInfo(
                 id=ban.id,
@@ -105,8 +105,8 @@ class ModerationDbService:
 
         async with self._db.transaction() as conn:
             await GuildsRepo.ensure_exists(conn, guild_id, guild_name)
-            target_user_id = await UserRepo.ensure_exists(conn, discord_id=target_discord_id)
-            moderator_user_id = await UserRepo.ensure_exists(conn, discord_id=moderator_discord_id)
+            target_user_id = await self._identity.ensure_user_id(conn, target_discord_id)
+            moderator_user_id = await self._identity.ensure_user_id(conn, moderator_discord_id)
 
             ban = await ModerationBansRepo.upsert(
                 conn,
@@ -136,30 +136,47 @@ class ModerationDbService:
     ) -> bool:
         """Supprime un ban. Retourne True si supprimé."""
         async with self._db.transaction() as conn:
-            user_row = await UserRepo.get_by_discord_id(conn, target_discord_id)
-            if not user_row:
+            user_id = await self._identity.resolve_user_id(conn, target_discord_id)
+            if user_id is None:
                 return False
 
-            return await ModerationBansRepo.delete(conn, guild_id, user_row.user_id)
+            return await ModerationBansRepo.delete(conn, guild_id, user_id)
 
-    async def get_expired_bans(self, now: datetime) -> List[BanInfo]:
-        """Récupère tous les bans expirés."""
+    async def list_banned_discord_ids(self) -> dict[int, set[int]]:
+        """discord_id bannis par guild, pour l'index memoire des bans actifs."""
         async with self._db.acquire() as conn:
-            expired = await ModerationBansRepo.list_expired(conn, now)
+            bans = await ModerationBansRepo.list_banned_user_ids(conn)
+            discord_ids = await self._identity.get_discord_ids_many(
+                conn, [user_id for _, user_id in bans]
+            )
 
-            result = []
-            for ban in expired:
-                # Get discord_ids
-                target_row = await UserRepo.get_by_user_id(conn, ban.user_id)
-                mod_row = await UserRepo.get_by_user_id(conn, ban.banned_by_user_id)
+        banned: dict[int, set[int]] = {}
+        for guild_id, user_id in bans:
+            discord_id = discord_ids.get(user_id)
+            if discord_id:
+                banned.setdefault(guild_id, set()).add(discord_id)
+        return banned
+
+    async def get_temporary_bans(self) -> List[BanInfo]:
+        """Récupère tous les bans temporaires (expirés ou non), par date de fin."""
+        async with self._db.acquire() as conn:
+            bans = await ModerationBansRepo.list_temporary(conn)
+
+            # Get discord_ids (une seule requete pour tout le lot)
+            discord_ids = await self._identity.get_discord_ids_many(
+                conn,
+                [ban.user_id for ban in bans] + [ban.banned_by_user_id for ban in bans],
+            )
 
+            result = []
+            for ban in bans:
                 result.append(BanInfo(
                     id=ban.id,
                     guild_id=ban.guild_id,
-                    target_discord_id=target_row.discord_id if target_row else 0,
+                    target_discord_id=discord_ids.get(ban.user_id, 0),
                     ban_type=ban.ban_type,
                     reason=ban.reason,
-                    moderator_discord_id=mod_row.discord_id if mod_row else 0,
+                    moderator_discord_id=discord_ids.get(ban.banned_by_user_id, 0),
                     banned_at=ban.banned_at,
                     ban_end=ban.ban_end,
                 ))
@@ -179,8 +196,8 @@ class ModerationDbService:
         """Ajoute un warning. Retourne l'ID du warning créé."""
         async with self._db.transaction() as conn:
             await GuildsRepo.ensure_exists(conn, guild_id, guild_name)
-            target_user_id = await UserRepo.ensure_exists(conn, discord_id=target_discord_id)
-            moderator_user_id = await UserRepo.ensure_exists(conn, discord_id=moderator_discord_id)
+            target_user_id = await self._identity.ensure_user_id(conn, target_discord_id)
+            moderator_user_id = await self._identity.ensure_user_id(conn, moderator_discord_id)
 
             return await ModerationWarningsRepo.insert(
                 conn,
@@ -197,12 +214,12 @@ class ModerationDbService:
     ) -> int:
         """Compte les warnings pour un utilisateur."""
         async with self._db.acquire() as conn:
-            user_row = await UserRepo.get_by_discord_id(conn, target_discord_id)
-            if not user_row:
+            user_id = await self._identity.resolve_user_id(conn, target_discord_id)
+            if user_id is None:
                 return 0
 
             return await ModerationWarningsRepo.count_for_user(
-                conn, guild_id, user_row.user_id
+                conn, guild_id, user_id
             )
 
     async def list_warnings(
@@ -213,22 +230,25 @@ class ModerationDbService:
     ) -> List[WarningInfo]:
         """Liste les warnings pour un utilisateur."""
         async with self._db.acquire() as conn:
-            user_row = await UserRepo.get_by_discord_id(conn, target_discord_id)
-            if not user_row:
+            user_id = await self._identity.resolve_user_id(conn, target_discord_id)
+            if user_id is None:
                 return []
 
             warnings = await ModerationWarningsRepo.list_for_user(
-                conn, guild_id, user_row.user_id, limit
+                conn, guild_id, user_id, limit
+            )
+
+            mod_discord_ids = await self._identity.get_discord_ids_many(
+                conn, [w.warned_by_user_id for w in warnings]
             )
 
             result = []
             for w in warnings:
-                mod_row = await UserRepo.get_by_user_id(conn, w.warned_by_user_id)
                 result.append(WarningInfo(
                     id=w.id,
                     guild_id=w.guild_id,
                     target_discord_id=target_discord_id,
-                    moderator_discord_id=mod_row.discord_id if mod_row else 0,
+                    moderator_discord_id=mod_discord_ids.get(w.warned_by_user_id, 0),
                     reason=w.reason,
                     created_at=w.created_at,
                 ))
@@ -247,12 +267,12 @@ class ModerationDbService:
     ) -> int:
         """Supprime tous les warnings d'un utilisateur. Retourne le nombre supprimé."""
         async with self._db.transaction() as conn:
-            user_row = await UserRepo.get_by_discord_id(conn, target_discord_id)
-            if not user_row:
+            user_id = await self._identity.resolve_user_id(conn, target_discord_id)
+            if user_id is None:
                 return 0
 
             return await ModerationWarningsRepo.clear_for_user(
-                conn, guild_id, user_row.user_id
+                conn, guild_id, user_id
             )
 
     # ==================== ROLE BACKUPS ====================
@@ -279,7 +299,7 @@ class ModerationDbService:
 
         async with self._db.transaction() as conn:
             await GuildsRepo.ensure_exists(conn, guild_id, guild_name)
-            user_id = await UserRepo.ensure_exists(conn, discord_id=target_discord_id)
+            user_id = await self._identity.ensure_user_id(conn, target_discord_id)
 
             await ModerationRoleBackupsRepo.upsert(conn, guild_id, user_id, roles)
             return True
@@ -291,12 +311,12 @@ class ModerationDbService:
     ) -> Optional[List[int]]:
         """Récupère les rôles sauvegardés pour un utilisateur."""
         async with self._db.acquire() as conn:
-            user_row = await UserRepo.get_by_discord_id(conn, target_discord_id)
-            if not user_row:
+            user_id = await self._identity.resolve_user_id(conn, target_discord_id)
+            if user_id is None:
                 return None
 
             backup = await ModerationRoleBackupsRepo.get(
-                conn, guild_id, user_row.user_id
+                conn, guild_id, user_id
             )
             if not backup:
                 return None
@@ -310,10 +330,10 @@ class ModerationDbService:
     ) -> bool:
         """Supprime le backup des rôles. Retourne True si supprimé."""
         async with self._db.transaction() as conn:
-            user_row = await UserRepo.get_by_discord_id(conn, target_discord_id)
-            if not user_row:
+            user_id = await self._identity.resolve_user_id(conn, target_discord_id)
+            if user_id is None:
                 return False
 
             return await ModerationRoleBackupsRepo.delete(
-                conn, guild_id, user_row.user_id
+                conn, guild_id, user_id
             )
@@ -0,0 +1,69 @@
+# database/services/presence_service.py
+"""
+Service DB de reconciliation de presence (valorant_info, guild_members, five-stack)
+contre le cache de membres gateway, en une transaction et en SQL ensembliste.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import AsyncIterable, Iterable
+
+from database.repos.presence_repo import PresenceRepo
+
+
+@dataclass(frozen=True, slots=True)
+class PresenceReconciliation:
+    reactivated: int = 0
+    deactivated: int = 0
+    members_rejoined: int = 0
+    members_left: int = 0
+    queue_entries_removed: int = 0
+    team_members_removed: int = 0
+    team_leaders_reassigned: int = 0
+    teams_closed: int = 0
+
+
+class PresenceDbService:
+    def __init__(self, db) -> None:
+        self._db = db
+
+    async def reconcile(
+        self,
+        guild_ids: Iterable[int],
+        members: Iterable[tuple[int, int]] | AsyncIterable[tuple[int, int]],
+        *,
+        complete: bool = True,
+    ) -> PresenceReconciliation:
+        """
+        members: (guild_id, discord_id) des guilds scannees, streame vers COPY.
+        guild_members et five-stack ne sont reconcilies que pour guild_ids;
+        valorant_info.is_active = present dans au moins une de ces guilds.
+        complete=False: d'autres guilds du bot n'ont pas ete scannees, un joueur
+        absent des guild_ids peut y etre: valorant_info est seulement reactive.
+        """
+        guild_ids = list(guild_ids)
+        if not guild_ids:
+            return PresenceReconciliation()
+
+        async with self._db.transaction() as conn:
+            await PresenceRepo.load_snapshot(conn, members)
+            reactivated, deactivated = await PresenceRepo.reconcile_valorant_info(
+                conn, guild_ids, deactivate=complete
+            )
+            rejoined, left = await PresenceRepo.reconcile_guild_members(conn, guild_ids)
+            queue_removed = await PresenceRepo.purge_five_stack_queue(conn, guild_ids)
+            team_members_removed = await PresenceRepo.purge_five_stack_team_members(conn, guild_ids)
+            leaders = await PresenceRepo.reassign_five_stack_leaders(conn, guild_ids)
+            closed = await PresenceRepo.close_empty_five_stack_teams(conn, guild_ids)
+
+        return PresenceReconciliation(
+            reactivated=reactivated,
+            deactivated=deactivated,
+            members_rejoined=rejoined,
+            members_left=left,
+            queue_entries_removed=queue_removed,
+            team_members_removed=team_members_removed,
+            team_leaders_reassigned=leaders,
+            teams_closed=closed,
+        )
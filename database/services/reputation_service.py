@@ -4,11 +4,11 @@ from dataclasses import dataclass
 from datetime import date
 from typing import Literal, Optional
 
+from database.identity_map import UserIdentityMap
 from database.repos.guild_member_repo import GuildMemberRepo
 from database.repos.guilds_repo import GuildsRepo
 from database.repos.reputation_events_repo import ReputationEventsRepo, ReputationEventType
 from database.repos.user_profiles_repo import UserProfilesRepo
-from database.repos.user_repo import UserRepo
 
 MAX_REPUTATION_EVENTS_PER_PAIR = 5
 
@@ -39,8 +39,9 @@ class UserProfileInfo:
 
 
 class ReputationDbService:
-    def __init__(self, db) -> None:
+    def __init__(self, db, identity: UserIdentityMap | None = None) -> None:
         self._db = db
+        self._identity = identity if identity is not None else UserIdentityMap()
 
     async def add_event(
         self,
@@ -56,8 +57,8 @@ class ReputationDbService:
         event_date = event_date or date.today()
         async with self._db.transaction() as conn:
             await GuildsRepo.ensure_exists(conn, guild_id, guild_name)
-            reporter_user_id = await UserRepo.ensure_exists(conn, discord_id=reporter_discord_id)
-            target_user_id = await UserRepo.ensure_exists(conn, discord_id=target_discord_id)
+            reporter_user_id = await self._identity.ensure_user_id(conn, reporter_discord_id)
+            target_user_id = await self._identity.ensure_user_id(conn, target_discord_id)
             await GuildMemberRepo.mark_join(conn, guild_id=guild_id, user_id=reporter_user_id)
             await GuildMemberRepo.mark_join(conn, guild_id=guild_id, user_id=target_user_id)
 
@@ -94,8 +95,10 @@ class ReputationDbService:
             return ReputationAddResult(status="created" if inserted else "duplicate_today")
 
     async def get_summary(self, *, guild_id: int, target_discord_id: int) -> ReputationSummary:
-        async with self._db.transaction() as conn:
-            target_user_id = await UserRepo.ensure_exists(conn, discord_id=target_discord_id)
+        async with self._db.acquire() as conn:
+            target_user_id = await self._identity.resolve_user_id(conn, target_discord_id)
+            if target_user_id is None:
+                return ReputationSummary(reports=0, recommendations=0)
             row = await ReputationEventsRepo.get_summary(
                 conn,
                 guild_id=guild_id,
@@ -107,8 +110,10 @@ class ReputationDbService:
             )
 
     async def get_profile(self, discord_id: int) -> UserProfileInfo:
-        async with self._db.transaction() as conn:
-            user_id = await UserRepo.ensure_exists(conn, discord_id=discord_id)
+        async with self._db.acquire() as conn:
+            user_id = await self._identity.resolve_user_id(conn, discord_id)
+            if user_id is None:
+                return UserProfileInfo()
             row = await UserProfilesRepo.get(conn, user_id)
             if row is None:
                 return UserProfileInfo()
@@ -129,7 +134,7 @@ class ReputationDbService:
         note: str | None,
     ) -> UserProfileInfo:
         async with self._db.transaction() as conn:
-            user_id = await UserRepo.ensure_exists(conn, discord_id=discord_id)
+            user_id = await self._identity.ensure_user_id(conn, discord_id)
             await UserProfilesRepo.upsert(
                 conn,
                 user_id=user_id,
@@ -97,11 +97,6 @@ class ScrimsDbService:
             rows = await ScrimsRepo.list_active(conn, guild_id=guild_id)
             return tuple([await self._row_to_info(conn, row) for row in rows])
 
-    async def list_due_scrims(self, *, now: datetime) -> tuple[ScrimInfo, ...]:
-        async with self._db.acquire() as conn:
-            rows = await ScrimsRepo.list_due(conn, now=now)
-            return tuple([await self._row_to_info(conn, row) for row in rows])
-
     async def join_team(
         self,
         *,
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from database.repos.guilds_repo import GuildsRepo
+from database.repos.twitch_live_announcements_repo import TwitchLiveAnnouncementsRepo
 from database.repos.twitch_streamers_repo import TwitchStreamersRepo
 
 
@@ -29,3 +30,32 @@ class TwitchStreamersDbService:
         async with self._db.acquire() as conn:
             rows = await TwitchStreamersRepo.list_by_guild(conn, guild_id)
         return [row.streamer_login for row in rows]
+
+    async def list_all_streamers(self) -> dict[int, list[str]]:
+        """Streamers suivis par guild, en une requete (poller global)."""
+        async with self._db.acquire() as conn:
+            rows = await TwitchStreamersRepo.list_all(conn)
+        streamers: dict[int, list[str]] = {}
+        for row in rows:
+            streamers.setdefault(row.guild_id, []).append(row.streamer_login)
+        return streamers
+
+    async def list_live_announcements(self) -> dict[tuple[int, str], str]:
+        async with self._db.acquire() as conn:
+            rows = await TwitchLiveAnnouncementsRepo.list_all(conn)
+        return {(row.guild_id, row.streamer_login): row.stream_id for row in rows}
+
+    async def record_live_announcement(self, *, guild_id: int, streamer_login: str, stream_id: str) -> None:
+        async with self._db.transaction() as conn:
+            await TwitchLiveAnnouncementsRepo.upsert(
+                conn,
+                guild_id=guild_id,
+                streamer_login=streamer_login,
+                stream_id=stream_id,
+            )
+
+    async def clear_live_announcements(self, streamer_logins: list[str]) -> int:
+        if not streamer_logins:
+            return 0
+        async with self._db.transaction() as conn:
+            return await TwitchLiveAnnouncementsRepo.delete_by_logins(conn, streamer_logins)
@@ -0,0 +1,73 @@
+# database/services/users_service.py
+"""
+Service DB de l'identite utilisateur (table `users`).
+Porte l'identity map partagee et ecrit en lot les last_seen_at differes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Optional
+
+from database.identity_map import UserIdentityMap
+from database.repos.user_repo import UserRepo
+
+logger = logging.getLogger(__name__)
+
+
+class UsersDbService:
+    def __init__(self, db, identity: UserIdentityMap | None = None) -> None:
+        self._db = db
+        self._identity = identity if identity is not None else UserIdentityMap()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @property
+    def identity(self) -> UserIdentityMap:
+        return self._identity
+
+    async def flush_seen(self) -> int:
+        """Ecrit les last_seen_at en attente. Retourne le nombre de lignes touchees."""
+        user_ids = self._identity.drain_seen()
+        if not user_ids:
+            return 0
+        try:
+            async with self._db.transaction() as conn:
+                return await UserRepo.touch_seen_many(conn, user_ids)
+        except Exception:
+            # Remettre en file pour le prochain flush
+            for user_id in user_ids:
+                self._identity.mark_seen(user_id)
+            raise
+
+    def start_seen_flusher(self, interval_seconds: float = 60.0) -> None:
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._seen_flusher(interval_seconds))
+
+    async def close(self) -> None:
+        """Arrete le flush periodique et ecrit les derniers last_seen_at."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        try:
+            await self.flush_seen()
+        except Exception:
+            logger.exception("[users] Dernier flush last_seen_at echoue.")
+
+    async def _seen_flusher(self, interval_seconds: float) -> None:
+        logger.info("[users] Flush last_seen_at demarre (intervalle %ss).", interval_seconds)
+        try:
+            while True:
+                await asyncio.sleep(interval_seconds)
+                try:
+                    touched = await self.flush_seen()
+                    if touched:
+                        logger.debug("[users] %s last_seen_at mis a jour.", touched)
+                except Exception:
+                    logger.exception("[users] Flush last_seen_at echoue.")
+        finally:
+            logger.info("[users] Flush last_seen_at arrete.")
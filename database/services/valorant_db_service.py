@@ -1,34 +1,48 @@
 # database/services/valorant_db_service.py
 """
 Service DB pour le domaine Valorant.
-Orchestre ValorantInfoRepo, ValorantEloHistoryRepo et UserRepo.
+Orchestre ValorantInfoRepo et ValorantEloHistoryRepo (identites via UserIdentityMap).
 Toutes les methodes publiques acceptent discord_id et font le mapping interne.
 """
 
+import asyncio
 import logging
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import Any, Optional, Sequence
 
 from database.engine import Db
-from database.repos.user_repo import UserRepo
-from database.repos.valorant_info_repo import ValorantInfoRepo, ValorantInfoRow
-from database.repos.valorant_elo_history_repo import ValorantEloHistoryRepo, EloHistoryRow
+from database.identity_map import UserIdentityMap
+from database.repos.valorant_info_repo import (
+    ValorantInfoRepo,
+    ValorantInfoRow,
+    ValorantPipelineUpdate,
+)
+from database.repos.valorant_elo_history_repo import (
+    EloHistoryRow,
+    EloHistorySeries,
+    ValorantEloHistoryRepo,
+)
+from database.repos.valorant_mmr_summary_repo import MmrDailySummaryRow, ValorantMmrSummaryRepo
 
 logger = logging.getLogger(__name__)
 
 
 class ValorantDbService:
 
-    def __init__(self, db: Db) -> None:
+    def __init__(self, db: Db, identity: UserIdentityMap | None = None) -> None:
         self._db = db
+        self._identity = identity if identity is not None else UserIdentityMap()
+        # Partitions (season, act) connues: le DDL ne tourne que pour un nouvel acte.
+        self._known_partitions: set[tuple[int, int]] | None = None
+        self._partitions_lock = asyncio.Lock()
 
     # ==================== helpers ====================
 
     async def _resolve_user_id(self, conn, discord_id: int) -> Optional[int]:
-        return await UserRepo.get_user_id(conn, discord_id)
+        return await self._identity.resolve_user_id(conn, discord_id)
 
     async def _require_user_id(self, conn, discord_id: int) -> int:
-        uid = await UserRepo.get_user_id(conn, discord_id)
+        uid = await self._identity.resolve_user_id(conn, discord_id)
         if uid is None:
             raise ValueError(f"No internal user_id for discord_id={discord_id}")
         return uid
@@ -37,7 +51,7 @@ class ValorantDbService:
 
     async def link_account(self, discord_id: int, pseudo: str, tag: str) -> bool:
         async with self._db.transaction() as conn:
-            user_id = await UserRepo.ensure_exists(conn, discord_id=discord_id)
+            user_id = await self._identity.ensure_user_id(conn, discord_id)
             await ValorantInfoRepo.upsert_pseudo_tag(conn, user_id, pseudo, tag)
         return True
 
@@ -68,8 +82,7 @@ class ValorantDbService:
             row = await ValorantInfoRepo.get_by_pseudo_tag(conn, pseudo, tag)
             if row is None:
                 return None
-            user_row = await UserRepo.get_by_user_id(conn, row.user_id)
-            return user_row.discord_id if user_row else None
+            return await self._identity.resolve_discord_id(conn, row.user_id)
 
     async def reset_for_account_change(
         self, discord_id: int, pseudo: str, tag: str
@@ -137,6 +150,18 @@ class ValorantDbService:
             await ValorantInfoRepo.update_pipeline_error(conn, user_id)
         return True
 
+    async def apply_pipeline_results(self, updates: list[ValorantPipelineUpdate]) -> int:
+        """
+        Ecrit tous les resultats d'un batch pipeline en une seule requete.
+        Un discord_id present plusieurs fois garde son dernier resultat.
+        Retourne le nombre de lignes mises a jour.
+        """
+        if not updates:
+            return 0
+        latest = {update.discord_id: update for update in updates}
+        async with self._db.transaction() as conn:
+            return await ValorantInfoRepo.apply_pipeline_results(conn, list(latest.values()))
+
     # ==================== activite ====================
 
     async def mark_inactive(self, discord_id: int) -> bool:
@@ -144,8 +169,7 @@ class ValorantDbService:
             user_id = await self._resolve_user_id(conn, discord_id)
             if user_id is None:
                 return False
-            await ValorantInfoRepo.mark_inactive(conn, user_id)
-        return True
+            return await ValorantInfoRepo.mark_inactive(conn, user_id)
 
     async def reactivate(self, discord_id: int) -> bool:
         async with self._db.transaction() as conn:
@@ -154,37 +178,6 @@ class ValorantDbService:
                 return False
             return await ValorantInfoRepo.mark_active(conn, user_id)
 
-    async def get_all_discord_ids(self) -> list[int]:
-        """Retourne tous les discord_ids avec un compte Valorant lie (single JOIN)."""
-        async with self._db.acquire() as conn:
-            return await ValorantInfoRepo.get_all_discord_ids(conn)
-
-    async def sync_presence(
-        self,
-        active_discord_ids: set[int],
-        all_discord_ids: set[int],
-    ) -> tuple[int, int]:
-        """
-        Reactive les presents et desactive les absents en une seule transaction.
-        Retourne (reactivated, deactivated).
-        """
-        async with self._db.transaction() as conn:
-            rows = await ValorantInfoRepo.get_user_ids_by_discord_ids(
-                conn, list(all_discord_ids)
-            )
-            present_user_ids = [
-                r.user_id for r in rows
-                if r.discord_id in active_discord_ids
-            ]
-            absent_user_ids = [
-                r.user_id for r in rows
-                if r.discord_id not in active_discord_ids
-            ]
-
-            reactivated = await ValorantInfoRepo.bulk_mark_active(conn, present_user_ids)
-            deactivated = await ValorantInfoRepo.bulk_mark_inactive(conn, absent_user_ids)
-        return reactivated, deactivated
-
     # ==================== notification ====================
 
     async def get_last_notification(self, discord_id: int) -> Optional[datetime]:
@@ -259,6 +252,29 @@ class ValorantDbService:
                 conn, user_id, season, act, info.puuid
             )
 
+    async def get_history_series(
+        self,
+        discord_id: int,
+        season: int | None = None,
+        act: int | None = None,
+        since: datetime | None = None,
+    ) -> EloHistorySeries:
+        """Variante colonne de get_history (stats sur de longs historiques)."""
+        async with self._db.acquire() as conn:
+            user_id = await self._resolve_user_id(conn, discord_id)
+            if user_id is None:
+                return EloHistorySeries.from_columns([])
+            info = await ValorantInfoRepo.get_by_user_id(conn, user_id)
+            if info is None:
+                return EloHistorySeries.from_columns([])
+            if not info.puuid:
+                return await ValorantEloHistoryRepo.get_history_series(
+                    conn, user_id, season, act, legacy_only=True, since=since
+                )
+            return await ValorantEloHistoryRepo.get_history_series(
+                conn, user_id, season, act, info.puuid, since=since
+            )
+
     async def get_partitions(self, discord_id: int) -> list[tuple[int, int]]:
         async with self._db.acquire() as conn:
             user_id = await self._resolve_user_id(conn, discord_id)
@@ -279,9 +295,27 @@ class ValorantDbService:
         async with self._db.acquire() as conn:
             return await ValorantEloHistoryRepo.get_latest_partition(conn)
 
+    async def load_known_partitions(self) -> set[tuple[int, int]]:
+        async with self._db.acquire() as conn:
+            partitions = await ValorantEloHistoryRepo.list_partitions(conn)
+        self._known_partitions = partitions
+        logger.info("[valorant] %s partitions d'historique connues.", len(partitions))
+        return set(partitions)
+
     async def ensure_partitions(self, season: int, act: int) -> None:
-        async with self._db.transaction() as conn:
-            await ValorantEloHistoryRepo.ensure_partitions(conn, season, act)
+        if await self._partitions_known([(season, act)]):
+            return
+        async with self._partitions_lock:
+            if await self._partitions_known([(season, act)]):
+                return
+            async with self._db.transaction() as conn:
+                await ValorantEloHistoryRepo.ensure_partitions(conn, season, act)
+            self._known_partitions.add((season, act))
+
+    async def _partitions_known(self, partitions: list[tuple[int, int]]) -> bool:
+        if self._known_partitions is None:
+            await self.load_known_partitions()
+        return all(partition in self._known_partitions for partition in partitions)
 
     async def insert_history_entry(
         self,
@@ -311,6 +345,18 @@ class ValorantDbService:
                 source=source,
             )
 
+    async def bulk_insert_history(self, rows: list[EloHistoryRow]) -> int:
+        """
+        Import d'historique: chaque partition (season, act) absente du cache est
+        creee une seule fois, puis un COPY + une fusion en une transaction.
+        """
+        if not rows:
+            return 0
+        for season, act in sorted({(row.season, row.act) for row in rows}):
+            await self.ensure_partitions(season, act)
+        async with self._db.transaction() as conn:
+            return await ValorantEloHistoryRepo.bulk_insert_entries(conn, rows)
+
     async def get_valorant_info_by_user_id(
         self, user_id: int
     ) -> Optional[ValorantInfoRow]:
@@ -336,6 +382,97 @@ class ValorantDbService:
         async with self._db.transaction() as conn:
             await ValorantInfoRepo.mark_mmr_history_backfilled(conn, user_id)
 
+    # ==================== daily MMR summary ====================
+
+    @staticmethod
+    def _summary_account(puuid: str | None) -> str:
+        return puuid or ""
+
+    async def get_account_history_series(
+        self,
+        user_id: int,
+        puuid: str | None,
+        season: int | None = None,
+        act: int | None = None,
+        since: datetime | None = None,
+    ) -> EloHistorySeries:
+        """Historique en colonnes d'un compte (puuid, ou legacy sans puuid)."""
+        async with self._db.acquire() as conn:
+            if not puuid:
+                return await ValorantEloHistoryRepo.get_history_series(
+                    conn, user_id, season, act, legacy_only=True, since=since
+                )
+            return await ValorantEloHistoryRepo.get_history_series(
+                conn, user_id, season, act, puuid, since=since
+            )
+
+    async def get_account_partitions(
+        self, user_id: int, puuid: str | None
+    ) -> list[tuple[int, int]]:
+        async with self._db.acquire() as conn:
+            if not puuid:
+                return await ValorantEloHistoryRepo.get_distinct_partitions(
+                    conn, user_id, legacy_only=True
+                )
+            return await ValorantEloHistoryRepo.get_distinct_partitions(conn, user_id, puuid)
+
+    async def get_daily_summaries(
+        self, discord_id: int, season: int | None = None, act: int | None = None
+    ) -> list[MmrDailySummaryRow] | None:
+        """Agregats du compte courant; None tant que le rollup n'a pas ete construit."""
+        async with self._db.acquire() as conn:
+            user_id = await self._resolve_user_id(conn, discord_id)
+            if user_id is None:
+                return []
+            info = await ValorantInfoRepo.get_by_user_id(conn, user_id)
+            if info is None:
+                return []
+            account = self._summary_account(info.puuid)
+            if not await ValorantMmrSummaryRepo.is_built(conn, user_id, account):
+                return None
+            return await ValorantMmrSummaryRepo.get_summaries(conn, user_id, account, season, act)
+
+    async def get_daily_summaries_before(
+        self,
+        user_id: int,
+        puuid: str | None,
+        scopes: Sequence[tuple[int, int]],
+        day: date,
+    ) -> dict[tuple[int, int], MmrDailySummaryRow]:
+        """Agregat du dernier jour anterieur a `day` par (season, act) (etat repris par le jour suivant)."""
+        async with self._db.acquire() as conn:
+            return await ValorantMmrSummaryRepo.get_last_before_many(
+                conn, user_id, self._summary_account(puuid), scopes, day
+            )
+
+    async def replace_daily_summaries(
+        self,
+        user_id: int,
+        puuid: str | None,
+        scopes: Sequence[tuple[int, int]],
+        from_day: date | None,
+        summaries: Sequence[Any],
+    ) -> None:
+        async with self._db.transaction() as conn:
+            await ValorantMmrSummaryRepo.replace_days(
+                conn, user_id, self._summary_account(puuid), scopes, from_day, summaries
+            )
+
+    async def rebuild_daily_summaries(
+        self, user_id: int, puuid: str | None, summaries: Sequence[Any]
+    ) -> None:
+        """Remplace tout le rollup du compte et le marque comme complet."""
+        account = self._summary_account(puuid)
+        scopes = sorted({(summary.season, summary.act) for summary in summaries})
+        async with self._db.transaction() as conn:
+            await ValorantMmrSummaryRepo.delete_account(conn, user_id, account)
+            await ValorantMmrSummaryRepo.replace_days(conn, user_id, account, scopes, None, summaries)
+            await ValorantMmrSummaryRepo.mark_built(conn, user_id, account)
+
+    async def invalidate_daily_summaries(self, user_id: int, puuid: str | None) -> None:
+        async with self._db.transaction() as conn:
+            await ValorantMmrSummaryRepo.clear_built(conn, user_id, self._summary_account(puuid))
+
     # ==================== stats ====================
 
     async def get_user_stats(self) -> dict[str, int]:
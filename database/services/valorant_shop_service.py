@@ -1,32 +1,34 @@
 from __future__ import annotations
 
-from database.repos.guilds_repo import GuildsRepo
-from database.repos.valorant_sent_bundles_repo import ValorantSentBundlesRepo
+from typing import Iterable
+
+from database.repos.valorant_sent_bundles_repo import ShopNotifyTargetRow, ValorantSentBundlesRepo
 
 
 class ValorantShopDbService:
     def __init__(self, db) -> None:
         self._db = db
 
-    async def is_bundle_sent(self, *, guild_id: int, bundle_uuid: str) -> bool:
+    async def list_notify_targets(
+        self,
+        *,
+        guild_ids: Iterable[int],
+        channel_key: str,
+        bundle_uuids: Iterable[str],
+    ) -> list[ShopNotifyTargetRow]:
+        """Salons de notification et bundles deja envoyes de toutes les guilds, en une requete."""
         async with self._db.acquire() as conn:
-            return await ValorantSentBundlesRepo.exists(
+            return await ValorantSentBundlesRepo.list_notify_targets(
                 conn,
-                guild_id=guild_id,
-                bundle_uuid=bundle_uuid,
+                guild_ids=list(guild_ids),
+                channel_key=channel_key,
+                bundle_uuids=list(bundle_uuids),
             )
 
-    async def mark_bundle_sent(
-        self,
-        *,
-        guild_id: int,
-        guild_name: str | None,
-        bundle_uuid: str,
-    ) -> bool:
+    async def mark_bundles_sent(self, sent: Iterable[tuple[int, str]]) -> int:
+        """(guild_id, bundle_uuid) envoyes, en un insert. Les guilds existent deja (salon configure)."""
+        sent = list(sent)
+        if not sent:
+            return 0
         async with self._db.transaction() as conn:
-            await GuildsRepo.ensure_exists(conn, guild_id, guild_name)
-            return await ValorantSentBundlesRepo.insert(
-                conn,
-                guild_id=guild_id,
-                bundle_uuid=bundle_uuid,
-            )
+            return await ValorantSentBundlesRepo.insert_many(conn, sent)
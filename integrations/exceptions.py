@@ -15,8 +15,11 @@ class NetworkError(IntegrationError):
 class ApiError(IntegrationError):
     """
     Le serveur repond avec une erreur
+    status: code HTTP quand l'erreur vient d'une reponse (None sinon)
     """
-    pass
+    def __init__(self, message: str = "", *, status: int | None = None):
+        super().__init__(message)
+        self.status = status
 
 class RateLimitError(ApiError):
     """
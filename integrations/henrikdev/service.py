@@ -4,7 +4,8 @@ import logging
 from pydantic import ValidationError
 
 from integrations.exceptions import ApiError
-from integrations.http_client import HTTPClient
+from integrations.http_client import HTTPClient, RequestLimiter
+from integrations.response_cache import CachePolicy, ResponseCache, cache_key
 from integrations.henrikdev.models import (
     AccountResponseName,
     AccountResponsePuuid,
@@ -22,17 +23,45 @@ class HenrikDevService:
 
     BASE_URL = "https://api.henrikdev.xyz/valorant"
 
-    def __init__(self, client: HTTPClient, api_key: str, header_name: str = "Authorization"):
+    # Comptes: quasi statiques. MMR/historiques: courts, le pipeline repasse rarement plus vite.
+    CACHE_POLICIES = {
+        "account": CachePolicy(ttl_seconds=3600, stale_seconds=86400),
+        "mmr": CachePolicy(ttl_seconds=60),
+        "mmr_history": CachePolicy(ttl_seconds=120),
+        "matchlist": CachePolicy(ttl_seconds=120),
+        "store": CachePolicy(ttl_seconds=300),
+    }
+
+    def __init__(
+        self,
+        client: HTTPClient,
+        api_key: str,
+        header_name: str = "Authorization",
+        cache: ResponseCache | None = None,
+    ):
         self._client = client
         self._api_key = api_key.strip()
         self._header = {header_name: self._api_key} if self._api_key else {}
+        self._cache = cache
 
     @property
     def is_configured(self) -> bool:
         return bool(self._api_key)
 
+    async def _get(self, url: str, endpoint: str, *, params=None, limiter: RequestLimiter | None = None):
+        # Le limiter n'est consomme que si une requete part vraiment (miss,
+        # revalidation en arriere-plan, retry): un hit de cache ne coute rien.
+        def load():
+            return self._client.get(url, params=params, headers=self._header, limiter=limiter)
+
+        if self._cache is None:
+            return await load()
+        return await self._cache.fetch(cache_key(url, params), self.CACHE_POLICIES[endpoint], load)
 
-    async def get_account_by_name(self, name: str, tag: str) -> tuple[AccountResponseName, RateLimit]:
+
+    async def get_account_by_name(
+        self, name: str, tag: str, *, limiter: RequestLimiter | None = None
+    ) -> tuple[AccountResponseName, RateLimit]:
         """
     Get Valorant account info from HenrikDev using Name + Tag.
 
@@ -50,7 +79,7 @@ class HenrikDevService:
         """
 
         url = f"{self.BASE_URL}/v2/account/{name}/{tag}"
-        resp = await self._client.get(url, headers=self._header)
+        resp = await self._get(url, "account", limiter=limiter)
 
         rl = resp.ratelimit()
         logger.debug("RateLimit: remaining=%s/%s reset=%ss bucket=%s version=%s",
@@ -85,7 +114,7 @@ class HenrikDevService:
         """
 
         url = f"{self.BASE_URL}/v1/by-puuid/account/{puuid}"
-        resp = await self._client.get(url, headers=self._header)
+        resp = await self._get(url, "account")
 
         rl = resp.ratelimit()
         logger.debug("RateLimit: remaining=%s/%s reset=%ss bucket=%s version=%s",
@@ -100,10 +129,12 @@ class HenrikDevService:
         return model, rl
 
     
-    async def get_mmr_by_puuid(self, region: str, platform: str, puuid: str):
+    async def get_mmr_by_puuid(
+        self, region: str, platform: str, puuid: str, *, limiter: RequestLimiter | None = None
+    ):
 
         url = f"{self.BASE_URL}/v3/by-puuid/mmr/{region}/{platform}/{puuid}"
-        resp = await self._client.get(url, headers=self._header)
+        resp = await self._get(url, "mmr", limiter=limiter)
 
         rl = resp.ratelimit()
         logger.debug("RateLimit: remaining=%s/%s reset=%ss bucket=%s version=%s",
@@ -119,7 +150,8 @@ class HenrikDevService:
     
 
     async def get_matchlist_by_puuid(self, region: str, platform: str, puuid: str, *, mode: str | None = None,
-                                     map: str | None = None, size: int | None = 10, start: int | None = None):
+                                     map: str | None = None, size: int | None = 10, start: int | None = None,
+                                     limiter: RequestLimiter | None = None):
         
         params: dict[str, object] = {"size": size}
         if start is not None:
@@ -130,7 +162,7 @@ class HenrikDevService:
             params["map"] = map
         
         url = f"{self.BASE_URL}/v4/by-puuid/matches/{region}/{platform}/{puuid}"
-        resp = await self._client.get(url, params=params, headers=self._header)
+        resp = await self._get(url, "matchlist", params=params, limiter=limiter)
 
         rl = resp.ratelimit()
         logger.debug("RateLimit: remaining=%s/%s reset=%ss bucket=%s version=%s",
@@ -147,7 +179,7 @@ class HenrikDevService:
     async def get_mmr_history_by_puuid(self, region: str, platform: str, puuid: str):
         
         url = f"{self.BASE_URL}/v2/by-puuid/mmr-history/{region}/{platform}/{puuid}"
-        resp = await self._client.get(url, headers=self._header)
+        resp = await self._get(url, "mmr_history")
 
         rl = resp.ratelimit()
         logger.debug("RateLimit: remaining=%s/%s reset=%ss bucket=%s version=%s",
@@ -177,11 +209,7 @@ class HenrikDevService:
             params["size"] = size
         if page is not None:
             params["page"] = page
-        resp = await self._client.get(
-            url,
-            params=params or None,
-            headers=self._header,
-        )
+        resp = await self._get(url, "mmr_history", params=params or None)
 
         rl = resp.ratelimit()
         logger.debug("RateLimit: remaining=%s/%s reset=%ss bucket=%s version=%s",
@@ -197,7 +225,7 @@ class HenrikDevService:
 
     async def get_featured_store(self) -> tuple[StoreFeaturedResponse, RateLimit]:
         url = f"{self.BASE_URL}/v2/store-featured"
-        resp = await self._client.get(url, headers=self._header)
+        resp = await self._get(url, "store")
 
         rl = resp.ratelimit()
         logger.debug(
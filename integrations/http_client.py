@@ -4,31 +4,94 @@ import aiohttp
 import asyncio
 import json
 import logging
-from typing import Any, Mapping, Sequence
+import random
+from dataclasses import dataclass
+from typing import Any, Mapping, Protocol, Sequence
+from urllib.parse import urlsplit
 
 from integrations.exceptions import RateLimitError, ApiError, NetworkError
 from integrations.henrikdev.models import HttpResponse
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Politique de retry pour une classe d'endpoints.
+
+    - attempts: nombre total d'essais (1 = pas de retry)
+    - backoff exponentiel avec "full jitter": sleep dans [0, min(max_delay, base_delay * 2**n)]
+    - 429 n'est jamais rejoue ici: le rate limit est gere par les appelants
+    """
+    attempts: int = 1
+    base_delay: float = 0.5
+    max_delay: float = 5.0
+    retry_statuses: frozenset[int] = frozenset({500, 502, 503, 504})
+    retry_network_errors: bool = True
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0.0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+NO_RETRY = RetryPolicy(attempts=1)
+
+
+class RequestLimiter(Protocol):
+    """Budget de requetes (ex: AsyncTokenBucket) consomme avant chaque envoi reel."""
+
+    async def acquire(self) -> None: ...
+
+# Politiques par host (HenrikDev a un quota serre: un seul retry).
+DEFAULT_RETRY_POLICIES: dict[str, RetryPolicy] = {
+    "api.henrikdev.xyz": RetryPolicy(attempts=2, base_delay=1.0, max_delay=4.0),
+    "valorant-api.com": RetryPolicy(attempts=3, base_delay=0.5, max_delay=5.0),
+    "api.twitch.tv": RetryPolicy(attempts=3, base_delay=0.5, max_delay=5.0),
+}
+DEFAULT_RETRY_POLICY = RetryPolicy(attempts=2)
+
+
 class HTTPClient:
     """
     Client HTTP qui utilise aiohttp.
 
     Role:
     - Ouvrir et Fermer une session aiohttp (via async with).
-    - Faire des requetes GET et retourner du JSON.
+    - Connecteur partage: limite par host, cache DNS, keep-alive.
+    - Faire des requetes GET/POST et retourner du JSON.
+    - Rejouer les 5xx/timeouts selon la politique du host (backoff + jitter).
+    - Consommer le limiter de l'appelant avant chaque envoi, retries compris.
+    - Fusionner les GET identiques en vol (meme URL, params et headers).
     - Traduire les erreur reseau/HTTP/JSON vers des exeptions.
     """
 
-    def __init__(self, timeout_seconds: float = 10.0):
+    ParamsType = Mapping[str, Any] | Sequence[tuple[str, Any]]
+
+    def __init__(
+        self,
+        timeout_seconds: float = 10.0,
+        *,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        dns_cache_ttl_seconds: int = 300,
+        keepalive_timeout_seconds: float = 30.0,
+        retry_policies: Mapping[str, RetryPolicy] | None = None,
+        default_retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+    ):
         self._session = None
         self._timeout_seconds = timeout_seconds
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._dns_cache_ttl_seconds = dns_cache_ttl_seconds
+        self._keepalive_timeout_seconds = keepalive_timeout_seconds
+        self._retry_policies = dict(DEFAULT_RETRY_POLICIES if retry_policies is None else retry_policies)
+        self._default_retry_policy = default_retry_policy
+        self._in_flight: dict[tuple, asyncio.Future[HttpResponse]] = {}
 
     async def __aenter__(self):
         """
         Cree une session et le client
-        
+
         return:
 
         self : self._session
@@ -37,7 +100,13 @@ class HTTPClient:
         logger.debug("Ouverture de la session (timeout %ss)", self._timeout_seconds)
 
         timeout = aiohttp.ClientTimeout(total=self._timeout_seconds)
-        self._session = aiohttp.ClientSession(timeout=timeout)
+        connector = aiohttp.TCPConnector(
+            limit=self._limit,
+            limit_per_host=self._limit_per_host,
+            ttl_dns_cache=self._dns_cache_ttl_seconds,
+            keepalive_timeout=self._keepalive_timeout_seconds,
+        )
+        self._session = aiohttp.ClientSession(timeout=timeout, connector=connector)
         return self
 
 
@@ -57,18 +126,116 @@ class HTTPClient:
             return text
         else:
             return text[:limit] + f"...(body tronquer max {limit} caractère)"
-        
-    ParamsType = Mapping[str, Any] | Sequence[tuple[str, Any]]
 
-    async def get(self, url: str, *, params: ParamsType | None = None, headers: Mapping[str, str] | None = None) -> HttpResponse:
+    def retry_policy_for(self, url: str) -> RetryPolicy:
+        host = (urlsplit(url).hostname or "").lower()
+        return self._retry_policies.get(host, self._default_retry_policy)
+
+    async def get(
+        self,
+        url: str,
+        *,
+        params: ParamsType | None = None,
+        headers: Mapping[str, str] | None = None,
+        retry: RetryPolicy | None = None,
+        limiter: RequestLimiter | None = None,
+    ) -> HttpResponse:
+        key = self._coalesce_key(url, params, headers)
+        shared = self._in_flight.get(key)
+        if shared is None:
+            shared = asyncio.ensure_future(
+                self._request("GET", url, params=params, headers=headers, retry=retry, limiter=limiter)
+            )
+            self._in_flight[key] = shared
+            shared.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            logger.debug("GET %s coalesced with in-flight request", url)
+        # shield: un appelant annule n'annule pas la requete des autres
+        return await asyncio.shield(shared)
+
+    async def post(
+        self,
+        url: str,
+        *,
+        params: ParamsType | None = None,
+        headers: Mapping[str, str] | None = None,
+        data: Mapping[str, Any] | None = None,
+        retry: RetryPolicy | None = None,
+    ) -> HttpResponse:
+        # POST n'est pas idempotent: pas de retry sauf demande explicite.
+        return await self._request(
+            "POST", url, params=params, headers=headers, data=data, retry=retry or NO_RETRY
+        )
+
+    @staticmethod
+    def _coalesce_key(
+        url: str,
+        params: ParamsType | None,
+        headers: Mapping[str, str] | None,
+    ) -> tuple:
+        if params is None:
+            params_key: tuple = ()
+        elif isinstance(params, Mapping):
+            params_key = tuple(sorted((str(k), str(v)) for k, v in params.items()))
+        else:
+            params_key = tuple((str(k), str(v)) for k, v in params)
+        headers_key = tuple(sorted((headers or {}).items()))
+        return (url, params_key, headers_key)
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: ParamsType | None = None,
+        headers: Mapping[str, str] | None = None,
+        data: Mapping[str, Any] | None = None,
+        retry: RetryPolicy | None = None,
+        limiter: RequestLimiter | None = None,
+    ) -> HttpResponse:
         if self._session is None:
             logger.error("HTTPClient used without session (use 'async with').")
             raise RuntimeError("HTTPClient must be used with 'async with'.")
 
-        logger.debug("GET %s (params=%s)", url, params)
+        policy = retry or self.retry_policy_for(url)
+        attempt = 0
+        while True:
+            if limiter is not None:
+                await limiter.acquire()
+            try:
+                return await self._send_once(method, url, params=params, headers=headers, data=data)
+            except RateLimitError:
+                raise
+            except ApiError as e:
+                retryable = e.status in policy.retry_statuses
+                error = e
+            except NetworkError as e:
+                retryable = policy.retry_network_errors
+                error = e
+
+            attempt += 1
+            if not retryable or attempt >= policy.attempts:
+                raise error
+            delay = policy.delay(attempt - 1)
+            logger.warning(
+                "%s %s failed (%s), retry %s/%s in %.2fs",
+                method, url, error, attempt, policy.attempts - 1, delay,
+            )
+            await asyncio.sleep(delay)
+
+    async def _send_once(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: ParamsType | None = None,
+        headers: Mapping[str, str] | None = None,
+        data: Mapping[str, Any] | None = None,
+    ) -> HttpResponse:
+        logger.debug("%s %s (params=%s)", method, url, params)
 
         try:
-            async with self._session.get(url, params=params, headers=headers) as resp:
+            async with self._session.request(method, url, params=params, data=data, headers=headers) as resp:
                 status = resp.status
 
                 # Copie headers en dict[str, str]
@@ -78,77 +245,32 @@ class HTTPClient:
                     body = self._truncate(await resp.text())
                     if status == 429:
                         logger.warning("HTTP 429 rate-limited on %s", url)
-                        raise RateLimitError(f"HTTP {status}: {body}")
+                        raise RateLimitError(f"HTTP {status}: {body}", status=status)
                     logger.error("HTTP %s on %s | body=%s", status, url, body)
-                    raise ApiError(f"HTTP {status}: {body}")
+                    raise ApiError(f"HTTP {status}: {body}", status=status)
 
                 try:
-                    data = await resp.json()
+                    payload = await resp.json()
                 except aiohttp.ContentTypeError:
                     body = self._truncate(await resp.text())
                     logger.error("Invalid JSON content-type on %s | body=%s", url, body)
-                    raise ApiError(f"Invalid JSON (content-type). Body: {body}")
-                
-                except json.JSONDecodeError:
-                    body = self._truncate(await resp.text())
-                    logger.error("Invalid JSON decode on %s | body=%s", url, body)
-                    raise ApiError(f"Invalid JSON (decode). Body: {body}")
-
-                if not isinstance(data, dict):
-                    logger.error("Unexpected JSON type from %s: %s", url, type(data).__name__)
-                    raise ApiError(f"Unexpected JSON type: {type(data).__name__}")
-
-                return HttpResponse(status=status, payload=data, headers=resp_headers)
-
-        except asyncio.TimeoutError:
-            logger.warning("Timeout after %ss on %s", self._timeout_seconds, url)
-            raise NetworkError(f"Request timed out after {self._timeout_seconds}s")
-
-        except aiohttp.ClientError as e:
-            logger.exception("Network error on %s", url)
-            raise NetworkError(str(e))
-        
-
-    async def post(self, url: str, *, params: ParamsType | None = None, headers: Mapping[str, str] | None = None, data: Mapping[str, Any] | None = None) -> HttpResponse:
-        if self._session is None:
-            logger.error("HTTPClient used without session (use 'async with').")
-            raise RuntimeError("HTTPClient must be used with 'async with'.")
-
-        logger.debug("POST %s (params=%s)", url, params)
-
-        try:
-            async with self._session.post(url, params=params, data=data, headers=headers) as resp:
-                status = resp.status
-                resp_headers = {k: v for k, v in resp.headers.items()}
+                    raise ApiError(f"Invalid JSON (content-type). Body: {body}", status=status)
 
-                if status >= 400:
-                    body = self._truncate(await resp.text())
-                    if status == 429:
-                        logger.warning("HTTP 429 rate-limited on %s", url)
-                        raise RateLimitError(f"HTTP {status}: {body}")
-                    logger.error("HTTP %s on %s | body=%s", status, url, body)
-                    raise ApiError(f"HTTP {status}: {body}")
-
-                try:
-                    data_json = await resp.json()
-                except aiohttp.ContentTypeError:
-                    body = self._truncate(await resp.text())
-                    logger.error("Invalid JSON content-type on %s | body=%s", url, body)
-                    raise ApiError(f"Invalid JSON (content-type). Body: {body}")
                 except json.JSONDecodeError:
                     body = self._truncate(await resp.text())
                     logger.error("Invalid JSON decode on %s | body=%s", url, body)
-                    raise ApiError(f"Invalid JSON (decode). Body: {body}")
+                    raise ApiError(f"Invalid JSON (decode). Body: {body}", status=status)
 
-                if not isinstance(data_json, dict):
-                    logger.error("Unexpected JSON type from %s: %s", url, type(data_json).__name__)
-                    raise ApiError(f"Unexpected JSON type: {type(data_json).__name__}")
+                if not isinstance(payload, dict):
+                    logger.error("Unexpected JSON type from %s: %s", url, type(payload).__name__)
+                    raise ApiError(f"Unexpected JSON type: {type(payload).__name__}", status=status)
 
-                return HttpResponse(status=status, payload=data_json, headers=resp_headers)
+                return HttpResponse(status=status, payload=payload, headers=resp_headers)
 
         except asyncio.TimeoutError:
             logger.warning("Timeout after %ss on %s", self._timeout_seconds, url)
             raise NetworkError(f"Request timed out after {self._timeout_seconds}s")
+
         except aiohttp.ClientError as e:
             logger.exception("Network error on %s", url)
             raise NetworkError(str(e))
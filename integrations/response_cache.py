@@ -0,0 +1,197 @@
+# integrations\response_cache.py
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Mapping, Protocol, Sequence
+from urllib.parse import urlencode
+
+from integrations.henrikdev.models import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+ParamsType = Mapping[str, Any] | Sequence[tuple[str, Any]]
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """
+    TTL d'une classe d'endpoints.
+
+    - ttl_seconds: la reponse est servie telle quelle pendant ce delai
+    - stale_seconds: au-dela, elle est encore servie pendant ce delai
+      mais une revalidation est lancee en arriere-plan (stale-while-revalidate)
+    """
+    ttl_seconds: float
+    stale_seconds: float = 0.0
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    response: HttpResponse
+    stored_at: float
+
+
+class CacheStore(Protocol):
+    async def get(self, key: str) -> CacheEntry | None: ...
+
+    async def set(self, key: str, entry: CacheEntry) -> None: ...
+
+
+class MemoryCacheStore:
+    """LRU en memoire, bornee en nombre d'entrees."""
+
+    def __init__(self, max_entries: int = 2048):
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> CacheEntry | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+
+class DiskCacheStore:
+    """Un fichier JSON par cle; survit aux redemarrages (utile pour les assets)."""
+
+    def __init__(self, directory: str | Path):
+        self._directory = Path(directory)
+
+    def _path(self, key: str) -> Path:
+        return self._directory / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+    async def get(self, key: str) -> CacheEntry | None:
+        return await asyncio.to_thread(self._read, self._path(key))
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        await asyncio.to_thread(self._write, self._path(key), entry)
+
+    @staticmethod
+    def _read(path: Path) -> CacheEntry | None:
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+            return CacheEntry(
+                response=HttpResponse.model_validate(raw["response"]),
+                stored_at=float(raw["stored_at"]),
+            )
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.warning("Unreadable cache file %s, ignored", path)
+            return None
+
+    def _write(self, path: Path, entry: CacheEntry) -> None:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps({"stored_at": entry.stored_at, "response": entry.response.model_dump()}),
+            encoding="utf-8",
+        )
+        tmp.replace(path)
+
+
+def cache_key(url: str, params: ParamsType | None = None) -> str:
+    if not params:
+        return url
+    items = params.items() if isinstance(params, Mapping) else params
+    return f"{url}?{urlencode(sorted((str(k), str(v)) for k, v in items))}"
+
+
+class ResponseCache:
+    """
+    Cache de reponses HTTP devant les services d'integration.
+
+    - Lecture memoire (LRU) puis disque (optionnel); une lecture disque remonte en memoire.
+    - Les headers ne sont pas conserves: le rate limit qu'ils decrivent n'a de sens
+      que pour la requete reellement envoyee (un hit renvoie un RateLimit vide).
+    - Une seule revalidation en arriere-plan par cle.
+    """
+
+    def __init__(
+        self,
+        memory: MemoryCacheStore | None = None,
+        disk: CacheStore | None = None,
+        *,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._memory = memory if memory is not None else MemoryCacheStore()
+        self._disk = disk
+        self._clock = clock
+        self._refreshing: dict[str, asyncio.Task] = {}
+
+    async def fetch(
+        self,
+        key: str,
+        policy: CachePolicy,
+        loader: Callable[[], Awaitable[HttpResponse]],
+    ) -> HttpResponse:
+        entry = await self._lookup(key)
+        if entry is not None:
+            age = self._clock() - entry.stored_at
+            if age < policy.ttl_seconds:
+                return entry.response
+            if age < policy.ttl_seconds + policy.stale_seconds:
+                self._revalidate(key, loader)
+                return entry.response
+
+        return await self._load(key, loader)
+
+    async def close(self) -> None:
+        tasks = list(self._refreshing.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._refreshing.clear()
+
+    async def _lookup(self, key: str) -> CacheEntry | None:
+        entry = await self._memory.get(key)
+        if entry is None and self._disk is not None:
+            entry = await self._disk.get(key)
+            if entry is not None:
+                await self._memory.set(key, entry)
+        return entry
+
+    async def _load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[HttpResponse]],
+    ) -> HttpResponse:
+        response = await loader()
+        stored = HttpResponse(status=response.status, payload=response.payload)
+        entry = CacheEntry(response=stored, stored_at=self._clock())
+        await self._memory.set(key, entry)
+        if self._disk is not None:
+            try:
+                await self._disk.set(key, entry)
+            except Exception:
+                logger.exception("Disk cache write failed for %s", key)
+        return response
+
+    def _revalidate(self, key: str, loader: Callable[[], Awaitable[HttpResponse]]) -> None:
+        if key in self._refreshing:
+            return
+
+        async def refresh() -> None:
+            try:
+                await self._load(key, loader)
+            except Exception as e:
+                logger.warning("Background revalidation failed for %s: %s", key, e)
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(refresh())
@@ -5,6 +5,7 @@ from pydantic import ValidationError
 
 from integrations.exceptions import ApiError
 from integrations.http_client import HTTPClient
+from integrations.response_cache import CachePolicy, ResponseCache
 from integrations.valorant_api.models import BundleResponseUuid, CardResponseUuid, TitleResponseUuid
 
 logger = logging.getLogger(__name__)
@@ -13,14 +14,23 @@ class ValorantApiService:
 
     BASE_URL = "https://valorant-api.com"
 
-    def __init__(self, client: HTTPClient):
+    # Metadonnees d'assets immuables: cache long, revalidation en arriere-plan ensuite.
+    ASSET_CACHE_POLICY = CachePolicy(ttl_seconds=7 * 86400, stale_seconds=30 * 86400)
+
+    def __init__(self, client: HTTPClient, cache: ResponseCache | None = None):
         self._client = client
+        self._cache = cache
+
+    async def _get_asset(self, url: str):
+        if self._cache is None:
+            return await self._client.get(url)
+        return await self._cache.fetch(url, self.ASSET_CACHE_POLICY, lambda: self._client.get(url))
 
 
     async def get_player_card_by_uuid(self, playercarduid: str):
 
         url = f"{self.BASE_URL}/v1/playercards/{playercarduid}"
-        resp = await self._client.get(url)
+        resp = await self._get_asset(url)
 
         try:
             model = CardResponseUuid.model_validate(resp.payload)
@@ -33,7 +43,7 @@ class ValorantApiService:
     async def get_player_title_by_uuid(self, playertitleUuid: str):
 
         url = f"{self.BASE_URL}/v1/playertitles/{playertitleUuid}"
-        resp = await self._client.get(url)
+        resp = await self._get_asset(url)
 
         try:
             model = TitleResponseUuid.model_validate(resp.payload)
@@ -45,7 +55,7 @@ class ValorantApiService:
 
     async def get_bundle_by_uuid(self, bundle_uuid: str) -> BundleResponseUuid:
         url = f"{self.BASE_URL}/v1/bundles/{bundle_uuid}"
-        resp = await self._client.get(url)
+        resp = await self._get_asset(url)
 
         try:
             model = BundleResponseUuid.model_validate(resp.payload)
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import pytest
+
+from cogs.ranking.assign_rank import EmbedCog
+from database.repos.valorant_info_repo import ValorantPipelineUpdate
+
+
+class FakeRankingService:
+    def __init__(self) -> None:
+        self.fail = True
+        self.written: list[list[int]] = []
+
+    async def apply_pipeline_results(self, updates) -> int:
+        if self.fail:
+            raise ConnectionError("db down")
+        self.written.append([update.discord_id for update in updates])
+        return len(updates)
+
+
+def update(discord_id: int) -> ValorantPipelineUpdate:
+    return ValorantPipelineUpdate(discord_id=discord_id, success=True, read_pseudo="Joueur", read_tag="EUW")
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_results_pending_ahead_of_newer_ones() -> None:
+    cog = EmbedCog.__new__(EmbedCog)
+    cog._ranking_svc = FakeRankingService()
+    updates = [update(1), update(2)]
+
+    await cog._flush_pipeline_updates(updates)
+    assert [pending.discord_id for pending in updates] == [1, 2]
+
+    updates.append(update(3))
+    cog._ranking_svc.fail = False
+    await cog._flush_pipeline_updates(updates)
+
+    assert updates == []
+    assert cog._ranking_svc.written == [[1, 2, 3]]
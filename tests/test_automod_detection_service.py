@@ -68,3 +68,33 @@ def test_whitelist_checks_member_permissions_roles_and_channels() -> None:
     assert service.is_member_whitelisted(_member(roles=[99]), config) is False
     assert service.is_channel_whitelisted(123, config) is True
     assert service.is_channel_whitelisted(456, config) is False
+
+
+def test_matcher_is_cached_and_rebuilt_when_custom_lists_change() -> None:
+    service = AutomodDetectionService()
+    config = {"custom_scam_patterns": [r"free\s*vbucks"], "custom_scam_domains": []}
+
+    matcher = service.get_matcher(config)
+    assert service.get_matcher(dict(config)) is matcher
+
+    updated = {**config, "custom_scam_domains": ["fake-discord.com"]}
+    assert service.get_matcher(updated) is not matcher
+    assert service.is_scam_domain("https://www.fake-discord.com/login", updated) is True
+    assert service.is_scam_domain("https://www.fake-discord.com/login", config) is False
+
+
+def test_matcher_keeps_backreference_patterns_semantics() -> None:
+    service = AutomodDetectionService()
+    config = {"custom_scam_patterns": [r"(gift)-\1"]}
+
+    assert service.is_scam_content("gift-gift", config) is True
+    assert service.is_scam_content("gift-card", config) is False
+    assert service.is_scam_content("free nitro", config) is True
+
+
+def test_domain_lookup_only_matches_whole_labels() -> None:
+    service = AutomodDetectionService()
+
+    assert service.is_scam_domain("https://free-nitro.com", {}) is True
+    assert service.is_scam_domain("https://a.b.free-nitro.com/x", {}) is True
+    assert service.is_scam_domain("https://notfree-nitro.com", {}) is False
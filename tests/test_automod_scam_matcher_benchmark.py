@@ -0,0 +1,94 @@
+"""Micro-benchmark du matcher de scam: messages/seconde avant et apres compilation.
+
+Lancer avec `pytest -s tests/test_automod_scam_matcher_benchmark.py` pour voir les chiffres.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from urllib.parse import urlparse
+
+from cogs.moderation.services.automod_detection_service import (
+    SCAM_DOMAINS,
+    SCAM_PATTERNS,
+    AutomodDetectionService,
+)
+
+MESSAGES = [
+    "gg wp, on relance une ranked ce soir ?",
+    "regarde ce clip https://clips.twitch.tv/AwesomeClip-123",
+    "quelqu'un pour un 5 stack ? je suis plat 2",
+    "Claim your free nitro https://discord-nitro.gift/claim",
+    "lien du tournoi: https://www.start.gg/tournament/valo-cup",
+    "selling acc https://cdn.scam-store.example/item",
+    "free vbucks ici https://discord.com/channels/1/2",
+    "j'ai enfin atteint immortal 1 !!",
+] * 25
+
+CONFIG = {
+    "custom_scam_patterns": [rf"promo-code-{i}\d+" for i in range(20)] + [r"free\s*vbucks"],
+    "custom_scam_domains": [f"scam-{i}.example" for i in range(50)] + ["scam-store.example"],
+}
+
+
+class LegacyDetection:
+    """Implementation d'origine (recompile les patterns custom a chaque message)."""
+
+    def __init__(self) -> None:
+        self.scam_patterns = [re.compile(p, re.IGNORECASE) for p in SCAM_PATTERNS]
+        self.scam_domains = tuple(d.lower() for d in SCAM_DOMAINS)
+        self.url_pattern = re.compile(r'https?://[^\s<>"{}|\\^`\[\]]+')
+
+    def is_scam_domain(self, url: str, config: dict) -> bool:
+        domain = urlparse(url).netloc.lower()
+        for scam_domain in self.scam_domains:
+            if domain == scam_domain or domain.endswith("." + scam_domain):
+                return True
+        for scam_domain in config.get("custom_scam_domains", []) or []:
+            normalized = str(scam_domain).lower()
+            if domain == normalized or domain.endswith("." + normalized):
+                return True
+        return False
+
+    def is_scam_content(self, content: str, config: dict) -> bool:
+        content_lower = content.lower()
+        for pattern in self.scam_patterns:
+            if pattern.search(content_lower):
+                return True
+        for pattern_str in config.get("custom_scam_patterns", []) or []:
+            try:
+                if re.compile(pattern_str, re.IGNORECASE).search(content_lower):
+                    return True
+            except re.error:
+                continue
+        return False
+
+    def is_scam_message_content(self, content: str, config: dict) -> bool:
+        if self.is_scam_content(content, config):
+            return True
+        return any(self.is_scam_domain(url, config) for url in self.url_pattern.findall(content))
+
+
+def _messages_per_second(check, rounds: int = 5) -> tuple[float, list[bool]]:
+    results = [check(message, CONFIG) for message in MESSAGES]
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for message in MESSAGES:
+            check(message, CONFIG)
+    elapsed = time.perf_counter() - start
+    return rounds * len(MESSAGES) / elapsed, results
+
+
+def test_scam_matcher_benchmark() -> None:
+    legacy_rate, legacy_results = _messages_per_second(LegacyDetection().is_scam_message_content)
+    compiled_rate, compiled_results = _messages_per_second(
+        AutomodDetectionService().is_scam_message_content
+    )
+
+    print(
+        f"\nscam matcher: avant {legacy_rate:,.0f} msg/s, "
+        f"apres {compiled_rate:,.0f} msg/s (x{compiled_rate / legacy_rate:.1f})"
+    )
+    assert compiled_results == legacy_results
+    assert any(compiled_results) and not all(compiled_results)
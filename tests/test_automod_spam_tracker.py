@@ -172,3 +172,116 @@ def test_spam_tracker_whitelist_expires() -> None:
     assert tracker.is_whitelisted(1, 10, now=now + timedelta(seconds=4)) is True
     assert tracker.is_whitelisted(1, 10, now=now + timedelta(seconds=6)) is False
     assert tracker.spam_whitelist == {}
+
+
+def test_spam_tracker_expires_idle_users_without_full_sweep() -> None:
+    tracker = AutomodSpamTracker()
+    now = datetime(2026, 5, 8, 12, 0)
+
+    for user_id in range(50):
+        tracker.record_message(
+            user_id=user_id,
+            guild_id=10,
+            channel_id=100,
+            message_id=user_id,
+            content="hello",
+            now=now,
+        )
+
+    tracker.record_and_detect(
+        user_id=999,
+        guild_id=10,
+        channel_id=100,
+        message_id=999,
+        content="hello",
+        threshold=2,
+        time_window_seconds=60,
+        now=now + timedelta(minutes=3),
+    )
+
+    assert tracker.get_matching_message_refs(
+        user_id=1,
+        guild_id=10,
+        content="hello",
+        now=now + timedelta(minutes=3),
+        window_seconds=600,
+    ) == []
+    assert list(tracker._streams) == [(999, 10)]
+
+
+def test_spam_tracker_bounds_history_per_user() -> None:
+    tracker = AutomodSpamTracker(max_records_per_stream=3)
+    now = datetime(2026, 5, 8, 12, 0)
+
+    for index in range(5):
+        tracker.record_message(
+            user_id=1,
+            guild_id=10,
+            channel_id=100 + index,
+            message_id=1000 + index,
+            content="same",
+            now=now + timedelta(seconds=index),
+        )
+
+    refs = tracker.get_matching_message_refs(
+        user_id=1,
+        guild_id=10,
+        content="same",
+        now=now + timedelta(seconds=5),
+    )
+
+    assert refs == [(102, 1002), (103, 1003), (104, 1004)]
+
+
+def test_spam_tracker_recounts_when_window_grows() -> None:
+    tracker = AutomodSpamTracker()
+    now = datetime(2026, 5, 8, 12, 0)
+
+    tracker.record_and_detect(
+        user_id=1,
+        guild_id=10,
+        channel_id=100,
+        message_id=1000,
+        content="same",
+        threshold=2,
+        time_window_seconds=300,
+        now=now,
+    )
+    assert tracker.record_and_detect(
+        user_id=1,
+        guild_id=10,
+        channel_id=101,
+        message_id=1001,
+        content="same",
+        threshold=2,
+        time_window_seconds=10,
+        now=now + timedelta(seconds=30),
+    ) is False
+    assert tracker.record_and_detect(
+        user_id=1,
+        guild_id=10,
+        channel_id=101,
+        message_id=1002,
+        content="same",
+        threshold=2,
+        time_window_seconds=300,
+        now=now + timedelta(seconds=31),
+    ) is True
+
+
+def test_spam_tracker_user_message_refs_cover_every_content() -> None:
+    tracker = AutomodSpamTracker()
+    now = datetime(2026, 5, 8, 12, 0)
+
+    for index, content in enumerate(("a", "b", "a")):
+        tracker.record_message(
+            user_id=1,
+            guild_id=10,
+            channel_id=100 + index,
+            message_id=1000 + index,
+            content=content,
+            now=now + timedelta(seconds=index),
+        )
+
+    assert tracker.get_user_message_refs(user_id=1, guild_id=10) == [(100, 1000), (101, 1001), (102, 1002)]
+    assert tracker.get_user_message_refs(user_id=1, guild_id=11) == []
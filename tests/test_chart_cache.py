@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pytest
+
+from core.chart_cache import ChartCache, chart_cache_key
+from core.chart_renderer import ChartRenderer
+
+
+calls: list[tuple] = []
+
+
+def _fake_render(days, net_changes, current_member_count) -> bytes:
+    calls.append((tuple(days), tuple(net_changes), current_member_count))
+    return f"png-{current_member_count}-{sum(net_changes)}".encode()
+
+
+def test_cache_key_changes_with_series_and_parameters():
+    base = chart_cache_key(_fake_render, ([date(2026, 5, 8)], [1], 42), {})
+
+    assert base == chart_cache_key(_fake_render, ([date(2026, 5, 8)], [1], 42), {})
+    assert base != chart_cache_key(_fake_render, ([date(2026, 5, 8)], [2], 42), {})
+    assert base != chart_cache_key(_fake_render, ([date(2026, 5, 8)], [1], 43), {})
+    assert base != chart_cache_key(_fake_render, ([date(2026, 5, 8)], [1], 42), {"title": "x"})
+
+
+@pytest.mark.asyncio
+async def test_memory_budget_evicts_least_recently_used():
+    cache = ChartCache(max_bytes=10)
+    await cache.set("a", b"aaaa")
+    await cache.set("b", b"bbbb")
+    assert await cache.get("a") == b"aaaa"
+
+    await cache.set("c", b"cccc")
+
+    assert await cache.get("b") is None
+    assert await cache.get("a") == b"aaaa"
+    assert await cache.get("c") == b"cccc"
+    assert cache.nbytes == 8
+
+
+@pytest.mark.asyncio
+async def test_evicted_entries_spill_to_disk_and_come_back(tmp_path):
+    cache = ChartCache(max_bytes=6, spill_dir=tmp_path)
+    await cache.set("a", b"aaaa")
+    await cache.set("b", b"bbbb")
+
+    assert "a" not in cache._entries
+    assert (tmp_path / "a.png").read_bytes() == b"aaaa"
+    assert await cache.get("a") == b"aaaa"
+    assert "a" in cache._entries
+
+
+@pytest.mark.asyncio
+async def test_disk_spill_is_bounded(tmp_path):
+    cache = ChartCache(max_bytes=4, spill_dir=tmp_path, spill_max_bytes=8)
+    for key in ("a", "b", "c", "d", "e"):
+        await cache.set(key, key.encode() * 4)
+
+    assert sum(path.stat().st_size for path in tmp_path.glob("*.png")) <= 8
+
+
+@pytest.mark.asyncio
+async def test_renderer_serves_identical_inputs_from_cache():
+    calls.clear()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        renderer = ChartRenderer(executor=executor, cache=ChartCache())
+        days = [date(2026, 5, 7), date(2026, 5, 8)]
+
+        first = await renderer.render(_fake_render, days, [1, 2], 42)
+        second = await renderer.render(_fake_render, list(days), [1, 2], 42)
+        changed = await renderer.render(_fake_render, days, [1, 3], 42)
+
+    assert first == second == b"png-42-3"
+    assert changed == b"png-42-4"
+    assert len(calls) == 2
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from cogs.ranking.renderers import render_mmr_history_png
+from core.chart_renderer import ChartRenderBusyError, ChartRenderTimeoutError, ChartRenderer
+
+
+def _blocking_render(release: threading.Event) -> bytes:
+    release.wait(timeout=5)
+    return b"png"
+
+
+def _slow_render() -> bytes:
+    time.sleep(0.3)
+    return b"png"
+
+
+@pytest.mark.asyncio
+async def test_render_runs_in_executor_and_returns_bytes():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        renderer = ChartRenderer(executor=executor)
+        now = datetime(2026, 5, 8, 12, 0, tzinfo=timezone.utc)
+
+        png = await renderer.render(
+            render_mmr_history_png,
+            [now, now + timedelta(hours=1), now + timedelta(hours=2)],
+            [1000, 1020, 1015],
+            period="today",
+            title="Aujourd'hui",
+        )
+
+    assert png.startswith(b"\x89PNG\r\n\x1a\n")
+
+
+@pytest.mark.asyncio
+async def test_render_rejects_when_queue_is_full():
+    release = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        renderer = ChartRenderer(executor=executor, max_pending=1)
+        pending = asyncio.create_task(renderer.render(_blocking_render, release))
+        await asyncio.sleep(0)
+
+        with pytest.raises(ChartRenderBusyError):
+            await renderer.render(_blocking_render, release)
+
+        release.set()
+        assert await pending == b"png"
+
+
+@pytest.mark.asyncio
+async def test_render_times_out():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        renderer = ChartRenderer(executor=executor, timeout_seconds=0.05)
+
+        with pytest.raises(ChartRenderTimeoutError):
+            await renderer.render(_slow_render)
+
+
+@pytest.mark.asyncio
+async def test_timed_out_render_keeps_its_slot_until_the_worker_finishes():
+    release = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        renderer = ChartRenderer(executor=executor, max_pending=1, timeout_seconds=0.05)
+
+        with pytest.raises(ChartRenderTimeoutError):
+            await renderer.render(_blocking_render, release)
+        with pytest.raises(ChartRenderBusyError):
+            await renderer.render(_blocking_render, release)
+
+        release.set()
+        for _ in range(100):
+            if not renderer._slots.locked():
+                break
+            await asyncio.sleep(0.01)
+        assert await renderer.render(_blocking_render, release) == b"png"
+
+
+@pytest.mark.asyncio
+async def test_process_pool_renders_png():
+    renderer = ChartRenderer(max_workers=1)
+    try:
+        await renderer.start()
+        now = datetime(2026, 5, 8, 12, 0, tzinfo=timezone.utc)
+        png = await renderer.render(
+            render_mmr_history_png,
+            [now, now + timedelta(days=1)],
+            [1000, 990],
+            period="week",
+            title="7 derniers jours",
+        )
+    finally:
+        await renderer.close()
+
+    assert png.startswith(b"\x89PNG\r\n\x1a\n")
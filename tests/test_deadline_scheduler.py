@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core.deadline_scheduler import DeadlineScheduler
+
+
+def in_ms(milliseconds: float) -> datetime:
+    return datetime.now(timezone.utc) + timedelta(milliseconds=milliseconds)
+
+
+async def wait_for_calls(calls: list, count: int, timeout: float = 1.0) -> None:
+    async def _wait():
+        while len(calls) < count:
+            await asyncio.sleep(0.005)
+
+    await asyncio.wait_for(_wait(), timeout)
+
+
+@pytest.mark.asyncio
+async def test_deadlines_fire_in_order_and_replacing_a_key_moves_it():
+    scheduler = DeadlineScheduler()
+    fired: list[str] = []
+
+    async def handler(key):
+        fired.append(key)
+
+    scheduler.register("test", handler)
+    scheduler.start()
+    try:
+        scheduler.schedule("test", "b", in_ms(40))
+        scheduler.schedule("test", "a", in_ms(20))
+        scheduler.schedule("test", "c", in_ms(30))
+        scheduler.schedule("test", "c", in_ms(60))
+        scheduler.schedule("test", "gone", in_ms(10))
+        scheduler.cancel("test", "gone")
+
+        await wait_for_calls(fired, 3)
+        await asyncio.sleep(0.03)
+        assert fired == ["a", "b", "c"]
+        assert len(scheduler) == 0
+    finally:
+        await scheduler.close()
+
+
+@pytest.mark.asyncio
+async def test_earlier_deadline_wakes_a_sleeping_timer():
+    scheduler = DeadlineScheduler()
+    fired: list[str] = []
+
+    async def handler(key):
+        fired.append(key)
+
+    scheduler.register("test", handler)
+    scheduler.start()
+    try:
+        scheduler.schedule("test", "late", in_ms(60_000))
+        await asyncio.sleep(0.01)
+        scheduler.schedule("test", "soon", in_ms(10))
+
+        await wait_for_calls(fired, 1)
+        assert fired == ["soon"]
+        assert scheduler.deadline("test", "late") is not None
+    finally:
+        await scheduler.close()
+
+
+@pytest.mark.asyncio
+async def test_due_handlers_run_concurrently_up_to_max_workers():
+    scheduler = DeadlineScheduler(max_workers=2)
+    active = 0
+    peak = 0
+    done: list[int] = []
+
+    async def handler(key):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.02)
+        active -= 1
+        done.append(key)
+
+    scheduler.register("test", handler)
+    for key in range(5):
+        scheduler.schedule("test", key, datetime.now(timezone.utc))
+    scheduler.start()
+    try:
+        await wait_for_calls(done, 5)
+        assert peak == 2
+    finally:
+        await scheduler.close()
+
+
+@pytest.mark.asyncio
+async def test_failing_handler_is_retried_and_unregister_drops_pending_deadlines():
+    scheduler = DeadlineScheduler(retry_delay_seconds=0.01)
+    attempts: list[str] = []
+
+    async def flaky(key):
+        attempts.append(key)
+        if len(attempts) == 1:
+            raise RuntimeError("boom")
+
+    scheduler.register("flaky", flaky)
+    scheduler.register("other", flaky)
+    scheduler.schedule("flaky", "x", datetime.now(timezone.utc))
+    scheduler.schedule("other", "y", in_ms(60_000))
+    scheduler.start()
+    try:
+        await wait_for_calls(attempts, 2)
+        assert attempts == ["x", "x"]
+
+        scheduler.unregister("other")
+        assert scheduler.deadline("other", "y") is None
+        assert len(scheduler) == 0
+    finally:
+        await scheduler.close()
+
+
+def test_naive_datetimes_are_utc():
+    scheduler = DeadlineScheduler()
+    naive = datetime(2030, 1, 1, 12, 0)
+
+    scheduler.schedule("test", 1, naive)
+
+    assert scheduler.deadline("test", 1) == naive.replace(tzinfo=timezone.utc)
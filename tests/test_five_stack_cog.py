@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from cogs.five_stack.five_stack import QUEUE_RELOAD_DEADLINE, QUEUE_SEARCH_DEADLINE, FiveStackCog
+from core.deadline_scheduler import DeadlineScheduler
+
+
+class FakeFiveStackService:
+    def __init__(self) -> None:
+        self.fail_match = True
+        self.loads = 0
+        self.created: list[int] = []
+        self.next_search = None
+        self.fail_load = False
+
+    async def load_queue(self) -> None:
+        if self.fail_load:
+            raise RuntimeError("database down")
+        self.loads += 1
+
+    async def next_queue_expiry(self):
+        return None
+
+    async def find_match_proposals(self, guild_id: int):
+        return [SimpleNamespace(guild_id=guild_id)]
+
+    def next_queue_search(self, guild_id: int):
+        return self.next_search
+
+
+class FakeBot:
+    def __init__(self, guilds) -> None:
+        self.guilds = guilds
+
+    def get_guild(self, guild_id: int):
+        return next((guild for guild in self.guilds if guild.id == guild_id), None)
+
+
+def make_cog(service: FakeFiveStackService) -> FiveStackCog:
+    cog = FiveStackCog.__new__(FiveStackCog)
+    cog.bot = FakeBot([SimpleNamespace(id=1)])
+    cog._service = service
+    cog._deadlines = DeadlineScheduler()
+    cog._server_locks = {}
+
+    async def create_match(guild, proposal):
+        if service.fail_match:
+            raise RuntimeError("discord down")
+        service.created.append(guild.id)
+
+    async def refresh_queue_message(guild):
+        return None
+
+    cog._create_match = create_match
+    cog._refresh_queue_message = refresh_queue_message
+    return cog
+
+
+@pytest.mark.asyncio
+async def test_failed_match_creation_schedules_a_new_search() -> None:
+    service = FakeFiveStackService()
+    cog = make_cog(service)
+
+    await cog._process_queue(cog.bot.guilds[0])
+
+    assert cog._deadlines.deadline(QUEUE_SEARCH_DEADLINE, 1) is not None
+    service.fail_match = False
+    await cog._search_queue(1)
+    assert service.created == [1]
+
+
+@pytest.mark.asyncio
+async def test_presence_reconciliation_reloads_queue_only_when_entries_were_removed() -> None:
+    service = FakeFiveStackService()
+    service.fail_match = False
+    cog = make_cog(service)
+
+    await cog.on_presence_reconciled(SimpleNamespace(queue_entries_removed=0))
+    assert service.loads == 0
+
+    await cog.on_presence_reconciled(SimpleNamespace(queue_entries_removed=2))
+    assert service.loads == 1
+    assert service.created == [1]
+
+
+@pytest.mark.asyncio
+async def test_successful_search_schedules_the_next_elo_widening() -> None:
+    service = FakeFiveStackService()
+    service.fail_match = False
+    service.next_search = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    cog = make_cog(service)
+
+    await cog._process_queue(cog.bot.guilds[0])
+    assert cog._deadlines.deadline(QUEUE_SEARCH_DEADLINE, 1) == service.next_search
+
+    service.next_search = None
+    await cog._process_queue(cog.bot.guilds[0])
+    assert cog._deadlines.deadline(QUEUE_SEARCH_DEADLINE, 1) is None
+
+
+@pytest.mark.asyncio
+async def test_failed_queue_reload_schedules_a_retry() -> None:
+    service = FakeFiveStackService()
+    service.fail_match = False
+    service.fail_load = True
+    cog = make_cog(service)
+
+    await cog._reload_queue()
+    assert cog._deadlines.deadline(QUEUE_RELOAD_DEADLINE, None) is not None
+    assert service.created == []
+
+    service.fail_load = False
+    await cog._reload_queue(None)
+    assert service.loads == 1
+    assert service.created == [1]
+    assert cog._deadlines.deadline(QUEUE_RELOAD_DEADLINE, None) is None
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pytest
+
+from database.repos.five_stack_queue_repo import FiveStackQueueRow
+from database.services.five_stack_service import FiveStackDbService
+
+NOW = datetime(2026, 5, 1, 20, 0, tzinfo=timezone.utc)
+
+
+def team_record(code: str, member_ids: list[int]) -> dict:
+    return {
+        "code": code,
+        "guild_id": 1,
+        "leader_discord_id": member_ids[0] if member_ids else 99,
+        "visibility": "public",
+        "forum_channel_id": None,
+        "thread_id": None,
+        "voice_channel_id": None,
+        "status": "active",
+        "created_at": NOW,
+        "member_ids": member_ids,
+    }
+
+
+def match_record(match_id: int, guild_id: int = 1) -> dict:
+    return {
+        "id": match_id,
+        "guild_id": guild_id,
+        "match_code": f"M{match_id}",
+        "voice_channel_id": None,
+        "quality_score": 0.9,
+        "elo_spread": 10,
+        "avg_elo": 1000,
+        "role_diversity_score": 0.4,
+        "total_wait_time_seconds": 60,
+        "team_size": 2,
+        "language": "francais",
+        "region": "eu",
+        "platform": "pc",
+        "created_at": NOW,
+    }
+
+
+def participant_record(match_id: int, member_id: int) -> dict:
+    return {
+        "match_id": match_id,
+        "discord_member_id": member_id,
+        "elo_at_match": 1000,
+        "roles_selected": ["fill"],
+        "entry_type": 1,
+        "wait_time_seconds": 30,
+    }
+
+
+class FakeFiveStackConnection:
+    def __init__(self) -> None:
+        self.queries: list[tuple[str, tuple]] = []
+
+    async def fetch(self, query: str, *args):
+        self.queries.append((query, args))
+        if "FROM five_stack_teams t" in query:
+            return [team_record("AAA", [1, 2, 3]), team_record("BBB", [4]), team_record("CCC", [])]
+        if "WHERE discord_member_id = $1" in query:
+            return [participant_record(match_id, 10) for match_id in (9, 8, 7)]
+        if "FROM five_stack_matches" in query:
+            return [match_record(9), match_record(7)]
+        if "match_id = ANY" in query:
+            return [participant_record(9, 10), participant_record(9, 11), participant_record(7, 10)]
+        return []
+
+    async def fetchrow(self, query: str, *args):
+        self.queries.append((query, args))
+        return match_record(42)
+
+    async def execute(self, query: str, *args):
+        self.queries.append((query, args))
+        return "DELETE 2"
+
+
+class FakeContext:
+    def __init__(self, conn) -> None:
+        self.conn = conn
+
+    async def __aenter__(self):
+        return self.conn
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class FakeDb:
+    def __init__(self) -> None:
+        self.conn = FakeFiveStackConnection()
+
+    def acquire(self):
+        return FakeContext(self.conn)
+
+    def transaction(self):
+        return FakeContext(self.conn)
+
+
+def queue_row(entry_id: int, member_ids: tuple[int, ...], roles: tuple[str, ...]) -> FiveStackQueueRow:
+    return FiveStackQueueRow(
+        id=entry_id,
+        guild_id=1,
+        discord_member_id=member_ids[0],
+        entry_type=len(member_ids),
+        team_code=None,
+        team_member_ids=member_ids,
+        language="francais",
+        region="eu",
+        platform="pc",
+        desired_team_size=5,
+        mmr_extended=False,
+        elo=1000,
+        elo_high=None,
+        elo_low=None,
+        roles=roles,
+        queued_at=NOW,
+    )
+
+
+@pytest.mark.asyncio
+async def test_list_teams_aggregates_members_in_one_query():
+    db = FakeDb()
+
+    teams = await FiveStackDbService(db).list_teams(1)
+
+    assert [(team.team.code, team.member_ids) for team in teams] == [
+        ("AAA", (1, 2, 3)),
+        ("BBB", (4,)),
+        ("CCC", ()),
+    ]
+    assert len(db.conn.queries) == 1
+
+
+@pytest.mark.asyncio
+async def test_player_match_history_batches_matches_and_participants():
+    db = FakeDb()
+
+    history = await FiveStackDbService(db).get_player_match_history(guild_id=1, discord_member_id=10, limit=3)
+
+    assert [(bundle.match.id, [p.discord_member_id for p in bundle.participants]) for bundle in history] == [
+        (9, [10, 11]),
+        (7, [10]),
+    ]
+    assert len(db.conn.queries) == 3
+    assert db.conn.queries[1][1] == (1, [9, 8, 7])
+
+
+@pytest.mark.asyncio
+async def test_create_match_inserts_participants_and_stats_in_bulk():
+    db = FakeDb()
+    entries = (queue_row(1, (10, 11, 12), ("duelist",)), queue_row(2, (13,), ()), queue_row(3, (14,), ("fill",)))
+
+    await FiveStackDbService(db).create_match(
+        guild_id=1,
+        match_code="M42",
+        voice_channel_id=None,
+        entries=entries,
+        team_size=5,
+        quality_score=0.9,
+        elo_spread=0,
+        avg_elo=1000,
+        role_diversity_score=0.4,
+    )
+
+    assert len(db.conn.queries) == 4
+    _, participants_args = next(q for q in db.conn.queries if "five_stack_match_participants" in q[0])
+    assert participants_args[0] == 42
+    assert participants_args[1] == [10, 11, 12, 13, 14]
+    assert participants_args[3] == ["duelist", "duelist", "duelist", "", "fill"]
+    _, stats_args = next(q for q in db.conn.queries if "five_stack_player_stats" in q[0])
+    assert stats_args[3] == [False, False, False, True, True]
+    assert stats_args[4] == ["duelist", "duelist", "duelist", None, "fill"]
+
+
+@pytest.mark.asyncio
+async def test_add_queue_entry_resolves_team_identities_in_bulk(monkeypatch):
+    from database.repos.five_stack_queue_repo import FiveStackQueueRepo
+    from database.repos.guild_member_repo import GuildMemberRepo
+    from database.repos.guilds_repo import GuildsRepo
+    from database.repos.user_repo import UserRepo
+
+    calls: list[tuple[str, object]] = []
+
+    async def ensure_exists(conn, guild_id, guild_name):
+        calls.append(("guild", guild_id))
+
+    async def get_user_ids_many(conn, discord_ids):
+        calls.append(("prefetch", sorted(discord_ids)))
+        return {discord_id: discord_id + 100 for discord_id in discord_ids if discord_id != 13}
+
+    async def ensure_exists_with_status(conn, *, discord_id):
+        calls.append(("create", discord_id))
+        return discord_id + 100, True
+
+    async def mark_join_many(conn, *, guild_id, user_ids):
+        calls.append(("join", user_ids))
+
+    async def upsert(conn, **kwargs):
+        return queue_row(1, kwargs["team_member_ids"], ())
+
+    monkeypatch.setattr(GuildsRepo, "ensure_exists", ensure_exists)
+    monkeypatch.setattr(UserRepo, "get_user_ids_many", get_user_ids_many)
+    monkeypatch.setattr(UserRepo, "ensure_exists_with_status", ensure_exists_with_status)
+    monkeypatch.setattr(GuildMemberRepo, "mark_join_many", mark_join_many)
+    monkeypatch.setattr(FiveStackQueueRepo, "upsert", upsert)
+
+    await FiveStackDbService(FakeDb()).add_queue_entry(
+        guild_id=1, guild_name="Guild", discord_member_id=10, team_member_ids=(10, 11, 12, 13),
+    )
+
+    # Une requete d'identite pour l'equipe, une creation pour le seul inconnu
+    assert calls == [
+        ("guild", 1),
+        ("prefetch", [10, 11, 12, 13]),
+        ("create", 13),
+        ("join", [110, 111, 112, 113]),
+    ]
@@ -0,0 +1,151 @@
+"""Benchmark du matchmaking five-stack sur une file synthetique: propositions/seconde et qualite moyenne.
+
+Lancer avec `pytest -s tests/test_five_stack_matchmaker_benchmark.py` pour voir les chiffres.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from cogs.five_stack.services import QueueMatchmaker
+from cogs.five_stack.services.queue_matchmaker import DEFAULT_ELO, TARGET_TEAM_SIZES, MatchProposal
+from database.repos.five_stack_queue_repo import FiveStackQueueRow
+
+NOW = datetime(2026, 5, 1, 20, 0, tzinfo=timezone.utc)
+QUEUE_SIZE = 2000
+ROLES = ("duelist", "controller", "initiator", "sentinel", "fill")
+
+
+def synthetic_queue(size: int = QUEUE_SIZE, seed: int = 7) -> list[FiveStackQueueRow]:
+    rng = random.Random(seed)
+    entries = []
+    next_member_id = 1
+    for entry_id in range(1, size + 1):
+        team_size = rng.choices((1, 2, 3, 4), weights=(70, 15, 10, 5))[0]
+        members = tuple(range(next_member_id, next_member_id + team_size))
+        next_member_id += team_size
+        elos = [max(0, int(rng.gauss(1200, 300))) for _ in members]
+        elo = sum(elos) // len(elos)
+        desired = rng.choice([size for size in (0, 2, 3, 5) if size == 0 or size >= team_size])
+        entries.append(
+            FiveStackQueueRow(
+                id=entry_id,
+                guild_id=1,
+                discord_member_id=members[0],
+                entry_type=team_size,
+                team_code=f"T{entry_id}" if team_size > 1 else None,
+                team_member_ids=members,
+                language=rng.choice(("francais", "anglais")),
+                region="eu",
+                platform=rng.choice(("pc", "pc", "console")),
+                desired_team_size=desired,
+                mmr_extended=False,
+                elo=elo,
+                elo_high=max(elos) if team_size > 1 else elo + 150,
+                elo_low=min(elos) if team_size > 1 else max(0, elo - 150),
+                roles=tuple(rng.sample(ROLES, rng.randint(1, 2))),
+                queued_at=NOW - timedelta(seconds=rng.randint(0, 480)),
+            )
+        )
+    return entries
+
+
+class LegacyGreedyMatcher:
+    """Implementation d'origine: premieres entrees de la file qui remplissent la taille visee."""
+
+    def find_all(self, entries: list[FiveStackQueueRow]) -> list[MatchProposal]:
+        groups: dict[tuple, list[FiveStackQueueRow]] = {}
+        for entry in entries:
+            groups.setdefault((entry.guild_id, entry.language, entry.region, entry.platform), []).append(entry)
+
+        proposals = []
+        for group in groups.values():
+            available = sorted(group, key=lambda item: item.queued_at)
+            while True:
+                proposal = None
+                for target_size in TARGET_TEAM_SIZES:
+                    proposal = self.build(available, target_size)
+                    if proposal is not None:
+                        break
+                if proposal is None:
+                    break
+                proposals.append(proposal)
+                used = {entry.id for entry in proposal.entries}
+                available = [entry for entry in available if entry.id not in used]
+        return proposals
+
+    @staticmethod
+    def build(entries: list[FiveStackQueueRow], target_size: int) -> MatchProposal | None:
+        candidates = [
+            entry for entry in entries if entry.entry_type <= target_size and entry.desired_team_size in {0, target_size}
+        ]
+        selected = []
+        member_ids: list[int] = []
+        for entry in candidates:
+            entry_members = list(entry.all_member_ids)
+            if len(member_ids) + len(entry_members) > target_size or set(entry_members) & set(member_ids):
+                continue
+            selected.append(entry)
+            member_ids.extend(entry_members)
+            if len(member_ids) == target_size:
+                break
+        if len(member_ids) != target_size:
+            return None
+
+        elos = [entry.elo if entry.elo is not None else DEFAULT_ELO for entry in selected]
+        elo_spread = max(elos) - min(elos)
+        role_diversity = min(1.0, len({role for entry in selected for role in entry.roles}) / 5)
+        oldest = max(int((NOW - entry.queued_at).total_seconds()) for entry in selected)
+        quality_score = max(0.0, min(1.0, 1 - (elo_spread / 1000) + role_diversity * 0.2 + min(0.2, oldest / 1800)))
+        return MatchProposal(
+            guild_id=selected[0].guild_id,
+            entries=tuple(selected),
+            member_ids=tuple(member_ids),
+            team_size=target_size,
+            quality_score=round(quality_score, 3),
+            elo_spread=elo_spread,
+            avg_elo=sum(elos) // len(elos),
+            role_diversity_score=round(role_diversity, 3),
+        )
+
+
+def _measure(find) -> tuple[list[MatchProposal], float]:
+    start = time.perf_counter()
+    proposals = find()
+    return proposals, time.perf_counter() - start
+
+
+def _average_quality(proposals: list[MatchProposal]) -> float:
+    return sum(proposal.quality_score for proposal in proposals) / len(proposals)
+
+
+def test_five_stack_matchmaker_benchmark() -> None:
+    entries = synthetic_queue()
+
+    legacy, legacy_elapsed = _measure(lambda: LegacyGreedyMatcher().find_all(entries))
+
+    def search() -> list[MatchProposal]:
+        matchmaker = QueueMatchmaker()
+        matchmaker.load(entries)
+        return list(matchmaker.find_proposals(now=NOW))
+
+    proposals, elapsed = _measure(search)
+
+    print(
+        f"\nfive-stack matchmaker ({len(entries)} entrees): "
+        f"avant {len(legacy)} propositions, {len(legacy) / legacy_elapsed:,.0f}/s, "
+        f"qualite {_average_quality(legacy):.3f}, ecart ELO moyen "
+        f"{sum(p.elo_spread for p in legacy) / len(legacy):.0f} | "
+        f"apres {len(proposals)} propositions, {len(proposals) / elapsed:,.0f}/s, "
+        f"qualite {_average_quality(proposals):.3f}, ecart ELO moyen "
+        f"{sum(p.elo_spread for p in proposals) / len(proposals):.0f}"
+    )
+
+    used_entries = [entry.id for proposal in proposals for entry in proposal.entries]
+    used_members = [member_id for proposal in proposals for member_id in proposal.member_ids]
+    assert len(used_entries) == len(set(used_entries))
+    assert len(used_members) == len(set(used_members))
+    assert all(len(proposal.member_ids) == proposal.team_size for proposal in proposals)
+    assert _average_quality(proposals) > _average_quality(legacy)
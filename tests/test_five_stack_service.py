@@ -1,12 +1,13 @@
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from types import SimpleNamespace
 
 import pytest
 
-from cogs.five_stack.services import FiveStackService
+from cogs.five_stack.services import FiveStackService, QueueMatchmaker
 from database.repos.five_stack_teams_repo import FiveStackTeamRow
 from database.services.five_stack_service import FiveStackTeamInfo
 
@@ -16,6 +17,7 @@ class FakeFiveStackDb:
         self.teams: dict[str, FiveStackTeamInfo] = {}
         self.queue: list[object] = []
         self.saved_entries: list[dict] = []
+        self.queue_reads = 0
 
     async def get_user_team(self, *, guild_id: int, discord_member_id: int):
         for team in self.teams.values():
@@ -56,8 +58,12 @@ class FakeFiveStackDb:
         return kwargs
 
     async def list_queue(self, guild_id: int | None = None):
+        self.queue_reads += 1
         return tuple(entry for entry in self.queue if guild_id is None or entry.guild_id == guild_id)
 
+    async def remove_from_queue(self, *, guild_id: int, discord_member_id: int):
+        return True
+
 
 class FakeChannels:
     async def get_one(self, guild_id: int, key: str):
@@ -102,6 +108,9 @@ class QueueEntry:
     elo: int | None = 1000
     roles: tuple[str, ...] = ("fill",)
     queued_at: datetime = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    elo_high: int | None = None
+    elo_low: int | None = None
+    mmr_extended: bool = False
 
     @property
     def all_member_ids(self) -> tuple[int, ...]:
@@ -199,3 +208,166 @@ async def test_find_match_proposals_groups_compatible_entries():
     assert proposals[0].member_ids == (10, 11, 12, 13, 14)
     assert proposals[0].team_size == 5
     assert proposals[0].role_diversity_score == 1.0
+
+
+@pytest.mark.asyncio
+async def test_next_queue_expiry_is_the_earliest_conversion_or_removal():
+    service, db = make_service()
+    assert await service.next_queue_expiry() is None
+
+    base = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+    db.queue = [
+        QueueEntry(id=1, guild_id=1, discord_member_id=10, entry_type=1, team_member_ids=(10,),
+                   desired_team_size=0, queued_at=base),
+        QueueEntry(id=2, guild_id=2, discord_member_id=11, entry_type=1, team_member_ids=(11,),
+                   desired_team_size=5, queued_at=base + timedelta(minutes=2)),
+    ]
+
+    # any: expire a +10 min; taille 5: conversion a +2+5 min
+    assert await service.next_queue_expiry() == base + timedelta(minutes=7)
+
+
+def solo(entry_id: int, member_id: int, **kwargs) -> QueueEntry:
+    return QueueEntry(id=entry_id, guild_id=1, discord_member_id=member_id, entry_type=1,
+                      team_member_ids=(member_id,), **kwargs)
+
+
+def test_queue_matchmaker_matches_only_buckets_changed_since_last_search():
+    matchmaker = QueueMatchmaker()
+    matchmaker.load([solo(index, 10 + index) for index in range(1, 5)] + [solo(9, 99, language="anglais")])
+
+    assert matchmaker.find_proposals() == ()
+    assert [entry.id for entry in matchmaker.entries()] == [1, 2, 3, 4, 9]
+
+    matchmaker.add(solo(5, 15, elo=1100))
+    matchmaker.add(solo(10, 98, language="anglais", desired_team_size=2))
+    proposals = matchmaker.find_proposals(guild_id=1)
+
+    assert [proposal.member_ids for proposal in proposals] == [(11, 12, 13, 14, 15)]
+    assert proposals[0].elo_spread == 100
+
+    matchmaker.remove_ids(entry.id for entry in proposals[0].entries)
+    assert [entry.id for entry in matchmaker.entries()] == [9, 10]
+
+
+def test_queue_matchmaker_picks_the_tightest_elo_group_around_the_oldest_entry():
+    base = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+    matchmaker = QueueMatchmaker()
+    matchmaker.load([
+        solo(1, 11, elo=1000, desired_team_size=2, queued_at=base),
+        solo(2, 12, elo=1140, desired_team_size=2, queued_at=base + timedelta(seconds=1)),
+        solo(3, 13, elo=1010, desired_team_size=2, queued_at=base + timedelta(seconds=2), roles=("duelist",)),
+        solo(4, 14, elo=1400, desired_team_size=2, queued_at=base + timedelta(seconds=3)),
+    ])
+
+    proposals = matchmaker.find_proposals(now=base + timedelta(seconds=10))
+
+    # L'ancre (la plus ancienne) part avec son plus proche voisin en ELO, pas avec le suivant de la file
+    assert [proposal.member_ids for proposal in proposals] == [(11, 13)]
+    assert proposals[0].elo_spread == 10
+    assert proposals[0].role_diversity_score == 0.4
+
+
+def test_queue_matchmaker_respects_elo_bounds_widened_by_wait_unless_mmr_extended():
+    base = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+    def proposals(*, now: datetime, mmr_extended: bool = False):
+        matchmaker = QueueMatchmaker()
+        matchmaker.load([
+            solo(1, 11, elo=1000, desired_team_size=2, queued_at=base,
+                 elo_low=950, elo_high=1050, mmr_extended=mmr_extended),
+            solo(2, 12, elo=1300, desired_team_size=2, queued_at=base, mmr_extended=mmr_extended),
+        ])
+        return [proposal.member_ids for proposal in matchmaker.find_proposals(now=now)]
+
+    assert proposals(now=base) == []
+    # +/-150 autour de l'ELO, elargi de 50 par minute d'attente
+    assert proposals(now=base + timedelta(minutes=2)) == []
+    assert proposals(now=base + timedelta(minutes=3)) == [(11, 12)]
+    assert proposals(now=base, mmr_extended=True) == [(11, 12)]
+
+
+def test_queue_matchmaker_re_searches_unmatched_buckets_when_elo_windows_widen():
+    base = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+    matchmaker = QueueMatchmaker()
+    matchmaker.load([
+        solo(1, 11, elo=1000, desired_team_size=2, queued_at=base, elo_low=950, elo_high=1050),
+        solo(2, 12, elo=1300, desired_team_size=2, queued_at=base + timedelta(seconds=20)),
+    ])
+
+    assert matchmaker.find_proposals(now=base + timedelta(seconds=30)) == ()
+    # Palier suivant: la premiere minute d'attente de l'entree la plus ancienne
+    assert matchmaker.next_search_at(1) == base + timedelta(minutes=1)
+    assert matchmaker.next_search_at(2) is None
+    # Avant l'echeance, le bucket n'est pas re-examine
+    assert matchmaker.find_proposals(now=base + timedelta(seconds=50)) == ()
+
+    now = base + timedelta(minutes=1)
+    while not (proposals := matchmaker.find_proposals(now=now)):
+        now = matchmaker.next_search_at(1)
+    assert [proposal.member_ids for proposal in proposals] == [(11, 12)]
+    # Les deux fenetres doivent s'accepter: la 2e entree atteint 1000 a sa 3e minute
+    assert now == base + timedelta(minutes=3, seconds=20)
+
+
+def test_queue_matchmaker_upserts_by_owner_and_removes_team_entries_of_a_member():
+    matchmaker = QueueMatchmaker()
+    team = QueueEntry(id=1, guild_id=1, discord_member_id=10, entry_type=3, team_member_ids=(10, 11, 12))
+    matchmaker.load([team, solo(2, 20)])
+
+    matchmaker.add(solo(3, 20, desired_team_size=2))
+    assert [entry.id for entry in matchmaker.entries()] == [1, 3]
+
+    assert matchmaker.remove_member(1, 11) == 1
+    assert [entry.id for entry in matchmaker.entries()] == [3]
+    assert len(matchmaker) == 1
+
+
+@pytest.mark.asyncio
+async def test_find_match_proposals_reads_the_queue_once_then_uses_the_index():
+    service, db = make_service()
+    db.queue = [solo(1, 11, desired_team_size=2)]
+
+    assert await service.find_match_proposals(guild_id=1) == ()
+    db.queue.append(solo(2, 12, desired_team_size=2))
+
+    assert await service.find_match_proposals(guild_id=1) == ()
+    assert db.queue_reads == 1
+
+    await service.load_queue()
+    proposals = await service.find_match_proposals(guild_id=1)
+    assert [proposal.member_ids for proposal in proposals] == [(11, 12)]
+
+
+@pytest.mark.asyncio
+async def test_queue_entry_added_during_a_reload_is_kept_in_the_index():
+    service, db = make_service(profiles={11: profile()})
+    await service.load_queue()
+    data = await service.build_solo_queue_data(
+        guild_id=1, guild_name="Guild", member_id=11, role_ids=set(), desired_team_size=2
+    )
+    release = asyncio.Event()
+    list_queue = db.list_queue
+
+    async def slow_list_queue(guild_id=None):
+        rows = await list_queue(guild_id)
+        await release.wait()
+        return rows
+
+    async def add_queue_entry(**kwargs):
+        entry = solo(1, kwargs["discord_member_id"], desired_team_size=2)
+        db.queue.append(entry)
+        return entry
+
+    db.list_queue = slow_list_queue
+    db.add_queue_entry = add_queue_entry
+
+    reload = asyncio.create_task(service.load_queue())
+    await asyncio.sleep(0)
+    add = asyncio.create_task(service.add_queue_entry(data))
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(reload, add)
+
+    # L'ajout attend la fin du rechargement au lieu d'etre efface par load()
+    assert [entry.id for entry in service._matchmaker.entries()] == [1]
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from database.guild_config_cache import GuildConfigCache
+from database.repos.guild_channels_repo import GuildChannelsRepo
+from database.repos.guild_roles_repo import GuildRolesRepo
+from database.repos.guilds_repo import GuildsRepo
+from database.services.guild_channels_service import ChannelConfigurationService
+from database.services.guild_roles_service import RoleConfigurationService
+
+
+class FakeContext:
+    async def __aenter__(self):
+        return "conn"
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class FakeDb:
+    def transaction(self):
+        return FakeContext()
+
+    def acquire(self):
+        return FakeContext()
+
+
+@pytest.mark.asyncio
+async def test_channel_config_reads_are_served_from_snapshot(monkeypatch):
+    loads: list[int] = []
+
+    async def get_all(conn, guild_id):
+        loads.append(guild_id)
+        return {"welcome": 10, "logs": 20}
+
+    monkeypatch.setattr(GuildChannelsRepo, "get_all", get_all)
+    service = ChannelConfigurationService(FakeDb())
+
+    assert await service.get_one(1, "welcome") == 10
+    assert await service.get_one(1, "  logs ") == 20
+    assert await service.get_one(1, "missing") is None
+    assert await service.get_all(1) == {"welcome": 10, "logs": 20}
+    assert loads == [1]
+
+
+@pytest.mark.asyncio
+async def test_channel_config_write_invalidates_snapshot(monkeypatch):
+    stored = {"welcome": 10}
+
+    async def get_all(conn, guild_id):
+        return dict(stored)
+
+    async def ensure_exists(conn, guild_id, guild_name):
+        return None
+
+    async def upsert(conn, guild_id, key, channel_id):
+        stored[key] = channel_id
+
+    async def delete(conn, guild_id, key):
+        return stored.pop(key, None) is not None
+
+    monkeypatch.setattr(GuildChannelsRepo, "get_all", get_all)
+    monkeypatch.setattr(GuildsRepo, "ensure_exists", ensure_exists)
+    monkeypatch.setattr(GuildChannelsRepo, "upsert", upsert)
+    monkeypatch.setattr(GuildChannelsRepo, "delete", delete)
+    service = ChannelConfigurationService(FakeDb())
+
+    assert await service.get_one(1, "welcome") == 10
+    await service.set_one(1, "Guild", "welcome", 11)
+    assert await service.get_one(1, "welcome") == 11
+    assert await service.remove_one(1, "welcome") is True
+    assert await service.get_one(1, "welcome") is None
+
+
+@pytest.mark.asyncio
+async def test_role_config_get_all_returns_a_copy(monkeypatch):
+    async def get_all(conn, guild_id):
+        return {"ban": 5}
+
+    monkeypatch.setattr(GuildRolesRepo, "get_all", get_all)
+    service = RoleConfigurationService(FakeDb())
+
+    roles = await service.get_all(1)
+    roles["ban"] = 99
+
+    assert await service.get_one(1, "ban") == 5
+
+
+@pytest.mark.asyncio
+async def test_cache_coalesces_concurrent_loads():
+    cache = GuildConfigCache()
+    loads: list[int] = []
+
+    async def loader(guild_id):
+        loads.append(guild_id)
+        await asyncio.sleep(0)
+        return {"key": guild_id}
+
+    results = await asyncio.gather(*(cache.get(7, loader) for _ in range(20)))
+
+    assert loads == [7]
+    assert all(result == {"key": 7} for result in results)
+
+
+def test_cache_ttl_expires_snapshot():
+    cache = GuildConfigCache(ttl_seconds=60.0)
+    cache._snapshots[1] = (100.0, {"key": 1})
+
+    assert cache.peek(1, now=159.0) == {"key": 1}
+    assert cache.peek(1, now=160.0) is None
+
+
+@pytest.mark.asyncio
+async def test_invalidation_during_load_discards_stale_snapshot():
+    cache = GuildConfigCache()
+    release = asyncio.Event()
+
+    async def loader(guild_id):
+        await release.wait()
+        return {"key": 1}
+
+    pending = asyncio.create_task(cache.get(1, loader))
+    await asyncio.sleep(0)
+    cache.invalidate(1)
+    release.set()
+
+    assert await pending == {"key": 1}
+    assert cache.peek(1) is None
+
+
+def test_write_listeners_are_notified_on_invalidation_only():
+    cache = GuildConfigCache()
+    written: list[int] = []
+
+    def broken(guild_id):
+        raise RuntimeError("boom")
+
+    cache.add_listener(broken)
+    cache.add_listener(written.append)
+    cache._snapshots[1] = (0.0, {"key": 1})
+    cache.invalidate(1)
+    cache.clear()
+    cache.remove_listener(written.append)
+    cache.invalidate(2)
+
+    assert written == [1]
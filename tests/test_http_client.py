@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from integrations.exceptions import ApiError, NetworkError, RateLimitError
+from integrations.henrikdev.models import HttpResponse
+from integrations.http_client import HTTPClient, RetryPolicy
+
+
+def make_client(monkeypatch, outcomes, **kwargs):
+    """Client dont _send_once rejoue `outcomes` (reponse ou exception) dans l'ordre."""
+    client = HTTPClient(**kwargs)
+    client._session = object()
+    calls: list[tuple[str, str]] = []
+
+    async def send_once(method, url, *, params=None, headers=None, data=None):
+        calls.append((method, url))
+        await asyncio.sleep(0)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(client, "_send_once", send_once)
+    monkeypatch.setattr(RetryPolicy, "delay", lambda self, attempt: 0.0)
+    return client, calls
+
+
+def ok(payload=None):
+    return HttpResponse(status=200, payload=payload or {"ok": True}, headers={})
+
+
+@pytest.mark.asyncio
+async def test_identical_in_flight_gets_share_one_request(monkeypatch):
+    client, calls = make_client(monkeypatch, [ok({"n": 1}), ok({"n": 2})])
+
+    first, second = await asyncio.gather(
+        client.get("https://valorant-api.com/v1/bundles/x", params={"a": 1}),
+        client.get("https://valorant-api.com/v1/bundles/x", params={"a": 1}),
+    )
+
+    assert first is second
+    assert len(calls) == 1
+
+    third = await client.get("https://valorant-api.com/v1/bundles/x", params={"a": 1})
+    assert third.payload == {"n": 2}
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_gets_with_different_headers_are_not_coalesced(monkeypatch):
+    client, calls = make_client(monkeypatch, [ok(), ok()])
+
+    await asyncio.gather(
+        client.get("https://api.twitch.tv/helix/streams", headers={"Authorization": "a"}),
+        client.get("https://api.twitch.tv/helix/streams", headers={"Authorization": "b"}),
+    )
+
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_get_retries_server_errors_and_timeouts(monkeypatch):
+    client, calls = make_client(
+        monkeypatch,
+        [ApiError("HTTP 503", status=503), NetworkError("timeout"), ok()],
+    )
+
+    resp = await client.get("https://valorant-api.com/v1/playercards/x")
+
+    assert resp.status == 200
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_get_does_not_retry_client_errors_or_rate_limits(monkeypatch):
+    client, calls = make_client(
+        monkeypatch,
+        [ApiError("HTTP 404", status=404), RateLimitError("HTTP 429", status=429)],
+    )
+
+    with pytest.raises(ApiError):
+        await client.get("https://valorant-api.com/v1/playercards/x")
+    with pytest.raises(RateLimitError):
+        await client.get("https://valorant-api.com/v1/playercards/y")
+
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_retry_policy_is_chosen_per_host(monkeypatch):
+    client, calls = make_client(
+        monkeypatch,
+        [ApiError("HTTP 502", status=502)] * 3,
+        retry_policies={"api.henrikdev.xyz": RetryPolicy(attempts=2)},
+        default_retry_policy=RetryPolicy(attempts=1),
+    )
+
+    with pytest.raises(ApiError):
+        await client.get("https://api.henrikdev.xyz/valorant/v2/account/a/b")
+    with pytest.raises(ApiError):
+        await client.get("https://example.com/other")
+
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_post_is_not_retried_by_default(monkeypatch):
+    client, calls = make_client(monkeypatch, [ApiError("HTTP 500", status=500)])
+
+    with pytest.raises(ApiError):
+        await client.post("https://id.twitch.tv/oauth2/token", data={"a": "b"})
+
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_limiter_is_charged_for_every_attempt(monkeypatch):
+    class CountingLimiter:
+        def __init__(self) -> None:
+            self.acquired = 0
+
+        async def acquire(self) -> None:
+            self.acquired += 1
+
+    limiter = CountingLimiter()
+    client, calls = make_client(monkeypatch, [ApiError("HTTP 503", status=503), ok()])
+
+    await client.get("https://valorant-api.com/v1/playercards/x", limiter=limiter)
+
+    assert len(calls) == 2
+    assert limiter.acquired == 2
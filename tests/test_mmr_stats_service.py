@@ -1,8 +1,24 @@
+import random
+from dataclasses import dataclass
 from datetime import date, datetime, timedelta, timezone
 from types import SimpleNamespace
+from typing import Sequence
 from zoneinfo import ZoneInfo
 
-from cogs.ranking.services.mmr_stats_service import calculate_mmr_stats, parse_mmr_period
+import numpy as np
+
+from cogs.ranking.services.mmr_stats_service import (
+    MAX_PLOT_POINTS,
+    MmrHistoryRow,
+    MmrStats,
+    calculate_mmr_stats_from_series,
+    combine_mmr_day_summaries,
+    lttb_indices,
+    mmr_days_need_rebuild,
+    parse_mmr_period,
+    summarize_mmr_days,
+)
+from database.repos.valorant_elo_history_repo import EloHistorySeries
 
 
 def _row(day: int, elo: int, **metadata) -> SimpleNamespace:
@@ -25,6 +41,209 @@ def _row_dt(recorded_at: datetime, elo: int, **metadata) -> SimpleNamespace:
     return SimpleNamespace(recorded_at=recorded_at, elo=elo, **metadata)
 
 
+def _series_stats(history, **period) -> MmrStats | None:
+    return calculate_mmr_stats_from_series(EloHistorySeries.from_rows(history), **period)
+
+
+# Implementation de reference ligne a ligne (ancien calcul de production), gardee
+# comme oracle pour les tests de parite des calculs en colonnes et des agregats.
+
+@dataclass(frozen=True)
+class _DiffRow:
+    row: MmrHistoryRow
+    diff: int
+
+
+@dataclass(frozen=True)
+class _SyntheticPlotRow:
+    recorded_at: datetime
+    elo: int
+
+
+def reference_mmr_stats(
+    history: Sequence[MmrHistoryRow],
+    *,
+    start_date: date | None = None,
+    start_at: datetime | None = None,
+) -> MmrStats | None:
+    period_rows = [
+        row
+        for row in history
+        if _is_in_period(row, start_date, start_at)
+    ]
+    if not period_rows:
+        return None
+
+    if any(_row_attr(row, "rr_delta") is not None for row in period_rows):
+        diffs, plot_rows = _metadata_diffs(history, start_date, start_at)
+    else:
+        diffs, plot_rows = _legacy_diffs(history, start_date, start_at), period_rows
+
+    if not diffs or len(plot_rows) < 2:
+        return None
+
+    wins = [diff for _, diff in diffs if diff > 0]
+    losses = [diff for _, diff in diffs if diff < 0]
+
+    return MmrStats(
+        total_games=len(diffs),
+        total_change=sum(diff for _, diff in diffs),
+        avg_win=round(sum(wins) / len(wins)) if wins else 0,
+        avg_loss=round(sum(losses) / len(losses)) if losses else 0,
+        last_diff=diffs[-1][1],
+        dates_plot=[row.recorded_at for row in plot_rows],
+        elos_plot=[row.elo for row in plot_rows],
+    )
+
+
+def _legacy_diffs(
+    history: Sequence[MmrHistoryRow],
+    start_date: date | None,
+    start_at: datetime | None,
+) -> list[tuple[datetime, int]]:
+    diffs: list[tuple[datetime, int]] = []
+    for index in range(1, len(history)):
+        recorded_at = history[index].recorded_at
+        if not _is_in_period(history[index], start_date, start_at):
+            continue
+
+        diff = history[index].elo - history[index - 1].elo
+        diffs.append((recorded_at, diff))
+    return diffs
+
+
+def _metadata_diffs(
+    history: Sequence[MmrHistoryRow],
+    start_date: date | None,
+    start_at: datetime | None,
+) -> tuple[list[tuple[datetime, int]], list[MmrHistoryRow]]:
+    diff_rows: list[_DiffRow] = []
+    previous: MmrHistoryRow | None = None
+
+    for row in history:
+        in_period = _is_in_period(row, start_date, start_at)
+        if not in_period:
+            previous = row
+            continue
+
+        rr_delta = _row_attr(row, "rr_delta")
+        if previous is None and _row_attr(row, "source") == "legacy":
+            previous = row
+            continue
+        if rr_delta is None and previous is not None:
+            rr_delta = row.elo - previous.elo
+        if rr_delta is None:
+            previous = row
+            continue
+
+        if rr_delta != 0 or _row_attr(row, "match_id"):
+            diff_rows.append(_DiffRow(row, rr_delta))
+
+        previous = row
+
+    deduped_rows = _dedupe_imported_matches_and_snapshots(diff_rows)
+    diffs = [(item.row.recorded_at, item.diff) for item in deduped_rows]
+    plot_rows = _metadata_plot_rows(history, start_date, start_at, deduped_rows)
+    return diffs, plot_rows
+
+
+def _dedupe_imported_matches_and_snapshots(diff_rows: list[_DiffRow]) -> list[_DiffRow]:
+    deduped: list[_DiffRow] = []
+    last_import: _DiffRow | None = None
+
+    for item in diff_rows:
+        if _row_attr(item.row, "match_id"):
+            deduped.append(item)
+            last_import = item
+            continue
+
+        if last_import and item.row.elo == last_import.row.elo:
+            continue
+
+        deduped.append(item)
+        last_import = None
+
+    return deduped
+
+
+def _metadata_plot_rows(
+    history: Sequence[MmrHistoryRow],
+    start_date: date | None,
+    start_at: datetime | None,
+    diff_rows: list[_DiffRow],
+) -> list[MmrHistoryRow]:
+    if not diff_rows:
+        return []
+
+    selected_rows = [item.row for item in diff_rows]
+    first_change = selected_rows[0]
+    baseline = _find_plot_baseline(history, start_date, start_at, first_change)
+    if baseline is not None and baseline is not first_change:
+        return [baseline, *selected_rows]
+    boundary_baseline = _period_boundary_baseline(diff_rows[0], start_at)
+    if boundary_baseline is not None:
+        return [boundary_baseline, *selected_rows]
+    imported_baseline = _imported_plot_baseline(diff_rows[0])
+    if imported_baseline is not None:
+        return [imported_baseline, *selected_rows]
+    return selected_rows
+
+
+def _find_plot_baseline(
+    history: Sequence[MmrHistoryRow],
+    start_date: date | None,
+    start_at: datetime | None,
+    first_change: MmrHistoryRow,
+) -> MmrHistoryRow | None:
+    previous: MmrHistoryRow | None = None
+
+    for row in history:
+        if row is first_change:
+            if previous is not None:
+                return previous
+            return first_change
+        if _is_in_period(row, start_date, start_at):
+            previous = row
+
+    return first_change
+
+
+def _period_boundary_baseline(diff_row: _DiffRow, start_at: datetime | None) -> _SyntheticPlotRow | None:
+    if start_at is None or diff_row.row.recorded_at <= start_at:
+        return None
+    return _SyntheticPlotRow(
+        recorded_at=start_at,
+        elo=diff_row.row.elo - diff_row.diff,
+    )
+
+
+def _imported_plot_baseline(diff_row: _DiffRow) -> _SyntheticPlotRow | None:
+    if not _row_attr(diff_row.row, "match_id"):
+        return None
+    return _SyntheticPlotRow(
+        recorded_at=diff_row.row.recorded_at - timedelta(seconds=1),
+        elo=diff_row.row.elo - diff_row.diff,
+    )
+
+
+def _row_attr(row: MmrHistoryRow, name: str):
+    return getattr(row, name, None)
+
+
+def _is_in_period(row: MmrHistoryRow, start_date: date | None, start_at: datetime | None) -> bool:
+    if start_at is not None:
+        return _recorded_at_for_compare(row.recorded_at, start_at) >= start_at
+    return not start_date or row.recorded_at.date() >= start_date
+
+
+def _recorded_at_for_compare(recorded_at: datetime, start_at: datetime) -> datetime:
+    if recorded_at.tzinfo is None and start_at.tzinfo is not None:
+        return recorded_at.replace(tzinfo=start_at.tzinfo)
+    if recorded_at.tzinfo is not None and start_at.tzinfo is None:
+        return recorded_at.replace(tzinfo=None)
+    return recorded_at
+
+
 def test_parse_mmr_period_standard_values() -> None:
     today = date(2026, 5, 8)
 
@@ -42,6 +261,15 @@ def test_parse_mmr_period_week_uses_rolling_paris_window() -> None:
     assert selection.start_at == now - timedelta(days=7)
 
 
+def test_parse_mmr_period_week_start_is_stable_within_a_minute() -> None:
+    now = datetime(2026, 6, 12, 1, 48, 5, 123, tzinfo=ZoneInfo("Europe/Paris"))
+
+    first = parse_mmr_period("week", now=now)
+    second = parse_mmr_period("week", now=now + timedelta(seconds=40))
+
+    assert first.start_at == second.start_at == datetime(2026, 6, 5, 1, 48, tzinfo=ZoneInfo("Europe/Paris"))
+
+
 def test_parse_mmr_period_episode_act() -> None:
     selection = parse_mmr_period("e9a2", today=date(2026, 5, 8))
 
@@ -52,7 +280,7 @@ def test_parse_mmr_period_episode_act() -> None:
 
 
 def test_calculate_mmr_stats_filters_and_calculates_diffs() -> None:
-    stats = calculate_mmr_stats(
+    stats = _series_stats(
         [_row(6, 100), _row(7, 120), _row(8, 110), _row(8, 140)],
         start_date=date(2026, 5, 7),
     )
@@ -78,7 +306,7 @@ def test_calculate_mmr_stats_prefers_henrik_matches_over_tracker_snapshots() ->
         _row_at(13, 5, 1041, rr_delta=16, source="tracker_snapshot"),
     ]
 
-    stats = calculate_mmr_stats(history, start_date=date(2026, 5, 8))
+    stats = _series_stats(history, start_date=date(2026, 5, 8))
 
     assert stats is not None
     assert stats.total_games == 4
@@ -96,7 +324,7 @@ def test_calculate_mmr_stats_keeps_tracker_snapshots_after_imports() -> None:
         _row_at(11, 0, 1030, rr_delta=20, source="tracker_snapshot"),
     ]
 
-    stats = calculate_mmr_stats(history, start_date=date(2026, 5, 8))
+    stats = _series_stats(history, start_date=date(2026, 5, 8))
 
     assert stats is not None
     assert stats.total_games == 2
@@ -111,7 +339,7 @@ def test_calculate_mmr_stats_dedupes_aggregated_tracker_snapshot_after_imports()
         _row_at(11, 0, 1025, rr_delta=25, source="tracker_snapshot"),
     ]
 
-    stats = calculate_mmr_stats(history, start_date=date(2026, 5, 8))
+    stats = _series_stats(history, start_date=date(2026, 5, 8))
 
     assert stats is not None
     assert stats.total_games == 2
@@ -126,7 +354,7 @@ def test_calculate_mmr_stats_counts_zero_rr_imported_matches() -> None:
         _row_at(12, 0, 1005, match_id="m3", rr_delta=-5, source="henrik_live"),
     ]
 
-    stats = calculate_mmr_stats(history, start_date=date(2026, 5, 8))
+    stats = _series_stats(history, start_date=date(2026, 5, 8))
 
     assert stats is not None
     assert stats.total_games == 3
@@ -136,7 +364,7 @@ def test_calculate_mmr_stats_counts_zero_rr_imported_matches() -> None:
 
 
 def test_calculate_mmr_stats_adds_baseline_for_single_imported_match() -> None:
-    stats = calculate_mmr_stats(
+    stats = _series_stats(
         [_row_at(10, 0, 1010, match_id="m1", rr_delta=10, source="henrik_live")],
         start_date=date(2026, 5, 8),
     )
@@ -167,7 +395,7 @@ def test_calculate_mmr_stats_week_excludes_games_before_rolling_start_and_keeps_
         ),
     ]
 
-    stats = calculate_mmr_stats(history, start_at=start_at)
+    stats = _series_stats(history, start_at=start_at)
 
     assert stats is not None
     assert stats.total_games == 1
@@ -180,7 +408,7 @@ def test_calculate_mmr_stats_week_excludes_games_before_rolling_start_and_keeps_
 
 
 def test_calculate_mmr_stats_ignores_first_filtered_legacy_delta() -> None:
-    stats = calculate_mmr_stats(
+    stats = _series_stats(
         [
             _row(7, 1000, rr_delta=35, source="legacy"),
             _row(8, 1015, rr_delta=15, source="legacy"),
@@ -195,7 +423,7 @@ def test_calculate_mmr_stats_ignores_first_filtered_legacy_delta() -> None:
 
 
 def test_calculate_mmr_stats_keeps_baseline_for_single_metadata_change() -> None:
-    stats = calculate_mmr_stats(
+    stats = _series_stats(
         [
             _row(7, 1000, rr_delta=None, source="legacy"),
             _row(8, 1020, rr_delta=20, source="legacy"),
@@ -210,9 +438,266 @@ def test_calculate_mmr_stats_keeps_baseline_for_single_metadata_change() -> None
 
 
 def test_calculate_mmr_stats_returns_none_without_enough_filtered_points() -> None:
-    stats = calculate_mmr_stats(
+    stats = _series_stats(
         [_row(6, 100), _row(7, 120)],
         start_date=date(2026, 5, 7),
     )
 
     assert stats is None
+
+
+def _assert_series_matches_rows(history, **period) -> None:
+    expected = reference_mmr_stats(history, **period)
+    actual = calculate_mmr_stats_from_series(EloHistorySeries.from_rows(history), **period)
+
+    assert actual == expected
+
+
+def test_series_stats_match_row_stats_on_fixed_histories() -> None:
+    start_at = datetime(2026, 6, 12, 1, 48, tzinfo=ZoneInfo("Europe/Paris")) - timedelta(days=7)
+    cases = [
+        ([_row(6, 100), _row(7, 120), _row(8, 110), _row(8, 140)], {"start_date": date(2026, 5, 7)}),
+        ([_row(6, 100), _row(7, 120)], {"start_date": date(2026, 5, 7)}),
+        ([_row(7, 1000, rr_delta=35, source="legacy"), _row(8, 1015, rr_delta=15, source="legacy")], {}),
+        ([_row(7, 1000, rr_delta=None, source="legacy"), _row(8, 1020, rr_delta=20, source="legacy")], {}),
+        ([_row_at(10, 0, 1010, match_id="m1", rr_delta=10, source="henrik_live")], {"start_date": date(2026, 5, 8)}),
+        (
+            [
+                _row_dt(datetime(2026, 6, 4, 9, 28, tzinfo=timezone.utc), 1800, rr_delta=-29, match_id="m"),
+                _row_dt(datetime(2026, 6, 11, 14, 43, tzinfo=timezone.utc), 1819, rr_delta=19),
+            ],
+            {"start_at": start_at},
+        ),
+        (
+            [
+                _row_at(10, 0, 1010, match_id="m1", rr_delta=10, source="henrik_live"),
+                _row_at(10, 30, 1025, match_id="m2", rr_delta=15, source="henrik_live"),
+                _row_at(11, 0, 1025, rr_delta=25, source="tracker_snapshot"),
+                _row_at(11, 5, 1030, rr_delta=5, source="tracker_snapshot"),
+                _row_at(11, 10, 1025, rr_delta=-5, source="tracker_snapshot"),
+            ],
+            {"start_date": date(2026, 5, 8)},
+        ),
+    ]
+
+    for history, period in cases:
+        _assert_series_matches_rows(history, **period)
+
+
+def _random_history(
+    rng: random.Random,
+    base: datetime,
+    count: int,
+    kinds: tuple[str, ...] = ("legacy", "match", "snapshot", "snapshot_same", "bare"),
+) -> list[SimpleNamespace]:
+    elo = 1000
+    history = []
+    recorded_at = base
+    for index in range(count):
+        recorded_at += timedelta(minutes=rng.randint(1, 600))
+        kind = rng.choice(kinds)
+        delta = rng.choice([-20, -10, 0, 0, 5, 15, 25])
+        if kind == "legacy":
+            elo += delta
+            history.append(_row_dt(recorded_at, elo, rr_delta=rng.choice([None, delta]), source="legacy"))
+        elif kind == "match":
+            elo += delta
+            history.append(_row_dt(recorded_at, elo, rr_delta=delta, match_id=f"m{index}", source="henrik_live"))
+        elif kind == "snapshot_same":
+            history.append(_row_dt(recorded_at, elo, rr_delta=delta, source="tracker_snapshot"))
+        elif kind == "snapshot":
+            elo += delta
+            history.append(_row_dt(recorded_at, elo, rr_delta=delta, source="tracker_snapshot"))
+        else:
+            elo += delta
+            history.append(_row_dt(recorded_at, elo))
+    return history
+
+
+def test_series_stats_match_row_stats_on_random_histories() -> None:
+    rng = random.Random(1234)
+    base = datetime(2026, 5, 1, tzinfo=timezone.utc)
+
+    for _ in range(300):
+        history = _random_history(rng, base, rng.randint(1, 40))
+        period = rng.choice(
+            [
+                {},
+                {"start_date": (base + timedelta(days=rng.randint(0, 6))).date()},
+                {"start_at": base + timedelta(hours=rng.randint(0, 150))},
+            ]
+        )
+        _assert_series_matches_rows(history, **period)
+
+
+def test_period_since_pushes_window_bounds_to_utc() -> None:
+    now = datetime(2026, 6, 12, 1, 48, tzinfo=ZoneInfo("Europe/Paris"))
+
+    assert parse_mmr_period("all").since is None
+    assert parse_mmr_period("e9a2").since is None
+    assert parse_mmr_period("week", now=now).since == now - timedelta(days=7)
+    assert parse_mmr_period(None, today=date(2026, 5, 8)).since == datetime(2026, 5, 8, tzinfo=timezone.utc)
+
+
+def test_series_stats_are_unchanged_when_sql_keeps_only_window_and_previous_row() -> None:
+    rng = random.Random(99)
+    base = datetime(2026, 5, 1, tzinfo=timezone.utc)
+    elo = 1000
+    history = []
+    for index in range(200):
+        delta = rng.choice([-15, 0, 10, 20])
+        elo += delta
+        history.append(
+            _row_dt(base + timedelta(hours=index), elo, rr_delta=delta, match_id=f"m{index}" if index % 3 else None)
+        )
+
+    selection = parse_mmr_period("week", now=base + timedelta(days=8))
+    since_us = EloHistorySeries.from_rows([_row_dt(selection.since, 0)]).recorded_us[0]
+    full = EloHistorySeries.from_rows(history)
+    first = int(np.searchsorted(full.recorded_us, since_us))
+    windowed = EloHistorySeries.from_rows(history[max(first - 1, 0):])
+
+    period = {"start_date": selection.start_date, "start_at": selection.start_at}
+    assert calculate_mmr_stats_from_series(windowed, **period) == reference_mmr_stats(history, **period)
+
+
+def test_lttb_keeps_endpoints_and_extremes() -> None:
+    x = np.arange(2_000, dtype=np.int64)
+    y = np.zeros(2_000, dtype=np.int64)
+    y[1_234] = 500
+
+    kept = lttb_indices(x, y, 100)
+
+    assert len(kept) == 100
+    assert kept[0] == 0 and kept[-1] == 1_999
+    assert np.all(np.diff(kept) > 0)
+    assert 1_234 in kept
+
+
+def test_series_stats_downsample_plot_but_not_totals() -> None:
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    history = [
+        _row_dt(base + timedelta(hours=index), 1000 + (index % 7) * 5, rr_delta=5 if index % 7 else -30, match_id=f"m{index}")
+        for index in range(3_000)
+    ]
+    series = EloHistorySeries.from_rows(history)
+
+    full = calculate_mmr_stats_from_series(series)
+    reduced = calculate_mmr_stats_from_series(series, max_plot_points=MAX_PLOT_POINTS)
+
+    assert full is not None and reduced is not None
+    assert len(reduced.elos_plot) == MAX_PLOT_POINTS
+    assert reduced.dates_plot[0] == full.dates_plot[0]
+    assert reduced.dates_plot[-1] == full.dates_plot[-1]
+    assert (reduced.total_games, reduced.total_change, reduced.avg_win, reduced.avg_loss) == (
+        full.total_games,
+        full.total_change,
+        full.avg_win,
+        full.avg_loss,
+    )
+
+
+def _match_history(seed: int, count: int) -> list[SimpleNamespace]:
+    rng = random.Random(seed)
+    recorded_at = datetime(2026, 5, 1, tzinfo=timezone.utc)
+    elo = 1000
+    history = []
+    for index in range(count):
+        recorded_at += timedelta(minutes=rng.randint(20, 900))
+        delta = rng.choice([-20, -10, 0, 5, 15, 25])
+        elo += delta
+        history.append(_row_dt(recorded_at, elo, rr_delta=delta, match_id=f"m{index}", source="henrik_live"))
+    return history
+
+
+def test_daily_summaries_combine_to_full_period_totals() -> None:
+    for seed in range(50):
+        history = _match_history(seed, random.Random(seed).randint(2, 80))
+        expected = reference_mmr_stats(history)
+        summaries = summarize_mmr_days(EloHistorySeries.from_rows(history), season=9, act=2)
+        actual = combine_mmr_day_summaries(summaries)
+
+        assert actual is not None and expected is not None
+        assert (actual.total_games, actual.total_change, actual.avg_win, actual.avg_loss, actual.last_diff) == (
+            expected.total_games,
+            expected.total_change,
+            expected.avg_win,
+            expected.avg_loss,
+            expected.last_diff,
+        )
+        assert actual.dates_plot[0] == expected.dates_plot[0]
+        assert (actual.dates_plot[-1], actual.elos_plot[-1]) == (expected.dates_plot[-1], expected.elos_plot[-1])
+        assert len(actual.elos_plot) == len({summary.day for summary in summaries}) + 1
+
+
+def test_summarize_mmr_days_from_day_only_needs_previous_row() -> None:
+    history = _match_history(7, 120)
+    full = summarize_mmr_days(EloHistorySeries.from_rows(history), season=9, act=2)
+    from_day = full[len(full) // 2].day
+
+    first = next(index for index, row in enumerate(history) if row.recorded_at.date() >= from_day)
+    tail = summarize_mmr_days(
+        EloHistorySeries.from_rows(history[first - 1:]), season=9, act=2, from_day=from_day
+    )
+
+    assert tail == [summary for summary in full if summary.day >= from_day]
+
+
+def _totals(stats) -> tuple[int, int, int, int, int] | None:
+    if stats is None:
+        return None
+    return (stats.total_games, stats.total_change, stats.avg_win, stats.avg_loss, stats.last_diff)
+
+
+def _random_kinds(rng: random.Random) -> tuple[str, ...]:
+    return rng.choice(
+        [
+            ("legacy", "match", "snapshot", "snapshot_same", "bare"),
+            ("match", "snapshot_same"),
+            ("legacy", "bare"),
+        ]
+    )
+
+
+def test_daily_summaries_match_raw_stats_on_random_histories() -> None:
+    rng = random.Random(2024)
+    base = datetime(2026, 5, 1, tzinfo=timezone.utc)
+
+    for _ in range(500):
+        history = _random_history(rng, base, rng.randint(1, 60), _random_kinds(rng))
+        expected = reference_mmr_stats(history)
+        summaries = summarize_mmr_days(EloHistorySeries.from_rows(history), season=9, act=2)
+        actual = combine_mmr_day_summaries(summaries)
+
+        if expected is not None:
+            assert _totals(actual) == _totals(expected)
+        if actual is None:
+            assert expected is None
+
+
+def test_incremental_daily_summaries_match_a_full_rebuild() -> None:
+    rng = random.Random(77)
+    base = datetime(2026, 5, 1, tzinfo=timezone.utc)
+    extended = 0
+
+    for _ in range(500):
+        history = _random_history(rng, base, rng.randint(2, 60), _random_kinds(rng))
+        full = summarize_mmr_days(EloHistorySeries.from_rows(history), season=9, act=2)
+        from_day = history[rng.randrange(1, len(history))].recorded_at.date()
+        first = next(index for index, row in enumerate(history) if row.recorded_at.date() >= from_day)
+
+        # Etat de la base avant l'arrivee des lignes >= from_day, puis rafraichissement
+        before = summarize_mmr_days(EloHistorySeries.from_rows(history[:first]), season=9, act=2)
+        previous = before[-1] if before else None
+        tail_series = EloHistorySeries.from_rows(history[max(first - 1, 0):])
+        if mmr_days_need_rebuild(tail_series, from_day=from_day, previous=previous):
+            continue
+        extended += 1
+        tail = summarize_mmr_days(tail_series, season=9, act=2, from_day=from_day, previous=previous)
+
+        assert before + tail == full
+    assert extended > 250
+
+
+def test_combine_mmr_day_summaries_without_games_returns_none() -> None:
+    assert combine_mmr_day_summaries([]) is None
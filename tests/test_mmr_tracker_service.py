@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timedelta, timezone
 from types import SimpleNamespace
 
 import pytest
 
+from cogs.ranking.services.mmr_stats_service import MAX_PLOT_POINTS, parse_mmr_period
 from cogs.ranking.services.mmr_tracker_service import MmrTrackerService
+from database.repos.valorant_elo_history_repo import EloHistorySeries
 from integrations.exceptions import ApiError, RateLimitError
 
 
@@ -21,6 +24,9 @@ class FakeValorantDb:
         self.latest_partition = None
         self.backfill_attempts: list[tuple[int, str | None]] = []
         self.backfilled: list[int] = []
+        self.history_rows: list = []
+        self.daily_summaries = None
+        self.summary_calls: list[tuple[str, tuple[object, ...]]] = []
 
     async def get_last_history_row(self, user_id: int, puuid: str | None = None):
         self.calls.append(("get_last_history_row", (user_id, puuid)))
@@ -55,6 +61,19 @@ class FakeValorantDb:
         )
         return True
 
+    async def bulk_insert_history(self, rows) -> int:
+        for row in rows:
+            self.calls.append(
+                (
+                    "bulk_insert_history",
+                    (
+                        row.user_id, row.season, row.act, row.recorded_at, row.elo, row.is_win,
+                        row.puuid, row.rr_delta, row.match_id, row.source,
+                    ),
+                )
+            )
+        return len(rows)
+
     async def get_valorant_info_by_discord_id(self, discord_id: int):
         self.calls.append(("get_valorant_info_by_discord_id", (discord_id,)))
         return self.info
@@ -67,6 +86,36 @@ class FakeValorantDb:
     async def mark_mmr_history_backfilled(self, user_id: int) -> None:
         self.backfilled.append(user_id)
 
+    async def get_history_series(self, discord_id: int, season=None, act=None, since=None):
+        self.summary_calls.append(("get_history_series", (discord_id, season, act, since)))
+        return EloHistorySeries.from_rows(self.history_rows)
+
+    async def get_account_history_series(self, user_id: int, puuid, season=None, act=None, since=None):
+        self.summary_calls.append(("get_account_history_series", (user_id, puuid, season, act, since)))
+        return EloHistorySeries.from_rows(
+            [row for row in self.history_rows if since is None or row.recorded_at >= since]
+        )
+
+    async def get_account_partitions(self, user_id: int, puuid):
+        return sorted({(8, 2)} if self.history_rows else set())
+
+    async def get_daily_summaries(self, discord_id: int, season=None, act=None):
+        self.summary_calls.append(("get_daily_summaries", (discord_id, season, act)))
+        return self.daily_summaries
+
+    async def get_daily_summaries_before(self, user_id: int, puuid, scopes, day):
+        self.summary_calls.append(("get_daily_summaries_before", (user_id, puuid, list(scopes), day)))
+        return {}
+
+    async def replace_daily_summaries(self, user_id: int, puuid, scopes, from_day, summaries):
+        self.summary_calls.append(("replace_daily_summaries", (user_id, puuid, list(scopes), from_day, len(summaries))))
+
+    async def rebuild_daily_summaries(self, user_id: int, puuid, summaries):
+        self.summary_calls.append(("rebuild_daily_summaries", (user_id, puuid, len(summaries))))
+
+    async def invalidate_daily_summaries(self, user_id: int, puuid) -> None:
+        self.summary_calls.append(("invalidate_daily_summaries", (user_id, puuid)))
+
 
 class FakeHenrik:
     def __init__(
@@ -173,6 +222,13 @@ async def test_insert_history_entry_stores_metadata_and_uses_delta_for_is_win():
             (10, 8, 2, recorded_at, 542, False, "puuid-1", -16, "match-1", "henrik_live"),
         ),
     ]
+    # Un seul aller-retour pour l'etat des deux perimetres, une seule ecriture
+    assert db.summary_calls == [
+        ("get_daily_summaries_before", (10, "puuid-1", [(8, 2), (0, 0)], recorded_at.date())),
+        ("get_account_history_series", (10, "puuid-1", 8, 2, recorded_at)),
+        ("get_account_history_series", (10, "puuid-1", None, None, recorded_at)),
+        ("replace_daily_summaries", (10, "puuid-1", [(8, 2), (0, 0)], recorded_at.date(), 0)),
+    ]
 
 
 @pytest.mark.asyncio
@@ -305,6 +361,7 @@ async def test_fetch_full_history_imports_stored_history():
     assert db.backfill_attempts == [(10, None)]
     assert db.backfilled == [10]
     assert db.calls[-1][1][-4:] == ("puuid-1", -16, "match-1", "henrik_stored")
+    assert db.summary_calls[-1] == ("rebuild_daily_summaries", (10, "puuid-1", 0))
 
 
 @pytest.mark.asyncio
@@ -482,3 +539,180 @@ async def test_tracked_row_backfill_is_throttled_by_attempted_at():
 
     assert inserted is True
     assert db.backfill_attempts == []
+
+
+@pytest.mark.asyncio
+async def test_fetch_full_history_prefetches_remaining_pages_concurrently():
+    db = FakeValorantDb()
+    db.info = player_info()
+    pages = {
+        None: stored_response(
+            [history_entry(match_id="m-1"), history_entry(match_id="m-2")],
+            total=5, returned=2, before=0, after=3,
+        ),
+        2: stored_response(
+            [history_entry(match_id="m-3"), history_entry(match_id="m-4")],
+            total=5, returned=2, before=2, after=1,
+        ),
+        3: stored_response([history_entry(match_id="m-5")], total=5, returned=1, before=4, after=0),
+    }
+    in_flight = 0
+    max_in_flight = 0
+
+    class ConcurrentHenrik(FakeHenrik):
+        async def get_stored_mmr_history_by_puuid(self, region, platform, puuid, *, page=None, size=None):
+            nonlocal in_flight, max_in_flight
+            self.calls.append(("stored", (region, platform, puuid, page, size)))
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            return pages[page], None
+
+    henrik = ConcurrentHenrik()
+    service = MmrTrackerService(db, henrik)
+
+    result = await service.fetch_full_history(123)
+
+    assert result.status == "imported"
+    assert result.inserted_count == 5
+    assert max_in_flight == 2
+    assert [call[1][3] for call in henrik.calls] == [None, 2, 3]
+    assert [call[1][8] for call in db.calls if call[0] == "bulk_insert_history"] == [
+        "m-1", "m-2", "m-3", "m-4", "m-5",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_prepare_partitions_precreates_next_act_for_latest_season():
+    db = FakeValorantDb()
+    service = MmrTrackerService(db, FakeHenrik())
+
+    await service.prepare_partitions(
+        [
+            {"current_season": 9, "current_act": 2},
+            {"current_season": 9, "current_act": 3},
+            {"current_season": None, "current_act": None},
+        ]
+    )
+
+    assert [call[1] for call in db.calls if call[0] == "ensure_partitions"] == [
+        (9, 3), (9, 4), (10, 1),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_prepare_partitions_ignores_rows_without_season():
+    db = FakeValorantDb()
+    service = MmrTrackerService(db, FakeHenrik())
+
+    await service.prepare_partitions([{"current_season": None, "current_act": 1}])
+
+    assert db.calls == []
+
+
+def _history_row(hour: int, elo: int, rr_delta: int, match_id: str):
+    return ns(
+        recorded_at=datetime(2026, 5, 8, hour, tzinfo=timezone.utc),
+        elo=elo,
+        rr_delta=rr_delta,
+        match_id=match_id,
+        source="henrik_live",
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_mmr_stats_reads_daily_summaries_for_act_periods():
+    db = FakeValorantDb()
+    db.daily_summaries = [
+        ns(
+            season=8, act=2, day=datetime(2026, 5, 8).date(), games=2, net_change=5,
+            wins=1, win_total=20, losses=1, loss_total=-15, last_diff=-15,
+            open_at=datetime(2026, 5, 8, 10, tzinfo=timezone.utc), open_elo=1000,
+            close_at=datetime(2026, 5, 8, 12, tzinfo=timezone.utc), close_elo=1005,
+        )
+    ]
+    db.history_rows = [
+        _history_row(10, 1020, 20, "m1"),
+        _history_row(11, 1005, -15, "m2"),
+    ]
+    service = MmrTrackerService(db, object())
+
+    stats = await service.get_mmr_stats(123, parse_mmr_period("e8a2"))
+
+    assert (stats.total_games, stats.total_change, stats.avg_win, stats.avg_loss) == (2, 5, 20, -15)
+    # Un point par jour (ouverture puis cloture), sans lecture de l'historique brut
+    assert stats.elos_plot == [1000, 1005]
+    assert db.summary_calls == [("get_daily_summaries", (123, 8, 2))]
+
+
+@pytest.mark.asyncio
+async def test_get_mmr_stats_reads_whole_account_summaries_for_all():
+    db = FakeValorantDb()
+    db.daily_summaries = []
+    db.history_rows = [_history_row(10, 1020, 20, "m1"), _history_row(11, 1005, -15, "m2")]
+    service = MmrTrackerService(db, object())
+
+    stats = await service.get_mmr_stats(123, parse_mmr_period("all"))
+
+    assert stats is None
+    assert db.summary_calls == [("get_daily_summaries", (123, 0, 0))]
+
+
+@pytest.mark.asyncio
+async def test_get_mmr_stats_falls_back_to_history_and_rebuilds_missing_rollup():
+    db = FakeValorantDb()
+    db.info = player_info()
+    db.history_rows = [
+        _history_row(10, 1020, 20, "m1"),
+        _history_row(11, 1005, -15, "m2"),
+    ]
+    service = MmrTrackerService(db, object())
+
+    stats = await service.get_mmr_stats(123, parse_mmr_period("all"))
+    await asyncio.gather(*service._summary_rebuilds.values())
+
+    assert (stats.total_games, stats.total_change) == (2, 5)
+    assert ("get_history_series", (123, None, None, None)) in db.summary_calls
+    # Un jour pour l'acte, un pour tout le compte
+    assert db.summary_calls[-1] == ("rebuild_daily_summaries", (10, "puuid-1", 2))
+    assert service._summary_rebuilds == {}
+
+
+@pytest.mark.asyncio
+async def test_get_mmr_stats_keeps_raw_history_for_rolling_week():
+    db = FakeValorantDb()
+    db.history_rows = [
+        _history_row(10, 1020, 20, "m1"),
+        _history_row(11, 1005, -15, "m2"),
+    ]
+    service = MmrTrackerService(db, object())
+    selection = parse_mmr_period("week", now=datetime(2026, 5, 9, tzinfo=timezone.utc))
+
+    stats = await service.get_mmr_stats(123, selection)
+
+    assert (stats.total_games, stats.total_change) == (2, 5)
+    assert db.summary_calls == [("get_history_series", (123, None, None, selection.since))]
+
+
+@pytest.mark.asyncio
+async def test_get_mmr_stats_reduces_long_rollup_plots():
+    db = FakeValorantDb()
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    db.daily_summaries = [
+        ns(
+            season=0, act=0, day=(start + timedelta(days=i)).date(), games=1, net_change=1,
+            wins=1, win_total=1, losses=0, loss_total=0, last_diff=1,
+            open_at=start + timedelta(days=i), open_elo=1000 + i,
+            close_at=start + timedelta(days=i, hours=1), close_elo=1001 + i,
+        )
+        for i in range(MAX_PLOT_POINTS + 100)
+    ]
+    service = MmrTrackerService(db, object())
+
+    stats = await service.get_mmr_stats(123, parse_mmr_period("all"))
+
+    assert stats.total_games == MAX_PLOT_POINTS + 100
+    assert len(stats.elos_plot) == MAX_PLOT_POINTS
+    assert stats.dates_plot[0] == start
+    assert stats.elos_plot[-1] == 1000 + MAX_PLOT_POINTS + 100
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from cogs.moderation import moderation
+from cogs.moderation.moderation import BAN_EXPIRY_DEADLINE, Moderation
+from core.deadline_scheduler import DeadlineScheduler
+
+
+class FakeModerationService:
+    def __init__(self, ban_end: datetime | None, *, unban_works: bool = True) -> None:
+        self.ban = SimpleNamespace(ban_end=ban_end) if ban_end is not None else None
+        self.unban_works = unban_works
+        self.temporary_bans_calls = 0
+
+    async def fetch_ban_info(self, guild_id: int, discord_user_id: int):
+        return self.ban
+
+    async def load_ban_index(self) -> None:
+        return None
+
+    async def get_temporary_bans(self):
+        self.temporary_bans_calls += 1
+        if self.temporary_bans_calls < 3:
+            return None
+        return [SimpleNamespace(guild_id=1, target_discord_id=10, ban_end=datetime(2030, 1, 1))]
+
+
+class FakeBot:
+    def __init__(self, guilds: dict[int, object]) -> None:
+        self._guilds = guilds
+
+    def get_guild(self, guild_id: int):
+        return self._guilds.get(guild_id)
+
+    async def wait_until_ready(self) -> None:
+        return None
+
+
+def make_cog(service: FakeModerationService, guilds: dict[int, object]) -> Moderation:
+    cog = Moderation.__new__(Moderation)
+    cog.bot = FakeBot(guilds)
+    cog._mod_svc = service
+    cog._deadlines = DeadlineScheduler()
+    cog.unbanned = []
+
+    async def unban_member(guild, user_id, reason=None):
+        cog.unbanned.append(user_id)
+        if service.unban_works:
+            service.ban = None
+
+    cog.unban_member = unban_member
+    return cog
+
+
+def expired() -> datetime:
+    return datetime.now(timezone.utc) - timedelta(minutes=1)
+
+
+@pytest.mark.asyncio
+async def test_expire_ban_unbans_once_the_deadline_is_reached() -> None:
+    service = FakeModerationService(expired())
+    cog = make_cog(service, {1: object()})
+
+    await cog._expire_ban((1, 10))
+
+    assert cog.unbanned == [10]
+    assert cog._deadlines.deadline(BAN_EXPIRY_DEADLINE, (1, 10)) is None
+
+
+@pytest.mark.asyncio
+async def test_expire_ban_raises_when_the_ban_survives_the_unban() -> None:
+    service = FakeModerationService(expired(), unban_works=False)
+    cog = make_cog(service, {1: object()})
+
+    with pytest.raises(RuntimeError):
+        await cog._expire_ban((1, 10))
+
+
+@pytest.mark.asyncio
+async def test_expire_ban_reschedules_when_the_guild_is_missing() -> None:
+    service = FakeModerationService(expired())
+    cog = make_cog(service, {})
+
+    await cog._expire_ban((1, 10))
+
+    assert cog.unbanned == []
+    retry_at = cog._deadlines.deadline(BAN_EXPIRY_DEADLINE, (1, 10))
+    assert retry_at is not None and retry_at > datetime.now(timezone.utc)
+
+
+@pytest.mark.asyncio
+async def test_async_init_retries_until_temporary_bans_load(monkeypatch) -> None:
+    sleeps: list[float] = []
+
+    async def fake_sleep(delay: float) -> None:
+        sleeps.append(delay)
+
+    monkeypatch.setattr(moderation.asyncio, "sleep", fake_sleep)
+    service = FakeModerationService(None)
+    cog = make_cog(service, {})
+
+    await cog._async_init()
+
+    assert service.temporary_bans_calls == 3
+    assert sleeps == [moderation.TEMPORARY_BANS_RETRY_SECONDS] * 2
+    assert cog._deadlines.deadline(BAN_EXPIRY_DEADLINE, (1, 10)) is not None
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import discord
+import pytest
+
+from cogs.moderation.message_purge import MessagePurger
+
+NOW = datetime(2026, 5, 1, 12, 0, tzinfo=timezone.utc)
+AFTER = NOW - timedelta(hours=1)
+
+
+def snowflake(when: datetime) -> int:
+    return discord.utils.time_snowflake(when)
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int, *, last_message_at: datetime | None, purged: int = 0, allowed: bool = True):
+        self.id = channel_id
+        self.name = f"salon-{channel_id}"
+        self.guild = SimpleNamespace(me=object(), name="guild")
+        self.last_message_id = snowflake(last_message_at) if last_message_at else None
+        self.allowed = allowed
+        self.purged = purged
+        self.bulk_deleted: list[list[int]] = []
+        self.single_deleted: list[int] = []
+        self.missing: set[int] = set()
+        self.purge_calls = 0
+
+    def permissions_for(self, _member):
+        return SimpleNamespace(manage_messages=self.allowed, read_message_history=True)
+
+    async def delete_messages(self, messages, *, reason=None):
+        message_ids = [message.id for message in messages]
+        if self.missing.intersection(message_ids):
+            raise discord.NotFound(SimpleNamespace(status=404, reason="Not Found"), "Unknown Message")
+        self.bulk_deleted.append(message_ids)
+
+    def get_partial_message(self, message_id: int):
+        async def delete():
+            if message_id in self.missing:
+                raise discord.NotFound(SimpleNamespace(status=404, reason="Not Found"), "Unknown Message")
+            self.single_deleted.append(message_id)
+
+        return SimpleNamespace(delete=delete)
+
+    async def purge(self, *, limit, check, after, reason=None):
+        self.purge_calls += 1
+        await asyncio.sleep(0.01)
+        return [object()] * self.purged
+
+
+@pytest.mark.asyncio
+async def test_purge_skips_idle_and_forbidden_channels_and_reports_progress():
+    busy = FakeChannel(1, last_message_at=NOW, purged=3)
+    idle = FakeChannel(2, last_message_at=AFTER - timedelta(minutes=5), purged=9)
+    empty = FakeChannel(3, last_message_at=None, purged=1)
+    forbidden = FakeChannel(4, last_message_at=NOW, purged=9, allowed=False)
+    reports: list[tuple[int, int, int]] = []
+
+    async def on_progress(progress):
+        reports.append((progress.channels_done, progress.channels_total, progress.deleted))
+
+    progress = await MessagePurger().purge(
+        [busy, idle, empty, forbidden],
+        user_id=10,
+        after=AFTER,
+        on_progress=on_progress,
+    )
+
+    assert progress.deleted == 4
+    assert (busy.purge_calls, idle.purge_calls, empty.purge_calls, forbidden.purge_calls) == (1, 0, 1, 0)
+    assert [done for done, _, _ in reports] == [1, 2]
+    assert reports[-1] == (2, 2, 4)
+
+
+@pytest.mark.asyncio
+async def test_known_refs_are_bulk_deleted_even_in_idle_channels():
+    refs_channel = FakeChannel(1, last_message_at=AFTER - timedelta(minutes=1))
+    recent = snowflake(NOW - timedelta(minutes=2))
+    too_old = snowflake(AFTER - timedelta(minutes=2))
+
+    progress = await MessagePurger().purge(
+        [refs_channel],
+        user_id=10,
+        after=AFTER,
+        known_refs=[(1, recent), (1, recent), (1, too_old), (99, recent)],
+    )
+
+    assert refs_channel.bulk_deleted == [[recent]]
+    assert progress.deleted == 1
+
+
+@pytest.mark.asyncio
+async def test_channels_are_purged_concurrently_under_a_shared_limit():
+    channels = [FakeChannel(channel_id, last_message_at=NOW, purged=1) for channel_id in range(6)]
+    active = 0
+    peak = 0
+
+    for channel in channels:
+        original = channel.purge
+
+        async def tracked(*, _original=original, **kwargs):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            try:
+                return await _original(**kwargs)
+            finally:
+                active -= 1
+
+        channel.purge = tracked
+
+    progress = await MessagePurger(max_concurrency=2).purge(channels, user_id=10, after=AFTER)
+
+    assert progress.deleted == 6
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_bulk_not_found_falls_back_to_single_deletes_and_still_scans():
+    channel = FakeChannel(1, last_message_at=NOW, purged=2)
+    gone = snowflake(NOW - timedelta(minutes=3))
+    present = snowflake(NOW - timedelta(minutes=2))
+    channel.missing.add(gone)
+
+    progress = await MessagePurger().purge(
+        [channel],
+        user_id=10,
+        after=AFTER,
+        known_refs=[(1, gone), (1, present)],
+    )
+
+    assert channel.bulk_deleted == []
+    assert channel.single_deleted == [present]
+    assert channel.purge_calls == 1
+    assert progress.deleted == 3
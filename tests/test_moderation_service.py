@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from cogs.moderation.services.moderation_service import ModerationService
+
+
+class FakeModerationDb:
+    def __init__(self, banned: dict[int, set[int]] | None = None):
+        self.banned = banned or {}
+        self.get_ban_calls: list[tuple[int, int]] = []
+        self.fail_listing = False
+        self.listing_gate: asyncio.Event | None = None
+
+    async def list_banned_discord_ids(self):
+        if self.fail_listing:
+            raise RuntimeError("db down")
+        snapshot = {guild_id: set(user_ids) for guild_id, user_ids in self.banned.items()}
+        if self.listing_gate is not None:
+            await self.listing_gate.wait()
+        return snapshot
+
+    async def get_ban(self, guild_id: int, target_discord_id: int):
+        self.get_ban_calls.append((guild_id, target_discord_id))
+        if target_discord_id in self.banned.get(guild_id, set()):
+            return SimpleNamespace(guild_id=guild_id, target_discord_id=target_discord_id)
+        return None
+
+    async def add_ban(self, *, guild_id, target_discord_id, **kwargs):
+        self.banned.setdefault(guild_id, set()).add(target_discord_id)
+
+    async def remove_ban(self, guild_id: int, target_discord_id: int) -> bool:
+        user_ids = self.banned.get(guild_id, set())
+        removed = target_discord_id in user_ids
+        user_ids.discard(target_discord_id)
+        return removed
+
+
+def build_service(db: FakeModerationDb) -> ModerationService:
+    return ModerationService(db, object(), object(), object())
+
+
+@pytest.mark.asyncio
+async def test_ban_index_skips_db_for_members_that_are_not_banned():
+    db = FakeModerationDb({1: {10}})
+    service = build_service(db)
+    await service.load_ban_index()
+
+    assert await service.get_ban_info(1, 20) is None
+    assert await service.get_ban_info(2, 10) is None
+    assert db.get_ban_calls == []
+
+    assert await service.get_ban_info(1, 10) is not None
+    assert db.get_ban_calls == [(1, 10)]
+
+
+@pytest.mark.asyncio
+async def test_ban_index_follows_add_and_remove():
+    db = FakeModerationDb()
+    service = build_service(db)
+    await service.load_ban_index()
+
+    await service.add_ban(1, "guild", 10, "perm", "spam", 99, None)
+    assert service.may_be_banned(1, 10)
+    assert await service.get_ban_info(1, 10) is not None
+
+    assert await service.remove_ban(1, 10) is True
+    assert not service.may_be_banned(1, 10)
+
+
+@pytest.mark.asyncio
+async def test_ban_index_falls_back_to_db_until_loaded():
+    db = FakeModerationDb({1: {10}})
+    db.fail_listing = True
+    service = build_service(db)
+    await service.load_ban_index()
+
+    assert service.may_be_banned(1, 20)
+    assert await service.get_ban_info(1, 20) is None
+    assert db.get_ban_calls == [(1, 20)]
+
+
+@pytest.mark.asyncio
+async def test_ban_index_keeps_bans_changed_while_loading():
+    db = FakeModerationDb({1: {10}})
+    db.listing_gate = asyncio.Event()
+    service = build_service(db)
+
+    loading = asyncio.create_task(service.load_ban_index())
+    await asyncio.sleep(0)
+    await service.add_ban(1, "guild", 20, "perm", "spam", 99, None)
+    await service.remove_ban(1, 10)
+    db.listing_gate.set()
+    await loading
+
+    assert service.may_be_banned(1, 20)
+    assert not service.may_be_banned(1, 10)
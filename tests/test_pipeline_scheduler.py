@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from cogs.ranking.services.pipeline_scheduler import PipelineScheduler
+from cogs.ranking.services.token_bucket import AsyncTokenBucket
+from cogs.ranking.services.valorant_pipeline import UserPipelineState
+from integrations.henrikdev.models import RateLimit
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def user_state(discord_id: int, **overrides):
+    values = {
+        "discord_id": discord_id,
+        "pseudo": "Player",
+        "tag": "EUW",
+        "puuid": "puuid",
+        "region": "eu",
+        "platform": "pc",
+        "rank": None,
+        "elo": None,
+        "error_count": 0,
+        "last_error_at": None,
+    }
+    values.update(overrides)
+    return UserPipelineState(**values)
+
+
+def test_token_bucket_refills_at_configured_rate():
+    clock = FakeClock()
+    bucket = AsyncTokenBucket(capacity=2, period_seconds=60.0, clock=clock)
+
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == pytest.approx(30.0)
+
+    clock.now = 30.0
+    assert bucket.try_acquire() == 0.0
+
+
+def test_token_bucket_is_capped_by_server_remaining():
+    clock = FakeClock()
+    bucket = AsyncTokenBucket(capacity=70, reserve=5, clock=clock)
+
+    bucket.observe(RateLimit(limit=90, remaining=7, reset_seconds=40))
+
+    assert bucket.tokens == pytest.approx(2.0)
+
+
+def test_token_bucket_pauses_until_server_reset_when_remaining_is_low():
+    clock = FakeClock()
+    bucket = AsyncTokenBucket(capacity=70, reserve=5, clock=clock)
+
+    bucket.observe(RateLimit(limit=90, remaining=5, reset_seconds=40))
+
+    assert bucket.try_acquire() == pytest.approx(40.0)
+    clock.now = 40.0
+    assert bucket.try_acquire() > 0  # le bucket repart de zero apres la pause
+    clock.now = 41.0
+    assert bucket.try_acquire() == 0.0
+
+
+def test_token_bucket_ignores_missing_headers():
+    bucket = AsyncTokenBucket(capacity=3, clock=FakeClock())
+
+    bucket.observe(None)
+    bucket.observe(RateLimit())
+
+    assert bucket.tokens == pytest.approx(3.0)
+
+
+def test_scheduler_orders_refresh_then_new_links_then_backoff():
+    scheduler = PipelineScheduler()
+    scheduler.push(user_state(1, error_count=2, last_error_at=datetime.now(timezone.utc)))
+    scheduler.push(user_state(2, puuid=None, region=None, platform=None))
+    scheduler.push(user_state(3))
+    scheduler.push(user_state(4, platform=None))
+    scheduler.push(user_state(5))
+
+    order = []
+    while (state := scheduler.pop()) is not None:
+        order.append(state.discord_id)
+
+    assert order == [3, 5, 2, 4, 1]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_runs_workers_concurrently_and_survives_errors():
+    scheduler = PipelineScheduler(workers=3)
+    for discord_id in range(6):
+        scheduler.push(user_state(discord_id))
+
+    in_flight = 0
+    max_in_flight = 0
+    handled: list[int] = []
+
+    async def handler(state):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        if state.discord_id == 2:
+            raise RuntimeError("boom")
+        handled.append(state.discord_id)
+
+    await scheduler.run(handler)
+
+    assert max_in_flight == 3
+    assert sorted(handled) == [0, 1, 3, 4, 5]
+    assert len(scheduler) == 0
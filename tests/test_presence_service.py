@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import pytest
+
+from database.services.presence_service import PresenceDbService, PresenceReconciliation
+
+
+class FakePresenceConnection:
+    def __init__(self):
+        self.executed: list[tuple[str, tuple]] = []
+        self.fetched: list[tuple[str, tuple]] = []
+        self.copied: list[tuple[str, list[tuple], tuple[str, ...]]] = []
+
+    async def execute(self, query: str, *args):
+        self.executed.append((query, args))
+        if "DELETE FROM five_stack_queue" in query:
+            return "DELETE 2"
+        if "DELETE FROM five_stack_team_members" in query:
+            return "DELETE 3"
+        if "SET leader_discord_id" in query:
+            return "UPDATE 1"
+        if "SET status = 'deleted'" in query:
+            return "UPDATE 1"
+        return "OK"
+
+    async def fetch(self, query: str, *args):
+        self.fetched.append((query, args))
+        if "UPDATE valorant_info" in query:
+            return [{"present": True}, {"present": False}, {"present": False}]
+        if "UPDATE guild_members" in query:
+            return [{"present": False}]
+        return []
+
+    async def copy_records_to_table(self, table_name, *, records, columns):
+        self.copied.append((table_name, list(records), tuple(columns)))
+
+
+class FakeTransaction:
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def __aenter__(self):
+        return self.conn
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class FakeDb:
+    def __init__(self):
+        self.conn = FakePresenceConnection()
+        self.transactions = 0
+
+    def transaction(self):
+        self.transactions += 1
+        return FakeTransaction(self.conn)
+
+
+@pytest.mark.asyncio
+async def test_reconcile_streams_snapshot_and_updates_every_presence_table():
+    db = FakeDb()
+    members = ((guild_id, discord_id) for guild_id in (1, 2) for discord_id in (10, 20))
+
+    result = await PresenceDbService(db).reconcile([1, 2], members)
+
+    assert result == PresenceReconciliation(
+        reactivated=1,
+        deactivated=2,
+        members_rejoined=0,
+        members_left=1,
+        queue_entries_removed=2,
+        team_members_removed=3,
+        team_leaders_reassigned=1,
+        teams_closed=1,
+    )
+    assert db.transactions == 1
+    assert db.conn.copied == [
+        ("tmp_presence_snapshot", [(1, 10), (1, 20), (2, 10), (2, 20)], ("guild_id", "discord_id"))
+    ]
+    assert "ON COMMIT DROP" in db.conn.executed[0][0]
+    fetched = [query for query, _ in db.conn.fetched]
+    assert all("FROM tmp_presence_snapshot" in query for query in fetched)
+    assert "UPDATE valorant_info" in fetched[0] and "UPDATE guild_members" in fetched[1]
+    assert db.conn.fetched[0][1] == ([1, 2], True)
+    assert db.conn.fetched[1][1] == ([1, 2],)
+
+
+@pytest.mark.asyncio
+async def test_partial_scan_only_reactivates_valorant_info():
+    db = FakeDb()
+
+    await PresenceDbService(db).reconcile([1], [(1, 10)], complete=False)
+
+    query, args = db.conn.fetched[0]
+    assert "UPDATE valorant_info" in query and "(p.present OR $2)" in query
+    assert args == ([1], False)
+
+
+@pytest.mark.asyncio
+async def test_reconcile_without_guilds_touches_nothing():
+    db = FakeDb()
+
+    result = await PresenceDbService(db).reconcile([], [])
+
+    assert result == PresenceReconciliation()
+    assert db.transactions == 0
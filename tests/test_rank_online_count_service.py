@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import asyncio
+
 import pytest
 
 from cogs.ranking.services.online_count_service import (
     ChannelEditRateLimiter,
+    ChannelRenameScheduler,
     RankOnlineCountService,
 )
 
@@ -11,10 +14,17 @@ from cogs.ranking.services.online_count_service import (
 class FakeConfigService:
     def __init__(self, values: dict[str, int]) -> None:
         self._values = values
+        self.listeners: list = []
 
     async def get_all(self, guild_id: int) -> dict[str, int]:
         return self._values
 
+    def add_write_listener(self, listener) -> None:
+        self.listeners.append(listener)
+
+    def remove_write_listener(self, listener) -> None:
+        self.listeners.remove(listener)
+
 
 @pytest.mark.asyncio
 async def test_rank_online_count_config_filters_rank_keys() -> None:
@@ -60,3 +70,121 @@ def test_channel_edit_rate_limiter_allows_two_edits_per_window() -> None:
     assert limiter.allow(123, now=101)
     assert not limiter.allow(123, now=102)
     assert limiter.allow(123, now=111)
+
+
+def test_channel_edit_rate_limiter_retry_after_reports_next_slot() -> None:
+    limiter = ChannelEditRateLimiter(max_edits=2, window_seconds=10)
+
+    assert limiter.retry_after(123, now=100) == 0
+    limiter.allow(123, now=100)
+    limiter.allow(123, now=104)
+
+    assert limiter.retry_after(123, now=105) == 5
+    assert limiter.retry_after(123, now=110) == 0
+
+
+@pytest.mark.asyncio
+async def test_member_changes_update_online_counters_incrementally() -> None:
+    service = RankOnlineCountService(
+        FakeConfigService({"fer": 1, "or": 2}),
+        FakeConfigService({"fer": 10, "or": 20}),
+    )
+    service.seed_guild(7, await service.get_config(7), {"fer": 3, "or": 1})
+
+    # Passage en ligne d'un membre "or"
+    changed = service.apply_member_change(
+        7, role_ids_before=[2], role_ids_after=[2], online_before=False, online_after=True
+    )
+    assert changed == frozenset({"or"})
+    assert service.online_count(7, "or") == 2
+
+    # Promotion fer -> or d'un membre en ligne
+    changed = service.apply_member_change(
+        7, role_ids_before=[1, 99], role_ids_after=[2, 99], online_before=True, online_after=True
+    )
+    assert changed == frozenset({"fer", "or"})
+    assert (service.online_count(7, "fer"), service.online_count(7, "or")) == (2, 3)
+
+    # Membre hors ligne sans changement de rang: rien ne bouge
+    assert not service.apply_member_change(
+        7, role_ids_before=[1], role_ids_after=[1, 99], online_before=False, online_after=False
+    )
+    # Guild jamais seedee: ignoree
+    assert not service.apply_member_change(
+        8, role_ids_before=[], role_ids_after=[1], online_before=True, online_after=True
+    )
+
+
+@pytest.mark.asyncio
+async def test_rename_scheduler_coalesces_to_last_name() -> None:
+    renamed: list[tuple[int, str]] = []
+
+    async def rename(channel_id: int, name: str) -> None:
+        renamed.append((channel_id, name))
+
+    scheduler = ChannelRenameScheduler(rename, debounce_seconds=0.01)
+    scheduler.schedule(5, "or-1-en-ligne", current_name="or-0-en-ligne")
+    scheduler.schedule(5, "or-2-en-ligne", current_name="or-0-en-ligne")
+    scheduler.schedule(6, "fer-1-en-ligne", current_name="fer-0-en-ligne")
+    scheduler.schedule(6, "fer-0-en-ligne", current_name="fer-0-en-ligne")
+    await asyncio.sleep(0.05)
+
+    assert renamed == [(5, "or-2-en-ligne")]
+    scheduler.clear()
+
+
+@pytest.mark.asyncio
+async def test_rename_scheduler_waits_for_rate_limit_budget() -> None:
+    renamed: list[str] = []
+
+    async def rename(channel_id: int, name: str) -> None:
+        renamed.append(name)
+
+    limiter = ChannelEditRateLimiter(max_edits=1, window_seconds=0.05)
+    scheduler = ChannelRenameScheduler(rename, rate_limiter=limiter, debounce_seconds=0)
+    scheduler.schedule(5, "or-1-en-ligne")
+    await asyncio.sleep(0.01)
+    scheduler.schedule(5, "or-2-en-ligne")
+    await asyncio.sleep(0.02)
+
+    assert renamed == ["or-1-en-ligne"]
+    await asyncio.sleep(0.06)
+    assert renamed == ["or-1-en-ligne", "or-2-en-ligne"]
+    scheduler.clear()
+
+
+@pytest.mark.asyncio
+async def test_config_watch_and_forget_guild() -> None:
+    roles = FakeConfigService({"or": 2})
+    channels = FakeConfigService({"or": 20})
+    service = RankOnlineCountService(roles, channels)
+    written: list[int] = []
+
+    service.watch_config(written.append)
+    assert roles.listeners == channels.listeners == [written.append]
+    service.unwatch_config(written.append)
+    assert roles.listeners == channels.listeners == []
+
+    config = await service.get_config(7)
+    service.seed_guild(7, config, {"or": 4})
+    assert service.forget_guild(7) == config
+    assert service.cached_config(7) is None
+    assert service.online_count(7, "or") == 0
+    assert service.forget_guild(7) is None
+
+
+@pytest.mark.asyncio
+async def test_rename_scheduler_cancel_drops_pending_renames() -> None:
+    renamed: list[str] = []
+
+    async def rename(channel_id: int, name: str) -> None:
+        renamed.append(name)
+
+    scheduler = ChannelRenameScheduler(rename, debounce_seconds=0.01)
+    scheduler.schedule(5, "or-1-en-ligne")
+    scheduler.schedule(6, "fer-1-en-ligne")
+    scheduler.cancel([5])
+    await asyncio.sleep(0.03)
+
+    assert renamed == ["fer-1-en-ligne"]
+    scheduler.clear()
@@ -20,7 +20,7 @@ class FakePersistentMessages:
 
 def make_service() -> RankingService:
     fake = FakePersistentMessages()
-    return RankingService(FakeValorantDb(), fake, fake, fake)
+    return RankingService(FakeValorantDb(), fake, fake, fake, fake)
 
 
 def test_get_role_key_for_rank_uses_rank_tiers_case_insensitively():
@@ -40,7 +40,7 @@ def test_get_role_key_for_rank_returns_none_for_unknown_rank():
 async def test_store_persistent_message_uses_service_argument_order():
     persistent = FakePersistentMessages()
     fake = FakePersistentMessages()
-    service = RankingService(FakeValorantDb(), fake, fake, persistent)
+    service = RankingService(FakeValorantDb(), fake, fake, persistent, fake)
 
     result = await service.store_persistent_message(
         guild_id=1,
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from integrations.henrikdev.models import HttpResponse
+from integrations.henrikdev.service import HenrikDevService
+from integrations.response_cache import (
+    CachePolicy,
+    DiskCacheStore,
+    MemoryCacheStore,
+    ResponseCache,
+    cache_key,
+)
+from integrations.valorant_api.service import ValorantApiService
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingLoader:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def __call__(self) -> HttpResponse:
+        self.calls += 1
+        return HttpResponse(
+            status=200,
+            payload={"n": self.calls},
+            headers={"x-ratelimit-remaining": "10"},
+        )
+
+
+@pytest.mark.asyncio
+async def test_fresh_entries_are_served_from_memory():
+    clock = FakeClock()
+    cache = ResponseCache(clock=clock)
+    loader = CountingLoader()
+    policy = CachePolicy(ttl_seconds=60)
+
+    first = await cache.fetch("k", policy, loader)
+    clock.now += 30
+    second = await cache.fetch("k", policy, loader)
+
+    assert loader.calls == 1
+    assert first.ratelimit().remaining == 10
+    assert second.payload == {"n": 1}
+    assert second.ratelimit().remaining is None  # pas de quota consomme sur un hit
+
+    clock.now += 31
+    third = await cache.fetch("k", policy, loader)
+    assert third.payload == {"n": 2}
+
+
+@pytest.mark.asyncio
+async def test_stale_entries_are_served_while_revalidating():
+    clock = FakeClock()
+    cache = ResponseCache(clock=clock)
+    loader = CountingLoader()
+    policy = CachePolicy(ttl_seconds=60, stale_seconds=600)
+
+    await cache.fetch("k", policy, loader)
+    clock.now += 120
+
+    stale = await cache.fetch("k", policy, loader)
+    again = await cache.fetch("k", policy, loader)  # une seule revalidation en vol
+    assert stale.payload == {"n": 1}
+    assert again.payload == {"n": 1}
+
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert loader.calls == 2
+    assert (await cache.fetch("k", policy, loader)).payload == {"n": 2}
+
+
+@pytest.mark.asyncio
+async def test_memory_store_evicts_least_recently_used():
+    store = MemoryCacheStore(max_entries=2)
+    cache = ResponseCache(store, clock=FakeClock())
+    policy = CachePolicy(ttl_seconds=60)
+
+    for key in ("a", "b", "c"):
+        await cache.fetch(key, policy, CountingLoader())
+
+    assert len(store) == 2
+    assert await store.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_disk_store_survives_a_new_cache_instance(tmp_path):
+    clock = FakeClock()
+    policy = CachePolicy(ttl_seconds=3600)
+    loader = CountingLoader()
+
+    await ResponseCache(disk=DiskCacheStore(tmp_path), clock=clock).fetch("k", policy, loader)
+    restarted = ResponseCache(disk=DiskCacheStore(tmp_path), clock=clock)
+
+    assert (await restarted.fetch("k", policy, loader)).payload == {"n": 1}
+    assert loader.calls == 1
+
+
+def test_cache_key_is_independent_of_param_order():
+    assert cache_key("u", {"b": 2, "a": 1}) == cache_key("u", [("a", 1), ("b", 2)])
+    assert cache_key("u") == "u"
+
+
+@pytest.mark.asyncio
+async def test_valorant_api_assets_are_fetched_once():
+    class FakeClient:
+        def __init__(self) -> None:
+            self.urls: list[str] = []
+
+        async def get(self, url, **kwargs):
+            self.urls.append(url)
+            return HttpResponse(
+                status=200,
+                payload={"status": 200, "data": {"uuid": "b1", "displayName": "Bundle"}},
+            )
+
+    client = FakeClient()
+    service = ValorantApiService(client, cache=ResponseCache())
+
+    first = await service.get_bundle_by_uuid("b1")
+    second = await service.get_bundle_by_uuid("b1")
+
+    assert first == second
+    assert client.urls == ["https://valorant-api.com/v1/bundles/b1"]
+
+
+@pytest.mark.asyncio
+async def test_henrik_limiter_is_only_charged_when_a_request_is_sent():
+    class FakeClient:
+        def __init__(self) -> None:
+            self.calls = 0
+
+        async def get(self, url, *, limiter=None, **kwargs):
+            self.calls += 1
+            await limiter.acquire()
+            return HttpResponse(status=200, payload={"n": self.calls})
+
+    class CountingLimiter:
+        def __init__(self) -> None:
+            self.acquired = 0
+
+        async def acquire(self) -> None:
+            self.acquired += 1
+
+    clock = FakeClock()
+    client = FakeClient()
+    limiter = CountingLimiter()
+    service = HenrikDevService(client, "key", cache=ResponseCache(clock=clock))
+    url = "https://api.henrikdev.xyz/valorant/v2/account/a/b"
+
+    await service._get(url, "account", limiter=limiter)
+    await service._get(url, "account", limiter=limiter)
+    assert limiter.acquired == 1
+
+    # Revalidation en arriere-plan: elle passe aussi par le limiter
+    clock.now += 3600 + 1
+    await service._get(url, "account", limiter=limiter)
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert client.calls == 2
+    assert limiter.acquired == 2
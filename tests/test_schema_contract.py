@@ -100,6 +100,44 @@ def test_mmr_history_metadata_migration_is_additive() -> None:
     assert "SET PUUID = VI.PUUID" not in migration
 
 
+def test_mmr_history_recorded_at_index_migration_is_additive() -> None:
+    migration = _migration_text("030_mmr_history_recorded_at_index.sql")
+
+    _assert_non_destructive(migration)
+    assert "CREATE INDEX IF NOT EXISTS IDX_VALORANT_ELO_HISTORY_USER_RECORDED_AT" in migration
+    assert "ON VALORANT_ELO_HISTORY_PARENT (USER_ID, RECORDED_AT)" in migration
+    assert "idx_valorant_elo_history_user_recorded_at" in EXPECTED_INDEXES
+
+
+def test_mmr_daily_summary_migration_is_additive() -> None:
+    migration = _migration_text("031_mmr_daily_summary.sql")
+
+    _assert_non_destructive(migration)
+    assert "CREATE TABLE IF NOT EXISTS VALORANT_MMR_DAILY_SUMMARY" in migration
+    assert "PRIMARY KEY (USER_ID, ACCOUNT, SEASON, ACT, DAY)" in migration
+    assert "CREATE TABLE IF NOT EXISTS VALORANT_MMR_SUMMARY_STATE" in migration
+    assert "valorant_mmr_daily_summary" in EXPECTED_TABLES
+    assert "valorant_mmr_summary_state" in EXPECTED_TABLES
+
+
+def test_mmr_daily_summary_carry_migration_is_additive() -> None:
+    migration = _migration_text("033_mmr_daily_summary_carry.sql")
+
+    _assert_non_destructive(migration)
+    assert "ADD COLUMN IF NOT EXISTS USES_RR_DELTA" in migration
+    assert "ADD COLUMN IF NOT EXISTS IMPORT_ELO" in migration
+    assert "ADD COLUMN IF NOT EXISTS VERSION" in migration
+
+
+def test_twitch_live_announcements_migration_is_additive() -> None:
+    migration = _migration_text("032_twitch_live_announcements.sql")
+
+    _assert_non_destructive(migration)
+    assert "CREATE TABLE IF NOT EXISTS TWITCH_LIVE_ANNOUNCEMENTS" in migration
+    assert "REFERENCES TWITCH_STREAMERS (GUILD_ID, STREAMER_LOGIN) ON DELETE CASCADE" in migration
+    assert "twitch_live_announcements" in EXPECTED_TABLES
+
+
 @pytest.mark.parametrize(
     ("name", "expected_fragments"),
     [
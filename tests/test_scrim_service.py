@@ -44,9 +44,6 @@ class FakeScrimsDb:
     async def list_active_scrims(self, guild_id: int | None = None):
         return (self.scrim,) if guild_id in {None, self.scrim.guild_id} else ()
 
-    async def list_due_scrims(self, *, now: datetime):
-        return (self.scrim,) if self.scrim.scheduled_at <= now else ()
-
     async def join_team(self, **kwargs):
         self.scrim = replace(self.scrim, team2_discord_ids=(200,))
         return ScrimJoinResult(status="joined", scrim=self.scrim)
@@ -2,13 +2,17 @@ from __future__ import annotations
 
 import pytest
 
+from types import SimpleNamespace
+
 from cogs.twitch.presenters import abbreviate_number, format_streamer_list
-from cogs.twitch.services import TwitchNotificationService, normalize_streamer_login
+from cogs.twitch.services import TwitchNotificationService, TwitchStreamPoller, normalize_streamer_login
+from integrations.twitch.models import TwitchGame, TwitchStream, TwitchUser
 
 
 class FakeTwitchDb:
     def __init__(self) -> None:
         self.streamers: dict[int, set[str]] = {}
+        self.announcements: dict[tuple[int, str], str] = {}
 
     async def add_streamer(self, *, guild_id: int, guild_name: str | None, streamer_login: str) -> bool:
         values = self.streamers.setdefault(guild_id, set())
@@ -27,6 +31,21 @@ class FakeTwitchDb:
     async def list_streamers(self, guild_id: int) -> list[str]:
         return sorted(self.streamers.get(guild_id, set()))
 
+    async def list_all_streamers(self) -> dict[int, list[str]]:
+        return {guild_id: sorted(logins) for guild_id, logins in self.streamers.items() if logins}
+
+    async def list_live_announcements(self) -> dict[tuple[int, str], str]:
+        return dict(self.announcements)
+
+    async def record_live_announcement(self, *, guild_id: int, streamer_login: str, stream_id: str) -> None:
+        self.announcements[(guild_id, streamer_login)] = stream_id
+
+    async def clear_live_announcements(self, streamer_logins: list[str]) -> int:
+        stale = [key for key in self.announcements if key[1] in streamer_logins]
+        for key in stale:
+            del self.announcements[key]
+        return len(stale)
+
 
 class FakeChannels:
     async def get_one(self, guild_id: int, key: str) -> int | None:
@@ -94,3 +113,88 @@ def test_abbreviate_number(value: int, expected: str) -> None:
 def test_format_streamer_list() -> None:
     assert format_streamer_list([]) == "Aucun streamer configure."
     assert format_streamer_list(["a", "b"]) == "Streamers: `a`, `b`"
+
+
+class FakeTwitchApi:
+    def __init__(self) -> None:
+        self.live: dict[str, str] = {}
+        self.calls: list[tuple[str, tuple[str, ...]]] = []
+
+    async def get_streams_by_logins(self, logins: list[str]):
+        self.calls.append(("streams", tuple(logins)))
+        return SimpleNamespace(data=[
+            TwitchStream(
+                id=stream_id,
+                user_id=f"u-{login}",
+                user_login=login,
+                user_name=login.title(),
+                game_id="g1",
+                title="Live",
+                viewer_count=10,
+                started_at="2026-01-01T00:00:00Z",
+            )
+            for login, stream_id in self.live.items()
+            if login in logins
+        ])
+
+    async def get_users_by_logins(self, logins: list[str]):
+        self.calls.append(("users", tuple(logins)))
+        return SimpleNamespace(data=[TwitchUser(id=f"u-{login}", login=login, display_name=login.title()) for login in logins])
+
+    async def get_followers_total(self, broadcaster_id: str) -> int:
+        self.calls.append(("followers", (broadcaster_id,)))
+        return 1234
+
+    async def get_games_by_ids(self, game_ids: list[str]):
+        self.calls.append(("games", tuple(game_ids)))
+        return SimpleNamespace(data=[TwitchGame(id=game_id, name="Valorant", box_art_url="art-{width}x{height}") for game_id in game_ids])
+
+
+def make_poller(db: FakeTwitchDb, api: FakeTwitchApi) -> TwitchStreamPoller:
+    return TwitchStreamPoller(api, make_service(db), clock=lambda: 0.0)
+
+
+@pytest.mark.asyncio
+async def test_stream_poller_dedupes_logins_across_guilds_and_pages_by_100() -> None:
+    db = FakeTwitchDb()
+    db.streamers = {1: {"shared", "alpha"}, 2: {"shared"}}
+    db.streamers[3] = {f"streamer_{index:03d}" for index in range(150)}
+    api = FakeTwitchApi()
+
+    assert await make_poller(db, api).poll([1, 2, 3]) == []
+
+    stream_calls = [logins for kind, logins in api.calls if kind == "streams"]
+    assert [len(logins) for logins in stream_calls] == [100, 52]
+    assert len({login for logins in stream_calls for login in logins}) == 152
+    assert all(kind == "streams" for kind, _ in api.calls)
+
+
+@pytest.mark.asyncio
+async def test_stream_poller_fans_out_once_per_guild_and_survives_restart() -> None:
+    db = FakeTwitchDb()
+    db.streamers = {1: {"shared"}, 2: {"shared", "other"}}
+    api = FakeTwitchApi()
+    api.live = {"shared": "s1"}
+    poller = make_poller(db, api)
+
+    announcements = await poller.poll([1, 2])
+    assert [(a.guild_id, a.login, a.follower_count, a.box_art_url) for a in announcements] == [
+        (1, "shared", 1234, "art-128x170"),
+        (2, "shared", 1234, "art-128x170"),
+    ]
+    assert [kind for kind, _ in api.calls].count("followers") == 1
+    for announcement in announcements:
+        await poller.mark_announced(announcement)
+
+    assert await poller.poll([1, 2]) == []
+    # Redemarrage: l'etat annonce est relu depuis la base
+    assert await make_poller(db, api).poll([1, 2]) == []
+
+    # Fin du live puis nouveau live: re-annonce, profils et followers en cache
+    api.live = {}
+    assert await poller.poll([1, 2]) == []
+    assert db.announcements == {}
+    api.calls.clear()
+    api.live = {"shared": "s2"}
+    assert len(await poller.poll([1, 2])) == 2
+    assert [kind for kind, _ in api.calls] == ["streams"]
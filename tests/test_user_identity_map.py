@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import pytest
+
+from database.identity_map import UserIdentityMap
+from database.repos.user_repo import UserRepo
+from database.services.users_service import UsersDbService
+
+
+class FakeContext:
+    async def __aenter__(self):
+        return "conn"
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class FakeDb:
+    def transaction(self):
+        return FakeContext()
+
+    def acquire(self):
+        return FakeContext()
+
+
+def test_identity_map_evicts_least_recently_used():
+    identity = UserIdentityMap(max_size=2)
+    identity.remember(1, 101)
+    identity.remember(2, 102)
+
+    assert identity.get_user_id(1) == 101  # 1 redevient le plus recent
+    identity.remember(3, 103)
+
+    assert identity.get_user_id(2) is None
+    assert identity.get_discord_id(102) is None
+    assert identity.get_user_id(1) == 101
+    assert identity.get_discord_id(103) == 3
+    assert len(identity) == 2
+
+
+@pytest.mark.asyncio
+async def test_ensure_user_id_skips_write_on_cache_hit(monkeypatch):
+    calls: list[int] = []
+
+    async def ensure_exists_with_status(conn, *, discord_id):
+        calls.append(discord_id)
+        return 101, False
+
+    monkeypatch.setattr(UserRepo, "ensure_exists_with_status", ensure_exists_with_status)
+    identity = UserIdentityMap()
+
+    assert await identity.ensure_user_id("conn", 1) == 101
+    assert await identity.ensure_user_id("conn", 1) == 101
+    assert await identity.ensure_user_id("conn", 1) == 101
+
+    assert calls == [1]
+    assert identity.drain_seen() == [101]
+    assert identity.drain_seen() == []
+
+
+@pytest.mark.asyncio
+async def test_ensure_user_id_does_not_cache_rows_created_in_transaction(monkeypatch):
+    calls: list[int] = []
+
+    async def ensure_exists_with_status(conn, *, discord_id):
+        calls.append(discord_id)
+        return 101, len(calls) == 1
+
+    monkeypatch.setattr(UserRepo, "ensure_exists_with_status", ensure_exists_with_status)
+    identity = UserIdentityMap()
+
+    await identity.ensure_user_id("conn", 1)
+    assert identity.get_user_id(1) is None
+
+    await identity.ensure_user_id("conn", 1)
+    assert identity.get_user_id(1) == 101
+    assert calls == [1, 1]
+
+
+@pytest.mark.asyncio
+async def test_flush_seen_batches_pending_users(monkeypatch):
+    touched: list[list[int]] = []
+
+    async def touch_seen_many(conn, user_ids):
+        touched.append(list(user_ids))
+        return len(user_ids)
+
+    monkeypatch.setattr(UserRepo, "touch_seen_many", touch_seen_many)
+    service = UsersDbService(FakeDb())
+    service.identity.mark_seen(102)
+    service.identity.mark_seen(101)
+    service.identity.mark_seen(102)
+
+    assert await service.flush_seen() == 2
+    assert await service.flush_seen() == 0
+    assert touched == [[101, 102]]
+
+
+@pytest.mark.asyncio
+async def test_flush_seen_requeues_on_failure(monkeypatch):
+    async def touch_seen_many(conn, user_ids):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(UserRepo, "touch_seen_many", touch_seen_many)
+    service = UsersDbService(FakeDb())
+    service.identity.mark_seen(101)
+
+    with pytest.raises(RuntimeError):
+        await service.flush_seen()
+
+    assert service.identity.drain_seen() == [101]
+
+
+def test_services_share_an_empty_identity_map():
+    identity = UserIdentityMap()
+
+    assert UsersDbService(FakeDb(), identity).identity is identity
+
+
+@pytest.mark.asyncio
+async def test_get_user_ids_many_only_fetches_missing(monkeypatch):
+    fetched: list[list[int]] = []
+
+    async def get_user_ids_many(conn, discord_ids):
+        fetched.append(sorted(discord_ids))
+        return {discord_id: discord_id + 100 for discord_id in discord_ids if discord_id != 4}
+
+    monkeypatch.setattr(UserRepo, "get_user_ids_many", get_user_ids_many)
+    identity = UserIdentityMap()
+    identity.remember(1, 101)
+
+    result = await identity.get_user_ids_many("conn", [1, 2, 3, 4, 2])
+
+    assert result == {1: 101, 2: 102, 3: 103}
+    assert fetched == [[2, 3, 4]]
+    assert identity.get_discord_id(103) == 3
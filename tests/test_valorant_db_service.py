@@ -1,13 +1,15 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
+
 import pytest
 
 from database.repos.user_repo import UserRepo
-from database.repos.valorant_elo_history_repo import ValorantEloHistoryRepo
+from database.repos.valorant_elo_history_repo import EloHistoryRow, ValorantEloHistoryRepo
 from database.repos.valorant_info_repo import (
     ValorantInfoRow,
     ValorantInfoRepo,
-    ValorantUserPresenceRow,
+    ValorantPipelineUpdate,
 )
 from database.services.valorant_db_service import ValorantDbService
 
@@ -36,49 +38,6 @@ class FakeDb:
         return FakeAcquire()
 
 
-@pytest.mark.asyncio
-async def test_sync_presence_uses_repo_batch_methods(monkeypatch):
-    calls: list[tuple[str, object]] = []
-
-    async def get_user_ids_by_discord_ids(conn, discord_ids):
-        calls.append(("lookup", (conn, set(discord_ids))))
-        return [
-            ValorantUserPresenceRow(user_id=1, discord_id=10),
-            ValorantUserPresenceRow(user_id=2, discord_id=20),
-            ValorantUserPresenceRow(user_id=3, discord_id=30),
-        ]
-
-    async def bulk_mark_active(conn, user_ids):
-        calls.append(("active", (conn, user_ids)))
-        return len(user_ids)
-
-    async def bulk_mark_inactive(conn, user_ids):
-        calls.append(("inactive", (conn, user_ids)))
-        return len(user_ids)
-
-    monkeypatch.setattr(
-        ValorantInfoRepo,
-        "get_user_ids_by_discord_ids",
-        get_user_ids_by_discord_ids,
-    )
-    monkeypatch.setattr(ValorantInfoRepo, "bulk_mark_active", bulk_mark_active)
-    monkeypatch.setattr(ValorantInfoRepo, "bulk_mark_inactive", bulk_mark_inactive)
-
-    service = ValorantDbService(FakeDb())
-
-    reactivated, deactivated = await service.sync_presence(
-        active_discord_ids={10, 30},
-        all_discord_ids={10, 20, 30},
-    )
-
-    assert (reactivated, deactivated) == (2, 1)
-    assert calls == [
-        ("lookup", ("conn", {10, 20, 30})),
-        ("active", ("conn", [1, 3])),
-        ("inactive", ("conn", [2])),
-    ]
-
-
 @pytest.mark.asyncio
 async def test_get_history_reads_legacy_rows_while_puuid_is_pending(monkeypatch):
     calls: list[tuple[str, object]] = []
@@ -179,3 +138,185 @@ async def test_get_partitions_reads_legacy_rows_while_puuid_is_pending(monkeypat
 
     assert rows == [(8, 2)]
     assert calls[-1] == ("get_partitions", ("conn", 10, None, True))
+
+
+@pytest.mark.asyncio
+async def test_apply_pipeline_results_writes_batch_in_one_repo_call(monkeypatch):
+    calls: list[tuple[str, object]] = []
+
+    async def apply_pipeline_results(conn, updates):
+        calls.append((conn, updates))
+        return len(updates)
+
+    async def get_user_id(conn, discord_id):
+        raise AssertionError("batch writes must not resolve user ids one by one")
+
+    monkeypatch.setattr(ValorantInfoRepo, "apply_pipeline_results", apply_pipeline_results)
+    monkeypatch.setattr(UserRepo, "get_user_id", get_user_id)
+
+    service = ValorantDbService(FakeDb())
+    first = ValorantPipelineUpdate(discord_id=10, success=False, read_pseudo="Joueur", read_tag="EUW")
+    retried = ValorantPipelineUpdate(discord_id=10, success=True, read_pseudo="Joueur", read_tag="EUW", rank="Gold 2", elo=542)
+    other = ValorantPipelineUpdate(discord_id=20, success=False, read_pseudo="Joueur", read_tag="EUW")
+
+    updated = await service.apply_pipeline_results([first, other, retried])
+
+    assert updated == 2
+    assert calls == [("conn", [retried, other])]
+
+
+@pytest.mark.asyncio
+async def test_apply_pipeline_results_skips_empty_batch(monkeypatch):
+    async def apply_pipeline_results(conn, updates):
+        raise AssertionError("empty batch must not hit the database")
+
+    monkeypatch.setattr(ValorantInfoRepo, "apply_pipeline_results", apply_pipeline_results)
+
+    assert await ValorantDbService(FakeDb()).apply_pipeline_results([]) == 0
+
+
+class FakeExecuteConnection:
+    def __init__(self):
+        self.executed: list[tuple[str, tuple[object, ...]]] = []
+
+    async def execute(self, query: str, *args):
+        self.executed.append((query, args))
+        return "UPDATE 2"
+
+
+@pytest.mark.asyncio
+async def test_repo_apply_pipeline_results_uses_single_unnest_update():
+    conn = FakeExecuteConnection()
+    updates = [
+        ValorantPipelineUpdate(discord_id=10, success=True, read_pseudo="Joueur", read_tag="EUW", puuid="p", region="eu", elo=100),
+        ValorantPipelineUpdate(discord_id=20, success=False, read_pseudo="Joueur", read_tag="EUW"),
+    ]
+
+    updated = await ValorantInfoRepo.apply_pipeline_results(conn, updates)
+
+    assert updated == 2
+    assert len(conn.executed) == 1
+    query, args = conn.executed[0]
+    assert "unnest(" in query
+    assert "JOIN users u ON u.discord_id = r.discord_id" in query
+    assert args[0] == [10, 20]
+    assert args[1] == [True, False]
+    assert args[2] == ["p", None]
+    assert args[6] == [100, None]
+    # Un compte relinke depuis la lecture du pipeline n'est pas ecrase
+    assert "AND vi.pseudo = r.read_pseudo" in query
+    assert args[11] == ["Joueur", "Joueur"]
+
+
+def history_row(season: int, act: int, minute: int) -> EloHistoryRow:
+    return EloHistoryRow(
+        season=season,
+        act=act,
+        user_id=1,
+        recorded_at=datetime(2026, 5, 8, 12, minute, tzinfo=timezone.utc),
+        elo=100 + minute,
+        is_win=True,
+        puuid="p",
+        rr_delta=minute,
+        match_id=f"m-{minute}",
+        source="henrik_stored",
+    )
+
+
+@pytest.mark.asyncio
+async def test_bulk_insert_history_ensures_each_partition_once(monkeypatch):
+    ensured: list[tuple[int, int]] = []
+    inserted: list[list[EloHistoryRow]] = []
+
+    async def ensure_partitions(conn, season, act):
+        ensured.append((season, act))
+
+    async def bulk_insert_entries(conn, rows):
+        inserted.append(list(rows))
+        return len(rows)
+
+    async def list_partitions(conn):
+        return set()
+
+    monkeypatch.setattr(ValorantEloHistoryRepo, "list_partitions", list_partitions)
+    monkeypatch.setattr(ValorantEloHistoryRepo, "ensure_partitions", ensure_partitions)
+    monkeypatch.setattr(ValorantEloHistoryRepo, "bulk_insert_entries", bulk_insert_entries)
+    rows = [history_row(8, 2, 0), history_row(8, 2, 1), history_row(8, 3, 2), history_row(9, 1, 3)]
+
+    count = await ValorantDbService(FakeDb()).bulk_insert_history(rows)
+
+    assert count == 4
+    assert ensured == [(8, 2), (8, 3), (9, 1)]
+    assert inserted == [rows]
+
+
+class FakeCopyConnection(FakeExecuteConnection):
+    def __init__(self):
+        super().__init__()
+        self.copied: list[tuple[str, list[tuple], tuple[str, ...]]] = []
+
+    async def execute(self, query: str, *args):
+        self.executed.append((query, args))
+        return "INSERT 0 2"
+
+    async def copy_records_to_table(self, table_name, *, records, columns):
+        self.copied.append((table_name, list(records), tuple(columns)))
+
+
+@pytest.mark.asyncio
+async def test_repo_bulk_insert_entries_copies_then_merges_once():
+    conn = FakeCopyConnection()
+    rows = [history_row(8, 2, 0), history_row(8, 2, 1)]
+
+    count = await ValorantEloHistoryRepo.bulk_insert_entries(conn, rows)
+
+    assert count == 2
+    assert len(conn.copied) == 1
+    table, records, columns = conn.copied[0]
+    assert table == "tmp_valorant_elo_history_import"
+    assert columns[:4] == ("season", "act", "user_id", "recorded_at")
+    assert records[1][-2:] == ("m-1", "henrik_stored")
+    merge = conn.executed[-1][0]
+    assert "FROM tmp_valorant_elo_history_import" in merge
+    assert "ON CONFLICT (season, act, user_id, recorded_at)" in merge
+
+
+@pytest.mark.asyncio
+async def test_ensure_partitions_runs_ddl_only_for_unknown_partitions(monkeypatch):
+    ddl: list[tuple[int, int]] = []
+    loads: list[str] = []
+
+    async def list_partitions(conn):
+        loads.append(conn)
+        return {(8, 2)}
+
+    async def ensure_partitions(conn, season, act):
+        ddl.append((season, act))
+
+    monkeypatch.setattr(ValorantEloHistoryRepo, "list_partitions", list_partitions)
+    monkeypatch.setattr(ValorantEloHistoryRepo, "ensure_partitions", ensure_partitions)
+    service = ValorantDbService(FakeDb())
+
+    await service.ensure_partitions(8, 2)
+    await service.ensure_partitions(8, 3)
+    await service.ensure_partitions(8, 3)
+    await service.ensure_partitions(8, 2)
+
+    assert loads == ["conn"]
+    assert ddl == [(8, 3)]
+
+
+@pytest.mark.asyncio
+async def test_repo_list_partitions_parses_act_tables():
+    class CatalogConnection:
+        async def fetch(self, query, *args):
+            assert "pg_inherits" in query
+            return [
+                {"relname": "valorant_elo_history_season_8_act_2"},
+                {"relname": "valorant_elo_history_season_10_act_1"},
+                {"relname": "valorant_elo_history_default"},
+            ]
+
+    partitions = await ValorantEloHistoryRepo.list_partitions(CatalogConnection())
+
+    assert partitions == {(8, 2), (10, 1)}
@@ -1,3 +1,5 @@
+from datetime import datetime, timezone
+
 import pytest
 
 from database.repos.valorant_elo_history_repo import ValorantEloHistoryRepo
@@ -91,3 +93,39 @@ async def test_get_last_row_can_read_only_unscoped_legacy_rows():
     query, args = conn.queries[0]
     assert args == (10,)
     assert "puuid IS NULL AND source = 'legacy'" in query
+
+
+@pytest.mark.asyncio
+async def test_get_history_series_returns_columns_with_same_filter():
+    class SeriesConnection(FakeConnection):
+        async def fetch(self, query: str, *args):
+            self.queries.append((query, args))
+            return [(1_000_000, 1000, 0, 0, 0, 1), (2_000_000, 1015, 15, 1, 1, 0)]
+
+    conn = SeriesConnection()
+
+    series = await ValorantEloHistoryRepo.get_history_series(conn, 10, 9, 2, puuid="puuid-1")
+
+    query, args = conn.queries[0]
+    assert args == (10, 9, 2, "puuid-1")
+    assert "AND season = $2 AND act = $3 AND puuid = $4" in query
+    assert len(series) == 2
+    assert series.elo.tolist() == [1000, 1015]
+    assert series.has_rr.tolist() == [False, True]
+    assert series.has_match.tolist() == [False, True]
+    assert series.is_legacy.tolist() == [True, False]
+
+
+@pytest.mark.asyncio
+async def test_get_history_since_keeps_last_row_before_window():
+    conn = FakeConnection()
+    since = datetime(2026, 5, 8, tzinfo=timezone.utc)
+
+    await ValorantEloHistoryRepo.get_history(conn, 10, puuid="puuid-1", since=since)
+
+    query, args = conn.queries[0]
+    assert args == (10, "puuid-1", since)
+    assert (
+        "AND recorded_at >= COALESCE((SELECT max(recorded_at) FROM valorant_elo_history_parent"
+        " WHERE user_id = $1 AND puuid = $2 AND recorded_at < $3), $3)"
+    ) in query
@@ -42,9 +42,11 @@ class FakeHenrikService:
         self.mmr = mmr
         self.error = error
         self.calls: list[tuple[str, tuple[object, ...]]] = []
+        self.limiters: list[object] = []
 
-    async def get_account_by_name(self, name: str, tag: str):
+    async def get_account_by_name(self, name: str, tag: str, *, limiter=None):
         self.calls.append(("account", (name, tag)))
+        self.limiters.append(limiter)
         if self.error:
             raise self.error
         return self.account
@@ -56,14 +58,17 @@ class FakeHenrikService:
         puuid: str,
         *,
         size: int = 1,
+        limiter=None,
     ):
         self.calls.append(("matches", (region, platform, puuid, size)))
+        self.limiters.append(limiter)
         if self.error:
             raise self.error
         return self.matches[platform]
 
-    async def get_mmr_by_puuid(self, region: str, platform: str, puuid: str):
+    async def get_mmr_by_puuid(self, region: str, platform: str, puuid: str, *, limiter=None):
         self.calls.append(("mmr", (region, platform, puuid)))
+        self.limiters.append(limiter)
         if self.error:
             raise self.error
         return self.mmr
@@ -118,6 +123,8 @@ async def test_pipeline_nominal_account_platform_then_rank():
     assert result.elo == 542
     assert result.current_season == 8
     assert result.current_act == 2
+    # Le bucket est consomme par le client HTTP, seulement pour les requetes envoyees
+    assert service.limiters == [pipeline.bucket] * 3
 
 
 @pytest.mark.asyncio
@@ -153,3 +160,13 @@ async def test_pipeline_network_error_returns_step_failure():
     assert result.success is False
     assert result.error_message == "downstream"
     assert result.should_notify_user is False
+
+
+@pytest.mark.asyncio
+async def test_pipeline_rate_limit_pauses_shared_bucket():
+    pipeline = ValorantPipeline(FakeHenrikService(error=RateLimitError("limited")))
+
+    with pytest.raises(RateLimitError):
+        await pipeline.execute_step(user_state())
+
+    assert pipeline.bucket.try_acquire() > 0
@@ -1,34 +1,52 @@
 from __future__ import annotations
 
+import asyncio
+
 import pytest
 
 from cogs.shop import shop_notifier
 from cogs.shop.shop_notifier import ValorantShopNotifier
 from cogs.shop.presenters import build_bundle_embed, build_item_embed, thread_name_for_bundle
-from cogs.shop.services import ShopBundle, ShopBundleItem, ShopBundleMetadata, ValorantShopService
+from cogs.shop.services import ShopBundle, ShopBundleItem, ShopBundleMetadata, ShopDelivery, ValorantShopService
+from database.repos.valorant_sent_bundles_repo import ShopNotifyTargetRow
 from integrations.exceptions import ApiError
 from integrations.henrikdev.models import StoreFeaturedResponse
 from integrations.valorant_api.models import BundleResponseUuid
 
 
 class FakeShopDb:
-    def __init__(self) -> None:
+    def __init__(self, channels: dict[int, int] | None = None) -> None:
+        self.channels = channels if channels is not None else {1: 42}
         self.sent: set[tuple[int, str]] = set()
-
-    async def is_bundle_sent(self, *, guild_id: int, bundle_uuid: str) -> bool:
-        return (guild_id, bundle_uuid) in self.sent
-
-    async def mark_bundle_sent(self, *, guild_id: int, guild_name: str | None, bundle_uuid: str) -> bool:
-        key = (guild_id, bundle_uuid)
-        if key in self.sent:
-            return False
-        self.sent.add(key)
-        return True
-
-
-class FakeChannels:
-    async def get_one(self, guild_id: int, key: str) -> int | None:
-        return 42 if key == "valorant_shop" else None
+        self.target_queries = 0
+        self.mark_calls: list[list[tuple[int, str]]] = []
+        self.mark_failures = 0
+
+    async def list_notify_targets(self, *, guild_ids, channel_key: str, bundle_uuids):
+        self.target_queries += 1
+        assert channel_key == "valorant_shop"
+        bundle_uuids = set(bundle_uuids)
+        return [
+            ShopNotifyTargetRow(
+                guild_id=guild_id,
+                channel_id=self.channels[guild_id],
+                sent_bundle_uuids=frozenset(
+                    uuid for sent_guild_id, uuid in self.sent if sent_guild_id == guild_id and uuid in bundle_uuids
+                ),
+            )
+            for guild_id in sorted(guild_ids)
+            if guild_id in self.channels
+        ]
+
+    async def mark_bundles_sent(self, sent) -> int:
+        sent = list(sent)
+        self.mark_calls.append(sent)
+        if self.mark_failures:
+            self.mark_failures -= 1
+            raise ConnectionError("db down")
+        before = len(self.sent)
+        self.sent.update(sent)
+        return len(self.sent) - before
 
 
 class FakeHenrik:
@@ -89,16 +107,19 @@ class FakeValorantApi:
 
 
 class FakeGuild:
-    id = 1
-    name = "Guild"
+    def __init__(self, guild_id: int = 1) -> None:
+        self.id = guild_id
+        self.name = f"Guild {guild_id}"
 
 
 class FakeThread:
     def __init__(self) -> None:
         self.embeds = []
+        self.messages: list[int] = []
 
-    async def send(self, *, embed) -> None:
-        self.embeds.append(embed)
+    async def send(self, *, embeds) -> None:
+        self.messages.append(len(embeds))
+        self.embeds.extend(embeds)
 
 
 class FakeMessage:
@@ -120,6 +141,7 @@ class FakeShopChannel:
         self.messages: list[FakeMessage] = []
 
     async def send(self, *, embed) -> FakeMessage:
+        await asyncio.sleep(0)
         if self.fail_send:
             raise RuntimeError("send failed")
         self.sent_embeds.append(embed)
@@ -129,13 +151,12 @@ class FakeShopChannel:
 
 
 class FakeBot:
-    guilds = [FakeGuild()]
-
-    def __init__(self, channel: FakeShopChannel) -> None:
-        self.channel = channel
+    def __init__(self, channels: dict[int, FakeShopChannel]) -> None:
+        self.channels = channels
+        self.guilds = [FakeGuild(guild_id) for guild_id in (1, 2, 3)]
 
     def get_channel(self, channel_id: int):
-        return self.channel if channel_id == 42 else None
+        return self.channels.get(channel_id)
 
 
 class FakeFlakyFeaturedStoreService:
@@ -152,12 +173,33 @@ class FakeFlakyFeaturedStoreService:
 def make_service(db: FakeShopDb | None = None, *, metadata_fail: bool = False) -> ValorantShopService:
     return ValorantShopService(
         db or FakeShopDb(),
-        FakeChannels(),
         FakeHenrik(),
         FakeValorantApi(fail=metadata_fail),
     )
 
 
+def make_notifier(service, channels: dict[int, FakeShopChannel]) -> ValorantShopNotifier:
+    notifier = ValorantShopNotifier.__new__(ValorantShopNotifier)
+    notifier.bot = FakeBot(channels)
+    notifier._service = service
+    notifier._send_slots = asyncio.Semaphore(shop_notifier.SHOP_SEND_CONCURRENCY)
+    return notifier
+
+
+def make_item(index: int) -> ShopBundleItem:
+    return ShopBundleItem(
+        uuid=f"item-{index}",
+        name=f"Item {index}",
+        image_url=None,
+        item_type="skin",
+        amount=1,
+        discount_percent=0,
+        base_price=875,
+        discounted_price=875,
+        promo_item=False,
+    )
+
+
 @pytest.mark.asyncio
 async def test_valorant_shop_service_fetches_featured_bundles() -> None:
     bundles = await make_service().fetch_featured_bundles()
@@ -168,20 +210,20 @@ async def test_valorant_shop_service_fetches_featured_bundles() -> None:
 
 
 @pytest.mark.asyncio
-async def test_valorant_shop_service_filters_and_marks_per_guild() -> None:
-    db = FakeShopDb()
+async def test_valorant_shop_service_plans_deliveries_per_guild_in_one_query() -> None:
+    db = FakeShopDb({1: 42, 2: 43})
     service = make_service(db)
     bundles = await service.fetch_featured_bundles()
 
-    assert await service.filter_new_bundles(guild_id=1, bundles=bundles) == bundles
-    assert await service.mark_bundle_sent(guild_id=1, guild_name="Guild", bundle_uuid="bundle-1") is True
-    assert await service.filter_new_bundles(guild_id=1, bundles=bundles) == ()
-    assert await service.filter_new_bundles(guild_id=2, bundles=bundles) == bundles
-
-
-@pytest.mark.asyncio
-async def test_valorant_shop_service_reads_channel_config() -> None:
-    assert await make_service().get_notify_channel_id(1) == 42
+    assert await service.plan_deliveries(guild_ids=[1, 2, 3], bundles=bundles) == (
+        ShopDelivery(guild_id=1, channel_id=42, bundles=bundles),
+        ShopDelivery(guild_id=2, channel_id=43, bundles=bundles),
+    )
+    assert await service.mark_bundles_sent([(1, "bundle-1")]) == 1
+    assert await service.plan_deliveries(guild_ids=[1, 2, 3], bundles=bundles) == (
+        ShopDelivery(guild_id=2, channel_id=43, bundles=bundles),
+    )
+    assert db.target_queries == 2
 
 
 @pytest.mark.asyncio
@@ -300,36 +342,73 @@ async def test_shop_notifier_retries_transient_featured_store_errors(monkeypatch
 
 
 @pytest.mark.asyncio
-async def test_shop_notifier_sends_bundle_thread_and_marks_sent() -> None:
-    db = FakeShopDb()
+async def test_shop_notifier_fans_out_to_guilds_and_marks_sent_bundles_in_one_batch() -> None:
+    db = FakeShopDb({1: 42, 2: 43})
     service = make_service(db)
+    channels = {42: FakeShopChannel(), 43: FakeShopChannel()}
+    notifier = make_notifier(service, channels)
+
+    await ValorantShopNotifier.check_shop_task.coro(notifier)
+
+    for channel in channels.values():
+        assert len(channel.sent_embeds) == 1
+        assert channel.sent_embeds[0].title == "🛍️ **Bundle Test**"
+        assert channel.messages[0].thread_name == "Détails – Bundle Test"
+        assert channel.messages[0].auto_archive_duration == 1440
+        assert [embed.title for embed in channel.messages[0].thread.embeds] == ["Vandal Test"]
+    assert db.mark_calls == [[(1, "bundle-1"), (2, "bundle-1")]]
+
+    await ValorantShopNotifier.check_shop_task.coro(notifier)
+
+    assert [len(channel.sent_embeds) for channel in channels.values()] == [1, 1]
+
+
+@pytest.mark.asyncio
+async def test_shop_notifier_packs_item_embeds_ten_per_message() -> None:
+    bundle = ShopBundle(
+        bundle_uuid="bundle-big",
+        seconds_remaining=None,
+        bundle_price=9000,
+        whole_sale_only=False,
+        expires_at=None,
+        items=tuple(make_item(index) for index in range(23)),
+    )
     channel = FakeShopChannel()
-    notifier = ValorantShopNotifier.__new__(ValorantShopNotifier)
-    notifier.bot = FakeBot(channel)
-    notifier._service = service
-    bundles = await service.fetch_featured_bundles()
+    notifier = make_notifier(make_service(), {42: channel})
 
-    await notifier._notify_guild(FakeGuild(), bundles, {})
+    sent = await notifier._deliver(ShopDelivery(guild_id=1, channel_id=42, bundles=(bundle,)), {})
 
-    assert len(channel.sent_embeds) == 1
-    assert channel.sent_embeds[0].title == "🛍️ **Bundle Test**"
-    assert channel.messages[0].thread_name == "Détails – Bundle Test"
-    assert channel.messages[0].auto_archive_duration == 1440
-    assert [embed.title for embed in channel.messages[0].thread.embeds] == ["Vandal Test"]
-    assert (1, "bundle-1") in db.sent
+    assert sent == ["bundle-big"]
+    assert channel.messages[0].thread.messages == [10, 10, 3]
+    assert [embed.title for embed in channel.messages[0].thread.embeds] == [f"Item {i}" for i in range(23)]
 
 
 @pytest.mark.asyncio
-async def test_shop_notifier_does_not_mark_sent_when_main_message_fails() -> None:
-    db = FakeShopDb()
+async def test_shop_notifier_does_not_mark_guild_whose_main_message_fails() -> None:
+    db = FakeShopDb({1: 42, 2: 43})
     service = make_service(db)
-    channel = FakeShopChannel(fail_send=True)
-    notifier = ValorantShopNotifier.__new__(ValorantShopNotifier)
-    notifier.bot = FakeBot(channel)
-    notifier._service = service
-    bundles = await service.fetch_featured_bundles()
+    channels = {42: FakeShopChannel(fail_send=True), 43: FakeShopChannel()}
+    notifier = make_notifier(service, channels)
+
+    await ValorantShopNotifier.check_shop_task.coro(notifier)
+
+    assert db.sent == {(2, "bundle-1")}
+
+
+@pytest.mark.asyncio
+async def test_shop_notifier_retries_recording_sent_bundles(monkeypatch) -> None:
+    sleeps: list[float] = []
+
+    async def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(shop_notifier.asyncio, "sleep", fake_sleep)
+    db = FakeShopDb({1: 42})
+    db.mark_failures = 2
+    notifier = make_notifier(make_service(db), {42: FakeShopChannel()})
 
-    with pytest.raises(RuntimeError, match="send failed"):
-        await notifier._notify_guild(FakeGuild(), bundles, {})
+    await ValorantShopNotifier.check_shop_task.coro(notifier)
 
-    assert db.sent == set()
+    assert db.sent == {(1, "bundle-1")}
+    assert len(db.mark_calls) == 3
+    assert [delay for delay in sleeps if delay] == list(shop_notifier.SHOP_MARK_RETRY_DELAYS_SECONDS)